@@ -1,23 +1,23 @@
 import streamlit as st
 import os
+from app.core import assets
+from app.core.metrics import instrument_page
+
+def page_url(page: str) -> str:
+    """Absolute path of a page, under the server's base URL path (server.baseUrlPath) if there is one."""
+    base = st.get_option("server.baseUrlPath").strip("/")
+    return f"/{base}/{page}" if base else f"/{page}"
+
+
+@instrument_page("home_dashboard")
 def home_dashboard():
-    # Custom CSS styling
-    st.markdown("""
-    <style>
-        .header {background: linear-gradient(45deg, #4B32C3, #0078D4); padding: 2rem; border-radius: 15px;}
-        .service-card {padding: 1.5rem; border-radius: 15px; box-shadow: 0 4px 6px rgba(0,0,0,0.1); transition: transform 0.2s;}
-        .service-card:hover {transform: translateY(-5px);}
-        .icon {font-size: 2.5rem; margin-bottom: 1rem;}
-        .nav-button {width: 100%; margin-top: 1rem;}
-        @media (max-width: 768px) {.service-card {margin-bottom: 1rem;}}
-    </style>
-    """, unsafe_allow_html=True)
+    assets.apply_stylesheet("home_dashboard")
 
     # Header Section
     with st.container():
         col1, col2 = st.columns([1, 3])
         with col1:
-            st.image("assets/jobfit-logo.png", width=200)
+            assets.image("jobfit-logo", width=200, alt="JobFit AI")
         with col2:
             st.markdown("<div class='header'>", unsafe_allow_html=True)
             st.title("Welcome to JobFit AI Suite 🚀")
@@ -33,25 +33,25 @@ def home_dashboard():
     services = [
         {
             "title": "ATS Dashboard",
-            "url": "http://localhost:8501/Ats_Dashboard",
+            "url": "Ats_Dashboard",
             "icon": "📊",
             "desc": "Analyze resume against job descriptions & get ATS optimization tips"
         },
         {
             "title": "HR Q&A Assistant",
-            "url": "http://localhost:8501/HR_Question_Answer",
+            "url": "HR_Question_Answer",
             "icon": "💬",
             "desc": "Prepare for interviews with AI-powered behavioral question answers"
         },
         {
             "title": "Job Post Analyzer",
-            "url": "http://localhost:8501/Job_Posting_Analyser",
+            "url": "Job_Posting_Analyser",
             "icon": "🔍",
             "desc": "Decode job postings & identify key requirements"
         },
         {
             "title": "Resume Tailor",
-            "url": "http://localhost:8501/Resume_Tailor",
+            "url": "Resume_Tailor",
             "icon": "✂️",
             "desc": "Create targeted resumes using GitHub, job posts & personal insights"
         }
@@ -65,7 +65,7 @@ def home_dashboard():
                 <div class="icon">{service['icon']}</div>
                 <h3>{service['title']}</h3>
                 <p style="color: #666; min-height: 80px">{service['desc']}</p>
-                <a href="{service['url']}" target="_self">
+                <a href="{page_url(service['url'])}" target="_self">
                     <button class="nav-button">
                         Try {service['title'].split()[0]} →
                     </button>
@@ -0,0 +1,148 @@
+"""
+HR Batch Q&A Module
+
+This module answers a list of behavioral questions at once and turns the
+answers into a study guide:
+1. `parse_questions(text)`: one question per line; list markers ("-",
+   "1.", "Q3:") are removed, and questions that differ only in case,
+   spacing or trailing punctuation are asked once
+2. `answer_questions(questions)` fetches the answers through
+   `hr_qa_client`, HR_QA_BATCH_CONCURRENCY at a time, and yields each one
+   as soon as it arrives. The worker threads carry the session's script
+   run context, so the fair-share scheduler queues their calls under the
+   session, and the caller's context, so `queue_status` still shows the
+   queue position
+3. `study_guide_markdown(answers)`: the answers in question order as one
+   markdown document
+
+Example usage:
+    questions, duplicates = parse_questions(pasted_text)
+    answers = {}
+    for answer in answer_questions(questions):
+        answers[answer.number] = answer
+    guide = study_guide_markdown(list(answers.values()))
+"""
+
+import contextvars
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from app.core.logger import get_logger
+from app.core.metrics import counter
+
+logger = get_logger(__name__)
+
+HR_BATCH_QUESTIONS = counter("jobfit_hr_batch_questions_total", "Questions of batch HR Q&A by outcome", ["outcome"])
+
+# "-", "*", "•", "1.", "2)", "Q3:", "Q3." in front of a question
+_LIST_MARKER = re.compile(r"^\s*(?:[-*+•]|\d+[.)]|q\d+[.:)]?)\s*", re.IGNORECASE)
+_TRAILING_PUNCTUATION = re.compile(r"[\s?.!:;]+$")
+_SPACE = re.compile(r"\s+")
+_HEADING = re.compile(r"^(#{1,4})(?=\s)", re.MULTILINE)
+
+
+@dataclass(frozen=True)
+class BatchAnswer:
+    """The answer to one question of a batch."""
+    number: int  # position of the question in the batch, from 1
+    question: str
+    answer: Optional[str]  # None when the service gave no answer
+    seconds: float
+
+
+def normalize_question(question: str) -> str:
+    """The form two questions are compared in: no list marker, case, extra spaces or trailing punctuation."""
+    question = _LIST_MARKER.sub("", question, count=1)
+    return _TRAILING_PUNCTUATION.sub("", _SPACE.sub(" ", question)).strip().casefold()
+
+
+def parse_questions(text: str) -> Tuple[List[str], int]:
+    """
+    Split pasted text into questions, one per line, without duplicates.
+
+    Returns:
+        Tuple[List[str], int]: The questions as written, list markers removed,
+        in their first order, and the number of duplicate lines dropped
+    """
+    questions: List[str] = []
+    seen = set()
+    duplicates = 0
+    for line in text.splitlines():
+        key = normalize_question(line)
+        if not key:
+            continue
+        if key in seen:
+            duplicates += 1
+            continue
+        seen.add(key)
+        questions.append(_SPACE.sub(" ", _LIST_MARKER.sub("", line, count=1)).strip())
+    return questions, duplicates
+
+
+def answer_questions(questions: Sequence[str], concurrency: Optional[int] = None) -> Iterator[BatchAnswer]:
+    """
+    Yield the answers to `questions` in the order they arrive.
+
+    At most `concurrency` (default HR_QA_BATCH_CONCURRENCY) questions are
+    in flight at once. Closing the generator early, e.g. when Streamlit
+    stops the script for a rerun, cancels the questions not yet sent.
+    """
+    from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+    from app.core.config import settings
+    from app.utils.api_clients.hr_qa_client import hr_qa_client
+
+    concurrency = max(1, concurrency or settings.HR_QA_BATCH_CONCURRENCY)
+    ctx = get_script_run_ctx(suppress_warning=True)
+
+    def attach() -> None:
+        if ctx is not None:
+            add_script_run_ctx(threading.current_thread(), ctx)
+
+    def ask(number: int, question: str) -> BatchAnswer:
+        start = time.perf_counter()
+        try:
+            answer = hr_qa_client(question)
+        except Exception as e:
+            logger.warning("Batch HR question %d failed: %s", number, e)
+            answer = None
+        HR_BATCH_QUESTIONS.inc(outcome="answered" if answer else "failed")
+        return BatchAnswer(number, question, answer, time.perf_counter() - start)
+
+    executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="hr-batch", initializer=attach)
+    try:
+        # Each call runs in a copy of the caller's context, so queue listeners reach the workers
+        pending = {
+            executor.submit(contextvars.copy_context().run, ask, number, question)
+            for number, question in enumerate(questions, start=1)
+        }
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                yield future.result()
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def study_guide_markdown(answers: Sequence[BatchAnswer]) -> str:
+    """The answers, in question order, as one markdown document."""
+    ordered = sorted(answers, key=lambda answer: answer.number)
+    parts = [
+        "# Behavioral Interview Study Guide",
+        f"*{len(ordered)} questions, {date.today():%d %B %Y}*",
+        "## Contents",
+        "\n".join(f"{answer.number}. {answer.question}" for answer in ordered),
+    ]
+    for answer in ordered:
+        parts.append(f"## {answer.number}. {answer.question}")
+        if answer.answer:
+            # Headings inside an answer go below the question's heading
+            parts.append(_HEADING.sub(r"##\1", answer.answer.strip()))
+        else:
+            parts.append("*No answer was received for this question.*")
+    return "\n\n".join(parts) + "\n"
@@ -1,5 +1,95 @@
 import streamlit as st
-from app.utils.api_clients.hr_qa_client import hr_qa_client
+
+from app.components.queue_status import queue_status
+from app.core import session_store
+
+SINGLE_MODE = "🔍 Single Question"
+BATCH_MODE = "📚 Batch Study Guide"
+STUDY_GUIDE_KEY = "hr_study_guide"
+
+
+def _show_answer(slot, answer) -> None:
+    """Render one batch answer into its placeholder."""
+    with slot.container():
+        if answer.answer:
+            st.markdown(answer.answer)
+        else:
+            st.warning("⚠️ No answer was received for this question. Try it again in Single Question mode.")
+
+
+def hr_batch_qa():
+    """Batch mode: answer a pasted list of questions and export them as a study guide"""
+    st.markdown("""
+        Paste the questions you are preparing for, **one per line**. Repeated questions are
+        asked once; answers appear as they arrive and can be downloaded as one study guide.
+    """)
+    text = st.text_area(
+        "Behavioral Questions :",
+        placeholder="Tell me about a time you disagreed with a team member\n"
+                    "Describe a situation where you had to lead without formal authority",
+        height=220,
+        key="batch_questions",
+    )
+    build_btn = st.button("📚 Build Study Guide", use_container_width=True)
+
+    if build_btn:
+        # Imported on first use so the page renders before requests/pydantic load
+        from app.components.hr_batch import answer_questions, parse_questions, study_guide_markdown
+        from app.core.config import settings
+
+        questions, duplicates = parse_questions(text or "")
+        if not questions:
+            st.warning("⚠️ Please input at least one question")
+            st.stop()
+        if duplicates:
+            st.info(f"♻️ {duplicates} repeated question(s) skipped")
+        if len(questions) > settings.HR_QA_BATCH_MAX_QUESTIONS:
+            st.warning(f"⚠️ Only the first {settings.HR_QA_BATCH_MAX_QUESTIONS} of {len(questions)} questions are answered")
+            questions = questions[:settings.HR_QA_BATCH_MAX_QUESTIONS]
+        session_store.put(STUDY_GUIDE_KEY, None)
+
+        progress = st.progress(0.0, text=f"🧠 Answering {len(questions)} questions...")
+        with queue_status():
+            # One box per question in the pasted order, filled as its answer arrives
+            slots = {}
+            for number, question in enumerate(questions, start=1):
+                with st.container(border=True):
+                    st.markdown(f"#### {number}. {question}")
+                    slots[number] = st.empty()
+                    slots[number].caption("⏳ Waiting for the answer...")
+            answers = []
+            for answer in answer_questions(questions):
+                answers.append(answer)
+                _show_answer(slots[answer.number], answer)
+                progress.progress(len(answers) / len(questions), text=f"{len(answers)} of {len(questions)} answered")
+
+        answered = sum(1 for answer in answers if answer.answer)
+        progress.progress(1.0, text=f"✅ {answered} of {len(questions)} questions answered")
+        # Large values go through the session store so idle sessions spill them to disk
+        session_store.put(STUDY_GUIDE_KEY, {
+            "answers": sorted(answers, key=lambda answer: answer.number),
+            "markdown": study_guide_markdown(answers),
+        })
+        st.toast("✅ Study guide ready!", icon="✅")
+
+    guide = session_store.get(STUDY_GUIDE_KEY)
+    if not guide:
+        return
+    if not build_btn:
+        # Reruns (e.g. a download click) show the last study guide again
+        for answer in guide["answers"]:
+            with st.container(border=True):
+                st.markdown(f"#### {answer.number}. {answer.question}")
+                _show_answer(st.empty(), answer)
+    st.download_button(
+        label="⬇️ Download Study Guide (Markdown)",
+        data=guide["markdown"],
+        file_name="hr_study_guide.md",
+        # UTF-8, so answers in any script download as written
+        mime="text/markdown; charset=utf-8",
+        use_container_width=True,
+    )
+
 
 def hr_behavioral_qa():
     """HR Behavioral Interview QA Interface with enhanced UX"""
@@ -13,6 +103,13 @@ def hr_behavioral_qa():
             **Get HR answer** to behavioral interview questions
         """)
         
+        mode = st.radio(
+            "Mode", [SINGLE_MODE, BATCH_MODE], horizontal=True, label_visibility="collapsed", key="hr_qa_mode"
+        )
+        if mode == BATCH_MODE:
+            hr_batch_qa()
+            return
+
         # Help section with examples
         with st.expander("💡 Example Behavioral Questions"):
             st.markdown("""
@@ -41,7 +138,10 @@ def hr_behavioral_qa():
                 
             with st.status("🧠 Analyzing behavioral patterns...", expanded=True) as status:
                 try:
-                    answer = hr_qa_client(query)
+                    # Imported on first use so the page renders before requests/pydantic load
+                    from app.utils.api_clients.hr_qa_client import hr_qa_client
+                    with queue_status():
+                        answer = hr_qa_client(query)
                     if not answer:
                         raise ValueError("Empty response from analysis engine")
                         
@@ -1,6 +1,6 @@
 import streamlit as st
 
-from app.utils.api_clients.job_posting_analyser_client import analyze_job_posting
+from app.components.queue_status import queue_status
 
 
 def job_posting_analyser():
@@ -9,7 +9,9 @@ def job_posting_analyser():
         if st.button("Analyze"):
             if url:
                 with st.spinner("Analyzing..."):
-                    response = analyze_job_posting(url)
+                    from app.utils.api_clients.job_posting_analyser_client import analyze_job_posting
+                    with queue_status():
+                        response = analyze_job_posting(url)
                     st.markdown(response)
     except Exception as e:
             st.error(f"Error processing response: {e}")
\ No newline at end of file
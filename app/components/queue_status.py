@@ -0,0 +1,34 @@
+"""
+Queue Status Component
+
+Tells the user where they are in the backend queue (see
+`app.utils.api_clients.scheduler`) while one of their calls waits for a slot.
+"""
+from contextlib import contextmanager
+from typing import Iterator
+
+import streamlit as st
+
+
+@contextmanager
+def queue_status() -> Iterator[None]:
+    """
+    Show the queue position of backend calls made inside the block while
+    they wait; nothing is shown when a slot is free right away.
+    """
+    # Imported on first use, like the API clients, to keep page imports cheap
+    from app.utils.api_clients.scheduler import on_queue_wait
+
+    placeholder = st.empty()
+
+    def show(position: int) -> None:
+        if position:
+            placeholder.info(f"⏳ The service is busy, you are number {position} in the queue")
+        else:
+            placeholder.empty()
+
+    try:
+        with on_queue_wait(show):
+            yield
+    finally:
+        placeholder.empty()
@@ -3,18 +3,123 @@ Resume Analysis UI Module
 
 This module provides UI functionality for uploading resumes, entering job descriptions,
 and analyzing them through the ATS checker service.
+
+As soon as both inputs are there, `prepare_analysis_inputs` extracts the
+resume text (with pypdf when it is installed) and normalizes the job
+description, and `speculate_resume_analysis` can start the ATS check in the
+background (at most SPECULATION_ATS_MAX_PER_SESSION per session, by default
+none, so only the local preparation runs before the click). The job
+description is sent as pasted; its normalized form only identifies the check.
+Speculative checks are keyed by a hash of the resume bytes and the normalized
+job description, so any real change to either supersedes them, while pasting
+the same posting again does not; `analysis_sections` replays a speculative
+check or runs a new one.
 """
-from typing import BinaryIO, Optional
+from dataclasses import dataclass
+from typing import Any, BinaryIO, Iterator, Optional, Tuple
+import hashlib
+import io
+import re
 import traceback
+import unicodedata
 
-# Import custom components
-from app.utils.api_clients.ats_client import check_resume_against_job_description
+# API clients are imported inside the functions, so that importing this module
+# (and the page that uses it) does not load requests and pydantic
+from app.core import speculation
 from app.core.logger import get_logger
 from app.core.exceptions import CustomException
 
 # Initialize logger
 logger = get_logger(__name__)
 
+ATS_SPECULATION = "ats_check"
+
+
+@dataclass(frozen=True)
+class AnalysisInputs:
+    """Resume and job description as sent to the ATS checker, identified by their content."""
+    resume_name: str
+    # As pasted
+    job_description: str
+    # sha256 of the resume bytes and the normalized job description
+    key: str
+    # sha256 of the resume bytes
+    resume_digest: str
+    is_pdf: bool
+    # Text of the resume's pages; None when pypdf is not installed or the file is no PDF
+    resume_text: Optional[str] = None
+
+
+def normalize_job_description(text: str) -> str:
+    """
+    Normalize pasted job description text: Unicode NFC, Unix line endings, single spaces,
+    at most one blank line in a row and no surrounding whitespace.
+
+    Pasting the same posting twice (from a browser, a PDF or an email) then gives the
+    same text, and the same ATS check.
+    """
+    text = unicodedata.normalize("NFC", text).replace("\r\n", "\n").replace("\r", "\n")
+    text = re.sub(r"[ \t\f\v\u00a0]+", " ", text)
+    text = re.sub(r" ?\n ?", "\n", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    return text.strip()
+
+
+def extract_resume_text(data: bytes) -> Tuple[bool, Optional[str]]:
+    """
+    Extract the text of a PDF resume, the way an ATS reads it.
+
+    pypdf is optional: without it only the PDF header is checked and no text is returned.
+
+    Returns:
+        Tuple[bool, Optional[str]]: Whether `data` is a readable PDF, and the text of its pages
+    """
+    try:
+        import pypdf
+    except ImportError:
+        return data.startswith(b"%PDF-"), None
+    try:
+        reader = pypdf.PdfReader(io.BytesIO(data))
+        return True, "\n".join(page.extract_text() or "" for page in reader.pages).strip()
+    except Exception as e:
+        logger.warning("Could not read the uploaded resume as a PDF: %s", e)
+        return False, None
+
+
+def prepare_analysis_inputs(
+    resume_file: BinaryIO,
+    job_description: str,
+    previous: Optional[AnalysisInputs] = None
+) -> AnalysisInputs:
+    """
+    Extract the uploaded resume's text and identify the inputs of an ATS check.
+
+    Args:
+        resume_file: The uploaded resume file object
+        job_description: String containing the job description text, as pasted
+        previous: Inputs prepared before; their resume text is reused if the resume is the same
+
+    Returns:
+        AnalysisInputs: The inputs as sent to the ATS checker
+    """
+    data = resume_file.getvalue()
+    digest = hashlib.sha256(data)
+    resume_digest = digest.hexdigest()
+    if previous is not None and previous.resume_digest == resume_digest:
+        is_pdf, resume_text = previous.is_pdf, previous.resume_text
+    else:
+        is_pdf, resume_text = extract_resume_text(data)
+    digest.update(b"\0")
+    digest.update(normalize_job_description(job_description).encode("utf-8"))
+    return AnalysisInputs(
+        resume_name=resume_file.name,
+        job_description=job_description,
+        key=digest.hexdigest(),
+        resume_digest=resume_digest,
+        is_pdf=is_pdf,
+        resume_text=resume_text
+    )
+
 
 def resume_analyzer(resume_file: Optional[BinaryIO], job_description: str) -> None:
     """
@@ -36,6 +141,7 @@ def resume_analyzer(resume_file: Optional[BinaryIO], job_description: str) -> No
         logger.info("Starting resume analysis")
         
         # Call the ATS checker API
+        from app.utils.api_clients.ats_client import check_resume_against_job_description
         return check_resume_against_job_description(
             resume_file, 
             job_description
@@ -44,8 +150,87 @@ def resume_analyzer(resume_file: Optional[BinaryIO], job_description: str) -> No
 
                     
     except CustomException as ce:
-        logger.error(f"Custom exception in resume analysis: {str(ce)}")
+        logger.error("Custom exception in resume analysis: %s", ce)
 
     except Exception as e:
-        logger.error(f"Unexpected error in resume analysis: {str(e)}")
+        logger.error("Unexpected error in resume analysis: %s", e)
         logger.debug(traceback.format_exc())
+
+
+def stream_resume_analysis(
+    resume_file: BinaryIO,
+    job_description: str
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the ATS analysis section by section so the UI can render each part
+    as soon as it arrives.
+    
+    Args:
+        resume_file: The uploaded resume file object
+        job_description: String containing the job description text
+        
+    Yields:
+        Tuple of report section name and its validated value
+        
+    Raises:
+        CustomException: If the ATS request fails
+    """
+    logger.info("Starting streamed resume analysis")
+    from app.utils.api_clients.ats_client import stream_ats_report
+    yield from stream_ats_report(resume_file, job_description)
+
+
+def speculate_resume_analysis(resume_file: BinaryIO, inputs: AnalysisInputs) -> None:
+    """
+    Start the ATS check for `inputs` in the background, superseding one for other inputs.
+
+    Args:
+        resume_file: The uploaded resume file object
+        inputs: The prepared inputs of `resume_file` and the job description
+    """
+    from app.core.config import settings
+
+    if settings.SPECULATION_ATS_MAX_PER_SESSION <= 0:
+        return
+    data = resume_file.getvalue()
+
+    def check():
+        # A copy of the upload, so the page can read the original meanwhile
+        upload = io.BytesIO(data)
+        upload.name = inputs.resume_name
+        return stream_resume_analysis(upload, inputs.job_description)
+
+    speculation.speculate(
+        ATS_SPECULATION, inputs.key, check, stream=True, limit=settings.SPECULATION_ATS_MAX_PER_SESSION
+    )
+
+
+def analysis_sections(resume_file: BinaryIO, inputs: AnalysisInputs) -> Iterator[Tuple[str, Any]]:
+    """
+    Stream the ATS analysis of `inputs`: from the speculative check for them if there is
+    one, done or in flight, otherwise from a new request.
+
+    Args:
+        resume_file: The uploaded resume file object
+        inputs: The prepared inputs of `resume_file` and the job description
+
+    Yields:
+        Tuple of report section name and its validated value
+
+    Raises:
+        CustomException: If the ATS request fails
+    """
+    running = speculation.take(ATS_SPECULATION, inputs.key)
+    if running is not None:
+        received = 0
+        try:
+            for section in running.items():
+                received += 1
+                yield section
+            return
+        except Exception as e:
+            if received:
+                raise
+            logger.warning("Speculative ATS check failed, checking again: %s", e)
+    resume_file.seek(0)
+    yield from stream_resume_analysis(resume_file, inputs.job_description)
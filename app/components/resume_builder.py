@@ -1,8 +1,9 @@
 import streamlit as st
+from app.components.queue_status import queue_status
+from app.core import session_store
 from app.core.logger import get_logger
 # from app.components.resume_tailor.html_populator import process_resume_data
 # from app.components.resume_tailor.html_to_pdf import create_pdf_from_html
-from app.utils.api_clients.resume_tailor_client import tailor_resume_and_guide
 
 logger = get_logger(__name__)
 
@@ -35,10 +36,13 @@ def resume_builder():
 
         with st.spinner("Analyzing your resume and job posting..."):
             try:
-                response = tailor_resume_and_guide(resume_file, job_posting_link, github_link, write_up)
+                # Imported on first use so the form renders before requests/pydantic load
+                from app.utils.api_clients.resume_tailor_client import tailor_resume_and_guide
+                with queue_status():
+                    response = tailor_resume_and_guide(resume_file, job_posting_link, github_link, write_up)
 
                 # resume_json = response.get("resume_json")
-                markdown_result = response.json().get("result", "No analysis provided.")
+                markdown_result = response.result
 
                 # if not resume_json:
                 #     st.error("Invalid response format: missing resume data")
@@ -55,23 +59,24 @@ def resume_builder():
                 # Save results to session
                 st.session_state.submitted = True
                 # st.session_state.resume_json = resume_json
-                st.session_state.markdown_result = markdown_result
-                st.session_state.pdf_bytes = pdf_bytes
+                # Large values go through the session store so idle sessions spill them to disk
+                session_store.put("markdown_result", markdown_result)
+                session_store.put("pdf_bytes", pdf_bytes)
 
                 st.success("Your tailored resume is ready!")
 
             except Exception as e:
-                logger.exception(f"Error generating resume: {str(e)}")
+                logger.exception("Error generating resume: %s", e)
                 st.error(f"Something went wrong. Please try again.{e}")
 
     # === Display Results and Download Button AFTER Submission ===
     if st.session_state.submitted:
         st.download_button(
             label="Download Tailored Resume",
-            data=st.session_state.pdf_bytes,
+            data=session_store.get("pdf_bytes"),
             file_name="tailored_resume.pdf",
             mime="application/pdf"
         )
 
         st.subheader("Resume Analysis")
-        st.markdown(st.session_state.markdown_result)
+        st.markdown(session_store.get("markdown_result"))
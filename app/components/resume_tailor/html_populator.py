@@ -1,11 +1,11 @@
 
 import json
 from app.core.logger import get_logger
+from app.core.metrics import histogram, timed
 from typing import Dict, Any, Union
 
 
 from app.schema.resume_data import ResumeData
-from jinja2 import Environment, FileSystemLoader
 import os
 
 # Configure logging
@@ -19,7 +19,10 @@ import os
 # )
 logger = get_logger(__name__)
 
+RENDER_SECONDS = histogram("jobfit_render_seconds", "Resume rendering duration by stage", ["stage"])
 
+
+@timed(RENDER_SECONDS, stage="populate_html")
 def populate_html_template(template_path: str, resume_data: Dict[str, Any]) -> str:
     """
     Populate HTML template with resume data
@@ -32,6 +35,9 @@ def populate_html_template(template_path: str, resume_data: Dict[str, Any]) -> s
         Populated HTML string
     """
     try:
+        # jinja2 is only needed when a resume is rendered
+        from jinja2 import Environment, FileSystemLoader
+        
         # Create Jinja2 environment
         template_dir = os.path.dirname(template_path)
         template_file = os.path.basename(template_path)
@@ -42,7 +48,7 @@ def populate_html_template(template_path: str, resume_data: Dict[str, Any]) -> s
         # Render the template with resume data
         return template.render(resume=resume_data)
     except Exception as e:
-        logger.exception(f"Error populating HTML template: {str(e)}")
+        logger.exception("Error populating HTML template: %s", e)
         raise
 
 # def extract_resume_json(response: str) -> Optional[Dict[str, Any]]:
@@ -92,7 +98,8 @@ def process_resume_data(resume_input: Union[Dict[str, Any], str]) -> str:
         Populated HTML string
     """
     try:
-        logger.info(f"Resume function started{resume_input}")
+        logger.info("Resume function started")
+        logger.debug("Resume input: %r", resume_input)
         # Parse string input to dict
         # if isinstance(resume_input, str):
         #     resume_json = json.loads(resume_input)
@@ -120,9 +127,9 @@ def process_resume_data(resume_input: Union[Dict[str, Any], str]) -> str:
         with open(output_path, 'w') as f:
             f.write(populated_html)
 
-        logger.info(f"Resume HTML generated successfully at {output_path}")
+        logger.info("Resume HTML generated successfully at %s", output_path)
         return populated_html
 
     except Exception as e:
-        logger.error(f"Error processing resume data: {e}")
+        logger.error("Error processing resume data: %s", e)
         raise 
\ No newline at end of file
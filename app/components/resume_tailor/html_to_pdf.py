@@ -3,6 +3,7 @@ import os
 # import tempfile
 # from pathlib import Path
 from app.core.logger import get_logger
+from app.core.metrics import histogram, timed
 from typing import Union, Optional
 # from playwright.sync_api import sync_playwright
 
@@ -19,6 +20,9 @@ from typing import Union, Optional
 # )
 logger = get_logger(__name__)
 
+RENDER_SECONDS = histogram("jobfit_render_seconds", "Resume rendering duration by stage", ["stage"])
+
+@timed(RENDER_SECONDS, stage="create_pdf")
 def create_pdf_from_html( output_path: Optional[str] = None) -> Union[bytes, str]:
     """
     Convert HTML content to PDF using Playwright
@@ -79,7 +83,7 @@ def create_pdf_from_html( output_path: Optional[str] = None) -> Union[bytes, str
         # return output_path
         
     except Exception as e:
-        logger.exception(f"Error generating PDF: {str(e)}")
+        logger.exception("Error generating PDF: %s", e)
         raise
 
 # def create_pdf_from_html_file(output_path: Optional[str] = None) -> Union[bytes, str]:
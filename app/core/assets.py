@@ -0,0 +1,256 @@
+"""
+Static Assets Module
+
+This module prepares the images and styles the pages show, so they are
+processed once instead of on every rerun:
+1. Images listed in IMAGE_VARIANTS are resized to each display width at 1x
+   and 2x and encoded as WebP and PNG
+2. Each stylesheet in `assets/styles/` belongs to the page it is named
+   after (`ats_dashboard.css`), and `apply_stylesheet(page)` applies only
+   that one, so one page's global rules do not restyle another
+3. Every generated file is named after a hash of its content and written to
+   `static/`, which Streamlit serves at `app/static/` (server.enableStaticServing)
+   under the server's base URL path, so browsers can cache it for good; a
+   `?v=` query additionally makes Tornado's static handler send a long max-age
+4. `static/manifest.json` maps the sources to their generated files; it is
+   rebuilt on first use when a source changed, or ahead of time with
+   `python -m app.core.assets`. A rebuild removes the files of the previous
+   manifest that are no longer used, and nothing else in `static/`
+
+When the static directory cannot be written or static serving is disabled,
+images fall back to `st.image` and styles to an inline `<style>` block.
+
+Example usage:
+    from app.core import assets
+
+    assets.apply_stylesheet("home_dashboard")
+    assets.image("jobfit-logo", width=200)
+"""
+
+import argparse
+import hashlib
+import io
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+ROOT = Path(__file__).resolve().parents[2]
+SOURCE_DIR = ROOT / "assets"
+STATIC_DIR = ROOT / "static"
+STATIC_URL = "app/static"
+
+# Image name (file in SOURCE_DIR without extension) -> display widths in CSS pixels
+IMAGE_VARIANTS: Dict[str, List[int]] = {
+    "jobfit-logo": [200],
+}
+DENSITIES = (1, 2)
+WEBP_QUALITY = 85
+
+MANIFEST_VERSION = 2
+
+
+def _source_files(source_dir: Path) -> List[Path]:
+    images = [source_dir / f"{name}.png" for name in IMAGE_VARIANTS]
+    return images + sorted((source_dir / "styles").glob("*.css"))
+
+
+def _fingerprint(source_dir: Path) -> Dict[str, str]:
+    """Size and modification time of every source, to tell when a rebuild is due."""
+    fingerprint = {}
+    for path in _source_files(source_dir):
+        stat = path.stat()
+        fingerprint[path.relative_to(source_dir).as_posix()] = f"{stat.st_size}:{stat.st_mtime_ns}"
+    return fingerprint
+
+
+def _write_hashed(static_dir: Path, stem: str, suffix: str, data: bytes) -> str:
+    """Write `data` under a content-hashed name, unless it is already there; return the name."""
+    name = f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{suffix}"
+    path = static_dir / name
+    if not path.exists():
+        tmp = path.with_name(f".{name}.{os.getpid()}.tmp")
+        tmp.write_bytes(data)
+        os.replace(tmp, path)
+    return name
+
+
+def _build_images(source_dir: Path, static_dir: Path) -> Dict[str, Any]:
+    from PIL import Image
+
+    images: Dict[str, Any] = {}
+    for name, widths in IMAGE_VARIANTS.items():
+        with Image.open(source_dir / f"{name}.png") as source:
+            source.load()
+            has_alpha = source.mode in ("RGBA", "LA") or "transparency" in source.info
+            source = source.convert("RGBA" if has_alpha else "RGB")
+            for width in widths:
+                variants: Dict[str, List[str]] = {"webp": [], "png": []}
+                for density in DENSITIES:
+                    # Never upscale: a 2x variant of a small source is the source itself
+                    pixels = min(width * density, source.width)
+                    height = round(source.height * pixels / source.width)
+                    resized = source.resize((pixels, height), Image.LANCZOS)
+                    for fmt, options in (("webp", {"quality": WEBP_QUALITY, "method": 6}), ("png", {"optimize": True})):
+                        buffer = io.BytesIO()
+                        resized.save(buffer, fmt.upper(), **options)
+                        variants[fmt].append(_write_hashed(static_dir, f"{name}-{width}w@{density}x", f".{fmt}", buffer.getvalue()))
+                images.setdefault(name, {})[str(width)] = {"height": round(source.height * width / source.width), **variants}
+    return images
+
+
+def _stylesheet(source_dir: Path, page: str) -> str:
+    path = source_dir / "styles" / f"{page}.css"
+    return f"/* {path.name} */\n{path.read_text(encoding='utf-8').strip()}\n"
+
+
+def _files(manifest: Dict[str, Any]) -> List[str]:
+    """Generated files a manifest lists; earlier versions had one "stylesheet" for every page."""
+    files = list(manifest.get("stylesheets", {}).values())
+    if "stylesheet" in manifest:
+        files.append(manifest["stylesheet"])
+    for sizes in manifest.get("images", {}).values():
+        for variant in sizes.values():
+            files += variant["webp"] + variant["png"]
+    return files
+
+
+def build(source_dir: Path = SOURCE_DIR, static_dir: Path = STATIC_DIR) -> Dict[str, Any]:
+    """Generate every image variant and page stylesheet, and write the manifest."""
+    static_dir.mkdir(parents=True, exist_ok=True)
+    try:
+        previous = json.loads((static_dir / "manifest.json").read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        previous = {}
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "sources": _fingerprint(source_dir),
+        "images": _build_images(source_dir, static_dir),
+        "stylesheets": {
+            path.stem: _write_hashed(static_dir, path.stem, ".css", _stylesheet(source_dir, path.stem).encode("utf-8"))
+            for path in sorted((source_dir / "styles").glob("*.css"))
+        },
+    }
+    # Drop the files of the previous build that this one does not use; other files are not ours
+    live = set(_files(manifest))
+    try:
+        stale = [name for name in _files(previous) if name not in live]
+    except (AttributeError, KeyError, TypeError):
+        stale = []
+    for name in stale:
+        (static_dir / Path(name).name).unlink(missing_ok=True)
+    tmp = static_dir / f".manifest.{os.getpid()}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, static_dir / "manifest.json")
+    logger.info("Built static assets in %s", static_dir)
+    return manifest
+
+
+def _is_current(manifest: Dict[str, Any], source_dir: Path, static_dir: Path) -> bool:
+    if manifest.get("version") != MANIFEST_VERSION or manifest.get("sources") != _fingerprint(source_dir):
+        return False
+    return all((static_dir / name).exists() for name in _files(manifest))
+
+
+def load_manifest(source_dir: Path = SOURCE_DIR, static_dir: Path = STATIC_DIR) -> Dict[str, Any]:
+    """The current manifest, rebuilding the assets if a source changed or a file is missing."""
+    try:
+        manifest = json.loads((static_dir / "manifest.json").read_text(encoding="utf-8"))
+        if _is_current(manifest, source_dir, static_dir):
+            return manifest
+    except (OSError, ValueError, KeyError):
+        pass
+    return build(source_dir, static_dir)
+
+
+_manifest: Optional[Dict[str, Any]] = None
+_manifest_failed = False
+_manifest_lock = threading.Lock()
+
+
+def get_manifest() -> Optional[Dict[str, Any]]:
+    """The process-wide manifest, or None when the assets cannot be built or served."""
+    global _manifest, _manifest_failed
+    if _manifest is None and not _manifest_failed:
+        with _manifest_lock:
+            if _manifest is None and not _manifest_failed:
+                try:
+                    import streamlit as st
+
+                    if not st.get_option("server.enableStaticServing"):
+                        raise RuntimeError("server.enableStaticServing is off")
+                    _manifest = load_manifest()
+                except (OSError, ImportError, RuntimeError) as e:
+                    logger.warning("Serving assets inline, static assets are unavailable: %s", e)
+                    _manifest_failed = True
+    return _manifest
+
+
+def _url(name: str) -> str:
+    """Absolute path of a generated file, under the server's base URL path (server.baseUrlPath) if there is one."""
+    import streamlit as st
+
+    digest = name.rsplit(".", 2)[-2]
+    base = st.get_option("server.baseUrlPath").strip("/")
+    prefix = f"/{base}" if base else ""
+    return f"{prefix}/{STATIC_URL}/{name}?v={digest}"
+
+
+def image_html(manifest: Dict[str, Any], name: str, width: int, alt: str = "") -> str:
+    """`<picture>` markup choosing WebP or PNG at the screen's pixel density."""
+    variant = manifest["images"][name][str(width)]
+
+    def srcset(files: List[str]) -> str:
+        return ", ".join(f"{_url(file)} {density}x" for file, density in zip(files, DENSITIES))
+
+    return (
+        f'<picture><source type="image/webp" srcset="{srcset(variant["webp"])}">'
+        f'<img src="{_url(variant["png"][0])}" srcset="{srcset(variant["png"])}" '
+        f'width="{width}" height="{variant["height"]}" alt="{alt}"></picture>'
+    )
+
+
+def image(name: str, width: int, alt: str = "") -> None:
+    """Show an image of IMAGE_VARIANTS at `width` CSS pixels."""
+    import streamlit as st
+
+    manifest = get_manifest()
+    if manifest is None or str(width) not in manifest["images"].get(name, {}):
+        st.image(str(SOURCE_DIR / f"{name}.png"), width=width)
+        return
+    st.markdown(image_html(manifest, name, width, alt), unsafe_allow_html=True)
+
+
+def apply_stylesheet(page: str) -> None:
+    """Apply the stylesheet of `page` (`assets/styles/<page>.css`) to the page."""
+    import streamlit as st
+
+    manifest = get_manifest()
+    if manifest is None or page not in manifest["stylesheets"]:
+        st.markdown(f"<style>\n{_stylesheet(SOURCE_DIR, page)}</style>", unsafe_allow_html=True)
+        return
+    st.markdown(f'<style>@import url("{_url(manifest["stylesheets"][page])}");</style>', unsafe_allow_html=True)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the static assets ahead of time")
+    parser.add_argument("--source-dir", type=Path, default=SOURCE_DIR)
+    parser.add_argument("--static-dir", type=Path, default=STATIC_DIR)
+    args = parser.parse_args()
+
+    manifest = build(args.source_dir, args.static_dir)
+    for name, sizes in manifest["images"].items():
+        for width, variant in sizes.items():
+            for file in variant["webp"] + variant["png"]:
+                print(f"{name} {width}w: {file} ({(args.static_dir / file).stat().st_size} bytes)")
+    for page, file in manifest["stylesheets"].items():
+        print(f"{page} stylesheet: {file} ({(args.static_dir / file).stat().st_size} bytes)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,442 @@
+"""
+Result Cache Module
+
+This module provides the cache shared by the API clients, so replicas reuse
+the results of expensive backend calls instead of each computing them again:
+1. `CacheBackend`, the interface: get / set / delete with a TTL, plus
+   `claim` / `fill`, which make get-or-compute atomic across threads,
+   processes and replicas (one caller computes a missing key while the
+   others wait for its result)
+2. `MemoryCache`: in-process LRU, for a single replica
+3. `SQLiteCache`: a SQLite database in WAL mode, for replicas sharing a volume
+4. `RedisCache`: a minimal Redis protocol client (GET, SET PX NX, DEL), for
+   replicas on different hosts; `benchmarks.redis_standin` serves the same
+   commands locally
+5. `get_cache()`, the backend selected by CACHE_BACKEND
+
+Every backend drops entries larger than CACHE_MAX_ENTRY_BYTES. The memory
+and SQLite backends also keep their total size under CACHE_MAX_BYTES; with
+Redis the server's own memory limit and eviction policy apply.
+
+Example usage:
+    cache = get_cache()
+    if cache is not None:
+        value, hit = cache.get_or_compute(key, lambda: expensive().encode())
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import unquote, urlparse
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+CACHE_BACKENDS = ("none", "memory", "sqlite", "redis")
+
+
+class CacheBackend:
+    """
+    Interface of a result cache.
+
+    Subclasses implement `get`, `set`, `delete`, `_acquire` and `_release`;
+    `claim`, `fill` and `get_or_compute` are built on top of them.
+    """
+
+    name = "base"
+
+    def __init__(self, ttl: float, max_entry_bytes: int, lock_timeout: float):
+        self.ttl = ttl
+        self.max_entry_bytes = max_entry_bytes
+        self.lock_timeout = lock_timeout
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def _acquire(self, key: str, token: str, ttl: float) -> bool:
+        """Take the compute lock of `key` unless another caller holds it."""
+        raise NotImplementedError
+
+    def _release(self, key: str, token: str) -> None:
+        """Give up the compute lock of `key` if `token` still holds it."""
+        raise NotImplementedError
+
+    def claim(self, key: str) -> Tuple[Optional[bytes], Optional[str]]:
+        """
+        Return the cached value of `key`, or the right to compute it.
+
+        While another caller computes the key, wait for its result, up to
+        `lock_timeout` seconds; after that the caller computes the value
+        itself without holding the lock.
+
+        Returns:
+            (value, None) on a hit, (None, token) when the caller must compute
+            the value and pass the token to `fill`, (None, None) when the wait
+            timed out
+        """
+        value = self.get(key)
+        if value is not None:
+            return value, None
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        pause = 0.01
+        while True:
+            if self._acquire(key, token, self.lock_timeout):
+                # The previous holder may have filled the key in the meantime
+                value = self.get(key)
+                if value is not None:
+                    self._release(key, token)
+                    return value, None
+                return None, token
+            if time.monotonic() >= deadline:
+                logger.warning("Timed out waiting for cache key %s, computing it again", key, rate_limit=60)
+                return None, None
+            time.sleep(pause)
+            pause = min(pause * 2, 0.25)
+            value = self.get(key)
+            if value is not None:
+                return value, None
+
+    def fill(self, key: str, token: Optional[str], value: Optional[bytes], ttl: Optional[float] = None) -> None:
+        """Store the computed value (None stores nothing) and release the claim."""
+        try:
+            if value is not None:
+                self.set(key, value, ttl)
+        finally:
+            if token is not None:
+                self._release(key, token)
+
+    def get_or_compute(
+        self,
+        key: str,
+        compute: Callable[[], Optional[bytes]],
+        ttl: Optional[float] = None
+    ) -> Tuple[Optional[bytes], bool]:
+        """
+        Return the cached value of `key`, computing and storing it on a miss.
+
+        Concurrent callers of the same key, in any process sharing the
+        backend, wait for the first one's result instead of computing it too.
+
+        Args:
+            key: Cache key
+            compute: Returns the value, or None for a result that must not be cached
+            ttl: Seconds to keep the value, defaults to the backend's TTL
+
+        Returns:
+            The value and whether it came from the cache
+        """
+        value, token = self.claim(key)
+        if value is not None:
+            return value, True
+        value = None
+        try:
+            value = compute()
+        finally:
+            self.fill(key, token, value, ttl)
+        return value, False
+
+    def _fits(self, key: str, value: bytes) -> bool:
+        if len(value) > self.max_entry_bytes:
+            logger.debug("Not caching %s: %d bytes is over the entry limit", key, len(value))
+            return False
+        return True
+
+
+class MemoryCache(CacheBackend):
+    """In-process LRU cache, bounded by total size."""
+
+    name = "memory"
+
+    def __init__(self, ttl: float, max_entry_bytes: int, lock_timeout: float, max_bytes: int):
+        super().__init__(ttl, max_entry_bytes, lock_timeout)
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: "OrderedDict[str, Tuple[bytes, float]]" = OrderedDict()
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry[0]
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if not self._fits(key, value):
+            return
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (value, expires_at)
+            self.size += len(value)
+            while self.size > self.max_bytes and self._entries:
+                self._remove(next(iter(self._entries)))
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._remove(key)
+
+    def _remove(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.size -= len(entry[0])
+
+    def _acquire(self, key: str, token: str, ttl: float) -> bool:
+        now = time.time()
+        with self._lock:
+            holder = self._locks.get(key)
+            if holder is not None and holder[1] > now:
+                return False
+            self._locks[key] = (token, now + ttl)
+            return True
+
+    def _release(self, key: str, token: str) -> None:
+        with self._lock:
+            holder = self._locks.get(key)
+            if holder is not None and holder[0] == token:
+                del self._locks[key]
+
+
+class SQLiteCache(CacheBackend):
+    """
+    Cache in a SQLite database in WAL mode, shared by every process that
+    opens the same file. When the total size goes over `max_bytes`, the
+    entries closest to expiry are evicted first.
+    """
+
+    name = "sqlite"
+
+    def __init__(self, ttl: float, max_entry_bytes: int, lock_timeout: float, max_bytes: int, path: Path):
+        super().__init__(ttl, max_entry_bytes, lock_timeout)
+        self.max_bytes = max_bytes
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as db:
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS entries ("
+                "key TEXT PRIMARY KEY, value BLOB NOT NULL, size INTEGER NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS entries_expires_at ON entries (expires_at)")
+            db.execute("CREATE TABLE IF NOT EXISTS locks (key TEXT PRIMARY KEY, token TEXT NOT NULL, expires_at REAL NOT NULL)")
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared between threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    def get(self, key: str) -> Optional[bytes]:
+        row = self._connection().execute(
+            "SELECT value FROM entries WHERE key = ? AND expires_at > ?", (key, time.time())
+        ).fetchone()
+        return None if row is None else bytes(row[0])
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if not self._fits(key, value):
+            return
+        now = time.time()
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            db.execute(
+                "INSERT OR REPLACE INTO entries (key, value, size, expires_at) VALUES (?, ?, ?, ?)",
+                (key, value, len(value), now + (self.ttl if ttl is None else ttl))
+            )
+            db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            if total > self.max_bytes:
+                self._evict(db, total - self.max_bytes)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+
+    @staticmethod
+    def _evict(db: sqlite3.Connection, excess: int) -> None:
+        keys: List[str] = []
+        for key, size in db.execute("SELECT key, size FROM entries ORDER BY expires_at"):
+            keys.append(key)
+            excess -= size
+            if excess <= 0:
+                break
+        db.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key in keys])
+
+    def delete(self, key: str) -> None:
+        self._connection().execute("DELETE FROM entries WHERE key = ?", (key,))
+
+    def _acquire(self, key: str, token: str, ttl: float) -> bool:
+        now = time.time()
+        cursor = self._connection().execute(
+            "INSERT INTO locks (key, token, expires_at) VALUES (?, ?, ?) "
+            "ON CONFLICT (key) DO UPDATE SET token = excluded.token, expires_at = excluded.expires_at "
+            "WHERE locks.expires_at <= ?",
+            (key, token, now + ttl, now)
+        )
+        return cursor.rowcount == 1
+
+    def _release(self, key: str, token: str) -> None:
+        self._connection().execute("DELETE FROM locks WHERE key = ? AND token = ?", (key, token))
+
+
+class RedisError(Exception):
+    """Error reply from a Redis server."""
+
+
+class RedisCache(CacheBackend):
+    """
+    Cache on a Redis protocol server. Uses one connection per thread and
+    only GET, SET (PX, NX) and DEL, so any Redis compatible server, or
+    `benchmarks.redis_standin`, can serve it.
+    """
+
+    name = "redis"
+
+    def __init__(self, ttl: float, max_entry_bytes: int, lock_timeout: float, url: str, prefix: str = "jobfit:"):
+        super().__init__(ttl, max_entry_bytes, lock_timeout)
+        parsed = urlparse(url)
+        self.host = parsed.hostname or "localhost"
+        self.port = parsed.port or 6379
+        self.password = unquote(parsed.password) if parsed.password else None
+        self.db = int(parsed.path.lstrip("/") or 0)
+        self.prefix = prefix
+        self._local = threading.local()
+
+    def _connect(self) -> Tuple[socket.socket, Any]:
+        sock = socket.create_connection((self.host, self.port), timeout=10)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        conn = (sock, sock.makefile("rb"))
+        self._local.conn = conn
+        if self.password:
+            self._command(b"AUTH", self.password.encode("utf-8"))
+        if self.db:
+            self._command(b"SELECT", str(self.db).encode())
+        return conn
+
+    def _command(self, *args: bytes):
+        conn = getattr(self._local, "conn", None) or self._connect()
+        request = b"*%d\r\n" % len(args) + b"".join(b"$%d\r\n%s\r\n" % (len(arg), arg) for arg in args)
+        try:
+            conn[0].sendall(request)
+            return self._reply(conn[1])
+        except (OSError, ConnectionError):
+            self._local.conn = None
+            conn[0].close()
+            raise
+
+    def _reply(self, reader):
+        line = reader.readline()
+        if not line:
+            raise ConnectionError("Redis server closed the connection")
+        kind, rest = line[:1], line[1:-2]
+        if kind == b"+":
+            return rest
+        if kind == b"-":
+            raise RedisError(rest.decode("utf-8", "replace"))
+        if kind == b":":
+            return int(rest)
+        if kind == b"$":
+            length = int(rest)
+            if length < 0:
+                return None
+            data = reader.read(length + 2)
+            return data[:-2]
+        if kind == b"*":
+            return [self._reply(reader) for _ in range(int(rest))]
+        raise RedisError(f"Unexpected reply: {line!r}")
+
+    def _key(self, key: str) -> bytes:
+        return (self.prefix + key).encode("utf-8")
+
+    def get(self, key: str) -> Optional[bytes]:
+        return self._command(b"GET", self._key(key))
+
+    def set(self, key: str, value: bytes, ttl: Optional[float] = None) -> None:
+        if not self._fits(key, value):
+            return
+        ttl_ms = max(1, int((self.ttl if ttl is None else ttl) * 1000))
+        self._command(b"SET", self._key(key), value, b"PX", str(ttl_ms).encode())
+
+    def delete(self, key: str) -> None:
+        self._command(b"DEL", self._key(key))
+
+    def _acquire(self, key: str, token: str, ttl: float) -> bool:
+        ttl_ms = max(1, int(ttl * 1000))
+        reply = self._command(b"SET", self._key("lock:" + key), token.encode(), b"PX", str(ttl_ms).encode(), b"NX")
+        return reply == b"OK"
+
+    def _release(self, key: str, token: str) -> None:
+        # GET then DEL is not atomic: a lock that expired in between and was
+        # taken by another caller could be deleted. Locks outlive any call
+        # (CACHE_LOCK_TIMEOUT), so this only matters for calls that overran it.
+        lock_key = self._key("lock:" + key)
+        if self._command(b"GET", lock_key) == token.encode():
+            self._command(b"DEL", lock_key)
+
+
+def create_cache(backend: str) -> Optional[CacheBackend]:
+    """
+    Build the cache backend named `backend` from the CACHE_* settings.
+
+    Raises:
+        ValueError: If the backend name is unknown
+    """
+    from app.core.config import settings
+
+    if backend not in CACHE_BACKENDS:
+        raise ValueError(f"CACHE_BACKEND must be one of {CACHE_BACKENDS}, got {backend!r}")
+    common = dict(
+        ttl=settings.CACHE_TTL_SECONDS,
+        max_entry_bytes=settings.CACHE_MAX_ENTRY_BYTES,
+        lock_timeout=settings.CACHE_LOCK_TIMEOUT
+    )
+    if backend == "memory":
+        return MemoryCache(max_bytes=settings.CACHE_MAX_BYTES, **common)
+    if backend == "sqlite":
+        return SQLiteCache(max_bytes=settings.CACHE_MAX_BYTES, path=Path(settings.CACHE_SQLITE_PATH), **common)
+    if backend == "redis":
+        return RedisCache(url=settings.CACHE_REDIS_URL, **common)
+    return None
+
+
+_caches: Dict[Tuple[str, int], Optional[CacheBackend]] = {}
+_caches_lock = threading.Lock()
+
+
+def get_cache() -> Optional[CacheBackend]:
+    """The cache selected by CACHE_BACKEND, or None when caching is off."""
+    from app.core.config import settings
+
+    # Keyed on the pid so a forked process does not reuse the parent's sockets
+    key = (settings.CACHE_BACKEND.lower(), os.getpid())
+    if key not in _caches:
+        # Under the lock: two in-process caches would each compute every result
+        with _caches_lock:
+            if key not in _caches:
+                _caches[key] = create_cache(key[0])
+                if _caches[key] is not None:
+                    logger.info("Using %s result cache", _caches[key].name)
+    return _caches[key]
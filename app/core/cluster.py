@@ -0,0 +1,187 @@
+"""
+Cluster Launcher Module
+
+One Streamlit process runs its scripts on one core at a time (the GIL), so
+this module runs the app as several worker processes behind one port:
+1. Starts CLUSTER_WORKERS Streamlit workers (one per CPU by default) on
+   consecutive ports from CLUSTER_WORKER_BASE_PORT, listening on 127.0.0.1
+2. Gives each worker its own log directory, LOG_DIR/worker-<n>, so
+   `CustomLogger` session directories of workers started in the same
+   second do not collide; METRICS_PORT and METRICS_FILE are offset per
+   worker the same way
+3. Shares one cookie secret between the workers, so XSRF cookies stay valid
+   when a browser is moved to another worker
+4. Serves them on CLUSTER_PORT through `app.core.proxy.StickyProxy`, which
+   keeps each browser on one worker and health checks them
+5. Restarts a worker that exits, backing off when it keeps failing, and
+   stops all workers on SIGINT / SIGTERM
+
+Results are only shared between workers with a shared cache backend
+(CACHE_BACKEND=sqlite or redis); the memory backend is per worker.
+
+Usage:
+    python -m app.core.cluster [--workers 4] [--port 8501] [--script Home_Dashboard.py] [streamlit options...]
+"""
+
+import argparse
+import asyncio
+import os
+import secrets
+import signal
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.metrics import counter, start_exporter
+from app.core.proxy import StickyProxy, Worker
+
+logger = get_logger(__name__)
+
+ROOT = Path(__file__).resolve().parents[2]
+
+WORKER_RESTARTS = counter("jobfit_cluster_worker_restarts_total", "Worker processes restarted after exiting", ["worker"])
+
+MAX_RESTART_DELAY = 30.0
+
+
+class WorkerProcess:
+    """A Streamlit worker process and its restart bookkeeping."""
+
+    def __init__(self, index: int, port: int, script: str, cookie_secret: str, extra_args: List[str]):
+        self.index = index
+        self.worker = Worker(f"worker-{index}", "127.0.0.1", port)
+        self.script = script
+        self.cookie_secret = cookie_secret
+        self.extra_args = extra_args
+        self.process: Optional[subprocess.Popen] = None
+        self.started_at = 0.0
+        self.failures = 0
+        self.restart_at: Optional[float] = None
+
+    def environment(self) -> Dict[str, str]:
+        env = dict(os.environ)
+        env["LOG_DIR"] = str(Path(settings.LOG_DIR) / self.worker.name)
+        # Streamlit only reads the cookie secret from its config or the environment
+        env["STREAMLIT_SERVER_COOKIE_SECRET"] = self.cookie_secret
+        if settings.METRICS_PORT:
+            # The launcher itself serves the proxy's metrics on METRICS_PORT
+            env["METRICS_PORT"] = str(settings.METRICS_PORT + 1 + self.index)
+        if settings.METRICS_FILE:
+            path = Path(settings.METRICS_FILE)
+            env["METRICS_FILE"] = str(path.with_name(f"{path.stem}.{self.worker.name}{path.suffix}"))
+        return env
+
+    def start(self) -> None:
+        command = [
+            sys.executable, "-m", "streamlit", "run", self.script,
+            "--server.address", self.worker.host,
+            "--server.port", str(self.worker.port),
+            "--server.headless", "true",
+            *self.extra_args,
+        ]
+        self.process = subprocess.Popen(command, cwd=ROOT, env=self.environment())
+        self.started_at = time.monotonic()
+        self.restart_at = None
+        logger.info("Started %s (pid %s) on port %s", self.worker.name, self.process.pid, self.worker.port)
+
+    def poll(self) -> None:
+        """Restart the process once it has exited and its backoff delay has passed."""
+        if self.process is None:
+            return
+        if self.restart_at is None:
+            code = self.process.poll()
+            if code is None:
+                return
+            self.worker.healthy = False
+            # A worker that ran for a while had a one-off failure; one that dies right away keeps failing
+            self.failures = 0 if time.monotonic() - self.started_at > 60 else self.failures + 1
+            delay = min(MAX_RESTART_DELAY, 2.0 ** self.failures - 1)
+            self.restart_at = time.monotonic() + delay
+            logger.warning("%s exited with code %s, restarting in %.0fs", self.worker.name, code, delay)
+        if time.monotonic() >= self.restart_at:
+            WORKER_RESTARTS.inc(worker=self.worker.name)
+            self.start()
+
+    def stop(self, timeout: float = 10.0) -> None:
+        if self.process is None or self.process.poll() is not None:
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+
+
+class Cluster:
+    """Worker processes plus the sticky proxy in front of them."""
+
+    def __init__(self, workers: int, host: str, port: int, base_port: int, script: str,
+                 health_interval: float, extra_args: Optional[List[str]] = None):
+        cookie_secret = secrets.token_urlsafe(32)
+        self.processes = [
+            WorkerProcess(i, base_port + i, script, cookie_secret, extra_args or [])
+            for i in range(workers)
+        ]
+        self.proxy = StickyProxy([process.worker for process in self.processes], host, port, health_interval)
+
+    async def _wait_for_workers(self, timeout: float = 60.0) -> None:
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            states = await asyncio.gather(*(self.proxy.check(process.worker) for process in self.processes))
+            if all(states):
+                return
+            await asyncio.sleep(0.5)
+        logger.warning("Not every worker was healthy after %.0fs, starting the proxy anyway", timeout)
+
+    async def run(self, stop: asyncio.Event) -> None:
+        for process in self.processes:
+            process.start()
+        try:
+            await self._wait_for_workers()
+            await self.proxy.start()
+            while not stop.is_set():
+                for process in self.processes:
+                    process.poll()
+                try:
+                    await asyncio.wait_for(stop.wait(), 1.0)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            await self.proxy.stop()
+            for process in self.processes:
+                process.stop()
+            logger.info("Stopped %d workers", len(self.processes))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Run the app as several Streamlit workers behind a sticky proxy")
+    parser.add_argument("--workers", type=int, default=settings.CLUSTER_WORKERS or os.cpu_count() or 1)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=settings.CLUSTER_PORT)
+    parser.add_argument("--base-port", type=int, default=settings.CLUSTER_WORKER_BASE_PORT)
+    parser.add_argument("--script", default="Home_Dashboard.py")
+    parser.add_argument("--health-interval", type=float, default=settings.CLUSTER_HEALTH_INTERVAL)
+    args, extra_args = parser.parse_known_args()
+
+    # Proxy metrics; workers get the ports after METRICS_PORT
+    start_exporter()
+    cluster = Cluster(args.workers, args.host, args.port, args.base_port, args.script,
+                      args.health_interval, extra_args)
+
+    async def run() -> None:
+        stop = asyncio.Event()
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGINT, signal.SIGTERM):
+            loop.add_signal_handler(sig, stop.set)
+        await cluster.run(stop)
+
+    asyncio.run(run())
+
+
+if __name__ == "__main__":
+    main()
@@ -8,8 +8,90 @@ class Settings(BaseSettings):
 
     
     API_BASE_URL: str | None = os.getenv('API_BASE_URL')
-    # Logging
+    # Logging; each run logs to a timestamped directory under LOG_DIR
+    LOG_DIR: str = os.getenv("LOG_DIR", "logs")
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    # "text" for human readable lines, "json" for one JSON object per record
+    LOG_FORMAT: str = os.getenv("LOG_FORMAT", "text")
+    # Hand records to a background thread instead of writing on the caller's thread
+    LOG_QUEUE_ENABLED: bool = os.getenv("LOG_QUEUE_ENABLED", "false").lower() == "true"
+    LOG_QUEUE_SIZE: int = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+    # What to do when the log queue is full: "drop_new" or "drop_oldest"
+    LOG_QUEUE_DROP_POLICY: str = os.getenv("LOG_QUEUE_DROP_POLICY", "drop_new")
+    # Longest rendering of a single log argument before it gets truncated
+    LOG_MAX_PAYLOAD_CHARS: int = int(os.getenv("LOG_MAX_PAYLOAD_CHARS", "2000"))
+    # Metrics: serve /metrics on this port (0 disables) and/or rewrite this file
+    METRICS_PORT: int = int(os.getenv("METRICS_PORT", "0"))
+    METRICS_FILE: str = os.getenv("METRICS_FILE", "")
+    METRICS_FILE_INTERVAL: float = float(os.getenv("METRICS_FILE_INTERVAL", "15"))
+    # Tracing: write one trace per user action to traces.jsonl in the log session directory. Off by
+    # default; a background thread writes the traces, and the file rotates like the log files
+    TRACING_ENABLED: bool = os.getenv("TRACING_ENABLED", "false").lower() == "true"
+    # Record every backend call (fingerprint, response, headers, timings) to this directory for replay
+    API_RECORD_DIR: str = os.getenv("API_RECORD_DIR", "")
+    # Workload classes: interactive calls (HR answers) and heavy ones (uploads, tailoring, job
+    # analysis) each get a fair-share scheduler and a connection pool. Most calls of the class in
+    # flight per process (0 disables its scheduler), and the time budget of one call, waiting for
+    # a slot included
+    API_INTERACTIVE_MAX_IN_FLIGHT: int = int(os.getenv("API_INTERACTIVE_MAX_IN_FLIGHT", "16"))
+    API_INTERACTIVE_TIMEOUT_SECONDS: float = float(os.getenv("API_INTERACTIVE_TIMEOUT_SECONDS", "60"))
+    API_HEAVY_MAX_IN_FLIGHT: int = int(os.getenv("API_HEAVY_MAX_IN_FLIGHT", "16"))
+    API_HEAVY_TIMEOUT_SECONDS: float = float(os.getenv("API_HEAVY_TIMEOUT_SECONDS", "300"))
+    # Adapt each class's slots to backend latency, between API_MIN_IN_FLIGHT and its
+    # MAX_IN_FLIGHT; without it MAX_IN_FLIGHT is a fixed cap
+    API_ADAPTIVE_LIMIT: bool = os.getenv("API_ADAPTIVE_LIMIT", "true").lower() == "true"
+    API_MIN_IN_FLIGHT: int = int(os.getenv("API_MIN_IN_FLIGHT", "2"))
+    # Longest Retry-After (429 / 503) a call waits out to send its request once more; 0 never retries
+    API_RETRY_AFTER_MAX_SECONDS: float = float(os.getenv("API_RETRY_AFTER_MAX_SECONDS", "30"))
+    # Compressed responses: "auto" asks for every encoding this install can decode, best first
+    # (zstd and br need the zstandard / brotli packages); or a literal Accept-Encoding value
+    API_ACCEPT_ENCODING: str = os.getenv("API_ACCEPT_ENCODING", "auto")
+    # Decoder for JSON decoded without a schema: "auto" (orjson when installed), "orjson" or "stdlib"
+    JSON_DECODER: str = os.getenv("JSON_DECODER", "auto")
+    # Result cache shared by the API clients: "none", "memory", "sqlite" or "redis"
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "none")
+    CACHE_TTL_SECONDS: float = float(os.getenv("CACHE_TTL_SECONDS", "3600"))
+    # Total size limit of the memory and SQLite caches, and the largest single entry of any backend
+    CACHE_MAX_BYTES: int = int(os.getenv("CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+    CACHE_MAX_ENTRY_BYTES: int = int(os.getenv("CACHE_MAX_ENTRY_BYTES", str(8 * 1024 * 1024)))
+    # How long a replica waits for another one computing the same result before computing it itself
+    CACHE_LOCK_TIMEOUT: float = float(os.getenv("CACHE_LOCK_TIMEOUT", "180"))
+    # SQLite cache file; put it on a volume shared by the replicas
+    CACHE_SQLITE_PATH: str = os.getenv("CACHE_SQLITE_PATH", "cache/api_cache.sqlite3")
+    CACHE_REDIS_URL: str = os.getenv("CACHE_REDIS_URL", "redis://localhost:6379/0")
+    # Near-duplicate reuse: an ATS check whose job description is at least NEAR_DUPLICATE_THRESHOLD
+    # similar (MinHash estimate of word 3-gram Jaccard) to one cached for the same resume is answered
+    # from that report; only with a result cache. The index keeps NEAR_DUPLICATE_MAX_ENTRIES texts
+    NEAR_DUPLICATE_ENABLED: bool = os.getenv("NEAR_DUPLICATE_ENABLED", "true").lower() == "true"
+    NEAR_DUPLICATE_THRESHOLD: float = float(os.getenv("NEAR_DUPLICATE_THRESHOLD", "0.9"))
+    NEAR_DUPLICATE_INDEX_PATH: str = os.getenv("NEAR_DUPLICATE_INDEX_PATH", "cache/near_duplicates.sqlite3")
+    NEAR_DUPLICATE_MAX_ENTRIES: int = int(os.getenv("NEAR_DUPLICATE_MAX_ENTRIES", "200000"))
+    # Memory budget for large session values (reports, PDFs), per session and for all sessions;
+    # the least recently used values over budget are compressed to SESSION_SPILL_DIR
+    SESSION_MEMORY_BUDGET_BYTES: int = int(os.getenv("SESSION_MEMORY_BUDGET_BYTES", str(8 * 1024 * 1024)))
+    SESSION_GLOBAL_MEMORY_BUDGET_BYTES: int = int(os.getenv("SESSION_GLOBAL_MEMORY_BUDGET_BYTES", str(256 * 1024 * 1024)))
+    # Empty means a directory under the system temp dir
+    SESSION_SPILL_DIR: str = os.getenv("SESSION_SPILL_DIR", "")
+    # Speculative work: start an analysis as soon as its inputs are complete, once they have
+    # been still for SPECULATION_DELAY_SECONDS, so the click finds it done or in flight
+    SPECULATION_ENABLED: bool = os.getenv("SPECULATION_ENABLED", "true").lower() == "true"
+    SPECULATION_DELAY_SECONDS: float = float(os.getenv("SPECULATION_DELAY_SECONDS", "0.5"))
+    # Speculative ATS checks a session may send to the backend. 0, the default, only prepares the
+    # inputs locally: a full ATS check is expensive, so sending it before the click is opt-in
+    SPECULATION_ATS_MAX_PER_SESSION: int = int(os.getenv("SPECULATION_ATS_MAX_PER_SESSION", "0"))
+    # Speculative job posting analyses a session may send; past it, edits of the URL only start
+    # an analysis on the click
+    SPECULATION_JOB_ANALYSIS_MAX_PER_SESSION: int = int(os.getenv("SPECULATION_JOB_ANALYSIS_MAX_PER_SESSION", "3"))
+    # Batch HR Q&A: answers fetched at once per batch (the interactive scheduler still shares
+    # the backend fairly between sessions), and the most questions one batch may hold
+    HR_QA_BATCH_CONCURRENCY: int = int(os.getenv("HR_QA_BATCH_CONCURRENCY", "4"))
+    HR_QA_BATCH_MAX_QUESTIONS: int = int(os.getenv("HR_QA_BATCH_MAX_QUESTIONS", "50"))
+    # Cluster launcher: worker processes (0 means one per CPU), the public port of the
+    # sticky proxy, the first worker port and the interval of worker health checks
+    CLUSTER_WORKERS: int = int(os.getenv("CLUSTER_WORKERS", "0"))
+    CLUSTER_PORT: int = int(os.getenv("CLUSTER_PORT", "8501"))
+    CLUSTER_WORKER_BASE_PORT: int = int(os.getenv("CLUSTER_WORKER_BASE_PORT", "8601"))
+    CLUSTER_HEALTH_INTERVAL: float = float(os.getenv("CLUSTER_HEALTH_INTERVAL", "5"))
     
     
     class Config:
@@ -7,17 +7,152 @@ This module provides a comprehensive logging setup that combines:
 3. Integration with application settings
 4. Module-specific loggers for better traceability
 5. Rotating file handlers to manage log file sizes
+6. Optional queue mode where callers only enqueue records and a single
+   background thread formats and writes them
+7. A logger facade with deferred formatting, payload truncation and
+   per-call-site sampling / rate limiting for hot paths
+8. Optional JSON output where `extra={...}` fields become top-level keys
+
+Importing this module is cheap: settings are read, and the log directory is
+created, when the first record is logged rather than at import time.
 """
 
 import sys
+import json
+import time
+import atexit
+import queue
+import threading
 import logging
 import logging.handlers
 from datetime import datetime
 from pathlib import Path
-from typing import Optional
-from app.core.config import settings
-# Import settings conditionally to handle initialization order
+from typing import Any, Dict, Optional, Tuple
+
+
+DROP_POLICIES = ("drop_new", "drop_oldest")
+
+
+LOG_FORMATS = ("text", "json")
+
+# Serializes the first-use setup: the first records may come from several threads at once
+_setup_lock = threading.RLock()
+
+
+def _settings():
+    """Application settings, imported on first use so importing this module stays cheap"""
+    from app.core.config import settings
+    return settings
+
+
+class FormatOnceFormatter(logging.Formatter):
+    """
+    Formatter that caches its output on the record.
+
+    All level files share one instance, so a record fanned out to several
+    files (and checked again for rotation) is only formatted once.
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        cached = record.__dict__.get("_formatted")
+        if cached is not None and cached[0] is self:
+            return cached[1]
+        text = self.render(record)
+        record.__dict__["_formatted"] = (self, text)
+        return text
+
+    def render(self, record: logging.LogRecord) -> str:
+        """Format the record; subclasses override this instead of format()"""
+        return super().format(record)
+
+
+class JsonFormatter(FormatOnceFormatter):
+    """
+    Formatter writing each record as one JSON object per line.
 
+    Standard record attributes map to fixed keys, and anything passed through
+    `extra={...}` is added as a top-level field of its own.
+    """
+
+    _RESERVED = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {
+        "message", "asctime", "taskName", "_formatted"
+    }
+
+    def render(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": self.formatTime(record, self.datefmt),
+            "level": record.levelname,
+            "logger": record.name,
+            "location": f"{record.filename}:{record.lineno}:{record.funcName}",
+            "thread": record.threadName,
+            "message": record.getMessage(),
+        }
+        for key, value in record.__dict__.items():
+            if key not in self._RESERVED:
+                payload[key] = value
+        if record.exc_info:
+            payload["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            payload["exception"] = record.exc_text
+        return json.dumps(payload, default=str, ensure_ascii=False)
+
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler for a bounded queue that drops records instead of blocking
+    the calling thread when the queue is full.
+    """
+
+    def __init__(self, log_queue: queue.Queue, drop_policy: str = "drop_new"):
+        super().__init__(log_queue)
+        if drop_policy not in DROP_POLICIES:
+            raise ValueError(f"Invalid drop policy: {drop_policy}, expected one of {DROP_POLICIES}")
+        self.drop_policy = drop_policy
+        # Records dropped because the queue was full; enqueue runs on every logging thread
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Return the record unformatted, to be formatted on the listener thread.
+
+        The stock QueueHandler renders the message, arguments and traceback
+        here, on the calling thread, and enqueues a copy holding only
+        strings. Skipping that moves the formatting cost off the caller.
+        The trade-off is that the record keeps references to its `args`
+        until the listener writes it. If the caller changes a mutable
+        argument (a dict, a list, an object) after the logging call, the
+        log shows the changed value, and objects stay alive while the record
+        is queued. Pass values, not objects that will change, when queue
+        mode is on.
+        """
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            pass
+
+        if self.drop_policy == "drop_oldest":
+            try:
+                self.queue.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+            except queue.Full:
+                pass
+        with self._dropped_lock:
+            self.dropped += 1
+
+
+class BoundedQueueListener(logging.handlers.QueueListener):
+    """QueueListener whose stop sentinel waits for room in a full queue."""
+
+    def enqueue_sentinel(self) -> None:
+        self.queue.put(self._sentinel)
 
 
 class CustomLogger:
@@ -27,6 +162,7 @@ class CustomLogger:
     - Console output with simple formatting
     - Multiple log files with different levels and detailed formatting
     - Log rotation to manage file sizes
+    - Optional non-blocking queue mode with a bounded queue
     """
     
     _instance = None  # Singleton instance
@@ -36,35 +172,55 @@ class CustomLogger:
     def get_instance(cls, **kwargs) -> 'CustomLogger':
         """Get or create the singleton logger instance"""
         if cls._instance is None:
-            cls._instance = cls(**kwargs)
+            with _setup_lock:
+                if cls._instance is None:
+                    cls._instance = cls(**kwargs)
         return cls._instance
     
     def __init__(
         self, 
         app_name: str = "job-assistant",
-        log_dir: str = "logs",
+        log_dir: Optional[str] = None,
         log_level: Optional[str] = None,
         enable_session_dirs: bool = True,
-        console_level: Optional[str] = None
+        console_level: Optional[str] = None,
+        use_queue: Optional[bool] = None,
+        queue_size: Optional[int] = None,
+        drop_policy: Optional[str] = None,
+        log_format: Optional[str] = None
     ):
         """
         Initialize the custom logger.
         
         Args:
             app_name: Name of the application for the root logger
-            log_dir: Directory to store log files
+            log_dir: Directory to store log files (defaults to settings)
             log_level: Overall log level (from settings or override)
             enable_session_dirs: Create timestamp subdirectories for logs
             console_level: Specific level for console output
+            use_queue: Write records from a background thread (defaults to settings)
+            queue_size: Maximum number of records waiting in the queue
+            drop_policy: "drop_new" or "drop_oldest" when the queue is full
+            log_format: "text" or "json" (defaults to settings)
         """
         # Skip if already initialized (singleton pattern)
         if self._initialized:
             return
             
+        settings = _settings()
         self.app_name = app_name
-        self.log_dir = Path(log_dir)
+        self.log_dir = Path(log_dir or getattr(settings, 'LOG_DIR', 'logs'))
         self.log_level = log_level or getattr(settings, 'LOG_LEVEL', 'INFO')
         self.enable_session_dirs = enable_session_dirs
+        self.use_queue = getattr(settings, 'LOG_QUEUE_ENABLED', False) if use_queue is None else use_queue
+        self.queue_size = queue_size or getattr(settings, 'LOG_QUEUE_SIZE', 10000)
+        self.drop_policy = drop_policy or getattr(settings, 'LOG_QUEUE_DROP_POLICY', 'drop_new')
+        self.log_format = (log_format or getattr(settings, 'LOG_FORMAT', 'text')).lower()
+        if self.log_format not in LOG_FORMATS:
+            print(f"Invalid log format: {self.log_format}, defaulting to text")
+            self.log_format = "text"
+        self.queue_handler: Optional[BoundedQueueHandler] = None
+        self.listener: Optional[BoundedQueueListener] = None
         
         # Determine numeric log level
         self.numeric_level = self._get_numeric_level(self.log_level)
@@ -95,12 +251,15 @@ class CustomLogger:
         self._setup_console_handler()
         self._setup_file_handlers()
         
+        if self.use_queue:
+            self._setup_queue()
+        
         # Mark as initialized
         CustomLogger._initialized = True
         
         # Log startup message
-        self.root_logger.info(f"Logging initialized at level: {self.log_level}")
-        self.root_logger.info(f"Log files location: {self.log_path}")
+        self.root_logger.info("Logging initialized at level: %s", self.log_level)
+        self.root_logger.info("Log files location: %s", self.log_path)
     
     def _get_numeric_level(self, level_name: str) -> int:
         """Convert string log level to numeric value"""
@@ -115,10 +274,13 @@ class CustomLogger:
         console_handler = logging.StreamHandler(sys.stdout)
         console_handler.setLevel(self.console_level)
         
-        console_format = logging.Formatter(
-            '%(asctime)s - %(levelname)-8s - %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        if self.log_format == "json":
+            console_format = JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+        else:
+            console_format = logging.Formatter(
+                '%(asctime)s - %(levelname)-8s - %(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
         console_handler.setFormatter(console_format)
         self.root_logger.addHandler(console_handler)
     
@@ -131,12 +293,16 @@ class CustomLogger:
             'error': (logging.ERROR, 'error.log')
         }
         
-        detailed_format = logging.Formatter(
-            '%(asctime)s - %(name)s - %(levelname)s - '
-            '[%(filename)s:%(lineno)d:%(funcName)s] - '
-            '%(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
+        # One shared formatter so each record is formatted once for all files
+        if self.log_format == "json":
+            detailed_format = JsonFormatter(datefmt='%Y-%m-%dT%H:%M:%S%z')
+        else:
+            detailed_format = FormatOnceFormatter(
+                '%(asctime)s - %(name)s - %(levelname)s - '
+                '[%(filename)s:%(lineno)d:%(funcName)s] - '
+                '%(message)s',
+                datefmt='%Y-%m-%d %H:%M:%S'
+            )
         
         for name, (level, filename) in handlers.items():
             # Skip handlers for levels below the configured level
@@ -153,6 +319,37 @@ class CustomLogger:
             file_handler.setFormatter(detailed_format)
             self.root_logger.addHandler(file_handler)
     
+    def _setup_queue(self):
+        """
+        Move the console and file handlers behind a bounded queue.
+        
+        The root logger keeps a single QueueHandler, so logging calls only
+        enqueue the record; the listener thread fans it out to the handlers.
+        """
+        handlers = list(self.root_logger.handlers)
+        log_queue = queue.Queue(maxsize=self.queue_size)
+        
+        self.queue_handler = BoundedQueueHandler(log_queue, self.drop_policy)
+        self.listener = BoundedQueueListener(log_queue, *handlers, respect_handler_level=True)
+        
+        self.root_logger.handlers = [self.queue_handler]
+        self.listener.start()
+        atexit.register(self.shutdown)
+    
+    def shutdown(self):
+        """Flush queued records and stop the background listener thread."""
+        if self.listener is None:
+            return
+        listener, self.listener = self.listener, None
+        listener.stop()
+        
+        if self.queue_handler.dropped:
+            listener.handle(self.root_logger.makeRecord(
+                self.root_logger.name, logging.WARNING, __file__, 0,
+                "Dropped %d log records because the log queue was full",
+                (self.queue_handler.dropped,), None
+            ))
+    
     def get_logger(self, name: Optional[str] = None) -> logging.Logger:
         """
         Get a logger instance for a specific module.
@@ -169,14 +366,159 @@ class CustomLogger:
         return logging.getLogger(name)
 
 
+class TruncatedArg:
+    """
+    Log argument that is only rendered when the record is actually formatted,
+    and is cut to a maximum length when it is.
+    """
+
+    __slots__ = ("value", "limit")
+
+    def __init__(self, value: Any, limit: int):
+        self.value = value
+        self.limit = limit
+
+    def _truncate(self, text: str) -> str:
+        if len(text) <= self.limit:
+            return text
+        return f"{text[:self.limit]}... [truncated {len(text) - self.limit} chars]"
+
+    def __str__(self) -> str:
+        return self._truncate(str(self.value))
+
+    def __repr__(self) -> str:
+        return self._truncate(repr(self.value))
+
+
+class LogFacade:
+    """
+    Facade over a module's logging.Logger for use on hot paths.
+    
+    - Level guard: nothing is built for disabled levels
+    - Deferred formatting: use `logger.debug("Loaded %s", name)` rather
+      than f-strings, so the message is only rendered when emitted
+    - Payload truncation: non-numeric arguments are cut to
+      `LOG_MAX_PAYLOAD_CHARS` when rendered
+    - Per-call-site limits: `sample=N` emits one call in N, and
+      `rate_limit=seconds` emits at most one call per interval,
+      noting how many were suppressed in between
+    
+    Any other attribute is forwarded to the wrapped logger.
+    """
+    
+    _NUMERIC = (int, float)
+    
+    def __init__(self, logger: logging.Logger, max_payload_chars: Optional[int] = None):
+        self.logger = logger
+        self._max_payload_chars = max_payload_chars
+        self._lock = threading.Lock()
+        self._sample_counts: Dict[Tuple[str, int], int] = {}
+        self._last_emitted: Dict[Tuple[str, int], float] = {}
+        self._suppressed: Dict[Tuple[str, int], int] = {}
+    
+    @property
+    def max_payload_chars(self) -> int:
+        if self._max_payload_chars is None:
+            self._max_payload_chars = getattr(_settings(), 'LOG_MAX_PAYLOAD_CHARS', 2000)
+        return self._max_payload_chars
+    
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.logger, name)
+    
+    def debug(self, msg: str, *args, **kwargs) -> None:
+        self._log(logging.DEBUG, msg, args, kwargs)
+    
+    def info(self, msg: str, *args, **kwargs) -> None:
+        self._log(logging.INFO, msg, args, kwargs)
+    
+    def warning(self, msg: str, *args, **kwargs) -> None:
+        self._log(logging.WARNING, msg, args, kwargs)
+    
+    def error(self, msg: str, *args, **kwargs) -> None:
+        self._log(logging.ERROR, msg, args, kwargs)
+    
+    def exception(self, msg: str, *args, exc_info: Any = True, **kwargs) -> None:
+        self._log(logging.ERROR, msg, args, kwargs, exc_info=exc_info)
+    
+    def critical(self, msg: str, *args, **kwargs) -> None:
+        self._log(logging.CRITICAL, msg, args, kwargs)
+    
+    def log(self, level: int, msg: str, *args, **kwargs) -> None:
+        self._log(level, msg, args, kwargs)
+    
+    def _log(self, level: int, msg: str, args: tuple, kwargs: Dict[str, Any], **defaults) -> None:
+        # Logging is configured on first use, so that importing a module stays cheap
+        if not CustomLogger._initialized:
+            with _setup_lock:
+                if not CustomLogger._initialized:
+                    setup_logging()
+        if not self.logger.isEnabledFor(level):
+            return
+        
+        sample = kwargs.pop("sample", None)
+        rate_limit = kwargs.pop("rate_limit", None)
+        if sample or rate_limit:
+            # Frame 2 is the caller of debug()/info()/...
+            frame = sys._getframe(2)
+            site = (frame.f_code.co_filename, frame.f_lineno)
+            suppressed = self._check_site(site, sample, rate_limit)
+            if suppressed is None:
+                return
+            if suppressed:
+                msg = f"{msg} (suppressed {suppressed} similar messages)"
+        
+        if args:
+            limit = self.max_payload_chars
+            args = tuple(
+                arg if isinstance(arg, self._NUMERIC) else TruncatedArg(arg, limit)
+                for arg in args
+            )
+        
+        for key, value in defaults.items():
+            kwargs.setdefault(key, value)
+        # Attribute the record to the caller, not to this facade
+        kwargs["stacklevel"] = kwargs.get("stacklevel", 1) + 2
+        self.logger.log(level, msg, *args, **kwargs)
+    
+    def _check_site(self, site: Tuple[str, int], sample: Optional[int], rate_limit: Optional[float]) -> Optional[int]:
+        """
+        Apply the sampling and rate limit of one call site.
+        
+        Returns:
+            None if the call should be skipped, otherwise the number of calls
+            suppressed since the last emitted one
+        """
+        with self._lock:
+            if sample:
+                count = self._sample_counts.get(site, 0)
+                self._sample_counts[site] = count + 1
+                if count % sample:
+                    self._suppressed[site] = self._suppressed.get(site, 0) + 1
+                    return None
+            
+            if rate_limit:
+                now = time.monotonic()
+                last = self._last_emitted.get(site)
+                if last is not None and now - last < rate_limit:
+                    self._suppressed[site] = self._suppressed.get(site, 0) + 1
+                    return None
+                self._last_emitted[site] = now
+            
+            return self._suppressed.pop(site, 0)
+
+
+_facades: Dict[Optional[str], LogFacade] = {}
+
+
 # Global functions for easy access
 
 def setup_logging(
     app_name: str = "job-assistant",
-    log_dir: str = "logs",
+    log_dir: Optional[str] = None,
     log_level: Optional[str] = None,
     enable_session_dirs: bool = True,
-    console_level: Optional[str] = None
+    console_level: Optional[str] = None,
+    use_queue: Optional[bool] = None
 ) -> logging.Logger:
     """
     Configure and initialize the logging system.
@@ -187,6 +529,7 @@ def setup_logging(
         log_level: Overall logging level
         enable_session_dirs: Whether to create timestamp subdirectories
         console_level: Specific level for console output
+        use_queue: Whether to write records from a background thread
         
     Returns:
         logging.Logger: Root logger instance
@@ -196,12 +539,13 @@ def setup_logging(
         log_dir=log_dir,
         log_level=log_level,
         enable_session_dirs=enable_session_dirs,
-        console_level=console_level
+        console_level=console_level,
+        use_queue=use_queue
     )
     return custom_logger.get_logger()
 
 
-def get_logger(name: Optional[str] = None) -> logging.Logger:
+def get_logger(name: Optional[str] = None) -> LogFacade:
     """
     Get a logger instance for a specific module.
     
@@ -210,11 +554,13 @@ def get_logger(name: Optional[str] = None) -> logging.Logger:
               If None, returns the root logger
               
     Returns:
-        logging.Logger: Logger instance for the specified module
-    """
-    # Ensure the custom logger is initialized
-    if not CustomLogger._initialized:
-        setup_logging()
+        LogFacade: Facade over the logger for the specified module
     
-    # Return the requested logger
-    return CustomLogger.get_instance().get_logger(name)
\ No newline at end of file
+    The logging system itself is set up by the first record logged through
+    any facade, not here, so module-level `logger = get_logger(__name__)`
+    neither reads settings nor creates the log directory.
+    """
+    facade = _facades.get(name)
+    if facade is None:
+        facade = _facades.setdefault(name, LogFacade(logging.getLogger(name)))
+    return facade
\ No newline at end of file
@@ -0,0 +1,493 @@
+"""
+Metrics Module for AI Job Application Assistant
+
+This module provides a small in-process metrics subsystem:
+1. Thread-safe counters and gauges with labels
+2. Latency histograms with HDR-style log-linear buckets (bounded relative
+   error at any scale, constant memory)
+3. Gauges backed by callbacks, evaluated at export time
+4. Prometheus text exposition, served over HTTP and/or written to a file
+   that a local scraper can read
+
+Example usage:
+    from app.core.metrics import counter, histogram, timed
+
+    REQUESTS = counter("jobfit_requests_total", "Requests handled", ["page"])
+    REQUESTS.inc(page="ats_dashboard")
+
+    with timed(histogram("jobfit_render_seconds", "Render time", ["stage"]), stage="pdf"):
+        ...
+"""
+
+import math
+import threading
+import time
+from contextlib import ContextDecorator
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from app.core.logger import get_logger
+from app.core.tracing import current_span, span
+
+logger = get_logger(__name__)
+
+LabelValues = Tuple[str, ...]
+
+# Histogram buckets exported to Prometheus, in seconds
+DEFAULT_EXPORT_BOUNDS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+    1.0, 2.5, 5.0, 10.0, 25.0, 60.0, 120.0,
+)
+EXPORT_QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Metric:
+    """Base class for a metric family with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, str]) -> LabelValues:
+        try:
+            if len(labels) == len(self.labelnames):
+                return tuple([labels[name] for name in self.labelnames])
+        except KeyError:
+            pass
+        raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+
+    def samples(self) -> Iterable[str]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        lines.extend(self.samples())
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    """Monotonically increasing value per label set."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        return self._values.get(self._key(labels), 0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+
+
+class Gauge(Metric):
+    """Value that can go up and down, or be read from a callback at export time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[LabelValues, float] = {}
+        self._functions: Dict[LabelValues, Callable[[], float]] = {}
+
+    def set(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels) -> None:
+        self.inc(-amount, **labels)
+
+    def set_function(self, function: Callable[[], float], **labels) -> None:
+        """Read the gauge from `function` each time metrics are exported."""
+        key = self._key(labels)
+        with self._lock:
+            self._functions[key] = function
+
+    def value(self, **labels) -> float:
+        key = self._key(labels)
+        if key in self._functions:
+            return self._functions[key]()
+        return self._values.get(key, 0)
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            items = list(self._values.items())
+            functions = list(self._functions.items())
+        for key, function in functions:
+            try:
+                items.append((key, function()))
+            except Exception as e:
+                logger.warning("Gauge %s callback failed: %s", self.name, e, rate_limit=60)
+        for key, value in items:
+            yield f"{self.name}{_format_labels(self.labelnames, key)} {value:g}"
+
+
+class HdrBuckets:
+    """
+    Log-linear bucket counts in the style of HdrHistogram.
+
+    Each power-of-two range above `lowest` is split into `sub_buckets` equal
+    buckets, so any recorded value is known to within 1/sub_buckets of its
+    magnitude, whatever its scale. Values below `lowest` share bucket zero.
+    """
+
+    __slots__ = ("lowest", "sub_buckets", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, lowest: float = 1e-6, sub_buckets: int = 16):
+        self.lowest = lowest
+        self.sub_buckets = sub_buckets
+        self.counts: Dict[int, int] = {}
+        self.count = 0
+        self.sum = 0.0
+        self.min = math.inf
+        self.max = 0.0
+
+    def index(self, value: float) -> int:
+        if value < self.lowest:
+            return 0
+        mantissa, exponent = math.frexp(value / self.lowest)  # mantissa in [0.5, 1)
+        sub = int((mantissa - 0.5) * 2 * self.sub_buckets)
+        return exponent * self.sub_buckets + sub + 1
+
+    def upper_bound(self, index: int) -> float:
+        if index == 0:
+            return self.lowest
+        exponent, sub = divmod(index - 1, self.sub_buckets)
+        return self.lowest * 2 ** (exponent - 1) * (1 + (sub + 1) / self.sub_buckets)
+
+    def record(self, value: float) -> None:
+        idx = self.index(value)
+        self.counts[idx] = self.counts.get(idx, 0) + 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = max(1, math.ceil(q * self.count))
+        seen = 0
+        for idx in sorted(self.counts):
+            seen += self.counts[idx]
+            if seen >= rank:
+                return min(self.upper_bound(idx), self.max)
+        return self.max
+
+    def cumulative(self, bounds: Sequence[float]) -> List[int]:
+        """Counts of values at or below each bound (to bucket precision)."""
+        result = []
+        ordered = sorted(self.counts.items())
+        position = seen = 0
+        for bound in bounds:
+            while position < len(ordered) and self.upper_bound(ordered[position][0]) <= bound:
+                seen += ordered[position][1]
+                position += 1
+            result.append(seen)
+        return result
+
+
+class Histogram(Metric):
+    """
+    Latency histogram per label set.
+
+    Exported as a Prometheus histogram over `export_bounds`, plus a
+    `<name>_quantiles` gauge family with p50/p90/p95/p99 read from the
+    full-resolution buckets.
+    """
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        export_bounds: Sequence[float] = DEFAULT_EXPORT_BOUNDS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.export_bounds = tuple(export_bounds)
+        self._buckets: Dict[LabelValues, HdrBuckets] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = self._key(labels)
+        with self._lock:
+            buckets = self._buckets.get(key)
+            if buckets is None:
+                buckets = self._buckets[key] = HdrBuckets()
+            buckets.record(value)
+
+    def quantile(self, q: float, **labels) -> float:
+        with self._lock:
+            buckets = self._buckets.get(self._key(labels))
+            return buckets.quantile(q) if buckets else 0.0
+
+    def count(self, **labels) -> int:
+        buckets = self._buckets.get(self._key(labels))
+        return buckets.count if buckets else 0
+
+    def samples(self) -> Iterable[str]:
+        with self._lock:
+            snapshot = [
+                (key, b.cumulative(self.export_bounds), b.count, b.sum)
+                for key, b in self._buckets.items()
+            ]
+        for key, cumulative, count, total in snapshot:
+            for bound, seen in zip(self.export_bounds, cumulative):
+                labels = _format_labels(self.labelnames, key, 'le="%g"' % bound)
+                yield f"{self.name}_bucket{labels} {seen}"
+            labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+            yield f"{self.name}_bucket{labels} {count}"
+            yield f"{self.name}_sum{_format_labels(self.labelnames, key)} {total:g}"
+            yield f"{self.name}_count{_format_labels(self.labelnames, key)} {count}"
+
+    def render(self) -> str:
+        text = super().render()
+        with self._lock:
+            quantiles = [
+                (key, [(q, b.quantile(q)) for q in EXPORT_QUANTILES])
+                for key, b in self._buckets.items()
+            ]
+        lines = [
+            f"# HELP {self.name}_quantiles {self.documentation} (quantiles)",
+            f"# TYPE {self.name}_quantiles gauge",
+        ]
+        for key, values in quantiles:
+            for q, value in values:
+                labels = _format_labels(self.labelnames, key, 'quantile="%g"' % q)
+                lines.append(f"{self.name}_quantiles{labels} {value:g}")
+        return text + "\n" + "\n".join(lines)
+
+
+class Registry:
+    """Collection of metric families, keyed by name."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+        self._lock = threading.Lock()
+
+    def get_or_create(self, cls, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Metric:
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, documentation, labelnames, **kwargs)
+            elif not isinstance(metric, cls) or metric.labelnames != tuple(labelnames):
+                raise ValueError(f"Metric {name} already registered with a different type or labels")
+            return metric
+
+    def render_prometheus(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        return "\n".join(metric.render() for metric in metrics) + "\n"
+
+
+REGISTRY = Registry()
+
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    """Get or create a counter in the global registry"""
+    return REGISTRY.get_or_create(Counter, name, documentation, labelnames)
+
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    """Get or create a gauge in the global registry"""
+    return REGISTRY.get_or_create(Gauge, name, documentation, labelnames)
+
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs) -> Histogram:
+    """Get or create a histogram in the global registry"""
+    return REGISTRY.get_or_create(Histogram, name, documentation, labelnames, **kwargs)
+
+
+class timed(ContextDecorator):
+    """
+    Observe the wall time of a block or function call in a histogram.
+
+    Works both as `with timed(HIST, stage="pdf"):` and as `@timed(HIST, stage="pdf")`.
+    """
+
+    def __init__(self, hist: Histogram, **labels):
+        self.hist = hist
+        self.labels = labels
+        self._local = threading.local()
+
+    def __enter__(self):
+        self._local.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.hist.observe(time.perf_counter() - self._local.start, **self.labels)
+        return False
+
+
+PAGE_RUNS = counter("jobfit_page_runs_total", "Streamlit page script runs", ["page", "outcome"])
+PAGE_SECONDS = histogram("jobfit_page_run_seconds", "Wall time of one page script run", ["page"])
+
+
+def instrument_page(page: str) -> Callable:
+    """
+    Decorator for a page's main function: times every script run, counts
+    outcomes, records the run as the root span of a new trace (one trace per
+    user action) and makes sure the metrics exporter is running.
+
+    Streamlit's own control-flow exceptions (st.stop, st.rerun) count as "ok".
+
+    Args:
+        page: Page label used in the metrics
+    """
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start_exporter()
+            start = time.perf_counter()
+            outcome = "ok"
+            try:
+                with span(f"page {page}", new_trace=True, page=page):
+                    return func(*args, **kwargs)
+            except Exception as e:
+                if not type(e).__module__.startswith("streamlit"):
+                    outcome = "error"
+                raise
+            finally:
+                PAGE_SECONDS.observe(time.perf_counter() - start, page=page)
+                PAGE_RUNS.inc(page=page, outcome=outcome)
+        return wrapper
+    return decorator
+
+
+def instrument_fragment(page: str, fragment: str) -> Callable:
+    """
+    Decorator for an `st.fragment` of a page. When the fragment reruns on its
+    own it is instrumented like a page run, labelled "<page>.<fragment>";
+    when it runs as part of a full page run it is a child span of that run.
+
+    Apply it below `@st.fragment`, so the fragment calls the instrumented function.
+
+    Args:
+        page: Page label used in the metrics
+        fragment: Fragment label
+    """
+    def decorator(func: Callable) -> Callable:
+        own_run = instrument_page(f"{page}.{fragment}")(func)
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if current_span() is None:
+                return own_run(*args, **kwargs)
+            with span(f"fragment {fragment}", fragment=fragment):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?")[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = REGISTRY.render_prometheus().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug("Metrics scrape: " + format, *args)
+
+
+def write_prometheus_file(path: Path) -> None:
+    """Atomically write the current metrics in Prometheus text format to `path`."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(REGISTRY.render_prometheus(), encoding="utf-8")
+    tmp_path.replace(path)
+
+
+_exporter_lock = threading.Lock()
+_exporter_started = False
+
+
+def start_exporter(port: Optional[int] = None, file_path: Optional[str] = None, interval: Optional[float] = None) -> None:
+    """
+    Start the configured exporters once per process.
+
+    Args:
+        port: Serve /metrics on this port (METRICS_PORT; 0 disables)
+        file_path: Rewrite this file every `interval` seconds (METRICS_FILE; empty disables)
+        interval: Seconds between file writes (METRICS_FILE_INTERVAL)
+    """
+    global _exporter_started
+    if _exporter_started:
+        return
+    with _exporter_lock:
+        if _exporter_started:
+            return
+        _exporter_started = True
+
+        from app.core.config import settings
+        port = settings.METRICS_PORT if port is None else port
+        file_path = settings.METRICS_FILE if file_path is None else file_path
+        interval = settings.METRICS_FILE_INTERVAL if interval is None else interval
+
+        if port:
+            try:
+                server = ThreadingHTTPServer(("127.0.0.1", port), _MetricsHandler)
+            except OSError as e:
+                # Another worker process already serves this port
+                logger.warning("Metrics endpoint not started on port %s: %s", port, e)
+            else:
+                threading.Thread(target=server.serve_forever, name="metrics-http", daemon=True).start()
+                logger.info("Serving metrics on http://127.0.0.1:%s/metrics", port)
+
+        if file_path:
+            def write_loop():
+                while True:
+                    try:
+                        write_prometheus_file(Path(file_path))
+                    except Exception as e:
+                        logger.warning("Failed to write metrics file: %s", e, rate_limit=300)
+                    time.sleep(interval)
+
+            threading.Thread(target=write_loop, name="metrics-file", daemon=True).start()
+            logger.info("Writing metrics to %s every %ss", file_path, interval)
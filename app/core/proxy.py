@@ -0,0 +1,340 @@
+"""
+Sticky Reverse Proxy Module
+
+This module spreads browsers over the Streamlit worker processes started by
+`app.core.cluster`, keeping each browser on one worker:
+1. A browser's first request goes to the healthy worker with the fewest open
+   sessions (websocket connections); the response sets a cookie naming it
+2. Later requests carrying the cookie go to the same worker. That includes
+   the websocket the Streamlit session lives on, file uploads and media
+   downloads, which all exist only in that worker's memory. Responses name
+   the worker in an X-Jobfit-Worker header
+3. Every worker is probed on /_stcore/health; browsers pinned to a worker
+   that fails its probe are moved to a healthy one (their Streamlit session
+   starts over there)
+4. Content-hashed files under app/static/ (see `app.core.assets`) are sent
+   with a one year immutable Cache-Control
+
+Requests are forwarded one at a time per client connection (HTTP/1.1 with
+keep-alive); a websocket upgrade turns the connection into a byte pipe.
+
+Example usage:
+    proxy = StickyProxy([Worker("worker-0", "127.0.0.1", 8601)], "0.0.0.0", 8501)
+    asyncio.run(proxy.serve_forever())
+"""
+
+import asyncio
+import re
+import time
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+from app.core.logger import get_logger
+from app.core.metrics import counter, gauge
+
+logger = get_logger(__name__)
+
+STICKY_COOKIE = "jobfit_worker"
+HEAD_LIMIT = 64 * 1024
+CHUNK = 64 * 1024
+STATIC_CACHE_CONTROL = "public, max-age=31536000, immutable"
+# app/static/<name>.<12 hex digits of the content hash>.<ext>
+HASHED_STATIC = re.compile(r"/app/static/[^/?]+\.[0-9a-f]{12}\.[A-Za-z0-9]+$")
+
+PROXY_REQUESTS = counter("jobfit_proxy_requests_total", "Requests forwarded by the sticky proxy", ["worker", "kind"])
+PROXY_SESSIONS = gauge("jobfit_proxy_sessions", "Open websocket sessions per worker", ["worker"])
+PROXY_WORKER_UP = gauge("jobfit_proxy_worker_up", "1 when the worker passed its last health check", ["worker"])
+
+Headers = List[Tuple[str, str]]
+
+
+@dataclass
+class Worker:
+    """One Streamlit worker process as seen by the proxy."""
+
+    name: str
+    host: str
+    port: int
+    healthy: bool = False
+    sessions: int = 0
+    # Browsers sent here, breaking ties between workers with as many sessions
+    assigned: int = 0
+    checked_at: float = 0.0
+
+
+class ProxyError(Exception):
+    """Malformed HTTP from the client or a worker."""
+
+
+def _parse_head(raw: bytes) -> Tuple[str, Headers]:
+    lines = raw.decode("latin-1").split("\r\n")
+    headers = []
+    for line in lines[1:]:
+        if not line:
+            continue
+        name, sep, value = line.partition(":")
+        if not sep:
+            raise ProxyError(f"malformed header line: {line[:80]!r}")
+        headers.append((name.strip(), value.strip()))
+    return lines[0], headers
+
+
+def _render_head(start_line: str, headers: Headers) -> bytes:
+    lines = [start_line] + [f"{name}: {value}" for name, value in headers]
+    return ("\r\n".join(lines) + "\r\n\r\n").encode("latin-1")
+
+
+def _header(headers: Headers, name: str) -> Optional[str]:
+    name = name.lower()
+    for key, value in headers:
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _without(headers: Headers, name: str) -> Headers:
+    name = name.lower()
+    return [(key, value) for key, value in headers if key.lower() != name]
+
+
+def _cookie(headers: Headers, name: str) -> Optional[str]:
+    for key, value in headers:
+        if key.lower() != "cookie":
+            continue
+        for part in value.split(";"):
+            cookie_name, _, cookie_value = part.strip().partition("=")
+            if cookie_name == name:
+                return cookie_value
+    return None
+
+
+async def _read_head(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """The next message head, or None when the peer closed the connection."""
+    try:
+        return await reader.readuntil(b"\r\n\r\n")
+    except asyncio.IncompleteReadError as e:
+        if e.partial.strip():
+            raise ProxyError("connection closed inside a message head")
+        return None
+    except asyncio.LimitOverrunError:
+        raise ProxyError("message head too large")
+
+
+async def _copy_exactly(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, length: int) -> None:
+    while length > 0:
+        data = await reader.read(min(CHUNK, length))
+        if not data:
+            raise ProxyError("connection closed inside a message body")
+        writer.write(data)
+        await writer.drain()
+        length -= len(data)
+
+
+async def _copy_chunked(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while True:
+        size_line = await reader.readuntil(b"\r\n")
+        writer.write(size_line)
+        size = int(size_line.split(b";")[0].strip() or b"0", 16)
+        if size == 0:
+            # Trailers, up to the empty line
+            while True:
+                line = await reader.readuntil(b"\r\n")
+                writer.write(line)
+                if line == b"\r\n":
+                    await writer.drain()
+                    return
+        await _copy_exactly(reader, writer, size + 2)
+
+
+async def _copy_until_eof(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    while True:
+        data = await reader.read(CHUNK)
+        if not data:
+            return
+        writer.write(data)
+        await writer.drain()
+
+
+async def _copy_body(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, headers: Headers,
+                     is_response: bool) -> bool:
+    """Copy one message body; return False when it was delimited by closing the connection."""
+    if "chunked" in (_header(headers, "Transfer-Encoding") or "").lower():
+        await _copy_chunked(reader, writer)
+        return True
+    length = _header(headers, "Content-Length")
+    if length is not None:
+        await _copy_exactly(reader, writer, int(length))
+        return True
+    if is_response:
+        await _copy_until_eof(reader, writer)
+        return False
+    return True
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    try:
+        await _copy_until_eof(reader, writer)
+    except (ConnectionError, asyncio.IncompleteReadError):
+        pass
+    finally:
+        writer.close()
+
+
+def _close(writer: Optional[asyncio.StreamWriter]) -> None:
+    if writer is not None and not writer.is_closing():
+        writer.close()
+
+
+class StickyProxy:
+    """HTTP and websocket reverse proxy pinning each browser to one worker."""
+
+    def __init__(self, workers: List[Worker], host: str, port: int, health_interval: float = 5.0,
+                 health_path: str = "/_stcore/health"):
+        self.workers = workers
+        self.host = host
+        self.port = port
+        self.health_interval = health_interval
+        self.health_path = health_path
+        self._by_name = {worker.name: worker for worker in workers}
+        self._server: Optional[asyncio.AbstractServer] = None
+        for worker in workers:
+            PROXY_SESSIONS.set_function(lambda worker=worker: worker.sessions, worker=worker.name)
+            PROXY_WORKER_UP.set_function(lambda worker=worker: float(worker.healthy), worker=worker.name)
+
+    def pick(self, cookie: Optional[str]) -> Optional[Worker]:
+        """The worker named by the sticky cookie if it is healthy, else the least loaded healthy one."""
+        pinned = self._by_name.get(cookie or "")
+        if pinned is not None and pinned.healthy:
+            return pinned
+        healthy = [worker for worker in self.workers if worker.healthy]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda worker: (worker.sessions, worker.assigned))
+
+    async def check(self, worker: Worker) -> bool:
+        """Probe the worker's health endpoint and record the outcome."""
+        healthy = False
+        writer = None
+        try:
+            reader, writer = await asyncio.wait_for(asyncio.open_connection(worker.host, worker.port), 2.0)
+            writer.write(f"GET {self.health_path} HTTP/1.1\r\nHost: {worker.host}:{worker.port}\r\n"
+                         f"Connection: close\r\n\r\n".encode("latin-1"))
+            await writer.drain()
+            status_line = await asyncio.wait_for(reader.readline(), 2.0)
+            healthy = status_line.split(b" ")[1:2] == [b"200"]
+        except (OSError, asyncio.TimeoutError, IndexError):
+            healthy = False
+        finally:
+            _close(writer)
+        if healthy != worker.healthy:
+            logger.info("Worker %s on port %s is %s", worker.name, worker.port, "up" if healthy else "down")
+        worker.healthy = healthy
+        worker.checked_at = time.monotonic()
+        return healthy
+
+    async def _health_loop(self) -> None:
+        while True:
+            await asyncio.gather(*(self.check(worker) for worker in self.workers))
+            await asyncio.sleep(self.health_interval)
+
+    async def start(self) -> None:
+        """Check the workers once, then start listening and checking in the background."""
+        await asyncio.gather(*(self.check(worker) for worker in self.workers))
+        self._server = await asyncio.start_server(self._handle, self.host, self.port, limit=HEAD_LIMIT)
+        self._health_task = asyncio.create_task(self._health_loop())
+        logger.info("Proxy listening on %s:%s for %d workers", self.host, self.port, len(self.workers))
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._health_task.cancel()
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def _handle(self, client_reader: asyncio.StreamReader, client_writer: asyncio.StreamWriter) -> None:
+        peer = client_writer.get_extra_info("peername") or ("", 0)
+        worker: Optional[Worker] = None
+        worker_reader: Optional[asyncio.StreamReader] = None
+        worker_writer: Optional[asyncio.StreamWriter] = None
+        try:
+            while True:
+                raw = await _read_head(client_reader)
+                if raw is None:
+                    return
+                start_line, headers = _parse_head(raw)
+                method, target, _ = start_line.split(" ", 2)
+                cookie = _cookie(headers, STICKY_COOKIE)
+                chosen = self.pick(cookie)
+                if chosen is None:
+                    client_writer.write(b"HTTP/1.1 503 Service Unavailable\r\nContent-Length: 0\r\n"
+                                        b"Retry-After: 5\r\nConnection: close\r\n\r\n")
+                    await client_writer.drain()
+                    return
+                if chosen is not worker or worker_reader.at_eof():
+                    _close(worker_writer)
+                    worker = chosen
+                    worker_reader, worker_writer = await asyncio.open_connection(
+                        worker.host, worker.port, limit=HEAD_LIMIT
+                    )
+
+                forwarded_for = _header(headers, "X-Forwarded-For")
+                client_ip = str(peer[0])
+                headers = _without(headers, "X-Forwarded-For") + [
+                    ("X-Forwarded-For", f"{forwarded_for}, {client_ip}" if forwarded_for else client_ip)
+                ]
+                upgrade = "upgrade" in (_header(headers, "Connection") or "").lower()
+                worker_writer.write(_render_head(start_line, headers))
+                await worker_writer.drain()
+                if not upgrade:
+                    await _copy_body(client_reader, worker_writer, headers, is_response=False)
+
+                # Skip interim 1xx responses other than 101
+                while True:
+                    response = await _read_head(worker_reader)
+                    if response is None:
+                        raise ProxyError(f"worker {worker.name} closed the connection")
+                    status_line, response_headers = _parse_head(response)
+                    status = int(status_line.split(" ", 2)[1])
+                    if status == 101 or not 100 <= status < 200:
+                        break
+                    client_writer.write(response)
+
+                response_headers.append(("X-Jobfit-Worker", worker.name))
+                if cookie != worker.name:
+                    worker.assigned += 1
+                    response_headers.append(("Set-Cookie", f"{STICKY_COOKIE}={worker.name}; Path=/; HttpOnly; SameSite=Lax"))
+                if status == 200 and HASHED_STATIC.search(target.split("?", 1)[0]):
+                    response_headers = _without(response_headers, "Cache-Control") + [
+                        ("Cache-Control", STATIC_CACHE_CONTROL)
+                    ]
+                client_writer.write(_render_head(status_line, response_headers))
+                await client_writer.drain()
+
+                if status == 101:
+                    PROXY_REQUESTS.inc(worker=worker.name, kind="websocket")
+                    worker.sessions += 1
+                    try:
+                        await asyncio.gather(
+                            _pipe(client_reader, worker_writer),
+                            _pipe(worker_reader, client_writer),
+                        )
+                    finally:
+                        worker.sessions -= 1
+                    return
+
+                PROXY_REQUESTS.inc(worker=worker.name, kind="http")
+                bodiless = method == "HEAD" or status in (204, 304) or 100 <= status < 200
+                keep_alive = True if bodiless else await _copy_body(worker_reader, client_writer, response_headers, True)
+                if not keep_alive or "close" in (_header(response_headers, "Connection") or "").lower():
+                    return
+        except (ProxyError, ValueError) as e:
+            logger.warning("Proxy request from %s failed: %s", peer[0], e, rate_limit=60)
+        except (ConnectionError, asyncio.IncompleteReadError, OSError) as e:
+            logger.debug("Proxy connection from %s ended: %s", peer[0], e)
+        finally:
+            _close(worker_writer)
+            _close(client_writer)
@@ -0,0 +1,259 @@
+"""
+Session Store Module
+
+This module keeps large per-session values (reports, generated PDFs) under a
+memory budget:
+1. `put(key, value)` stores a value in `st.session_state` behind a handle
+   that records its approximate size and when it was last used
+2. `get(key)` returns the value, reloading it from disk if it was spilled
+3. When a session holds more than SESSION_MEMORY_BUDGET_BYTES, or all
+   sessions together more than SESSION_GLOBAL_MEMORY_BUDGET_BYTES, the least
+   recently used values are pickled, compressed and written to
+   SESSION_SPILL_DIR, and dropped from memory
+4. Spill files are deleted when their handle is garbage collected, i.e.
+   when the value is replaced or the session ends
+
+Example usage:
+    from app.core import session_store
+
+    session_store.put("pdf_bytes", pdf_bytes)
+    ...
+    pdf_bytes = session_store.get("pdf_bytes")
+"""
+
+import io
+import os
+import pickle
+import sys
+import tempfile
+import threading
+import time
+import uuid
+import weakref
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from app.core.logger import get_logger
+from app.core.metrics import counter, gauge
+
+logger = get_logger(__name__)
+
+SESSION_STATE_BYTES = gauge("jobfit_session_state_bytes", "Approximate size of budgeted session values", ["state"])
+SESSION_SPILLS = counter("jobfit_session_spills_total", "Session values moved between memory and disk", ["direction"])
+
+
+def approximate_size(value: Any) -> int:
+    """
+    Approximate the memory held by `value`, following containers and object
+    attributes. Shared objects are counted once.
+    """
+    seen = set()
+    stack = [value]
+    total = 0
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, (str, bytes, bytearray, int, float, bool, type(None))):
+            continue
+        if isinstance(obj, io.BytesIO):
+            total += obj.getbuffer().nbytes
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+        if hasattr(obj, "__dict__"):
+            stack.append(vars(obj))
+    return total
+
+
+class _Slot:
+    """Bookkeeping of one budgeted value; outlives nothing but its handle."""
+
+    __slots__ = ("session_id", "key", "size", "last_used", "value", "path", "released")
+
+    def __init__(self, session_id: str, key: str, value: Any):
+        self.session_id = session_id
+        self.key = key
+        self.size = approximate_size(value)
+        self.last_used = time.monotonic()
+        self.value = value
+        self.path: Optional[Path] = None
+        self.released = False
+
+    @property
+    def resident(self) -> bool:
+        return self.path is None and not self.released
+
+
+class SessionValue:
+    """Handle stored in `st.session_state` in place of a budgeted value."""
+
+    __slots__ = ("_slot", "__weakref__")
+
+    def __init__(self, slot: _Slot):
+        self._slot = slot
+
+    def __repr__(self) -> str:
+        state = "resident" if self._slot.resident else "spilled"
+        return f"SessionValue({self._slot.key!r}, {self._slot.size} bytes, {state})"
+
+
+class SessionStore:
+    """Tracks budgeted values of every session and spills the coldest ones."""
+
+    def __init__(self, session_budget: int, global_budget: int, spill_dir: Path):
+        self.session_budget = session_budget
+        self.global_budget = global_budget
+        self.spill_dir = Path(spill_dir)
+        self._slots: Dict[str, List[_Slot]] = {}
+        # Slots whose handle was garbage collected, removed under the lock later
+        self._released: List[_Slot] = []
+        self._lock = threading.RLock()
+        SESSION_STATE_BYTES.set_function(lambda: self.total(resident=True), state="resident")
+        SESSION_STATE_BYTES.set_function(lambda: self.total(resident=False), state="spilled")
+
+    def wrap(self, session_id: str, key: str, value: Any) -> SessionValue:
+        """Register `value` under the session's budget and return its handle."""
+        slot = _Slot(session_id, key, value)
+        handle = SessionValue(slot)
+        weakref.finalize(handle, self._forget, slot)
+        with self._lock:
+            self._drain()
+            self._slots.setdefault(session_id, []).append(slot)
+            self._enforce(slot)
+        return handle
+
+    def load(self, handle: SessionValue) -> Any:
+        """The value behind `handle`, read back from disk if it was spilled."""
+        slot = handle._slot
+        with self._lock:
+            self._drain()
+            slot.last_used = time.monotonic()
+            if slot.resident:
+                return slot.value
+            path = slot.path
+            value = pickle.loads(zlib.decompress(path.read_bytes()))
+            slot.value, slot.path = value, None
+            path.unlink(missing_ok=True)
+            SESSION_SPILLS.inc(direction="in")
+            logger.debug("Reloaded session value %s (%d bytes)", slot.key, slot.size)
+            # Reloading may push the session over its budget again
+            self._enforce(slot)
+            return value
+
+    def total(self, session_id: Optional[str] = None, resident: bool = True) -> int:
+        """Bytes held in memory (or on disk) by one session, or by all of them."""
+        with self._lock:
+            self._drain()
+            if session_id is None:
+                slots = [slot for session in self._slots.values() for slot in session]
+            else:
+                slots = self._slots.get(session_id, [])
+            return sum(slot.size for slot in slots if not slot.released and slot.resident == resident)
+
+    def _enforce(self, hot: _Slot) -> None:
+        """Spill least recently used values until both budgets hold, `hot` last."""
+        def coldest_first(slots: List[_Slot]) -> List[_Slot]:
+            return sorted(
+                (slot for slot in slots if slot.resident),
+                key=lambda slot: (slot is hot, slot.last_used)
+            )
+
+        session_slots = self._slots.get(hot.session_id, [])
+        excess = self.total(hot.session_id) - self.session_budget
+        for slot in coldest_first(session_slots):
+            if excess <= 0:
+                break
+            self._spill(slot)
+            excess -= slot.size
+
+        excess = self.total() - self.global_budget
+        for slot in coldest_first([slot for session in self._slots.values() for slot in session]):
+            if excess <= 0:
+                break
+            self._spill(slot)
+            excess -= slot.size
+
+    def _spill(self, slot: _Slot) -> None:
+        if slot.released:
+            return
+        try:
+            data = zlib.compress(pickle.dumps(slot.value, protocol=pickle.HIGHEST_PROTOCOL), 1)
+            self.spill_dir.mkdir(parents=True, exist_ok=True)
+            path = self.spill_dir / f"{uuid.uuid4().hex}.pkl.z"
+            path.write_bytes(data)
+        except (OSError, pickle.PicklingError, TypeError, AttributeError) as e:
+            # Values that cannot be pickled stay in memory
+            logger.warning("Could not spill session value %s: %s", slot.key, e, rate_limit=60)
+            return
+        slot.value, slot.path = None, path
+        SESSION_SPILLS.inc(direction="out")
+        logger.debug("Spilled session value %s (%d bytes, %d compressed)", slot.key, slot.size, len(data))
+
+    def _forget(self, slot: _Slot) -> None:
+        # Runs during garbage collection, possibly inside a locked section of
+        # this thread, so it only marks the slot
+        slot.released = True
+        self._released.append(slot)
+
+    def _drain(self) -> None:
+        while self._released:
+            slot = self._released.pop()
+            session = self._slots.get(slot.session_id, [])
+            if slot in session:
+                session.remove(slot)
+            if not session:
+                self._slots.pop(slot.session_id, None)
+            if slot.path is not None:
+                slot.path.unlink(missing_ok=True)
+            slot.value = None
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> SessionStore:
+    """The process-wide store, configured from the SESSION_* settings."""
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                from app.core.config import settings
+
+                spill_dir = settings.SESSION_SPILL_DIR or os.path.join(tempfile.gettempdir(), "jobfit-session-spill")
+                _store = SessionStore(
+                    settings.SESSION_MEMORY_BUDGET_BYTES,
+                    settings.SESSION_GLOBAL_MEMORY_BUDGET_BYTES,
+                    Path(spill_dir) / str(os.getpid())
+                )
+    return _store
+
+
+def _session_id() -> str:
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx()
+    return ctx.session_id if ctx is not None else "default"
+
+
+def put(key: str, value: Any) -> None:
+    """Store `value` in the session state under the memory budget; None is stored as is."""
+    import streamlit as st
+
+    st.session_state[key] = None if value is None else get_store().wrap(_session_id(), key, value)
+
+
+def get(key: str, default: Any = None) -> Any:
+    """Read a value stored with `put`; plain session state values are returned unchanged."""
+    import streamlit as st
+
+    value = st.session_state.get(key, default)
+    if isinstance(value, SessionValue):
+        return get_store().load(value)
+    return value
@@ -0,0 +1,278 @@
+"""
+Speculative Work Module
+
+This module starts work a user is about to ask for in the background, so
+the click that asks for it finds the result ready or already on its way:
+1. `speculate(kind, key, work)` runs `work` in a background thread for the
+   calling session once its inputs have been still for
+   SPECULATION_DELAY_SECONDS; if they change again within the delay, the
+   work is cancelled before anything is sent
+2. A session runs at most one speculation per kind: starting one for a new
+   key supersedes the previous one. Work that has already started cannot
+   be called back (a request in flight cannot be interrupted), so its
+   result is discarded; streamed work stops at its next item and closes
+   its iterator, which ends the response and frees its scheduler slot
+3. `take(kind, key)` hands the speculation for `key` to the caller, done or
+   still running; `Speculation.result()` waits for it. A taken speculation
+   stays in place, so reruns with the same inputs do not start it again;
+   once its result has been handed over, it is dropped from memory and a
+   later `take` finds nothing, so the caller does the work itself
+4. Work that yields its result piece by piece (`stream=True`) is collected
+   as it arrives; `Speculation.items()` replays what has arrived and
+   follows the rest, so a streamed view renders the same way whether the
+   work is done, half done or just started
+5. `limit` caps the speculations of a kind a session may send to the
+   backend; past the cap, speculate() starts nothing and the click does the
+   work as before. The session keeps only the keys of what it sent
+6. Outcomes are counted per kind (jobfit_speculations_total), and the time
+   a click still waited for its speculation is recorded
+   (jobfit_speculation_wait_seconds)
+
+The background thread carries the session's script run context, so the
+fair-share scheduler queues its backend calls under the same session.
+
+Example usage:
+    if is_valid_url(url):
+        speculation.speculate("job_analysis", url, lambda: analyze_job_posting(url))
+    ...
+    if clicked:
+        running = speculation.take("job_analysis", url)
+        result = running.result() if running else analyze_job_posting(url)
+"""
+
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from app.core.logger import get_logger
+from app.core.metrics import counter, histogram
+from app.core.tracing import span
+
+logger = get_logger(__name__)
+
+SPECULATIONS = counter("jobfit_speculations_total", "Speculative work by outcome", ["kind", "outcome"])
+SPECULATION_WAIT_SECONDS = histogram(
+    "jobfit_speculation_wait_seconds", "Time a user action waited for its speculative work", ["kind"]
+)
+
+_STATE_KEY = "_speculations"
+_SENT_KEY = "_speculations_sent"
+_CAPPED_KEY = "_speculations_capped"
+
+
+class Speculation:
+    """Background work for one key of one kind."""
+
+    def __init__(self, kind: str, key: str, work: Callable[[], Any], delay: float, stream: bool = False):
+        self.kind = kind
+        self.key = key
+        self.started = False
+        self.used = False
+        self.cancelled = False
+        # The result has been handed over and dropped
+        self.consumed = False
+        # Keys of the speculations of this kind the session sent, for `limit`
+        self.sent: Optional[List[str]] = None
+        # Dropped once the work ends, so its inputs (e.g. an uploaded file) are not kept
+        self._work: Optional[Callable[[], Any]] = work
+        self._delay = delay
+        self._stream = stream
+        self._result: Any = None
+        self._items: List[Any] = []
+        self._error: Optional[BaseException] = None
+        # Set to end the delay early: to cancel, or because the result is wanted now
+        self._wake = threading.Event()
+        self._done = threading.Event()
+        # Notified for every streamed item and when the work ends
+        self._arrived = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name=f"speculate-{kind}", daemon=True)
+
+    def start(self) -> None:
+        from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+        ctx = get_script_run_ctx(suppress_warning=True)
+        if ctx is not None:
+            add_script_run_ctx(self._thread, ctx)
+        self._thread.start()
+
+    def _run(self) -> None:
+        try:
+            self._wake.wait(self._delay)
+            work = self._work
+            if self.cancelled or work is None:
+                SPECULATIONS.inc(kind=self.kind, outcome="cancelled")
+                return
+            self.started = True
+            if self.sent is not None:
+                self.sent.append(self.key)
+            SPECULATIONS.inc(kind=self.kind, outcome="started")
+            with span(f"speculate {self.kind}"):
+                if not self._stream:
+                    result = work()
+                    if not self.cancelled:
+                        self._result = result
+                    return
+                items = iter(work())
+                try:
+                    for item in items:
+                        if self.cancelled:
+                            break
+                        with self._arrived:
+                            self._items.append(item)
+                            self._arrived.notify_all()
+                finally:
+                    # Ends a streamed response early, and gives its scheduler slot back
+                    close = getattr(items, "close", None)
+                    if close is not None:
+                        close()
+                self._result = self._items
+        except Exception as e:
+            self._error = e
+            logger.warning("Speculative %s failed: %s", self.kind, e)
+        finally:
+            self._work = None
+            with self._arrived:
+                self._done.set()
+                self._arrived.notify_all()
+
+    def _drop(self) -> None:
+        """Let go of the work and what it produced."""
+        self._work = None
+        with self._arrived:
+            self._items = []
+            self._result = None
+            self._arrived.notify_all()
+
+    def done(self) -> bool:
+        return self._done.is_set()
+
+    def cancel(self) -> None:
+        """Cancel the work if it has not started yet; otherwise it stops early and its result is dropped."""
+        self.cancelled = True
+        self._wake.set()
+        self._drop()
+        if self.started and not self.used:
+            SPECULATIONS.inc(kind=self.kind, outcome="discarded")
+
+    def result(self, timeout: Optional[float] = None) -> Any:
+        """
+        Wait for the work and return its result.
+
+        Raises:
+            TimeoutError: The work did not finish within `timeout` seconds
+            Exception: Whatever the work raised
+        """
+        self._wake.set()
+        start = time.perf_counter()
+        if not self._done.wait(timeout):
+            raise TimeoutError(f"Speculative {self.kind} still running after {timeout}s")
+        SPECULATION_WAIT_SECONDS.observe(time.perf_counter() - start, kind=self.kind)
+        result = self._result
+        self.consumed = True
+        self._drop()
+        if self._error is not None:
+            raise self._error
+        return result
+
+    def items(self) -> Iterator[Any]:
+        """
+        Yield the items of streamed work: those already there at once, the rest as they arrive.
+
+        Raises:
+            Exception: Whatever the work raised, after the items that came before it
+        """
+        self._wake.set()
+        start = time.perf_counter()
+        position = 0
+        while True:
+            with self._arrived:
+                while position >= len(self._items) and not (self._done.is_set() or self.cancelled):
+                    self._arrived.wait()
+                arrived = self._items[position:]
+                # Superseded meanwhile: what is left belongs to inputs that are gone
+                finished = self._done.is_set() or self.cancelled
+            position += len(arrived)
+            yield from arrived
+            if finished and position >= len(self._items):
+                break
+        SPECULATION_WAIT_SECONDS.observe(time.perf_counter() - start, kind=self.kind)
+        self.consumed = True
+        self._drop()
+        if self._error is not None:
+            raise self._error
+
+
+def _speculations() -> Dict[str, Speculation]:
+    import streamlit as st
+
+    return st.session_state.setdefault(_STATE_KEY, {})
+
+
+def _sent(kind: str) -> List[str]:
+    """Keys of the session's speculations of `kind` that went to the backend; their threads add to it."""
+    import streamlit as st
+
+    return st.session_state.setdefault(_SENT_KEY, {}).setdefault(kind, [])
+
+
+def speculate(kind: str, key: str, work: Callable[[], Any], stream: bool = False,
+              limit: Optional[int] = None) -> Optional[Speculation]:
+    """
+    Start `work` in the background for `key`, unless it already runs or ran.
+
+    Args:
+        kind: What the work is, e.g. "job_analysis"; one speculation per kind and session
+        key: The inputs of the work; a different key supersedes the current speculation
+        work: Callable doing the work, called on a background thread
+        stream: `work` returns an iterable whose items are collected as they arrive
+        limit: Speculations of `kind` the session may send in total; None for no cap
+
+    Returns:
+        Speculation: The speculation for `key`, or None when SPECULATION_ENABLED is off
+        or the session has used up `limit`
+    """
+    import streamlit as st
+
+    from app.core.config import settings
+
+    if not settings.SPECULATION_ENABLED:
+        return None
+    speculations = _speculations()
+    current = speculations.get(kind)
+    if current is not None and current.key == key and not current.cancelled:
+        return current
+    if current is not None:
+        current.cancel()
+        del speculations[kind]
+    if limit is not None:
+        sent = _sent(kind)
+        if len(sent) >= limit:
+            # Counted once per key, not on every rerun with the same inputs
+            capped = st.session_state.setdefault(_CAPPED_KEY, {})
+            if capped.get(kind) != key:
+                capped[kind] = key
+                SPECULATIONS.inc(kind=kind, outcome="capped")
+            return None
+    speculation = speculations[kind] = Speculation(kind, key, work, settings.SPECULATION_DELAY_SECONDS, stream)
+    if limit is not None:
+        speculation.sent = sent
+    speculation.start()
+    return speculation
+
+
+def take(kind: str, key: str) -> Optional[Speculation]:
+    """The speculation of `kind` for `key`, or None if there is none for these inputs."""
+    current = _speculations().get(kind)
+    if current is None or current.key != key or current.cancelled or current.consumed:
+        return None
+    if not current.used:
+        current.used = True
+        SPECULATIONS.inc(kind=kind, outcome="used")
+    return current
+
+
+def discard(kind: str) -> None:
+    """Drop the session's speculation of `kind`, e.g. when its inputs became invalid."""
+    current = _speculations().pop(kind, None)
+    if current is not None:
+        current.cancel()
@@ -0,0 +1,434 @@
+"""
+Tracing Module for AI Job Application Assistant
+
+This module provides lightweight span-based tracing of user actions:
+1. One trace per user action (a Streamlit script run), with nested spans for
+   page sections, file handling, backend calls and rendering
+2. Span context carried in contextvars, so nesting follows the call stack
+3. OTLP-compatible JSON export: each finished trace is appended as one
+   `resourceSpans` document per line to `traces.jsonl` in the logger's
+   session directory. Serializing and writing happen on a background
+   thread behind a bounded queue (traces are dropped, and counted, when it
+   is full), and the file rotates like the log files
+4. Child spans wait for their root span; a child ending after its root was
+   written (work a user action left running on another thread) is written
+   on its own, and children whose root never ends are written after
+   PENDING_MAX_AGE_SECONDS or when more than MAX_PENDING_TRACES wait.
+   The viewer joins the documents of a trace by trace ID
+5. A small viewer: print a trace as an indented tree, or convert a trace
+   file to folded stacks (flamegraph.pl / speedscope) or Chrome trace events
+   (chrome://tracing / Perfetto)
+
+Usage:
+    python -m app.core.tracing logs/<session>/traces.jsonl --tree
+    python -m app.core.tracing logs/<session>/traces.jsonl --folded out.folded
+    python -m app.core.tracing logs/<session>/traces.jsonl --chrome out.json
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import ContextDecorator
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.core.logger import CustomLogger, get_logger
+
+logger = get_logger(__name__)
+
+SERVICE_NAME = "jobfit-frontend"
+STATUS_UNSET, STATUS_OK, STATUS_ERROR = 0, 1, 2
+# traces.jsonl rotates like the log files
+TRACE_FILE_MAX_BYTES = 10 * 1024 * 1024
+TRACE_FILE_BACKUPS = 5
+# Traces waiting for the writer thread; more are dropped
+EXPORT_QUEUE_SIZE = 1000
+# Bounds on child spans waiting for their root span
+MAX_PENDING_TRACES = 1000
+PENDING_MAX_AGE_SECONDS = 300.0
+# Trace IDs remembered after their root span was written, to recognize late children
+FLUSHED_TRACES_REMEMBERED = 10000
+
+
+@dataclass
+class Span:
+    """A timed operation within a trace."""
+    name: str
+    trace_id: str
+    span_id: str
+    parent_span_id: Optional[str] = None
+    start_ns: int = field(default_factory=time.time_ns)
+    end_ns: Optional[int] = None
+    attributes: Dict[str, Any] = field(default_factory=dict)
+    status: int = STATUS_UNSET
+    status_message: str = ""
+
+    @property
+    def duration_ms(self) -> float:
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def to_otlp(self) -> Dict[str, Any]:
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": 1,  # SPAN_KIND_INTERNAL
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns),
+            "attributes": [_otlp_attribute(k, v) for k, v in self.attributes.items()],
+            "status": {"code": self.status},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.status_message:
+            span["status"]["message"] = self.status_message
+        return span
+
+
+def _otlp_attribute(key: str, value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        typed = {"boolValue": value}
+    elif isinstance(value, int):
+        typed = {"intValue": str(value)}
+    elif isinstance(value, float):
+        typed = {"doubleValue": value}
+    else:
+        typed = {"stringValue": str(value)}
+    return {"key": key, "value": typed}
+
+
+def _enabled() -> bool:
+    # Imported here so that importing this module does not build Settings
+    from app.core.config import settings
+    return settings.TRACING_ENABLED
+
+
+_current_span: ContextVar[Optional[Span]] = ContextVar("jobfit_current_span", default=None)
+
+
+class TraceExporter:
+    """
+    Collects finished spans per trace and appends each trace to a JSON lines
+    file in OTLP format once its root span has ended.
+
+    The calling thread only groups spans and hands finished traces to a
+    bounded queue; a background thread serializes and writes them.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self._path = path
+        # trace ID -> (monotonic time of the first waiting span, spans)
+        self._pending: "OrderedDict[str, Tuple[float, List[Span]]]" = OrderedDict()
+        self._flushed: "OrderedDict[str, None]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._queue: "queue.Queue[Optional[List[Span]]]" = queue.Queue(maxsize=EXPORT_QUEUE_SIZE)
+        self._writer: Optional[threading.Thread] = None
+        self._handler: Optional[logging.handlers.RotatingFileHandler] = None
+        self.dropped = 0
+
+    @property
+    def path(self) -> Path:
+        if self._path is None:
+            self._path = CustomLogger.get_instance().log_path / "traces.jsonl"
+        return self._path
+
+    def on_end(self, span: Span) -> None:
+        now = time.monotonic()
+        ready: List[List[Span]] = []
+        with self._lock:
+            if span.parent_span_id is None:
+                _, spans = self._pending.pop(span.trace_id, (now, []))
+                spans.append(span)
+                ready.append(spans)
+                self._flushed[span.trace_id] = None
+                if len(self._flushed) > FLUSHED_TRACES_REMEMBERED:
+                    self._flushed.popitem(last=False)
+            elif span.trace_id in self._flushed:
+                # The root was already written; nothing else will flush this span
+                ready.append([span])
+            else:
+                self._pending.setdefault(span.trace_id, (now, []))[1].append(span)
+            # Oldest first: write traces whose root is overdue, or over the count limit
+            while self._pending:
+                trace_id, (first, spans) = next(iter(self._pending.items()))
+                if len(self._pending) <= MAX_PENDING_TRACES and now - first < PENDING_MAX_AGE_SECONDS:
+                    break
+                del self._pending[trace_id]
+                ready.append(spans)
+        for spans in ready:
+            self.export(spans)
+
+    def export(self, spans: List[Span]) -> None:
+        """Queue `spans` as one document for the writer thread; dropped if the queue is full."""
+        self._start_writer()
+        try:
+            self._queue.put_nowait(spans)
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Dropped a trace because the trace queue was full", rate_limit=60)
+
+    def _start_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="trace-exporter", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def _write_loop(self) -> None:
+        while True:
+            spans = self._queue.get()
+            try:
+                if spans is not None:
+                    self._write(spans)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, spans: List[Span]) -> None:
+        document = {
+            "resourceSpans": [{
+                "resource": {"attributes": [
+                    _otlp_attribute("service.name", SERVICE_NAME),
+                    _otlp_attribute("process.pid", os.getpid()),
+                ]},
+                "scopeSpans": [{
+                    "scope": {"name": __name__},
+                    "spans": [s.to_otlp() for s in spans],
+                }],
+            }]
+        }
+        line = json.dumps(document, separators=(",", ":"), default=str)
+        try:
+            if self._handler is None:
+                self._handler = logging.handlers.RotatingFileHandler(
+                    self.path, maxBytes=TRACE_FILE_MAX_BYTES, backupCount=TRACE_FILE_BACKUPS, encoding="utf-8"
+                )
+                self._handler.setFormatter(logging.Formatter("%(message)s"))
+            self._handler.emit(logging.makeLogRecord({"msg": line, "levelno": logging.INFO}))
+        except OSError as e:
+            logger.warning("Failed to write trace: %s", e, rate_limit=60)
+
+    def flush(self) -> None:
+        """Wait until every queued trace has been written."""
+        if self._writer is not None:
+            self._queue.join()
+            if self._handler is not None:
+                self._handler.flush()
+
+
+_exporter = TraceExporter()
+
+
+def current_span() -> Optional[Span]:
+    """Return the active span of this context, if any"""
+    return _current_span.get()
+
+
+class span(ContextDecorator):
+    """
+    Record a span around a block or function call.
+
+    Nested spans become children of the active span. Without an active span,
+    or with `new_trace=True`, the span starts a new trace.
+
+    Example usage:
+        with span("render", section="keywords"):
+            ...
+
+        @span("save_uploaded_file")
+        def save_uploaded_file(...):
+            ...
+    """
+
+    def __init__(self, name: str, new_trace: bool = False, **attributes):
+        self.name = name
+        self.new_trace = new_trace
+        self.attributes = attributes
+        self._local = threading.local()
+
+    def _stack(self) -> List[Any]:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def __enter__(self) -> Optional[Span]:
+        if not _enabled():
+            self._stack().append(None)
+            return None
+        parent = None if self.new_trace else _current_span.get()
+        current = Span(
+            name=self.name,
+            trace_id=parent.trace_id if parent else secrets.token_hex(16),
+            span_id=secrets.token_hex(8),
+            parent_span_id=parent.span_id if parent else None,
+            attributes=dict(self.attributes),
+        )
+        self._stack().append((current, _current_span.set(current)))
+        return current
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        entry = self._stack().pop()
+        if entry is None:
+            return False
+        current, token = entry
+        _current_span.reset(token)
+        current.end_ns = time.time_ns()
+        if exc_type is not None and not exc_type.__module__.startswith("streamlit"):
+            current.status = STATUS_ERROR
+            current.status_message = f"{exc_type.__name__}: {exc}"
+        _exporter.on_end(current)
+        return False
+
+
+def record_span(name: str, start_ns: int, end_ns: int, **attributes) -> None:
+    """
+    Record an already finished operation as a child of the active span.
+
+    Args:
+        name: Span name
+        start_ns: Start time in nanoseconds since the epoch
+        end_ns: End time in nanoseconds since the epoch
+        **attributes: Span attributes
+    """
+    parent = _current_span.get()
+    if parent is None or not _enabled():
+        return
+    _exporter.on_end(Span(
+        name=name,
+        trace_id=parent.trace_id,
+        span_id=secrets.token_hex(8),
+        parent_span_id=parent.span_id,
+        start_ns=start_ns,
+        end_ns=end_ns,
+        attributes=attributes,
+    ))
+
+
+def traceparent() -> Optional[str]:
+    """W3C traceparent header value for the active span, if any"""
+    current = _current_span.get()
+    if current is None:
+        return None
+    return f"00-{current.trace_id}-{current.span_id}-01"
+
+
+# Viewer
+
+def load_traces(path: Path) -> Dict[str, List[Dict[str, Any]]]:
+    """Read an OTLP JSON lines file into {trace_id: [span, ...]}"""
+    traces: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            for resource in json.loads(line)["resourceSpans"]:
+                for scope in resource["scopeSpans"]:
+                    for s in scope["spans"]:
+                        traces[s["traceId"]].append(s)
+    return traces
+
+
+def _children(spans: List[Dict[str, Any]]) -> Dict[Optional[str], List[Dict[str, Any]]]:
+    children: Dict[Optional[str], List[Dict[str, Any]]] = defaultdict(list)
+    for s in spans:
+        children[s.get("parentSpanId")].append(s)
+    for group in children.values():
+        group.sort(key=lambda s: int(s["startTimeUnixNano"]))
+    return children
+
+
+def _duration_ms(s: Dict[str, Any]) -> float:
+    return (int(s["endTimeUnixNano"]) - int(s["startTimeUnixNano"])) / 1e6
+
+
+def render_tree(spans: List[Dict[str, Any]]) -> Iterable[str]:
+    """Yield one indented line per span with its duration"""
+    children = _children(spans)
+
+    def walk(s: Dict[str, Any], depth: int) -> Iterable[str]:
+        error = " [ERROR]" if s.get("status", {}).get("code") == STATUS_ERROR else ""
+        yield f"{'  ' * depth}{s['name']}  {_duration_ms(s):.1f} ms{error}"
+        for child in children.get(s["spanId"], []):
+            yield from walk(child, depth + 1)
+
+    for root in children.get(None, []):
+        yield from walk(root, 0)
+
+
+def folded_stacks(traces: Dict[str, List[Dict[str, Any]]]) -> Dict[str, int]:
+    """
+    Aggregate self time (microseconds) per stack, in the folded format read
+    by flamegraph.pl and speedscope.
+    """
+    folded: Dict[str, int] = defaultdict(int)
+    for spans in traces.values():
+        children = _children(spans)
+
+        def walk(s: Dict[str, Any], stack: str) -> None:
+            stack = f"{stack};{s['name']}" if stack else s["name"]
+            kids = children.get(s["spanId"], [])
+            self_ms = _duration_ms(s) - sum(_duration_ms(k) for k in kids)
+            folded[stack] += max(0, int(self_ms * 1000))
+            for kid in kids:
+                walk(kid, stack)
+
+        for root in children.get(None, []):
+            walk(root, "")
+    return folded
+
+
+def chrome_trace(traces: Dict[str, List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Convert traces to Chrome trace event format, one row per trace"""
+    events = []
+    for row, spans in enumerate(traces.values()):
+        for s in spans:
+            events.append({
+                "name": s["name"],
+                "ph": "X",
+                "ts": int(s["startTimeUnixNano"]) / 1000,
+                "dur": _duration_ms(s) * 1000,
+                "pid": 1,
+                "tid": row,
+                "args": {a["key"]: next(iter(a["value"].values())) for a in s.get("attributes", [])},
+            })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="View or convert JobFit trace files")
+    parser.add_argument("trace_file", type=Path)
+    parser.add_argument("--tree", action="store_true", help="print every trace as a span tree")
+    parser.add_argument("--folded", type=Path, help="write folded stacks for flamegraph.pl/speedscope")
+    parser.add_argument("--chrome", type=Path, help="write Chrome trace event JSON")
+    args = parser.parse_args()
+
+    traces = load_traces(args.trace_file)
+    if args.folded:
+        lines = [f"{stack} {value}" for stack, value in sorted(folded_stacks(traces).items())]
+        args.folded.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    if args.chrome:
+        args.chrome.write_text(json.dumps(chrome_trace(traces)), encoding="utf-8")
+    if args.tree or not (args.folded or args.chrome):
+        for trace_id, spans in traces.items():
+            print(f"trace {trace_id}")
+            for line in render_tree(spans):
+                print(f"  {line}")
+
+
+if __name__ == "__main__":
+    main()
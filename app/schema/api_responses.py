@@ -0,0 +1,14 @@
+from typing import Any
+
+from pydantic import BaseModel
+
+
+class ReportResponse(BaseModel):
+    """Envelope returned by the ATS, HR Q&A and job analysis endpoints."""
+    response: Any = "No report found."
+
+
+class TailorResponse(BaseModel):
+    """Envelope returned by the resume builder endpoint."""
+    # Usually markdown, but passed on as received, like the response of ReportResponse
+    result: Any = "No analysis provided."
@@ -0,0 +1,27 @@
+from typing import List
+
+from pydantic import BaseModel, Field
+
+
+class Recommendation(BaseModel):
+    title: str = "Recommendation"
+    description: str = ""
+    action_items: List[str] = Field(default_factory=list)
+
+
+class AtsReport(BaseModel):
+    """
+    Structured ATS report.
+
+    Field order matches the order the backend emits the sections in, so the
+    match score can be rendered first, then the keywords, then recommendations.
+    """
+    match_score: float = 0
+    matched_keywords: List[str] = Field(default_factory=list)
+    missing_keywords: List[str] = Field(default_factory=list)
+    summary: str = ""
+    recommendations: List[Recommendation] = Field(default_factory=list)
+
+    @property
+    def total_keywords_count(self) -> int:
+        return len(self.matched_keywords) + len(self.missing_keywords)
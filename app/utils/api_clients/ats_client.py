@@ -1,13 +1,17 @@
 
 
 import requests
-from typing import Optional, Dict, Any, BinaryIO
-from app.core.config import settings
+from typing import Optional, Dict, Any, BinaryIO, Iterator, Tuple
 
 from app.core.logger import get_logger
 from app.core.exceptions import CustomException
-#back-end api url
-API_BASE_URL = settings.API_BASE_URL
+from app.schema.api_responses import ReportResponse
+from app.schema.ats_report import AtsReport
+from app.utils.api_clients.http_client import api_call
+from app.utils.incremental_json import IncrementalJSONParser
+from app.utils.json_parsing import get_type_adapter, parse_json
+
+ATS_ENDPOINT = "/api/ats-checker/check"
 logger = get_logger(__name__)
 
 def check_resume_against_job_description(
@@ -28,7 +32,7 @@ def check_resume_against_job_description(
         CustomException: If there's an error during the API request
     """
     logger.info("Starting ATS compatibility check")
-    logger.debug(f"Processing resume file: {resume_file.name}")
+    logger.debug("Processing resume file: %s", resume_file.name)
     
     try:
         # Prepare files and data for the request
@@ -39,25 +43,88 @@ def check_resume_against_job_description(
             "job_description": job_description
         }
         
-        logger.debug(f"Sending request to {API_BASE_URL}/api/ats-checker/check")
-        
         # Make the API request
-        response = requests.post(
-            url=f"{API_BASE_URL}/api/ats-checker/check",
-            files=files,
-            data=data
-        )
+        with api_call(ATS_ENDPOINT) as call:
+            logger.debug("Sending request to %s", call.url)
+            # A report for a near-duplicate job description and the same resume is reused
+            response = call.post(files=files, data=data, similar="job_description")
         
         # Process the response
         if response.status_code == 200:
-            report = response.json().get("response", "No report found.")
-            logger.info("Successfully retrieved job analysis report")
+            report = parse_json(response.content, ReportResponse).response
             logger.info("ATS check completed successfully")
             return report
         
     except requests.exceptions.RequestException as e:
-        logger.error(f"ATS API request failed: {str(e)}")
+        logger.error("ATS API request failed: %s", e)
+        raise CustomException(e)
+    except Exception as e:
+        logger.error("Unexpected error during ATS check: %s", e)
+        raise CustomException(e)
+
+
+def stream_ats_report(
+    resume_file: BinaryIO,
+    job_description: str,
+    chunk_size: int = 8192
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Submit a resume and job description to the ATS checker API and yield the
+    report sections as soon as each one has arrived.
+
+    Sections are the fields of `AtsReport`, each validated on its own. If the
+    backend returns a plain markdown report instead of a structured one, a
+    single `("markdown", text)` pair is yielded once the body is complete.
+
+    Args:
+        resume_file: An open file object containing the resume (PDF format)
+        job_description: String containing the job description text
+        chunk_size: Number of bytes to read from the response body at a time
+
+    Yields:
+        Tuple of section name and validated section value
+
+    Raises:
+        CustomException: If there's an error during the API request
+    """
+    logger.info("Starting streamed ATS compatibility check")
+
+    try:
+        files = {
+            "file": (resume_file.name, resume_file, "application/pdf")
+        }
+        data = {
+            "job_description": job_description
+        }
+
+        with api_call(ATS_ENDPOINT) as call, \
+                call.post(files=files, data=data, stream=True, similar="job_description") as response:
+            if response.status_code != 200:
+                logger.error("ATS check failed with status code: %s", response.status_code)
+                return
+
+            parser = IncrementalJSONParser(path=("response",))
+            body = bytearray()
+            sections = 0
+            for chunk in call.iter_content(response, chunk_size=chunk_size):
+                body += chunk
+                for section, value in parser.feed(chunk):
+                    field = AtsReport.model_fields.get(section)
+                    if field is None:
+                        logger.debug("Ignoring unknown ATS report section: %s", section)
+                        continue
+                    sections += 1
+                    yield section, get_type_adapter(field.annotation).validate_python(value)
+            parser.close()
+
+        if sections == 0:
+            # Backend answered with the legacy markdown report
+            yield "markdown", parse_json(bytes(body), ReportResponse).response
+        logger.info("Streamed ATS check completed successfully")
+
+    except requests.exceptions.RequestException as e:
+        logger.error("ATS API request failed: %s", e)
         raise CustomException(e)
     except Exception as e:
-        logger.error(f"Unexpected error during ATS check: {str(e)}")
-        raise CustomException(e)
\ No newline at end of file
+        logger.error("Unexpected error during ATS check: %s", e)
+        raise CustomException(e)
@@ -1,9 +1,11 @@
 from typing import Optional
 import requests
 from app.core.logger import get_logger
-from app.core.config import settings
+from app.schema.api_responses import ReportResponse
+from app.utils.api_clients.http_client import api_call
+from app.utils.json_parsing import parse_json
 
-API_BASE_URL = settings.API_BASE_URL
+HR_QA_ENDPOINT = "/api/hr-qa/answer"
 logger = get_logger(__name__)
 
 def hr_qa_client(query: str) -> Optional[str]:
@@ -18,36 +20,20 @@ def hr_qa_client(query: str) -> Optional[str]:
         None: If request fails or returns invalid response
     """
     try:
-        response = requests.post(
-            url=f"{API_BASE_URL}/api/hr-qa/answer",
-            data={"query": query},  # Changed to json for better content-type handling
-        )
-        
-        # Log successful request metrics
-        logger.debug(
-            f"HR QA request completed - Status: {response.status_code}",
-            extra={"query": query, "status_code": response.status_code}
-        )
-        # Process the response
+        with api_call(HR_QA_ENDPOINT) as call:
+            # The query goes into the call's api_call event, with its status and request ID
+            call.query = query
+            response = call.post(data={"query": query})
+
         if response.status_code == 200:
-            report = response.json().get("response", "No report found.")
-            logger.info("Successfully retrieved job analysis report")
-            logger.info("ATS check completed successfully")
-            return report
+            return parse_json(response.content, ReportResponse).response
 
-            
-        logger.warning("Received empty response from HR QA service")
+        logger.warning("HR QA service answered with status %s", response.status_code)
         return None
         
     except requests.exceptions.RequestException as e:
-        logger.error(
-            "HR QA request failed",
-            extra={"error": str(e), "query": query}
-        )
+        logger.error("HR QA request failed: %s", e)
     except ValueError as ve:  # Handle JSON decode errors
-        logger.error(
-            "Invalid JSON response from HR QA service",
-            extra={"error": str(ve), "query": query}
-        )
+        logger.error("Invalid JSON response from HR QA service: %s", ve)
     
-    return None
\ No newline at end of file
+    return None
@@ -0,0 +1,756 @@
+"""
+HTTP Client Module
+
+This module provides the shared transport used by all API clients:
+1. One pooled `requests.Session` per workload class (interactive / heavy),
+   so connections to the backend are reused and uploads never hold the
+   connections of HR answers; each pool is as large as its class's limit
+2. Connection classes that time the connect, upload and server-wait phases
+   of every request
+3. The `api_call` context manager, which emits exactly one structured
+   `api_call` log event per backend call with endpoint, status, byte
+   counts, phase durations, cache outcome and a request ID, and records
+   the same call in the metrics registry
+4. Tracing spans for the call and its connect, upload, server-wait and
+   body-read phases
+5. Request-ID correlation and Server-Timing: every request carries an
+   `X-Request-ID` header, and a `Server-Timing` header on the response is
+   split into server phases (e.g. scrape, llm, parse) and network time
+6. Optional recording of every call (API_RECORD_DIR) for offline replay
+7. The result cache (CACHE_BACKEND): a 200 answer is stored under the
+   request fingerprint and served to every replica sending the same
+   request until it expires; `ApiCall.cache` says "hit" or "miss". A call
+   naming a `similar` text field is also answered from the cached result
+   of an otherwise equal request whose field is a near-duplicate
+   (app.utils.near_duplicates); `ApiCall.cache` then says "similar"
+8. The fair-share scheduler of the call's workload class: a request waits
+   for a slot right before it is sent and holds it until the call ends;
+   `ApiCall.queue_ms` is the time it waited. Each call's time to first
+   byte and overload answers feed the scheduler's adaptive limit
+9. Retry-After: a 429 / 503 answer asking to wait at most
+   API_RETRY_AFTER_MAX_SECONDS is sent once more after the wait, and no
+   other call is sent before then
+10. Timeout budget: a call fails once it has taken its class's
+   API_<CLASS>_TIMEOUT_SECONDS, waiting for a slot included; the request
+   gets what is left of the budget as its read timeout
+11. Compressed responses: every request asks for the encodings this
+   install can decode (API_ACCEPT_ENCODING), best first; `ApiCall.encoding`
+   is the one the backend chose and `bytes_received` counts the bytes on
+   the wire
+"""
+
+import hashlib
+import io
+import json
+import re
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields as dataclass_fields
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.request import ACCEPT_ENCODING as DECODABLE_ENCODINGS
+
+from app.core.cache import CacheBackend, RedisError, get_cache
+from app.core.config import settings
+from app.core.logger import get_logger
+from app.core.metrics import counter, gauge, histogram
+from app.core.tracing import record_span, span, traceparent
+from app.utils.api_clients.limiter import OVERLOAD_STATUSES
+from app.utils.api_clients.recording import get_recorder, request_fingerprint
+from app.utils.api_clients.scheduler import FairScheduler, Ticket, Workload, current_session, get_scheduler, get_workload
+
+logger = get_logger(__name__)
+
+API_CALLS = counter("jobfit_api_calls_total", "Backend API calls", ["endpoint", "status"])
+API_SECONDS = histogram("jobfit_api_call_seconds", "Backend API call duration", ["endpoint"])
+API_PHASE_SECONDS = histogram("jobfit_api_call_phase_seconds", "Backend API call duration by phase", ["endpoint", "phase"])
+API_BYTES = counter("jobfit_api_bytes_total", "Bytes exchanged with the backend", ["endpoint", "direction"])
+API_IN_FLIGHT = gauge("jobfit_api_calls_in_flight", "Backend API calls currently in progress", ["endpoint"])
+API_SERVER_PHASE_SECONDS = histogram("jobfit_api_server_phase_seconds", "Backend processing time by Server-Timing phase", ["endpoint", "phase"])
+API_CACHE = counter("jobfit_api_cache_total", "Result cache outcomes of backend calls", ["endpoint", "outcome"])
+HTTP_POOL_CONNECTIONS = gauge("jobfit_http_pool_connections", "Connections held by the HTTP session of a workload class", ["workload", "state"])
+
+# Splits a header on commas outside quoted strings
+_HEADER_LIST_SPLIT = re.compile(r',(?=(?:[^"]*"[^"]*")*[^"]*$)')
+
+# Failures of a cache backend, which fall back to calling the backend directly
+_CACHE_ERRORS = (OSError, sqlite3.Error, RedisError)
+
+# Longest wait for a connection to the backend, within the timeout budget
+CONNECT_TIMEOUT = 10.0
+# Connections kept per class at least, like the requests default
+MIN_POOL_SIZE = 10
+# Content encodings in order of preference: smallest bodies and fastest decoding first
+PREFERRED_ENCODINGS = ("zstd", "br", "gzip", "deflate")
+
+# Errors of a call that mean the backend is overloaded or gone, like a 503
+_OVERLOAD_ERRORS = {"ConnectionError", "ConnectTimeout", "ReadTimeout", "Timeout"}
+
+# Phase durations of the request currently sent by this thread
+_phases = threading.local()
+
+
+def _add_phase(name: str, seconds: float) -> None:
+    setattr(_phases, name, getattr(_phases, name, 0.0) + seconds)
+
+
+def _reset_phases() -> None:
+    _phases.connect = _phases.upload = _phases.server_wait = 0.0
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """
+    Parse a `Server-Timing` header into {metric name: duration in ms}.
+
+    Metrics without a `dur` parameter are kept with a duration of 0; repeated
+    names are summed.
+
+    Example:
+        >>> parse_server_timing('scrape;dur=120.5, llm;dur=2300;desc="gpt", cache')
+        {'scrape': 120.5, 'llm': 2300.0, 'cache': 0.0}
+    """
+    timings: Dict[str, float] = {}
+    if not header:
+        return timings
+    for metric in _HEADER_LIST_SPLIT.split(header):
+        name, *params = [part.strip() for part in metric.split(";")]
+        if not name:
+            continue
+        duration = 0.0
+        for param in params:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "dur":
+                try:
+                    duration = float(value.strip().strip('"'))
+                except ValueError:
+                    pass
+        timings[name] = timings.get(name, 0.0) + duration
+    return timings
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Seconds to wait from a `Retry-After` header, given as seconds or as an
+    HTTP date; None if the header is missing or invalid.
+
+    Example:
+        >>> parse_retry_after("120")
+        120.0
+    """
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+def _file_positions(files: Optional[Dict[str, Any]]) -> List[Tuple[Any, int]]:
+    """Upload file objects and their positions, to rewind them before sending a request again."""
+    positions = []
+    for value in (files or {}).values():
+        fileobj = value[1] if isinstance(value, tuple) else value
+        if hasattr(fileobj, "seek") and hasattr(fileobj, "tell"):
+            positions.append((fileobj, fileobj.tell()))
+    return positions
+
+
+class _TimedConnectionMixin:
+    """Records connect, upload and server-wait time of a urllib3 connection."""
+
+    def connect(self) -> None:
+        start = time.perf_counter()
+        start_ns = time.time_ns()
+        try:
+            super().connect()
+        finally:
+            _add_phase("connect", time.perf_counter() - start)
+            record_span("http.connect", start_ns, time.time_ns(), host=self.host)
+
+    def request(self, *args, **kwargs) -> None:
+        # http.client opens the connection lazily inside request()
+        connect_before = getattr(_phases, "connect", 0.0)
+        start = time.perf_counter()
+        start_ns = time.time_ns()
+        try:
+            super().request(*args, **kwargs)
+        finally:
+            connect_during = getattr(_phases, "connect", 0.0) - connect_before
+            _add_phase("upload", time.perf_counter() - start - connect_during)
+            record_span("http.upload", start_ns, time.time_ns())
+
+    def getresponse(self):
+        start = time.perf_counter()
+        start_ns = time.time_ns()
+        try:
+            return super().getresponse()
+        finally:
+            _add_phase("server_wait", time.perf_counter() - start)
+            record_span("http.server_wait", start_ns, time.time_ns())
+
+
+class _TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+
+class _TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter whose connection pools use the timed connection classes."""
+
+    def init_poolmanager(self, *args, **kwargs) -> None:
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": _TimedHTTPConnectionPool,
+            "https": _TimedHTTPSConnectionPool,
+        }
+
+
+def accept_encoding(setting: str) -> str:
+    """
+    The Accept-Encoding header for an API_ACCEPT_ENCODING setting.
+
+    "auto" lists the encodings urllib3 can decode in this install (brotli and
+    zstandard are optional packages), best first; anything else is used as is.
+    """
+    if setting.lower() != "auto":
+        return setting
+    decodable = {encoding.strip() for encoding in DECODABLE_ENCODINGS.split(",")}
+    return ", ".join(encoding for encoding in PREFERRED_ENCODINGS if encoding in decodable)
+
+
+def _build_session(pool_size: int) -> requests.Session:
+    session = requests.Session()
+    session.headers["Accept-Encoding"] = accept_encoding(settings.API_ACCEPT_ENCODING)
+    adapter = TimedHTTPAdapter(pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+# One session per workload class
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def get_session(workload: Workload) -> requests.Session:
+    """The session of a workload class, with a pool large enough for all of its slots."""
+    session = _sessions.get(workload.name)
+    if session is None:
+        with _sessions_lock:
+            session = _sessions.get(workload.name)
+            if session is None:
+                session = _sessions[workload.name] = _build_session(max(MIN_POOL_SIZE, workload.max_in_flight))
+                for state in ("opened", "idle"):
+                    HTTP_POOL_CONNECTIONS.set_function(
+                        lambda session=session, state=state: _pool_connections(session, state),
+                        workload=workload.name, state=state
+                    )
+    return session
+
+
+def _pool_connections(session: requests.Session, state: str) -> float:
+    """Count connections opened by, or idle in, a session's pools."""
+    total = 0
+    for adapter in set(session.adapters.values()):
+        pools = adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            if state == "opened":
+                total += pool.num_connections
+            elif pool.pool is not None:
+                total += sum(1 for conn in list(pool.pool.queue) if conn is not None)
+    return total
+
+
+@dataclass
+class ApiCall:
+    """
+    One backend call and the fields of its `api_call` log event.
+
+    Use `post()` to send the request and, for streamed responses,
+    `iter_content()` to read the body so received bytes are counted.
+    """
+    endpoint: str
+    request_id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    method: str = "POST"
+    workload: Optional[str] = None
+    status: Optional[int] = None
+    encoding: Optional[str] = None  # Content-Encoding of the response body
+    bytes_sent: int = 0
+    bytes_received: int = 0
+    queue_ms: float = 0.0
+    connect_ms: float = 0.0
+    upload_ms: float = 0.0
+    server_wait_ms: float = 0.0
+    duration_ms: float = 0.0
+    server_timing: Dict[str, float] = field(default_factory=dict)
+    server_ms: Optional[float] = None
+    network_ms: Optional[float] = None
+    backend_request_id: Optional[str] = None  # only set when the backend did not echo ours
+    cache: Optional[str] = None  # "hit" / "miss" / "similar" / "error" when a cache is in front of the call
+    similarity: Optional[float] = None  # of the near-duplicate text whose cached result answered the call
+    retry_after: Optional[float] = None  # seconds a 429 / 503 answer asked to wait
+    retried: bool = False
+    error: Optional[str] = None
+    fingerprint: Optional[str] = None  # set while recording
+    query: Optional[str] = None  # the question of an HR Q&A call
+    _start: float = field(default_factory=time.perf_counter, repr=False)
+    # Response kept for the recorder and the result cache
+    _headers: Dict[str, str] = field(default_factory=dict, repr=False)
+    _body: Optional[bytearray] = field(default=None, repr=False)
+    _body_ms: float = field(default=0.0, repr=False)
+    _body_complete: bool = field(default=False, repr=False)
+    # (cache, key, token) of a streamed call that fills the cache when it ends
+    _cache_claim: Optional[Tuple[CacheBackend, str, Optional[str]]] = field(default=None, repr=False)
+    # (index, scope, text) under which a cached answer is indexed for near-duplicate reuse
+    _similar: Optional[Tuple[Any, str, str]] = field(default=None, repr=False)
+    # Scheduler slot held from sending the request until the call ends
+    _slot: Optional[Tuple[FairScheduler, Ticket]] = field(default=None, repr=False)
+
+    @property
+    def url(self) -> str:
+        return f"{settings.API_BASE_URL}{self.endpoint}"
+
+    def post(
+        self,
+        data: Optional[Dict[str, Any]] = None,
+        files: Optional[Dict[str, Any]] = None,
+        stream: bool = False,
+        similar: Optional[str] = None,
+        **kwargs
+    ) -> requests.Response:
+        """
+        Send the request through the shared session and record its phases.
+
+        Args:
+            data: Form fields
+            files: Multipart files
+            stream: Leave the body unread; read it with iter_content()
+            similar: Form field whose near-duplicates may answer from the result cache
+            **kwargs: Passed through to requests
+
+        Returns:
+            requests.Response: The backend response
+        """
+        self.method = "POST"
+        headers = dict(kwargs.pop("headers", None) or {})
+        headers["X-Request-ID"] = self.request_id
+        parent = traceparent()
+        if parent:
+            headers["traceparent"] = parent
+        cache = get_cache()
+        if get_recorder() is not None or cache is not None:
+            self.fingerprint = request_fingerprint(self.method, self.endpoint, data, files)
+        if get_recorder() is not None:
+            self._body = bytearray()
+
+        def send() -> requests.Response:
+            return self._send(headers, data, files, stream, **kwargs)
+
+        if cache is None:
+            return send()
+        if similar and (data or {}).get(similar):
+            response = self._post_similar(cache, data, files, similar)
+            if response is not None:
+                return response
+        return self._post_cached(cache, send, stream)
+
+    def _send(
+        self,
+        headers: Dict[str, str],
+        data: Optional[Dict[str, Any]],
+        files: Optional[Dict[str, Any]],
+        stream: bool,
+        **kwargs
+    ) -> requests.Response:
+        workload = get_workload(self.endpoint)
+        self.workload = workload.name
+        scheduler = get_scheduler(workload)
+        session = get_session(workload)
+        deadline = self._start + workload.timeout
+        positions = _file_positions(files)
+        caller_timeout = kwargs.pop("timeout", None)
+        while True:
+            if scheduler is not None and self._slot is None:
+                ticket = scheduler.acquire(current_session(), self.endpoint, max(0.0, deadline - time.perf_counter()))
+                self._slot = (scheduler, ticket)
+                self.queue_ms += ticket.queue_seconds * 1000
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                raise requests.exceptions.Timeout(f"{self.endpoint} spent its {workload.timeout:.0f}s budget")
+            timeout = caller_timeout or (min(CONNECT_TIMEOUT, remaining), remaining)
+            _reset_phases()
+            try:
+                # The body is always streamed so that reading it gets its own span
+                response = session.post(self.url, data=data, files=files, stream=True, headers=headers,
+                                        timeout=timeout, **kwargs)
+            finally:
+                self.connect_ms = _phases.connect * 1000
+                self.upload_ms = _phases.upload * 1000
+                self.server_wait_ms = _phases.server_wait * 1000
+
+            self.status = response.status_code
+            self.retry_after = None
+            if response.status_code in OVERLOAD_STATUSES:
+                self.retry_after = parse_retry_after(response.headers.get("Retry-After"))
+            if (self.retried or self.retry_after is None or self.retry_after > settings.API_RETRY_AFTER_MAX_SECONDS
+                    or self.retry_after >= deadline - time.perf_counter()):
+                break
+            # Send once more after the wait; the scheduler holds back every other call until then
+            logger.info("%s answered %s, sending again in %.1fs", self.endpoint, self.status, self.retry_after)
+            response.close()
+            self.retried = True
+            self._release_slot()
+            if scheduler is None:
+                time.sleep(self.retry_after)
+            for fileobj, position in positions:
+                fileobj.seek(position)
+
+        self._read_server_headers(response)
+        self.encoding = response.headers.get("Content-Encoding")
+        body = response.request.body
+        if isinstance(body, (bytes, str)):
+            self.bytes_sent = len(body)
+        if not stream:
+            read_start = time.perf_counter()
+            with span("http.read_body"):
+                self.bytes_received = _wire_bytes(response, len(response.content))
+            self._body_ms = (time.perf_counter() - read_start) * 1000
+            if self._body is not None:
+                self._body += response.content
+                self._body_complete = True
+        return response
+
+    def _release_slot(self) -> None:
+        """Give back the scheduler slot, reporting how the backend coped with the call."""
+        if self._slot is None:
+            return
+        scheduler, ticket = self._slot
+        self._slot = None
+        overloaded = self.status in OVERLOAD_STATUSES or self.error in _OVERLOAD_ERRORS
+        latency = self.server_wait_ms / 1000 if self.status is not None else None
+        scheduler.release(ticket, latency, overloaded, self.retry_after)
+
+    def _post_similar(
+        self,
+        cache: CacheBackend,
+        data: Dict[str, Any],
+        files: Optional[Dict[str, Any]],
+        similar: str
+    ) -> Optional[requests.Response]:
+        """
+        Answer from the cached result of a near-duplicate request, if there is one.
+
+        Near-duplicates are requests equal to this one except for the `similar`
+        field, whose text is at least NEAR_DUPLICATE_THRESHOLD similar. When there
+        is none, the call remembers where to index its own answer once cached.
+        """
+        from app.utils.near_duplicates import get_index
+
+        try:
+            index = get_index()
+            if index is None:
+                return None
+            text = str(data[similar])
+            scope = request_fingerprint(
+                self.method, self.endpoint, {name: value for name, value in data.items() if name != similar}, files
+            )
+            with span("cache.similar", backend=cache.name):
+                match = index.query(scope, text)
+                entry = cache.get(match.key) if match is not None else None
+        except _CACHE_ERRORS as e:
+            logger.warning("Near-duplicate lookup failed: %s", e, rate_limit=60)
+            return None
+        if entry is None:
+            self._similar = (index, scope, text)
+            return None
+        exact = match.key == _cache_key(self.fingerprint)
+        self.cache = "hit" if exact else "similar"
+        self.similarity = match.similarity
+        if not exact:
+            logger.info("%s answered from a cached result %.0f%% similar in %s",
+                        self.endpoint, match.similarity * 100, similar)
+        return self._cached_response(entry)
+
+    def _index_similar(self, key: str) -> None:
+        """Index the cached answer under `key` for near-duplicates of this request."""
+        if self._similar is None:
+            return
+        index, scope, text = self._similar
+        self._similar = None
+        try:
+            index.add(scope, key, text)
+        except sqlite3.Error as e:
+            logger.warning("Near-duplicate index update failed: %s", e, rate_limit=60)
+
+    def _post_cached(self, cache: CacheBackend, send, stream: bool) -> requests.Response:
+        """
+        Answer from the result cache, or send the request and cache a 200 answer.
+
+        A plain call is one atomic get-or-compute. A streamed call claims the
+        key here and fills it in `api_call` once the body has been read in
+        full, so callers of the same request wait for the stream instead of
+        sending it again.
+        """
+        key = _cache_key(self.fingerprint)
+        sent: Dict[str, Any] = {}
+
+        def compute() -> Optional[bytes]:
+            if self._body is None:
+                self._body = bytearray()
+            try:
+                sent["response"] = response = send()
+            except Exception as e:
+                # Raised again below, outside the cache error handling
+                sent["error"] = e
+                return None
+            if response.status_code != 200:
+                return None
+            return _encode_entry(response.status_code, response.headers.get("Content-Type"), bytes(self._body))
+
+        try:
+            if stream:
+                with span("cache.claim", backend=cache.name):
+                    entry, token = cache.claim(key)
+                if entry is None:
+                    self._cache_claim = (cache, key, token)
+            else:
+                entry, _ = cache.get_or_compute(key, compute)
+        except _CACHE_ERRORS as e:
+            # A broken cache must not break the call
+            logger.warning("Result cache %s failed: %s", cache.name, e, rate_limit=60)
+            self.cache = "error"
+            self._cache_claim = None
+            if "error" in sent:
+                raise sent["error"]
+            if "response" in sent:
+                return sent["response"]
+            return send()
+
+        if "error" in sent:
+            self.cache = "miss"
+            raise sent["error"]
+        if "response" in sent:
+            self.cache = "miss"
+            if entry is not None:
+                self._index_similar(key)
+            return sent["response"]
+        if entry is None:
+            self.cache = "miss"
+            if self._body is None:
+                self._body = bytearray()
+            return send()
+        self.cache = "hit"
+        self._body = None  # nothing to record: the answer did not come from the backend
+        return self._cached_response(entry)
+
+    def _cached_response(self, entry: bytes) -> requests.Response:
+        status, content_type, body = _decode_entry(entry)
+        response = requests.Response()
+        response.status_code = status
+        response.reason = "OK"
+        response.url = self.url
+        if content_type:
+            response.headers["Content-Type"] = content_type
+        response.raw = io.BytesIO(body)
+        self.status = status
+        self.bytes_received = len(body)
+        return response
+
+    def _read_server_headers(self, response: requests.Response) -> None:
+        """
+        Split the time to first byte into server phases and network time.
+
+        The server total is the `total` Server-Timing metric if the backend
+        sends one, otherwise the sum of its phases. Network time is what is
+        left of connect + upload + server wait.
+        """
+        if self._body is not None:
+            self._headers = dict(response.headers)
+        echoed = response.headers.get("X-Request-ID")
+        if echoed and echoed != self.request_id:
+            self.backend_request_id = echoed
+
+        self.server_timing = parse_server_timing(response.headers.get("Server-Timing"))
+        if not self.server_timing:
+            return
+        phases = {name: ms for name, ms in self.server_timing.items() if name != "total"}
+        self.server_ms = self.server_timing.get("total", sum(phases.values()))
+        client_ms = self.connect_ms + self.upload_ms + self.server_wait_ms
+        self.network_ms = max(0.0, client_ms - self.server_ms)
+
+    def iter_content(self, response: requests.Response, chunk_size: int = 8192) -> Iterator[bytes]:
+        """
+        Iterate over a streamed response body, counting received bytes.
+
+        The body-read span covers the whole iteration; its `blocked_ms`
+        attribute is the part spent waiting on the network rather than in
+        the consumer.
+        """
+        start_ns = time.time_ns()
+        blocked = 0.0
+        chunks = response.iter_content(chunk_size=chunk_size)
+        try:
+            while True:
+                wait_start = time.perf_counter()
+                chunk = next(chunks, None)
+                blocked += time.perf_counter() - wait_start
+                if chunk is None:
+                    self._body_complete = True
+                    if self.cache not in ("hit", "similar"):
+                        self.bytes_received = _wire_bytes(response, self.bytes_received)
+                    break
+                if self.cache not in ("hit", "similar"):
+                    self.bytes_received += len(chunk)
+                if self._body is not None:
+                    self._body += chunk
+                yield chunk
+        finally:
+            self._body_ms = (time.time_ns() - start_ns) / 1e6
+            record_span(
+                "http.read_body", start_ns, time.time_ns(),
+                bytes=self.bytes_received, blocked_ms=round(blocked * 1000, 3)
+            )
+
+    def event(self) -> Dict[str, Any]:
+        """Fields of the structured log event."""
+        fields = {f.name: getattr(self, f.name) for f in dataclass_fields(self) if not f.name.startswith("_")}
+        for key, value in fields.items():
+            if isinstance(value, float):
+                fields[key] = round(value, 3)
+        fields["server_timing"] = {name: round(ms, 3) for name, ms in self.server_timing.items()}
+        return {"event": "api_call", **fields}
+
+
+@contextmanager
+def api_call(endpoint: str) -> Iterator[ApiCall]:
+    """
+    Wrap one backend call and emit its `api_call` log event when it ends.
+
+    Example usage:
+        with api_call("/api/hr-qa/answer") as call:
+            response = call.post(data={"query": query})
+
+    Args:
+        endpoint: Path of the backend endpoint, e.g. "/api/hr-qa/answer"
+
+    Yields:
+        ApiCall: Record of the call, also used to send the request
+    """
+    call = ApiCall(endpoint=endpoint)
+    API_IN_FLIGHT.inc(endpoint=endpoint)
+    try:
+        with span(f"api_call {endpoint}", endpoint=endpoint, request_id=call.request_id) as call_span:
+            try:
+                yield call
+            finally:
+                if call_span is not None:
+                    call_span.set_attribute("status", call.status or 0)
+                    call_span.set_attribute("bytes_sent", call.bytes_sent)
+                    call_span.set_attribute("bytes_received", call.bytes_received)
+                    for name, ms in call.server_timing.items():
+                        call_span.set_attribute(f"server.{name}_ms", ms)
+                    if call.network_ms is not None:
+                        call_span.set_attribute("network_ms", call.network_ms)
+    except Exception as e:
+        call.error = type(e).__name__
+        raise
+    finally:
+        call.duration_ms = (time.perf_counter() - call._start) * 1000
+        API_IN_FLIGHT.dec(endpoint=endpoint)
+        call._release_slot()
+        _record_metrics(call)
+        if call._cache_claim is not None:
+            _fill_cache(call)
+        recorder = get_recorder()
+        if recorder is not None and call._body is not None and call.status is not None and not call.error:
+            recorder.record(call, call._headers, bytes(call._body), call._body_ms)
+        level = "warning" if call.error or (call.status or 0) >= 400 else "info"
+        getattr(logger, level)(
+            "API call %s %s -> %s in %.1f ms",
+            call.method, call.endpoint, call.status, call.duration_ms,
+            extra=call.event()
+        )
+
+
+def _wire_bytes(response: requests.Response, decoded: int) -> int:
+    """Bytes of the body as received: fewer than `decoded` when it came compressed."""
+    if response.headers.get("Content-Encoding") and hasattr(response.raw, "tell"):
+        return response.raw.tell()
+    return decoded
+
+
+def _cache_key(fingerprint: str) -> str:
+    # Different backends may answer the same request differently
+    return "api:" + hashlib.sha256(f"{settings.API_BASE_URL}\n{fingerprint}".encode("utf-8")).hexdigest()
+
+
+def _encode_entry(status: int, content_type: Optional[str], body: bytes) -> bytes:
+    header = json.dumps({"status": status, "content_type": content_type})
+    return header.encode("utf-8") + b"\n" + body
+
+
+def _decode_entry(entry: bytes) -> Tuple[int, Optional[str], bytes]:
+    header, _, body = entry.partition(b"\n")
+    meta = json.loads(header)
+    return meta["status"], meta["content_type"], body
+
+
+def _fill_cache(call: ApiCall) -> None:
+    """Store the answer of a streamed call that claimed its cache key, or just release the claim."""
+    cache, key, token = call._cache_claim
+    call._cache_claim = None
+    entry = None
+    if call.status == 200 and not call.error and call._body_complete and call._body is not None:
+        entry = _encode_entry(call.status, call._headers.get("Content-Type"), bytes(call._body))
+    try:
+        cache.fill(key, token, entry)
+    except _CACHE_ERRORS as e:
+        logger.warning("Result cache %s failed: %s", cache.name, e, rate_limit=60)
+        return
+    if entry is not None:
+        call._index_similar(key)
+
+
+def _record_metrics(call: ApiCall) -> None:
+    status = str(call.status) if call.status is not None else (call.error or "none")
+    API_CALLS.inc(endpoint=call.endpoint, status=status)
+    API_SECONDS.observe(call.duration_ms / 1000, endpoint=call.endpoint)
+    for phase in ("connect", "upload", "server_wait"):
+        API_PHASE_SECONDS.observe(getattr(call, f"{phase}_ms") / 1000, endpoint=call.endpoint, phase=phase)
+    if call.network_ms is not None:
+        API_PHASE_SECONDS.observe(call.network_ms / 1000, endpoint=call.endpoint, phase="network")
+    for name, ms in call.server_timing.items():
+        API_SERVER_PHASE_SECONDS.observe(ms / 1000, endpoint=call.endpoint, phase=name)
+    API_BYTES.inc(call.bytes_sent, endpoint=call.endpoint, direction="sent")
+    API_BYTES.inc(call.bytes_received, endpoint=call.endpoint, direction="received")
+    if call.cache is not None:
+        API_CACHE.inc(endpoint=call.endpoint, outcome=call.cache)
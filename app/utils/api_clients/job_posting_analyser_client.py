@@ -13,12 +13,13 @@ from typing import Optional, Dict, Any
 # Import custom exceptions and logger
 from app.core.exceptions import CustomException
 from app.core.logger import get_logger
-from app.core.config import settings
+from app.schema.api_responses import ReportResponse
+from app.utils.api_clients.http_client import api_call
+from app.utils.json_parsing import loads, parse_json
 # Initialize logger for this module
 logger = get_logger(__name__)
 
-# API Base URL should be in config, but using a placeholder for now
-API_BASE_URL = settings.API_BASE_URL
+JOB_ANALYSIS_ENDPOINT = "/api/job-analysis/analyze"
 
 def analyze_job_posting(url: str) -> Optional[Dict[str, Any]]:
     """
@@ -33,21 +34,19 @@ def analyze_job_posting(url: str) -> Optional[Dict[str, Any]]:
     Raises:
         CustomException: If there's an error making the API request or processing the response
     """
-    logger.info(f"Sending job posting URL for analysis: {url}")
+    logger.info("Sending job posting URL for analysis: %s", url)
     
     try:
         # Make the API request
-        response = requests.post(
-            url=f"{API_BASE_URL}/api/job-analysis/analyze", 
-            data={"url": url},
-        )
+        with api_call(JOB_ANALYSIS_ENDPOINT) as call:
+            response = call.post(data={"url": url})
         
         # Log the response status
-        logger.debug(f"Received response with status code: {response.status_code}")
+        logger.debug("Received response with status code: %s", response.status_code)
         
         # Process the response
         if response.status_code == 200:
-            report = response.json().get("response", "No report found.")
+            report = parse_json(response.content, ReportResponse).response
             logger.info("Successfully retrieved job analysis report")
             return report
         else:
@@ -56,8 +55,8 @@ def analyze_job_posting(url: str) -> Optional[Dict[str, Any]]:
             
             # Try to get error details if available
             try:
-                error_details = response.json()
-                logger.error(f"Error details: {error_details}")
+                error_details = loads(response.content)
+                logger.error("Error details: %s", error_details)
             except Exception:
                 logger.error("No error details available in response")
                 
@@ -0,0 +1,117 @@
+"""
+Adaptive Concurrency Limit Module
+
+This module sizes the fair-share scheduler to what the backend can take
+right now, in the style of TCP Vegas:
+1. Every finished call reports its time to first byte. Per endpoint, the
+   limit keeps a short and a long moving average of it: the long one is
+   the baseline, so a backend that got slower for good becomes the new
+   normal after a while, and single slow answers (LLM latency varies a
+   lot) do not count as congestion
+2. While the short average stays within LATENCY_FLAT of the baseline and
+   the slots are in use, the limit grows by about one slot per limit's
+   worth of calls (additive increase)
+3. When the short average passes LATENCY_CONGESTED times the baseline,
+   or the backend answers 429 / 503 or cannot be reached, the limit is
+   multiplied by BACKOFF (multiplicative decrease). It is cut at most once
+   per round trip: calls sent before the last cut do not cut it again. A
+   latency cut also raises the baseline so that the current latency is
+   just congested: if the backend got slower rather than busier, the limit
+   stops falling once the latency stops rising
+4. The limit stays between API_MIN_IN_FLIGHT and the workload class's
+   API_<CLASS>_MAX_IN_FLIGHT and is exported as jobfit_api_concurrency_limit
+
+A `Retry-After` on a 429 / 503 answer pauses the scheduler for that long
+(see `FairScheduler.release`), and `ApiCall` sends the request once more
+after the pause.
+"""
+
+import threading
+import time
+from typing import Dict
+
+from app.core.logger import get_logger
+from app.core.metrics import counter, gauge
+
+logger = get_logger(__name__)
+
+# Answers meaning "too busy, come back later"
+OVERLOAD_STATUSES = (429, 503)
+INITIAL_LIMIT = 8
+# Short average within this factor of the baseline counts as flat...
+LATENCY_FLAT = 1.1
+# ...and above this factor as queueing at the backend
+LATENCY_CONGESTED = 1.5
+BACKOFF = 0.7
+# Weight of a new sample in the short average and in the baseline
+SHORT_SMOOTHING = 0.2
+BASELINE_SMOOTHING = 0.005
+
+API_CONCURRENCY_LIMIT = gauge("jobfit_api_concurrency_limit", "Current adaptive limit of backend calls in flight", ["workload"])
+API_LIMIT_CUTS = counter("jobfit_api_concurrency_limit_cuts_total", "Cuts of the adaptive concurrency limit", ["workload", "reason"])
+
+
+class AdaptiveLimit:
+    """Additive-increase, multiplicative-decrease limit driven by per-endpoint latency."""
+
+    def __init__(self, min_limit: int, max_limit: int, initial: int = INITIAL_LIMIT, name: str = "heavy"):
+        self.name = name
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(self.max_limit, max(self.min_limit, initial)))
+        self._baseline: Dict[str, float] = {}
+        self._short: Dict[str, float] = {}
+        self._last_cut = 0.0
+        self._lock = threading.Lock()
+        API_CONCURRENCY_LIMIT.set_function(lambda: self.current, workload=name)
+
+    @property
+    def current(self) -> int:
+        return int(self.limit)
+
+    def observe(self, endpoint: str, latency: float, sent_at: float, in_flight: int) -> int:
+        """
+        Update the limit with one finished call.
+
+        Args:
+            endpoint: Endpoint of the call; latencies are compared per endpoint
+            latency: Time to first byte in seconds
+            sent_at: `time.perf_counter()` when the call got its slot
+            in_flight: Calls in flight when it finished, itself included
+
+        Returns:
+            int: The new limit
+        """
+        with self._lock:
+            baseline = self._baseline.get(endpoint, latency)
+            baseline += BASELINE_SMOOTHING * (latency - baseline)
+            self._baseline[endpoint] = baseline
+            short = self._short.get(endpoint, latency)
+            short += SHORT_SMOOTHING * (latency - short)
+            self._short[endpoint] = short
+
+            if short > baseline * LATENCY_CONGESTED:
+                if self._cut(sent_at, "latency"):
+                    self._baseline[endpoint] = short / LATENCY_CONGESTED
+            elif short <= baseline * LATENCY_FLAT and in_flight >= self.limit / 2:
+                # A limit that is not used tells nothing about the backend, so it does not grow
+                self.limit = min(self.max_limit, self.limit + 1 / self.limit)
+            return self.current
+
+    def overloaded(self, sent_at: float) -> int:
+        """Cut the limit after a 429 / 503 answer or a failed connection; returns the new limit."""
+        with self._lock:
+            self._cut(sent_at, "overload")
+            return self.current
+
+    def _cut(self, sent_at: float, reason: str) -> bool:
+        if sent_at < self._last_cut:
+            return False
+        before = self.current
+        self.limit = max(self.min_limit, self.limit * BACKOFF)
+        self._last_cut = time.perf_counter()
+        API_LIMIT_CUTS.inc(workload=self.name, reason=reason)
+        if self.current != before:
+            logger.info("Backend concurrency limit of %s calls cut from %d to %d (%s)",
+                        self.name, before, self.current, reason)
+        return True
@@ -0,0 +1,178 @@
+"""
+API Recording Module
+
+This module records backend traffic so it can be replayed offline:
+1. A request fingerprint built from the method, endpoint, form fields and
+   the names and content hashes of uploaded files, computed the same way by
+   the client and by the replay server
+2. `ApiRecorder`, which appends one entry per call to `index.jsonl` in the
+   archive directory: fingerprint, status, response headers, timings and
+   the hash of the response body, stored gzip-compressed under `bodies/`
+3. Readers for an archive, used by `benchmarks.replay_backend`
+
+Recording is enabled by setting API_RECORD_DIR. Request bodies are not
+stored, only their fingerprint; response bodies are, so an archive holds
+generated content about the uploaded resumes and should stay local.
+"""
+
+import gzip
+import hashlib
+import json
+import threading
+import time
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from app.core.config import settings
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+# Headers that describe the original transfer rather than the response
+_TRANSFER_HEADERS = {"connection", "keep-alive", "transfer-encoding", "content-length", "content-encoding", "date", "server"}
+
+
+def _file_content(content: Any) -> bytes:
+    """Bytes of an upload given as bytes, str or a file object."""
+    if isinstance(content, bytes):
+        return content
+    if isinstance(content, str):
+        return content.encode("utf-8")
+    if hasattr(content, "getvalue"):
+        return content.getvalue()
+    position = content.tell()
+    data = content.read()
+    content.seek(position)
+    return data
+
+
+def fingerprint(
+    method: str,
+    endpoint: str,
+    fields: Iterable[Tuple[str, str]],
+    files: Iterable[Tuple[str, str, bytes]]
+) -> str:
+    """
+    Fingerprint a request.
+
+    Args:
+        method: HTTP method
+        endpoint: Endpoint path
+        fields: (name, value) form fields
+        files: (field name, file name, content) uploads
+
+    Returns:
+        str: Hex SHA-256 of the normalized request
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{method.upper()} {endpoint}\n".encode("utf-8"))
+    for name, value in sorted(fields):
+        digest.update(f"field {name}={value}\n".encode("utf-8"))
+    for name, filename, content in sorted(files, key=lambda f: (f[0], f[1])):
+        digest.update(f"file {name}={filename}:{hashlib.sha256(content).hexdigest()}\n".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def request_fingerprint(
+    method: str,
+    endpoint: str,
+    data: Optional[Dict[str, Any]],
+    files: Optional[Dict[str, Any]]
+) -> str:
+    """Fingerprint a request as given to `requests` (form `data` and `files` dicts)."""
+    fields = [(name, "" if value is None else str(value)) for name, value in (data or {}).items()]
+    uploads = []
+    for name, spec in (files or {}).items():
+        if isinstance(spec, tuple):
+            filename, content = spec[0], spec[1]
+        else:
+            filename, content = getattr(spec, "name", name), spec
+        uploads.append((name, filename or "", _file_content(content)))
+    return fingerprint(method, endpoint, fields, uploads)
+
+
+class ApiRecorder:
+    """Appends recorded calls to an archive directory."""
+
+    def __init__(self, directory: Path):
+        self.directory = Path(directory)
+        (self.directory / "bodies").mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        call: Any,
+        headers: Dict[str, str],
+        body: bytes,
+        body_ms: float
+    ) -> None:
+        """
+        Store one finished call.
+
+        Args:
+            call: The ApiCall, with its fingerprint, status and timings
+            headers: Response headers
+            body: Decoded response body
+            body_ms: Time spent reading the body
+        """
+        body_sha = hashlib.sha256(body).hexdigest()
+        entry = {
+            "fingerprint": call.fingerprint,
+            "method": call.method,
+            "endpoint": call.endpoint,
+            "request_id": call.request_id,
+            "recorded_at": time.time(),
+            "status": call.status,
+            "headers": {k: v for k, v in headers.items() if k.lower() not in _TRANSFER_HEADERS},
+            "body_sha256": body_sha,
+            "body_bytes": len(body),
+            "timings": {
+                "connect_ms": round(call.connect_ms, 3),
+                "upload_ms": round(call.upload_ms, 3),
+                "server_wait_ms": round(call.server_wait_ms, 3),
+                "body_ms": round(body_ms, 3),
+                "duration_ms": round(call.duration_ms, 3),
+                "server_ms": call.server_ms,
+                "network_ms": call.network_ms,
+            },
+            "server_timing": call.server_timing,
+        }
+        path = self.directory / "bodies" / f"{body_sha}.gz"
+        try:
+            with self._lock:
+                if not path.exists():
+                    path.write_bytes(gzip.compress(body))
+                with open(self.directory / "index.jsonl", "a", encoding="utf-8") as f:
+                    f.write(json.dumps(entry) + "\n")
+        except OSError as e:
+            logger.warning("Failed to record API call %s: %s", call.request_id, e, rate_limit=60)
+
+
+@lru_cache(maxsize=None)
+def _recorder(directory: str) -> ApiRecorder:
+    return ApiRecorder(Path(directory))
+
+
+def get_recorder() -> Optional[ApiRecorder]:
+    """The recorder for API_RECORD_DIR, or None when recording is off."""
+    if not settings.API_RECORD_DIR:
+        return None
+    return _recorder(settings.API_RECORD_DIR)
+
+
+def load_archive(directory: Path) -> List[Dict[str, Any]]:
+    """Read every entry of an archive's index."""
+    with open(Path(directory) / "index.jsonl", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def read_body(directory: Path, entry: Dict[str, Any]) -> bytes:
+    """Response body of an archive entry."""
+    return gzip.decompress((Path(directory) / "bodies" / f"{entry['body_sha256']}.gz").read_bytes())
+
+
+def iter_archive(directory: Path) -> Iterator[Tuple[Dict[str, Any], bytes]]:
+    """Yield (entry, body) pairs of an archive."""
+    for entry in load_archive(directory):
+        yield entry, read_body(directory, entry)
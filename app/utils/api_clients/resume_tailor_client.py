@@ -2,10 +2,12 @@ import requests
 from app.core.logger import get_logger
 from app.core.exceptions import CustomException
 
-from app.core.config import settings
+from app.schema.api_responses import TailorResponse
+from app.utils.api_clients.http_client import api_call
+from app.utils.json_parsing import parse_json
 
 
-API_BASE_URL = settings.API_BASE_URL
+RESUME_BUILDER_ENDPOINT = "/api/resume-builder/check"
     
 logger =get_logger(__name__)
 
@@ -13,6 +15,9 @@ logger =get_logger(__name__)
 def tailor_resume_and_guide(resume_file, job_posting_url, github_url, write_up):
     """
     Sends resume tailoring request to backend and returns AI-generated report.
+
+    Returns:
+        TailorResponse: Validated response parsed straight from the response bytes
     """
 
     # Build multipart/form-data for file upload
@@ -32,20 +37,15 @@ def tailor_resume_and_guide(resume_file, job_posting_url, github_url, write_up):
     }
 
     try:
-        response = requests.post(
-            url=f"{API_BASE_URL}/api/resume-builder/check", 
-            files=files,
-            data=data,
-
-        )
+        with api_call(RESUME_BUILDER_ENDPOINT) as call:
+            response = call.post(files=files, data=data)
         response.raise_for_status() 
 
         # Safely extract data
-
-        return response
+        return parse_json(response.content, TailorResponse)
 
     except requests.exceptions.RequestException as e:
-            logger.error(f"❌ Error communicating with AI service: {str(e)}")
+            logger.error("❌ Error communicating with AI service: %s", e)
 
     except ValueError:
           logger.error( "⚠️ Response was not valid JSON.")
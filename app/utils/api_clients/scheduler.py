@@ -0,0 +1,345 @@
+"""
+Fair-Share Scheduler Module
+
+This module shares the backend between sessions, so one user repeating
+heavy requests cannot hold most of it:
+1. Calls belong to a workload class (ENDPOINT_WORKLOADS): "interactive"
+   for short calls a user waits on (HR answers) and "heavy" for uploads,
+   tailoring and job analysis. Each class has its own scheduler, so a
+   flood of one class cannot take the slots of the other; at most
+   API_<CLASS>_MAX_IN_FLIGHT calls of a class are in flight at once and
+   further calls wait in a queue per session
+2. Free slots go to the waiting sessions by deficit round-robin: each turn a
+   session earns a quantum of credit and sends its next call once its
+   credit covers the call's cost. Costs (ENDPOINT_COSTS) follow how long the
+   backend works on each endpoint, so a session sending tailoring requests
+   gets as much backend time as one asking HR questions, not more
+3. Time spent waiting is recorded per endpoint, and a listener registered
+   with `on_queue_wait` is told the caller's position in the queue while it
+   waits (the pages show it to the user)
+4. A call that spends its class's timeout budget
+   (API_<CLASS>_TIMEOUT_SECONDS) waiting fails with `QueueTimeout`, a
+   `requests` exception the clients already handle
+5. With API_ADAPTIVE_LIMIT the number of slots follows the backend's
+   latency and overload answers (`limiter.AdaptiveLimit`), and a
+   `Retry-After` from the backend holds every slot back for that long, at
+   most API_RETRY_AFTER_MAX_SECONDS; calls whose budget ends before the
+   pause does fail with `QueueTimeout` right away
+
+Cache hits do not take a slot: the slot is taken right before the request
+is sent, in `ApiCall`, and held until the call ends (for streamed calls,
+until the body has been read).
+
+Example usage:
+    with on_queue_wait(lambda position: print(f"number {position} in the queue")):
+        answer = hr_qa_client(question)
+"""
+
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterator, Optional
+
+import requests
+
+from app.core.logger import get_logger
+from app.core.metrics import gauge, histogram
+from app.core.tracing import span
+from app.utils.api_clients.limiter import AdaptiveLimit
+
+logger = get_logger(__name__)
+
+# Backend time of each endpoint relative to an HR answer
+ENDPOINT_COSTS: Dict[str, float] = {
+    "/api/hr-qa/answer": 1.0,
+    "/api/ats-checker/check": 3.0,
+    "/api/job-analysis/analyze": 3.0,
+    "/api/resume-builder/check": 6.0,
+}
+INTERACTIVE = "interactive"
+HEAVY = "heavy"
+# Workload class of each endpoint; endpoints not listed are heavy
+ENDPOINT_WORKLOADS: Dict[str, str] = {
+    "/api/hr-qa/answer": INTERACTIVE,
+    "/api/ats-checker/check": HEAVY,
+    "/api/job-analysis/analyze": HEAVY,
+    "/api/resume-builder/check": HEAVY,
+}
+QUANTUM = 1.0
+# How often a waiting caller re-reads its queue position
+POSITION_INTERVAL = 0.5
+
+API_QUEUE_SECONDS = histogram("jobfit_api_queue_seconds", "Time backend calls waited for a scheduler slot", ["endpoint"])
+API_QUEUE_DEPTH = gauge("jobfit_api_queue_depth", "Backend calls waiting for a scheduler slot", ["workload"])
+API_QUEUE_SESSIONS = gauge("jobfit_api_queue_sessions", "Sessions with backend calls waiting for a slot", ["workload"])
+
+_wait_listener: ContextVar[Optional[Callable[[int], None]]] = ContextVar("queue_wait_listener", default=None)
+
+
+class QueueTimeout(requests.exceptions.RequestException):
+    """A backend call waited too long for a scheduler slot."""
+
+
+@dataclass(frozen=True)
+class Workload:
+    """A class of backend calls with its own slots, connection pool and timeout budget."""
+    name: str
+    max_in_flight: int  # 0: no scheduler for the class
+    timeout: float  # seconds from making a call to its answer, waiting for a slot included
+
+
+def get_workload(endpoint: str) -> Workload:
+    """Workload class of `endpoint`, with its current settings."""
+    from app.core.config import settings
+
+    if ENDPOINT_WORKLOADS.get(endpoint, HEAVY) == INTERACTIVE:
+        return Workload(INTERACTIVE, settings.API_INTERACTIVE_MAX_IN_FLIGHT, settings.API_INTERACTIVE_TIMEOUT_SECONDS)
+    return Workload(HEAVY, settings.API_HEAVY_MAX_IN_FLIGHT, settings.API_HEAVY_TIMEOUT_SECONDS)
+
+
+class Ticket:
+    """One call's place in the scheduler, and later its slot."""
+
+    __slots__ = ("session", "endpoint", "cost", "granted", "enqueued_at", "granted_at", "queue_seconds")
+
+    def __init__(self, session: str, endpoint: str, cost: float):
+        self.session = session
+        self.endpoint = endpoint
+        self.cost = cost
+        self.granted = False
+        self.enqueued_at = time.perf_counter()
+        self.granted_at = 0.0
+        self.queue_seconds = 0.0
+
+
+class FairScheduler:
+    """Caps in-flight calls and hands out slots by deficit round-robin over sessions."""
+
+    def __init__(self, capacity: int, quantum: float = QUANTUM, limiter: Optional[AdaptiveLimit] = None,
+                 name: str = HEAVY):
+        self.name = name
+        self.limiter = limiter
+        self.capacity = limiter.current if limiter is not None else capacity
+        self.quantum = quantum
+        self.in_flight = 0
+        # No slot is handed out before this time (perf_counter), set from Retry-After
+        self._paused_until = 0.0
+        # Sessions with waiting calls, in round-robin order
+        self._queues: "OrderedDict[str, Deque[Ticket]]" = OrderedDict()
+        self._deficits: Dict[str, float] = {}
+        self._cond = threading.Condition()
+        API_QUEUE_DEPTH.set_function(self.waiting, workload=name)
+        API_QUEUE_SESSIONS.set_function(lambda: len(self._queues), workload=name)
+
+    def waiting(self) -> int:
+        with self._cond:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def acquire(self, session: str, endpoint: str, timeout: Optional[float] = None) -> Ticket:
+        """
+        Wait for a slot; the caller must `release` the returned ticket.
+
+        Raises:
+            QueueTimeout: No slot was free within `timeout` seconds
+        """
+        ticket = Ticket(session, endpoint, ENDPOINT_COSTS.get(endpoint, 1.0))
+        with self._cond:
+            if not self._queues and self.in_flight < self.capacity and not self.paused():
+                self.in_flight += 1
+                ticket.granted = True
+                ticket.granted_at = ticket.enqueued_at
+                API_QUEUE_SECONDS.observe(0.0, endpoint=endpoint)
+                return ticket
+            self._queues.setdefault(session, deque()).append(ticket)
+            self._dispatch()
+
+        listener = _wait_listener.get()
+        deadline = None if timeout is None else ticket.enqueued_at + timeout
+        reported = None
+        with span("scheduler.wait", endpoint=endpoint) as wait_span:
+            while True:
+                with self._cond:
+                    if not ticket.granted and deadline is not None and self._paused_until >= deadline:
+                        # The pause outlasts the budget: fail now rather than wait it out
+                        self._remove(ticket)
+                        raise QueueTimeout(f"Backend calls for {endpoint} are held back past the {timeout:.0f}s budget")
+                    if not ticket.granted:
+                        now = time.perf_counter()
+                        remaining = POSITION_INTERVAL if deadline is None else min(POSITION_INTERVAL, deadline - now)
+                        if self._paused_until > now:
+                            remaining = min(remaining, self._paused_until - now)
+                        if remaining > 0:
+                            self._cond.wait(remaining)
+                        # Nobody else dispatches when a pause ends
+                        self._dispatch()
+                    if ticket.granted:
+                        break
+                    if deadline is not None and time.perf_counter() >= deadline:
+                        self._remove(ticket)
+                        raise QueueTimeout(f"No backend slot for {endpoint} within {timeout:.0f}s")
+                    position = self._position(ticket)
+                if listener is not None and position != reported:
+                    reported = position
+                    try:
+                        listener(position)
+                    except Exception as e:
+                        if type(e).__module__.startswith("streamlit"):
+                            raise
+                        logger.warning("Queue wait listener failed: %s", e, rate_limit=60)
+            if wait_span is not None:
+                wait_span.set_attribute("queue_ms", ticket.queue_seconds * 1000)
+        if listener is not None and reported is not None:
+            listener(0)
+        return ticket
+
+    def release(self, ticket: Ticket, latency: Optional[float] = None, overloaded: bool = False,
+                retry_after: Optional[float] = None) -> None:
+        """
+        Give the slot back.
+
+        Args:
+            ticket: Ticket returned by `acquire`
+            latency: Time to first byte of the call in seconds, for the adaptive limit
+            overloaded: The backend answered 429 / 503 or could not be reached
+            retry_after: Seconds the backend asked to wait before the next call
+        """
+        with self._cond:
+            if not ticket.granted:
+                return
+            ticket.granted = False
+            if self.limiter is not None:
+                if overloaded:
+                    self.capacity = self.limiter.overloaded(ticket.granted_at)
+                elif latency is not None:
+                    self.capacity = self.limiter.observe(ticket.endpoint, latency, ticket.granted_at, self.in_flight)
+            self.in_flight -= 1
+            if retry_after:
+                from app.core.config import settings
+
+                # No longer than a call itself would wait to retry: one huge Retry-After must not
+                # time out every queued call of the class
+                pause = min(retry_after, settings.API_RETRY_AFTER_MAX_SECONDS)
+                self._paused_until = max(self._paused_until, time.perf_counter() + pause)
+                logger.info("Backend asked to retry after %.1fs, holding back new calls for %.1fs",
+                            retry_after, pause)
+            self._dispatch()
+
+    def paused(self) -> bool:
+        return time.perf_counter() < self._paused_until
+
+    @contextmanager
+    def slot(self, session: str, endpoint: str, timeout: Optional[float] = None) -> Iterator[Ticket]:
+        ticket = self.acquire(session, endpoint, timeout)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+    def _grant(self, ticket: Ticket) -> None:
+        ticket.granted = True
+        ticket.granted_at = time.perf_counter()
+        ticket.queue_seconds = ticket.granted_at - ticket.enqueued_at
+        self.in_flight += 1
+        API_QUEUE_SECONDS.observe(ticket.queue_seconds, endpoint=ticket.endpoint)
+
+    def _next(self, queues: "OrderedDict[str, Deque[Ticket]]", deficits: Dict[str, float]) -> Optional[Ticket]:
+        """Take the next ticket by deficit round-robin from `queues`, updating `deficits`."""
+        while queues:
+            session, queue = next(iter(queues.items()))
+            head = queue[0]
+            if deficits.get(session, 0.0) < head.cost:
+                # Not enough credit yet: earn a quantum and let the next session go
+                deficits[session] = deficits.get(session, 0.0) + self.quantum
+                queues.move_to_end(session)
+                continue
+            deficits[session] -= head.cost
+            queue.popleft()
+            if not queue:
+                # An idle session does not keep credit
+                del queues[session]
+                deficits.pop(session, None)
+            return head
+        return None
+
+    def _dispatch(self) -> None:
+        if self.paused():
+            return
+        granted = False
+        while self.in_flight < self.capacity:
+            ticket = self._next(self._queues, self._deficits)
+            if ticket is None:
+                break
+            self._grant(ticket)
+            granted = True
+        if granted:
+            self._cond.notify_all()
+
+    def _position(self, ticket: Ticket) -> int:
+        """1-based place of `ticket` in the order the queued calls would be dispatched."""
+        queues = OrderedDict((session, deque(queue)) for session, queue in self._queues.items())
+        deficits = dict(self._deficits)
+        position = 0
+        while True:
+            position += 1
+            next_ticket = self._next(queues, deficits)
+            if next_ticket is None or next_ticket is ticket:
+                return position
+
+    def _remove(self, ticket: Ticket) -> None:
+        queue = self._queues.get(ticket.session)
+        if queue is None or ticket not in queue:
+            return
+        queue.remove(ticket)
+        if not queue:
+            del self._queues[ticket.session]
+            self._deficits.pop(ticket.session, None)
+
+
+# One scheduler per workload class
+_schedulers: Dict[str, FairScheduler] = {}
+_scheduler_lock = threading.Lock()
+
+
+def get_scheduler(workload: Workload) -> Optional[FairScheduler]:
+    """The process-wide scheduler of a workload class, or None when its limit is 0."""
+    from app.core.config import settings
+
+    if workload.max_in_flight <= 0:
+        return None
+    scheduler = _schedulers.get(workload.name)
+    if scheduler is None:
+        with _scheduler_lock:
+            scheduler = _schedulers.get(workload.name)
+            if scheduler is None:
+                limiter = None
+                if settings.API_ADAPTIVE_LIMIT:
+                    limiter = AdaptiveLimit(settings.API_MIN_IN_FLIGHT, workload.max_in_flight, name=workload.name)
+                scheduler = _schedulers[workload.name] = FairScheduler(
+                    workload.max_in_flight, limiter=limiter, name=workload.name
+                )
+    return scheduler
+
+
+def current_session() -> str:
+    """Streamlit session of the calling thread; calls made outside a session share "default"."""
+    from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+    ctx = get_script_run_ctx(suppress_warning=True)
+    return ctx.session_id if ctx is not None else "default"
+
+
+@contextmanager
+def on_queue_wait(listener: Callable[[int], None]) -> Iterator[None]:
+    """
+    Call `listener(position)` whenever a call made inside the block changes
+    place in the queue, and `listener(0)` once it gets its slot.
+    """
+    token = _wait_listener.set(listener)
+    try:
+        yield
+    finally:
+        _wait_listener.reset(token)
+
@@ -0,0 +1,203 @@
+"""
+Incremental JSON Parser Module
+
+This module provides a push parser that emits the members of a JSON object
+as soon as each member has fully arrived, without waiting for the rest of the
+document. It lets the UI render the first sections of a large report while
+the remainder of the response body is still downloading.
+
+Only the structure is tracked while scanning; each completed member value is
+decoded once with the JSON decoder selected by JSON_DECODER.
+"""
+
+import re
+from typing import Any, List, Optional, Sequence, Tuple
+
+from app.utils.json_parsing import loads
+
+_STRUCTURAL = re.compile(rb'[{}\[\]",:]')
+_STRING_SPECIAL = re.compile(rb'["\\]')
+_NON_WHITESPACE = re.compile(rb'\S')
+
+_ARRAY_ITEM = object()  # Path marker for containers nested in arrays
+
+
+class _Frame:
+    """A container currently open in the document."""
+
+    __slots__ = ("is_object", "path", "key", "expect_key")
+
+    def __init__(self, is_object: bool, path: Tuple[Any, ...]):
+        self.is_object = is_object
+        self.path = path
+        self.key: Optional[str] = None
+        self.expect_key = is_object
+
+
+class IncrementalJSONParser:
+    """
+    Push parser emitting `(key, value)` pairs of one JSON object as they complete.
+
+    Example usage:
+        parser = IncrementalJSONParser(path=("response",))
+        for chunk in response.iter_content(chunk_size=8192):
+            for key, value in parser.feed(chunk):
+                render(key, value)
+        parser.close()
+
+    Args:
+        path: Keys leading from the document root to the object whose members
+              should be emitted. The default emits the root object's members.
+    """
+
+    def __init__(self, path: Sequence[str] = ()):
+        self._path = tuple(path)
+        self._buf = bytearray()
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._key_start: Optional[int] = None
+        self._value_start: Optional[int] = None
+        self.done = False
+
+    def feed(self, chunk: bytes) -> List[Tuple[str, Any]]:
+        """
+        Feed the next chunk of the document.
+
+        Args:
+            chunk: Next bytes of the response body
+
+        Returns:
+            List of `(key, value)` members of the target object completed by this chunk
+
+        Raises:
+            ValueError: If the document is malformed
+        """
+        if self.done or not chunk:
+            return []
+
+        self._buf += chunk
+        buf = self._buf
+        end = len(buf)
+        pos = self._pos
+        events: List[Tuple[str, Any]] = []
+
+        while pos < end and not self.done:
+            if self._in_string:
+                match = _STRING_SPECIAL.search(buf, pos)
+                if match is None:
+                    pos = end
+                    break
+                idx = match.start()
+                if buf[idx] == 0x5C:  # backslash escape
+                    if idx + 1 >= end:
+                        pos = idx
+                        break
+                    pos = idx + 2
+                    continue
+                self._in_string = False
+                pos = idx + 1
+                self._on_string_end(pos)
+                continue
+
+            match = _STRUCTURAL.search(buf, pos)
+            idx = match.start() if match else end
+            if self._awaiting_value() and idx > pos:
+                scalar = _NON_WHITESPACE.search(buf, pos, idx)
+                if scalar:
+                    self._value_start = scalar.start()
+            if match is None:
+                pos = end
+                break
+
+            self._on_structural(buf[idx], idx, events)
+            pos = idx + 1
+
+        self._pos = pos
+        self._compact()
+        return events
+
+    def close(self) -> None:
+        """
+        Signal the end of the document.
+
+        Raises:
+            ValueError: If the document ended before the root value was complete
+        """
+        if not self.done:
+            raise ValueError("Incomplete JSON document")
+
+    def _is_target(self) -> bool:
+        top = self._stack[-1] if self._stack else None
+        return top is not None and top.is_object and top.path == self._path
+
+    def _awaiting_value(self) -> bool:
+        return (
+            self._value_start is None
+            and self._is_target()
+            and not self._stack[-1].expect_key
+        )
+
+    def _on_structural(self, char: int, idx: int, events: List[Tuple[str, Any]]) -> None:
+        if char == 0x22:  # "
+            if self._awaiting_value():
+                self._value_start = idx
+            top = self._stack[-1] if self._stack else None
+            if top is not None and top.is_object and top.expect_key:
+                self._key_start = idx
+            self._in_string = True
+        elif char in (0x7B, 0x5B):  # { [
+            if self._awaiting_value():
+                self._value_start = idx
+            if self._stack:
+                parent = self._stack[-1]
+                child_key = parent.key if parent.is_object else _ARRAY_ITEM
+                path = parent.path + (child_key,)
+            else:
+                path = ()
+            self._stack.append(_Frame(char == 0x7B, path))
+        elif char == 0x3A:  # :
+            if not self._stack or not self._stack[-1].is_object:
+                raise ValueError(f"Unexpected ':' at offset {idx}")
+            self._stack[-1].expect_key = False
+        elif char == 0x2C:  # ,
+            if not self._stack:
+                raise ValueError(f"Unexpected ',' at offset {idx}")
+            self._emit_member(idx, events)
+            top = self._stack[-1]
+            if top.is_object:
+                top.expect_key = True
+        else:  # } ]
+            if not self._stack:
+                raise ValueError(f"Unexpected closing bracket at offset {idx}")
+            self._emit_member(idx, events)
+            self._stack.pop()
+            if not self._stack:
+                self.done = True
+
+    def _on_string_end(self, end: int) -> None:
+        if self._key_start is not None:
+            self._stack[-1].key = loads(bytes(self._buf[self._key_start:end]))
+            self._key_start = None
+
+    def _emit_member(self, end: int, events: List[Tuple[str, Any]]) -> None:
+        if self._value_start is None or not self._is_target():
+            return
+        raw = bytes(self._buf[self._value_start:end])
+        self._value_start = None
+        events.append((self._stack[-1].key, loads(raw)))
+
+    def _compact(self) -> None:
+        """Drop consumed bytes that no pending key or value still refers to."""
+        keep = self._pos
+        for start in (self._key_start, self._value_start):
+            if start is not None:
+                keep = min(keep, start)
+        if keep == 0:
+            return
+        del self._buf[:keep]
+        self._pos -= keep
+        if self._key_start is not None:
+            self._key_start -= keep
+        if self._value_start is not None:
+            self._value_start -= keep
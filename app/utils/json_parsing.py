@@ -0,0 +1,118 @@
+"""
+JSON Parsing Module
+
+This module provides a single validated parsing path for backend payloads.
+Raw response bytes are validated straight into Pydantic models with
+`model_validate_json` / `TypeAdapter.validate_json`, so the JSON is decoded
+and validated in one pass without building an intermediate dict first.
+
+JSON that is decoded without a schema (streamed report sections, error
+details) goes through `loads`, which uses the decoder selected by
+JSON_DECODER: orjson when it is installed ("auto"), or the standard
+library. orjson is stricter than the standard library (it rejects NaN and
+Infinity), so a document it rejects is decoded once more by the standard
+library, which has the last word. orjson decodes integers over 64 bits as
+floats; no report field holds such numbers.
+"""
+
+import json
+from functools import lru_cache
+from typing import Any, Callable, Tuple, Type, TypeVar, Union
+
+from pydantic import BaseModel, TypeAdapter
+
+from app.core.logger import get_logger
+
+T = TypeVar("T")
+
+RawJSON = Union[bytes, bytearray, str]
+
+JSON_DECODERS = ("auto", "orjson", "stdlib")
+
+logger = get_logger(__name__)
+
+
+@lru_cache(maxsize=None)
+def get_decoder(name: str) -> Tuple[str, Callable[[RawJSON], Any]]:
+    """
+    Resolve a JSON_DECODER setting to the decoder to use.
+
+    Args:
+        name: "auto" (orjson if installed), "orjson" or "stdlib"
+
+    Returns:
+        Tuple of the name of the decoder used and its `loads` function
+
+    Raises:
+        ValueError: If the decoder name is unknown
+    """
+    if name not in JSON_DECODERS:
+        raise ValueError(f"JSON_DECODER must be one of {JSON_DECODERS}, got {name!r}")
+    if name != "stdlib":
+        try:
+            import orjson
+            return "orjson", orjson.loads
+        except ImportError:
+            if name == "orjson":
+                logger.warning("JSON_DECODER is orjson, but orjson is not installed; using the standard library")
+    return "stdlib", json.loads
+
+
+def loads(raw: RawJSON) -> Any:
+    """
+    Decode JSON without a schema, with the decoder selected by JSON_DECODER.
+
+    Args:
+        raw: Raw JSON as bytes or str
+
+    Returns:
+        The decoded value
+
+    Raises:
+        ValueError: If the payload is not valid JSON (json.JSONDecodeError)
+    """
+    from app.core.config import settings
+
+    _, decode = get_decoder(settings.JSON_DECODER.lower())
+    try:
+        return decode(raw)
+    except ValueError:
+        if decode is json.loads:
+            raise
+        return json.loads(raw)
+
+
+@lru_cache(maxsize=None)
+def get_type_adapter(tp: Any) -> TypeAdapter:
+    """
+    Get a cached TypeAdapter for the given type.
+
+    Building a TypeAdapter compiles a validator, so it is done once per type.
+
+    Args:
+        tp: Type (model, list of models, etc.) to build the adapter for
+
+    Returns:
+        TypeAdapter: Cached adapter for the type
+    """
+    return TypeAdapter(tp)
+
+
+def parse_json(raw: RawJSON, tp: Type[T]) -> T:
+    """
+    Decode and validate raw JSON into the given type in a single pass.
+
+    Args:
+        raw: Raw JSON as bytes or str (e.g. `response.content`)
+        tp: Target type, either a Pydantic model or any type a TypeAdapter accepts
+
+    Returns:
+        The validated instance
+
+    Raises:
+        pydantic.ValidationError: If the payload is not valid JSON or fails validation
+    """
+    if isinstance(tp, type) and issubclass(tp, BaseModel):
+        return tp.model_validate_json(raw)
+    return get_type_adapter(tp).validate_json(raw)
+
@@ -0,0 +1,233 @@
+"""
+Near-Duplicate Index Module
+
+This module finds texts that are nearly the same as one seen before, so a
+request that differs from a cached one only in whitespace, boilerplate or
+a few words can reuse its result:
+1. `shingles(text)`: the word 3-grams of the lowercased text, so case,
+   punctuation and whitespace do not matter; `shingle_hashes` hashes them
+2. `MinHasher`: a MinHash signature of NUM_PERM values per text; the share
+   of equal values in two signatures estimates the Jaccard similarity of
+   their shingle sets. The hash functions are fixed by a seed, so
+   signatures stay comparable across processes and restarts
+3. `NearDuplicateIndex`: locality-sensitive hashing over the signatures,
+   kept in a SQLite database (WAL mode) that replicas on the same volume
+   share, like the SQLite result cache. Each signature is split into BANDS
+   bands of ROWS values; texts sharing a band are candidates, and only
+   candidates are compared on their full signatures. With 16 bands of 8
+   rows, a text at similarity 0.9 is a candidate with probability 99.99%,
+   one at 0.5 with 6%
+4. Entries belong to a scope, e.g. the request without its text field, and
+   only texts of the same scope are compared
+5. The index keeps its NEAR_DUPLICATE_MAX_ENTRIES newest texts; older ones
+   are dropped in batches
+6. `get_index()`, the index at NEAR_DUPLICATE_INDEX_PATH, or None when
+   NEAR_DUPLICATE_ENABLED is off
+
+Example usage:
+    index = get_index()
+    match = index.query(scope, job_description)
+    if match is not None:
+        report = cache.get(match.key)
+    ...
+    index.add(scope, cache_key, job_description)
+"""
+
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from app.core.logger import get_logger
+
+logger = get_logger(__name__)
+
+NUM_PERM = 128
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_WORDS = 3
+# Share of NEAR_DUPLICATE_MAX_ENTRIES dropped at once when the index is full
+PRUNE_FRACTION = 0.1
+
+_WORD = re.compile(r"\w+")
+# Odd multiplier combining the word hashes of a shingle
+_COMBINE = np.uint64(0x9E3779B97F4A7C15)
+
+
+def shingles(text: str) -> Set[str]:
+    """The word SHINGLE_WORDS-grams of `text`; a shorter text is one shingle."""
+    words = _WORD.findall(text.lower())
+    if len(words) <= SHINGLE_WORDS:
+        return {" ".join(words)} if words else set()
+    return {" ".join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+
+def shingle_hashes(text: str) -> np.ndarray:
+    """
+    64-bit hashes of the shingles of `text`, one per distinct shingle.
+
+    Words are hashed once and combined per shingle, which is several times
+    faster than hashing the joined shingle strings.
+    """
+    words = _WORD.findall(text.lower())
+    hashes = np.fromiter((zlib.crc32(word.encode("utf-8")) for word in words), dtype=np.uint64, count=len(words))
+    width = min(SHINGLE_WORDS, len(words))
+    grams = np.zeros(len(words) - width + 1 if words else 0, dtype=np.uint64)
+    for offset in range(width):
+        grams = grams * _COMBINE + hashes[offset:len(hashes) - width + 1 + offset]
+    return np.unique(grams)
+
+
+class MinHasher:
+    """MinHash signatures from multiply-shift hash functions over the shingle hashes."""
+
+    def __init__(self, num_perm: int = NUM_PERM, seed: int = 1):
+        rng = np.random.default_rng(seed)
+        # Odd multipliers; the high 32 bits of a * x + b (mod 2**64) are the hash
+        self._a = rng.integers(1, 2 ** 63, num_perm, dtype=np.uint64) | np.uint64(1)
+        self._b = rng.integers(0, 2 ** 63, num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> Optional[np.ndarray]:
+        """The signature of `text`, or None if it has no words."""
+        values = shingle_hashes(text)
+        if not len(values):
+            return None
+        hashed = (values[:, None] * self._a + self._b) >> np.uint64(32)
+        return hashed.min(axis=0).astype(np.uint32)
+
+
+def similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the texts behind two signatures."""
+    return float(np.count_nonzero(first == second)) / len(first)
+
+
+@dataclass(frozen=True)
+class Match:
+    """An indexed text near a queried one."""
+    key: str
+    similarity: float
+
+
+class NearDuplicateIndex:
+    """LSH index of MinHash signatures in a SQLite database."""
+
+    def __init__(self, path: Path, threshold: float, max_entries: int, hasher: Optional[MinHasher] = None):
+        self.path = Path(path)
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.hasher = hasher or MinHasher()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        db = self._connection()
+        db.execute("CREATE TABLE IF NOT EXISTS texts (id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, signature BLOB NOT NULL)")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS bands (bucket INTEGER NOT NULL, text INTEGER NOT NULL, "
+            "PRIMARY KEY (bucket, text)) WITHOUT ROWID"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # sqlite3 connections may not be shared between threads
+        db = getattr(self._local, "db", None)
+        if db is None:
+            db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=NORMAL")
+            self._local.db = db
+        return db
+
+    @staticmethod
+    def _buckets(scope: str, signature: np.ndarray) -> List[int]:
+        buckets = []
+        for band in range(BANDS):
+            digest = hashlib.blake2b(scope.encode("utf-8"), digest_size=8, person=band.to_bytes(2, "big"))
+            digest.update(signature[band * ROWS:(band + 1) * ROWS].tobytes())
+            buckets.append(int.from_bytes(digest.digest(), "big", signed=True))
+        return buckets
+
+    def add(self, scope: str, key: str, text: str) -> bool:
+        """
+        Index `text` under `key` in `scope`.
+
+        Returns:
+            bool: False if `key` is already indexed or the text has no words
+        """
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return False
+        buckets = self._buckets(scope, signature)
+        db = self._connection()
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            cursor = db.execute("INSERT OR IGNORE INTO texts (key, signature) VALUES (?, ?)", (key, signature.tobytes()))
+            added = cursor.rowcount == 1
+            if added:
+                text_id = cursor.lastrowid
+                db.executemany("INSERT OR IGNORE INTO bands (bucket, text) VALUES (?, ?)",
+                               [(bucket, text_id) for bucket in buckets])
+                if text_id % max(1, int(self.max_entries * PRUNE_FRACTION)) == 0:
+                    self._prune(db, text_id)
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+        return added
+
+    def _prune(self, db: sqlite3.Connection, newest: int) -> None:
+        oldest = db.execute("SELECT MIN(id) FROM texts").fetchone()[0]
+        if oldest is None or newest - oldest < self.max_entries:
+            return
+        cutoff = newest - int(self.max_entries * (1 - PRUNE_FRACTION))
+        db.execute("DELETE FROM texts WHERE id <= ?", (cutoff,))
+        db.execute("DELETE FROM bands WHERE text <= ?", (cutoff,))
+        logger.info("Dropped near-duplicate index entries up to #%d", cutoff)
+
+    def query(self, scope: str, text: str) -> Optional[Match]:
+        """The most similar indexed text of `scope` at or above the threshold, or None."""
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        buckets = self._buckets(scope, signature)
+        db = self._connection()
+        placeholders = ",".join("?" * len(buckets))
+        rows = db.execute(
+            f"SELECT key, signature FROM texts WHERE id IN "
+            f"(SELECT DISTINCT text FROM bands WHERE bucket IN ({placeholders}))",
+            buckets
+        ).fetchall()
+        best: Optional[Match] = None
+        for key, blob in rows:
+            score = similarity(signature, np.frombuffer(blob, dtype=np.uint32))
+            if score >= self.threshold and (best is None or score > best.similarity):
+                best = Match(key, score)
+        return best
+
+    def __len__(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM texts").fetchone()[0]
+
+
+_indexes: Dict[Tuple[str, int], NearDuplicateIndex] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index() -> Optional[NearDuplicateIndex]:
+    """The index at NEAR_DUPLICATE_INDEX_PATH, or None when NEAR_DUPLICATE_ENABLED is off."""
+    from app.core.config import settings
+
+    if not settings.NEAR_DUPLICATE_ENABLED:
+        return None
+    # Keyed on the pid so a forked process opens its own connections
+    key = (settings.NEAR_DUPLICATE_INDEX_PATH, os.getpid())
+    if key not in _indexes:
+        with _indexes_lock:
+            if key not in _indexes:
+                _indexes[key] = NearDuplicateIndex(
+                    Path(key[0]), settings.NEAR_DUPLICATE_THRESHOLD, settings.NEAR_DUPLICATE_MAX_ENTRIES
+                )
+    return _indexes[key]
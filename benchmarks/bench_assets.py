@@ -0,0 +1,160 @@
+"""
+Static Asset Benchmark and Check
+
+Builds the static assets into a scratch directory and compares:
+1. Bytes a browser downloads for the logo: the source PNG against each
+   generated variant
+2. Render cost on the server: `st.image` of the source PNG against the
+   `<picture>` markup of the generated variants, per rerun
+3. Build cost: a cold build, and loading an up-to-date manifest
+
+Checks: variants have the display width times their density, every variant
+is smaller than the source, an up-to-date manifest is not rebuilt, a changed
+source is, each page stylesheet holds its own source and no other page's,
+a rebuild removes the files of the previous build but no other file of the
+static directory, and generated URLs start at the server's base URL path.
+
+Usage:
+    python -m benchmarks.bench_assets [--reruns 30] [--check]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from app.core import assets
+from benchmarks.bench_suite import percentile
+
+
+def _render_source_png() -> None:
+    import streamlit as st
+
+    from app.core.assets import SOURCE_DIR
+
+    st.image(str(SOURCE_DIR / "jobfit-logo.png"), width=200)
+
+
+def _render_variants() -> None:
+    from app.core import assets
+
+    assets.image("jobfit-logo", width=200)
+
+
+def render_ms(script: Callable[[], None], reruns: int) -> Tuple[float, float]:
+    """p50 wall and CPU ms of a rerun of `script`."""
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_function(script).run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    wall, cpu = [], []
+    for _ in range(reruns):
+        start, start_cpu = time.perf_counter(), time.process_time()
+        at.run()
+        wall.append((time.perf_counter() - start) * 1000)
+        cpu.append((time.process_time() - start_cpu) * 1000)
+    return percentile(wall, 0.5), percentile(cpu, 0.5)
+
+
+def check_build(workdir: Path) -> Tuple[List[str], float, float]:
+    from PIL import Image
+
+    failures = []
+    source_dir = workdir / "assets"
+    static_dir = workdir / "static"
+    shutil.copytree(assets.SOURCE_DIR, source_dir)
+
+    start = time.perf_counter()
+    manifest = assets.load_manifest(source_dir, static_dir)
+    cold_ms = (time.perf_counter() - start) * 1000
+
+    source_bytes = (source_dir / "jobfit-logo.png").stat().st_size
+    print(f"{'file':<44} {'bytes':>9} {'of source':>10}")
+    print(f"{'jobfit-logo.png (source)':<44} {source_bytes:>9} {1:>10.1%}")
+    for name, sizes in manifest["images"].items():
+        for width, variant in sizes.items():
+            for fmt in ("webp", "png"):
+                for file, density in zip(variant[fmt], assets.DENSITIES):
+                    size = (static_dir / file).stat().st_size
+                    print(f"{file:<44} {size:>9} {size / source_bytes:>10.1%}")
+                    with Image.open(static_dir / file) as image:
+                        if image.width != int(width) * density:
+                            failures.append(f"{file} is {image.width}px wide, expected {int(width) * density}px")
+                    if size >= source_bytes:
+                        failures.append(f"{file} is not smaller than its source")
+
+    sources = {path.stem: path.read_text(encoding="utf-8").strip() for path in (source_dir / "styles").glob("*.css")}
+    for page, source in sources.items():
+        stylesheet = (static_dir / manifest["stylesheets"][page]).read_text(encoding="utf-8")
+        if source not in stylesheet:
+            failures.append(f"the {page} stylesheet is missing {page}.css")
+        others = [other for other in sources if other != page and sources[other] in stylesheet]
+        if others:
+            failures.append(f"the {page} stylesheet also holds {', '.join(others)}")
+
+    manifest_mtime = (static_dir / "manifest.json").stat().st_mtime_ns
+    start = time.perf_counter()
+    assets.load_manifest(source_dir, static_dir)
+    warm_ms = (time.perf_counter() - start) * 1000
+    if (static_dir / "manifest.json").stat().st_mtime_ns != manifest_mtime:
+        failures.append("an up-to-date manifest was rebuilt")
+
+    # Not generated: a rebuild leaves it alone
+    (static_dir / "robots.txt").write_text("User-agent: *\n", encoding="utf-8")
+    changed = source_dir / "styles" / "home_dashboard.css"
+    changed.write_text(changed.read_text(encoding="utf-8") + "\n.bench-marker {color: red;}\n", encoding="utf-8")
+    rebuilt = assets.load_manifest(source_dir, static_dir)
+    if ".bench-marker" not in (static_dir / rebuilt["stylesheets"]["home_dashboard"]).read_text(encoding="utf-8"):
+        failures.append("a changed stylesheet was not rebuilt")
+    if (static_dir / manifest["stylesheets"]["home_dashboard"]).exists():
+        failures.append("the stylesheet of the previous build was not removed")
+    if not (static_dir / "robots.txt").exists():
+        failures.append("a rebuild removed a file it did not generate")
+    return failures, cold_ms, warm_ms
+
+
+def check_urls() -> List[str]:
+    from streamlit import config
+
+    failures = []
+    name = "home_dashboard.0123456789ab.css"
+    for base, expected in (("", "/app/static/"), ("jobfit", "/jobfit/app/static/"), ("/jobfit/", "/jobfit/app/static/")):
+        config.set_option("server.baseUrlPath", base)
+        if not assets._url(name).startswith(expected + name):
+            failures.append(f"{assets._url(name)} with base URL path {base!r}, expected it under {expected}")
+    config.set_option("server.baseUrlPath", "")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--reruns", type=int, default=30)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    with tempfile.TemporaryDirectory() as workdir:
+        failures, cold_ms, warm_ms = check_build(Path(workdir))
+    failures += check_urls()
+    print(f"\nbuild: cold {cold_ms:.1f} ms, up to date {warm_ms:.2f} ms")
+
+    print(f"\n{'render (per rerun)':<24} {'wall p50 ms':>12} {'CPU p50 ms':>11}")
+    for label, script in (("st.image(source png)", _render_source_png), ("picture variants", _render_variants)):
+        wall, cpu = render_ms(script, args.reruns)
+        print(f"{label:<24} {wall:>12.2f} {cpu:>11.2f}")
+
+    if failures:
+        print(f"\n{len(failures)} asset check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,193 @@
+"""
+Result Cache Benchmark and Check
+
+Exercises every result cache backend the way several replicas would:
+1. Basics: values round-trip, expire after their TTL, entries over the
+   entry limit are not stored and the total size stays under its limit
+2. Single flight: replica processes (threads for the in-process memory
+   backend) run get-or-compute on the same keys at once with a slow compute;
+   each key must be computed exactly once
+3. Hit latency: p50/p95 of a get of a cached 16 KB value
+4. End to end: replica processes call the HR Q&A client against the stub
+   backend with a shared cache; each distinct question must reach the
+   backend once, every other call is a cache hit
+
+The Redis backend runs against `benchmarks.redis_standin`.
+
+Usage:
+    python -m benchmarks.bench_cache [--backends memory,sqlite,redis] [--replicas 4] [--check]
+"""
+
+import argparse
+import multiprocessing
+import os
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+from app.core.cache import CACHE_BACKENDS, CacheBackend, MemoryCache, RedisCache, SQLiteCache
+from benchmarks.bench_suite import percentile
+from benchmarks.redis_standin import RedisStandin
+from benchmarks.stub_backend import StubBackend
+
+MB = 1024 * 1024
+
+
+def make_backend(name: str, workdir: str, redis_url: str, ttl: float = 60.0, max_bytes: int = 64 * MB) -> CacheBackend:
+    common = dict(ttl=ttl, max_entry_bytes=1 * MB, lock_timeout=30.0)
+    if name == "memory":
+        return MemoryCache(max_bytes=max_bytes, **common)
+    if name == "sqlite":
+        return SQLiteCache(max_bytes=max_bytes, path=Path(workdir) / "cache.sqlite3", **common)
+    return RedisCache(url=redis_url, prefix="bench:", **common)
+
+
+def check_basics(name: str, workdir: str, redis_url: str) -> List[str]:
+    failures = []
+    cache = make_backend(name, workdir, redis_url, ttl=0.3, max_bytes=MB)
+    cache.set("basic", b"value")
+    if cache.get("basic") != b"value":
+        failures.append("value did not round-trip")
+    time.sleep(0.4)
+    if cache.get("basic") is not None:
+        failures.append("value outlived its TTL")
+
+    cache.set("huge", b"x" * (2 * MB), ttl=60)
+    if cache.get("huge") is not None:
+        failures.append("entry over the entry limit was stored")
+
+    if name != "redis":
+        for i in range(20):
+            cache.set(f"fill{i}", bytes(100 * 1024), ttl=60)
+        size = sum(len(cache.get(f"fill{i}") or b"") for i in range(20))
+        if size > MB:
+            failures.append(f"total size {size} is over the {MB} byte limit")
+        if cache.get("fill19") is None:
+            failures.append("newest entry was evicted")
+    return failures
+
+
+def _replica(name: str, workdir: str, redis_url: str, keys: int, threads: int, compute_ms: float) -> int:
+    """Run get-or-compute on every key from `threads` threads; return how many computes ran here."""
+    cache = make_backend(name, workdir, redis_url)
+    computes = 0
+    lock = threading.Lock()
+
+    def compute(key: str) -> bytes:
+        nonlocal computes
+        with lock:
+            computes += 1
+        time.sleep(compute_ms / 1000)
+        return key.encode() * 100
+
+    def worker(offset: int) -> None:
+        for i in range(keys):
+            key = f"flight{(i + offset) % keys}"
+            value, _ = cache.get_or_compute(key, lambda: compute(key))
+            assert value == key.encode() * 100, f"wrong value for {key}"
+
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(worker, range(threads)))
+    return computes
+
+
+def check_single_flight(name: str, workdir: str, redis_url: str, args: argparse.Namespace) -> Tuple[int, float]:
+    start = time.perf_counter()
+    if name == "memory":
+        computes = _replica(name, workdir, redis_url, args.keys, args.replicas * args.threads, args.compute_ms)
+    else:
+        context = multiprocessing.get_context("spawn")
+        with context.Pool(args.replicas) as pool:
+            computes = sum(pool.starmap(
+                _replica, [(name, workdir, redis_url, args.keys, args.threads, args.compute_ms)] * args.replicas
+            ))
+    return computes, time.perf_counter() - start
+
+
+def hit_latency_us(name: str, workdir: str, redis_url: str, gets: int = 2000) -> Tuple[float, float]:
+    cache = make_backend(name, workdir, redis_url)
+    cache.set("hot", os.urandom(16 * 1024))
+    timings = []
+    for _ in range(gets):
+        start = time.perf_counter()
+        cache.get("hot")
+        timings.append((time.perf_counter() - start) * 1e6)
+    return percentile(timings, 0.5), percentile(timings, 0.95)
+
+
+def _client_replica(questions: List[str], threads: int) -> Dict[str, float]:
+    from app.utils.api_clients.hr_qa_client import HR_QA_ENDPOINT, hr_qa_client
+    from app.utils.api_clients.http_client import API_CACHE
+
+    with ThreadPoolExecutor(threads) as pool:
+        answers = list(pool.map(hr_qa_client, questions * threads))
+    return {
+        "hit": API_CACHE.value(endpoint=HR_QA_ENDPOINT, outcome="hit"),
+        "miss": API_CACHE.value(endpoint=HR_QA_ENDPOINT, outcome="miss"),
+        "failed": sum(answer is None for answer in answers),
+    }
+
+
+def check_end_to_end(name: str, workdir: str, redis_url: str, stub_url: str, args: argparse.Namespace) -> Dict[str, float]:
+    questions = [f"Question {i} for {name}: why do you want this job?" for i in range(args.questions)]
+    os.environ.update(
+        API_BASE_URL=stub_url, CACHE_BACKEND=name, CACHE_REDIS_URL=redis_url,
+        CACHE_SQLITE_PATH=str(Path(workdir) / "e2e.sqlite3"), LOG_LEVEL="WARNING"
+    )
+    context = multiprocessing.get_context("spawn")
+    replicas = 1 if name == "memory" else args.replicas
+    with context.Pool(replicas) as pool:
+        results = pool.starmap(_client_replica, [(questions, args.threads)] * replicas)
+    return {key: sum(result[key] for result in results) for key in ("hit", "miss", "failed")}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--backends", default="memory,sqlite,redis")
+    parser.add_argument("--replicas", type=int, default=4, help="processes sharing the cache")
+    parser.add_argument("--threads", type=int, default=4, help="threads per replica")
+    parser.add_argument("--keys", type=int, default=8)
+    parser.add_argument("--compute-ms", type=float, default=200.0)
+    parser.add_argument("--questions", type=int, default=3, help="distinct questions in the end-to-end check")
+    parser.add_argument("--scale", type=float, default=0.05, help="stub backend latency scale")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    backends = [name for name in args.backends.split(",") if name]
+    unknown = [name for name in backends if name not in CACHE_BACKENDS or name == "none"]
+    if unknown:
+        parser.error(f"unknown backends: {', '.join(unknown)}")
+
+    failures: List[str] = []
+    print(f"{'backend':<8} {'computes':>9} {'expected':>9} {'flight s':>9} {'hit p50 us':>11} "
+          f"{'hit p95 us':>11} {'e2e miss':>9} {'e2e hit':>8}")
+    with RedisStandin() as redis, StubBackend(scale=args.scale) as stub:
+        for name in backends:
+            with tempfile.TemporaryDirectory() as workdir:
+                failures += [f"{name}: {failure}" for failure in check_basics(name, workdir, redis.url)]
+                computes, elapsed = check_single_flight(name, workdir, redis.url, args)
+                if computes != args.keys:
+                    failures.append(f"{name}: {computes} computes for {args.keys} keys")
+                p50, p95 = hit_latency_us(name, workdir, redis.url)
+                e2e = check_end_to_end(name, workdir, redis.url, stub.url, args)
+                if e2e["miss"] != args.questions or e2e["failed"]:
+                    failures.append(f"{name}: end to end {e2e['miss']:.0f} misses for {args.questions} questions, "
+                                    f"{e2e['failed']:.0f} failed calls")
+            print(f"{name:<8} {computes:>9} {args.keys:>9} {elapsed:>9.2f} {p50:>11.1f} {p95:>11.1f} "
+                  f"{e2e['miss']:>9.0f} {e2e['hit']:>8.0f}")
+
+    if failures:
+        print(f"\n{len(failures)} cache check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,257 @@
+"""
+Cluster Benchmark and Check
+
+Starts `app.core.cluster` and talks to it the way browsers do, over plain
+HTTP and over the Streamlit websocket (`/_stcore/stream`), through the proxy:
+1. Spread: fresh browsers are spread over every worker
+2. Stickiness: requests and websocket sessions carrying the cookie stay on
+   their worker
+3. Static files: content-hashed files get an immutable Cache-Control, and
+   the home page links do not point at a fixed host
+4. Failover: after a worker is killed, its browsers are moved to another
+   worker, and the launcher restarts it
+
+Then it runs --sessions concurrent Streamlit sessions, each rerunning the
+home page back to back, and reports script runs per second with one worker
+and with --workers workers. Extra workers only help with as many free cores.
+
+Usage:
+    python -m benchmarks.bench_cluster [--workers 2] [--sessions 8] [--duration 10] [--check]
+"""
+
+import argparse
+import os
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.request
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from app.core.proxy import STATIC_CACHE_CONTROL, STICKY_COOKIE
+from benchmarks.bench_suite import ROOT, percentile
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+class ClusterProcess:
+    """The launcher in a subprocess."""
+
+    def __init__(self, workers: int):
+        self.workers = workers
+        self.port = free_port()
+        self.base_port = free_port()
+        self.process: Optional[subprocess.Popen] = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def __enter__(self) -> "ClusterProcess":
+        env = dict(os.environ, LOG_LEVEL="WARNING", CLUSTER_HEALTH_INTERVAL="0.5")
+        self.process = subprocess.Popen(
+            [sys.executable, "-m", "app.core.cluster", "--workers", str(self.workers), "--host", "127.0.0.1",
+             "--port", str(self.port), "--base-port", str(self.base_port)],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        deadline = time.monotonic() + 90
+        while time.monotonic() < deadline:
+            try:
+                get(self.url + "/_stcore/health")
+                return self
+            except OSError:
+                time.sleep(0.5)
+        self.__exit__()
+        raise RuntimeError("cluster did not come up")
+
+    def __exit__(self, *exc) -> None:
+        self.process.send_signal(signal.SIGTERM)
+        try:
+            self.process.wait(30)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def worker_pid(self, index: int) -> Optional[int]:
+        """Pid of a worker process, from the launcher's children (Linux)."""
+        pid = self.process.pid
+        with open(f"/proc/{pid}/task/{pid}/children") as f:
+            children = f.read().split()
+        for child in children:
+            with open(f"/proc/{child}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+            if str(self.base_port + index).encode() in args:
+                return int(child)
+        return None
+
+
+def get(url: str, cookie: Optional[str] = None) -> Tuple[int, Dict[str, str], bytes]:
+    request = urllib.request.Request(url)
+    if cookie:
+        request.add_header("Cookie", f"{STICKY_COOKIE}={cookie}")
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return response.status, dict(response.headers), response.read()
+
+
+def run_session(url: str, cookie: Optional[str], runs: int = 1, deadline: Optional[float] = None) -> Tuple[int, bytes]:
+    """Open a Streamlit session, rerun the page `runs` times (or until `deadline`); return runs and payload."""
+    from streamlit.proto.BackMsg_pb2 import BackMsg
+    from streamlit.proto.ForwardMsg_pb2 import ForwardMsg
+    from websockets.sync.client import connect
+
+    headers = {"Cookie": f"{STICKY_COOKIE}={cookie}"} if cookie else {}
+    finished = 0
+    payload = []
+    with connect(url.replace("http", "ws", 1) + "/_stcore/stream", subprotocols=["streamlit"],
+                 additional_headers=headers, max_size=None, open_timeout=30) as ws:
+        rerun = BackMsg()
+        rerun.rerun_script.query_string = ""
+        rerun.rerun_script.page_script_hash = ""
+        while finished < runs or (deadline is not None and time.monotonic() < deadline):
+            ws.send(rerun.SerializeToString())
+            while True:
+                data = ws.recv(timeout=60)
+                message = ForwardMsg()
+                message.ParseFromString(data)
+                if finished == 0:
+                    payload.append(data)
+                if message.WhichOneof("type") == "script_finished":
+                    break
+            finished += 1
+    return finished, b"".join(payload)
+
+
+def check_routing(cluster: ClusterProcess) -> List[str]:
+    failures = []
+
+    assigned = Counter()
+    for _ in range(4 * cluster.workers):
+        status, headers, _ = get(cluster.url + "/")
+        cookie = headers.get("Set-Cookie", "")
+        if status != 200 or not cookie.startswith(f"{STICKY_COOKIE}="):
+            failures.append(f"first request got status {status} and cookie {cookie!r}")
+            continue
+        assigned[cookie.split(";")[0].split("=", 1)[1]] += 1
+    print(f"browsers per worker: {dict(sorted(assigned.items()))}")
+    if len(assigned) != cluster.workers:
+        failures.append(f"browsers were sent to {len(assigned)} of {cluster.workers} workers")
+
+    for index in range(cluster.workers):
+        name = f"worker-{index}"
+        served = {get(cluster.url + "/_stcore/health", name)[1].get("X-Jobfit-Worker") for _ in range(5)}
+        if served != {name}:
+            failures.append(f"requests pinned to {name} were served by {sorted(served)}")
+
+    static_files = sorted(name for name in os.listdir(ROOT / "static") if name.endswith(".webp"))
+    if static_files:
+        _, headers, _ = get(f"{cluster.url}/app/static/{static_files[0]}")
+        if headers.get("Cache-Control") != STATIC_CACHE_CONTROL:
+            failures.append(f"hashed static file sent with Cache-Control {headers.get('Cache-Control')!r}")
+    else:
+        failures.append("no static files were built")
+
+    runs, payload = run_session(cluster.url, "worker-0")
+    if runs != 1:
+        failures.append("websocket session through the proxy did not finish a run")
+    if b"Ats_Dashboard" not in payload:
+        failures.append("home page did not render its service links")
+    if b"localhost:8501" in payload:
+        failures.append("home page still links to localhost:8501")
+    return failures
+
+
+def check_failover(cluster: ClusterProcess) -> List[str]:
+    failures = []
+    pid = cluster.worker_pid(0)
+    if pid is None:
+        return ["could not find the pid of worker-0"]
+    os.kill(pid, signal.SIGKILL)
+    start = time.monotonic()
+    moved_to = None
+    while time.monotonic() - start < 10:
+        try:
+            moved_to = get(cluster.url + "/_stcore/health", "worker-0")[1].get("X-Jobfit-Worker")
+        except OSError:
+            moved_to = None
+        if moved_to and moved_to != "worker-0":
+            break
+        time.sleep(0.2)
+    moved_s = time.monotonic() - start
+    if moved_to in (None, "worker-0"):
+        failures.append("browsers of a killed worker were not moved")
+
+    while time.monotonic() - start < 60:
+        new_pid = cluster.worker_pid(0)
+        if new_pid not in (None, pid):
+            try:
+                if get(cluster.url + "/_stcore/health", "worker-0")[1].get("X-Jobfit-Worker") == "worker-0":
+                    break
+            except OSError:
+                pass
+        time.sleep(0.5)
+    else:
+        failures.append("killed worker was not restarted")
+    print(f"failover: browsers moved after {moved_s:.1f}s, worker back after {time.monotonic() - start:.1f}s")
+    return failures
+
+
+def throughput(cluster: ClusterProcess, sessions: int, duration: float) -> Tuple[float, float]:
+    """Script runs per second and p50 seconds per run with `sessions` concurrent sessions."""
+    results: List[int] = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def session(index: int) -> None:
+        runs, _ = run_session(cluster.url, f"worker-{index % cluster.workers}", runs=1, deadline=deadline)
+        with lock:
+            results.append(runs)
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=session, args=(i,)) for i in range(sessions)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    return sum(results) / elapsed, percentile([elapsed / runs for runs in results if runs], 0.5)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+
+    from app.core import assets
+    assets.load_manifest()
+
+    failures: List[str] = []
+    with ClusterProcess(args.workers) as cluster:
+        failures += check_routing(cluster)
+        failures += check_failover(cluster)
+
+    print(f"\n{os.cpu_count()} CPUs, {args.sessions} sessions rerunning the home page for {args.duration:.0f}s")
+    print(f"{'workers':>7} {'runs/s':>8} {'s/run p50':>10}")
+    for workers in sorted({1, args.workers}):
+        with ClusterProcess(workers) as cluster:
+            runs_per_s, per_run = throughput(cluster, args.sessions, args.duration)
+        print(f"{workers:>7} {runs_per_s:>8.2f} {per_run:>10.3f}")
+
+    if failures:
+        print(f"\n{len(failures)} cluster check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
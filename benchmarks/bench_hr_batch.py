@@ -0,0 +1,210 @@
+"""
+Batch HR Q&A Benchmark and Check
+
+Drives the batch mode of the HR Question Answer page through Streamlit's
+`AppTest` against the stub backend: --questions behavioral questions are
+pasted at once, a few of them repeated with other case, spacing and list
+markers, and the study guide is built. The report shows the time to the
+first answer and to the whole study guide with one question at a time
+(HR_QA_BATCH_CONCURRENCY=1, what pasting them one by one costs at best)
+and with the configured concurrency, and the size of the study guide.
+
+Checks:
+- the batch is at least --min-speedup times faster than one at a time
+- repeated questions are sent to the backend once
+- no more than HR_QA_BATCH_CONCURRENCY questions are in flight at once
+- every question is rendered with its answer, in the pasted order, and
+  again after a rerun (a download click reruns the page)
+- the markdown study guide holds every question, and questions and
+  answers outside Latin-1 (accents, CJK, emoji) come out as written
+
+Usage:
+    python -m benchmarks.bench_hr_batch [--questions 20] [--iterations 3] [--check]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Dict, List, Tuple
+
+from benchmarks.bench_suite import _app_test, _check, percentile
+from benchmarks.stub_backend import StubBackend
+
+HR_QA_ENDPOINT = "/api/hr-qa/answer"
+TOPICS = [
+    "you disagreed with a team member", "you led without formal authority", "you had to learn something quickly",
+    "you missed a deadline", "you handled a difficult customer", "you made a mistake at work",
+    "you improved a process", "you worked under pressure", "you persuaded a stakeholder",
+    "you received critical feedback", "you mentored a colleague", "you dealt with ambiguity",
+    "you balanced competing priorities", "you took a calculated risk", "you resolved a production incident",
+    "you changed your mind after new data", "you delivered bad news", "you went beyond your role",
+    "you worked with a remote team", "you failed and what you learned",
+]
+# Pasted once more in the page check, with an answer to match
+NON_LATIN_QUESTION = "Décrivez une situation où vous avez dû convaincre l’équipe「チーム」🚀"
+NON_LATIN_ANSWER = "Résumé — utilisez la méthode STAR : 状況、課題、行動、結果 ✅"
+
+
+def make_questions(count: int) -> Tuple[str, int]:
+    """Pasted text of `count` distinct questions plus a few repeats, and the number of distinct ones."""
+    questions = [f"Tell me about a time {TOPICS[i % len(TOPICS)]} (scenario {i // len(TOPICS) + 1})?"
+                 for i in range(count)]
+    lines = [f"{number}. {question}" for number, question in enumerate(questions, start=1)]
+    # The way repeats get pasted: another list marker, other case and spacing, no question mark
+    for question in questions[:: max(1, count // 4)]:
+        lines.append("- " + question.rstrip("?").lower().replace(" ", "  "))
+    return "\n".join(lines), count
+
+
+class InFlight:
+    """Wraps hr_qa_client to count concurrent calls."""
+
+    def __init__(self):
+        import app.utils.api_clients.hr_qa_client as client
+
+        self._client = client
+        self._original = client.hr_qa_client
+        self._lock = threading.Lock()
+        self.current = self.peak = 0
+        self.first_answer: float = 0.0
+        self.started: float = 0.0
+
+    def __enter__(self) -> "InFlight":
+        def counted(query: str):
+            with self._lock:
+                self.current += 1
+                self.peak = max(self.peak, self.current)
+            try:
+                return self._original(query)
+            finally:
+                with self._lock:
+                    self.current -= 1
+                    if not self.first_answer:
+                        self.first_answer = time.perf_counter() - self.started
+
+        self._client.hr_qa_client = counted
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._client.hr_qa_client = self._original
+
+    def reset(self) -> None:
+        self.current = self.peak = 0
+        self.first_answer = 0.0
+        self.started = time.perf_counter()
+
+
+def _batch_page(text: str):
+    at = _app_test("pages/HR_Question_Answer.py").run()
+    at.radio(key="hr_qa_mode").set_value(at.radio(key="hr_qa_mode").options[1]).run()
+    at.text_area(key="batch_questions").input(text)
+    return at
+
+
+def run(args: argparse.Namespace, stub: StubBackend, counter: InFlight, concurrency: int) -> Dict[str, List[float]]:
+    from app.core.config import settings
+
+    settings.HR_QA_BATCH_CONCURRENCY = concurrency
+    text, _ = make_questions(args.questions)
+    times: Dict[str, List[float]] = {"first": [], "total": [], "peak": [], "sent": []}
+    for _ in range(args.iterations):
+        at = _batch_page(text)
+        sent = stub._requests[HR_QA_ENDPOINT]
+        counter.reset()
+        at.button[0].click().run()
+        times["total"].append((time.perf_counter() - counter.started) * 1000)
+        times["first"].append(counter.first_answer * 1000)
+        times["peak"].append(counter.peak)
+        times["sent"].append(stub._requests[HR_QA_ENDPOINT] - sent)
+        _check(at)
+    return times
+
+
+def check_page(args: argparse.Namespace) -> Tuple[List[str], Dict[str, int]]:
+    from app.components.hr_batch import BatchAnswer, parse_questions, study_guide_markdown
+    from app.components.hr_qa import STUDY_GUIDE_KEY
+    from app.core import session_store
+
+    failures = []
+    text, distinct = make_questions(args.questions)
+    text += "\n" + NON_LATIN_QUESTION
+    distinct += 1
+    questions, _ = parse_questions(text)
+    at = _batch_page(text)
+    at.button[0].click().run()
+    _check(at)
+    for label in ("first run", "rerun"):
+        headings = [m.value for m in at.markdown if m.value.startswith("#### ")]
+        if headings != [f"#### {n}. {q}" for n, q in enumerate(questions, start=1)]:
+            failures.append(f"{label}: {len(headings)} questions rendered in order, expected {distinct}")
+        answers = [m for m in at.markdown if "STAR method" in m.value]
+        if len(answers) != distinct:
+            failures.append(f"{label}: {len(answers)} answers rendered, expected {distinct}")
+        if label == "first run":
+            at.run()
+            _check(at)
+    sizes = {}
+    handle = at.session_state[STUDY_GUIDE_KEY] if STUDY_GUIDE_KEY in at.session_state else None
+    guide = session_store.get_store().load(handle) if handle is not None else None
+    if guide is None:
+        return failures + ["no study guide in the session"], sizes
+    sizes = {"markdown": len(guide["markdown"].encode("utf-8"))}
+    missing = [q for q in questions if q not in guide["markdown"]]
+    if missing:
+        failures.append(f"{len(missing)} questions missing from the markdown study guide, e.g. {missing[0]!r}")
+    # The stub only answers in ASCII
+    markdown = study_guide_markdown([BatchAnswer(1, NON_LATIN_QUESTION, NON_LATIN_ANSWER, 0.0)])
+    if NON_LATIN_QUESTION not in markdown or NON_LATIN_ANSWER not in markdown:
+        failures.append("a non-Latin answer does not come out of the study guide as written")
+    return failures, sizes
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--questions", type=int, default=20, help="distinct questions per batch")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=1.0, help="stub backend latency scale")
+    parser.add_argument("--min-speedup", type=float, default=2.0)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+
+    from app.core.config import settings
+
+    concurrency = settings.HR_QA_BATCH_CONCURRENCY
+    failures: List[str] = []
+    with StubBackend(scale=args.scale) as stub, InFlight() as counter:
+        settings.API_BASE_URL = stub.url
+        results = {1: run(args, stub, counter, 1), concurrency: run(args, stub, counter, concurrency)}
+        settings.HR_QA_BATCH_CONCURRENCY = concurrency
+        page_failures, sizes = check_page(args)
+        failures += page_failures
+
+    print(f"{args.questions} distinct questions with repeats, {args.iterations} runs each")
+    print(f"{'concurrency':<12} {'first answer ms':>16} {'study guide ms':>15} {'peak in flight':>15} {'sent':>5}")
+    for limit, times in results.items():
+        print(f"{limit:<12} {percentile(times['first'], 0.5):>16.0f} {percentile(times['total'], 0.5):>15.0f} "
+              f"{max(times['peak']):>15.0f} {max(times['sent']):>5.0f}")
+        if max(times["peak"]) > limit:
+            failures.append(f"{max(times['peak'])} questions in flight with HR_QA_BATCH_CONCURRENCY={limit}")
+        if set(times["sent"]) != {args.questions}:
+            failures.append(f"{sorted(set(times['sent']))} questions sent for {args.questions} distinct ones")
+    print(f"study guide: {sizes.get('markdown', 0)} bytes of markdown")
+
+    speedup = percentile(results[1]["total"], 0.5) / max(percentile(results[concurrency]["total"], 0.5), 1e-9)
+    if speedup < args.min_speedup:
+        failures.append(f"the batch is only {speedup:.1f}x faster than one question at a time")
+
+    if failures:
+        print(f"\n{len(failures)} batch HR Q&A check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
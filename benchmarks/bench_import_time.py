@@ -0,0 +1,128 @@
+"""
+Import-Time Report and Budget Check
+
+Measures how long each page takes to import on top of Streamlit, which is
+what a new server process pays before the page's first element renders.
+Each measurement is a fresh interpreter running
+`python -X importtime -c "import streamlit; import <page>"`, in an empty
+working directory; the median of several runs is reported, with the
+heaviest packages the page pulls in.
+
+With `--check` the script exits with status 1 when a page exceeds its
+budget, or when importing it created a log directory (the logger must not
+set itself up at import time).
+
+Usage:
+    python -m benchmarks.bench_import_time [--runs 5] [--top 8] [--check] [--budget-ms 75]
+"""
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+from collections import defaultdict
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Import time budget on top of streamlit, in milliseconds
+PAGE_BUDGETS_MS: Dict[str, float] = {
+    "Home_Dashboard": 75.0,
+    "pages.Ats_Dashboard": 75.0,
+    "pages.HR_Question_Answer": 75.0,
+    "pages.Job_Posting_Analyser": 75.0,
+    "pages.Resume_Tailor": 75.0,
+}
+
+# Reported for reference, not budgeted: these are loaded on first use
+REFERENCE_MODULES = (
+    "app.core.config",
+    "app.utils.api_clients.http_client",
+    "app.utils.api_clients.ats_client",
+)
+
+
+def import_profile(module: str) -> Tuple[float, Dict[str, float], bool]:
+    """
+    Import `module` after streamlit in a fresh interpreter.
+
+    Returns:
+        Cumulative import time of the module (ms), self time per top-level
+        package imported because of it (ms), and whether a log directory
+        was created
+    """
+    with tempfile.TemporaryDirectory() as cwd:
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import streamlit; import {module}"],
+            cwd=cwd, env=dict(os.environ, PYTHONPATH=str(ROOT)),
+            capture_output=True, text=True, check=True
+        )
+        created_logs = (Path(cwd) / "logs").exists()
+
+    packages: Dict[str, float] = defaultdict(float)
+    total = 0.0
+    after_streamlit = False
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line.split(":", 1)[1].split("|")
+        name = name.strip()
+        if not after_streamlit:
+            after_streamlit = name == "streamlit"
+            continue
+        # Third-party time is grouped by package, our own by module
+        package = name.split(".")[0]
+        packages[name if package in ("app", "pages") else package] += int(self_us) / 1000
+        if name == module:
+            total = int(cumulative_us) / 1000
+    return total, dict(packages), created_logs
+
+
+def measure(module: str, runs: int) -> Tuple[float, Dict[str, float], bool]:
+    """Median over `runs` measurements, after one run that writes bytecode caches."""
+    import_profile(module)
+    profiles = [import_profile(module) for _ in range(runs)]
+    totals = [total for total, _, _ in profiles]
+    median_run = sorted(profiles, key=lambda p: p[0])[len(profiles) // 2]
+    return statistics.median(totals), median_run[1], any(logs for _, _, logs in profiles)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=8, help="heaviest packages to list per page")
+    parser.add_argument("--budget-ms", type=float, help="override every page budget")
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a budget is exceeded")
+    args = parser.parse_args()
+
+    failures: List[str] = []
+    print(f"{'module':<40} {'import ms':>10} {'budget ms':>10}")
+    for module in (*PAGE_BUDGETS_MS, *REFERENCE_MODULES):
+        total, packages, created_logs = measure(module, args.runs)
+        budget = PAGE_BUDGETS_MS.get(module)
+        if budget is not None and args.budget_ms is not None:
+            budget = args.budget_ms
+        status = ""
+        if budget is not None and total > budget:
+            status = "  OVER BUDGET"
+            failures.append(f"{module}: {total:.1f} ms > {budget:.0f} ms")
+        if created_logs:
+            status += "  CREATED LOG DIRECTORY"
+            failures.append(f"{module}: importing created a log directory")
+        print(f"{module:<40} {total:>10.1f} {budget if budget is not None else '-':>10}{status}")
+        heaviest = sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]
+        print("    " + ", ".join(f"{name} {ms:.1f}" for name, ms in heaviest))
+
+    if failures:
+        print(f"\n{len(failures)} import budget failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+JSON Decoding and Response Compression Benchmark and Check
+
+Micro-benchmarks the client side of large report bodies at realistic
+sizes: structured ATS reports (many keywords and recommendations) and
+markdown tailoring / analysis reports, from a few KB to --max-kb.
+1. Decoding: the standard library, orjson (when installed) and `loads`
+   (the JSON_DECODER selection with its fallback) on the whole body, the
+   streamed ATS parse (`IncrementalJSONParser` plus section validation)
+   with each decoder, and the schema parse used for complete bodies
+   (`parse_json`, pydantic's own decoder)
+2. Compression: body size and decompression time for every encoding this
+   install can decode (gzip always; br and zstd with brotli / zstandard)
+3. End to end: the ATS client against the stub backend with and without
+   gzip, comparing bytes on the wire and the parsed report
+
+Checks: `loads` decodes exactly like the standard library, including the
+documents orjson rejects (NaN, Infinity); when
+orjson is installed, it decodes every report size at least
+--min-speedup times faster than the standard library; gzip shrinks
+every report body at least --min-ratio times; the client asks for gzip,
+counts the compressed bytes and parses the same report as without
+compression. (The stub pads bodies with repeated filler, which compresses
+far better than a real report; the compression table has realistic ratios.)
+
+Usage:
+    python -m benchmarks.bench_json_decoding [--repeat 200] [--max-kb 256] [--check]
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import random
+import sys
+import time
+import zlib
+from typing import Callable, Dict, List, Tuple
+
+from benchmarks.bench_suite import JOB_DESCRIPTION, RESUME_PDF
+from benchmarks.stub_backend import StubBackend
+
+WORDS = (
+    "experience python backend service api design data pipeline cloud aws docker kubernetes terraform "
+    "team lead deliver scalable reliable system performance monitoring testing deployment customer "
+    "product requirement stakeholder improve reduce increase latency throughput database sql postgres "
+    "redis queue event stream architecture review mentor project impact metric result role skill "
+    "responsibility candidate resume section highlight keyword missing match strong weak evidence"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize() + "."
+
+
+def ats_report(rng: random.Random, size: int) -> bytes:
+    """A structured ATS report body of about `size` bytes."""
+    report = {"match_score": 72.5, "matched_keywords": [], "missing_keywords": [], "summary": "", "recommendations": []}
+    body = b""
+    while len(body) < size:
+        report["matched_keywords"].append(rng.choice(WORDS))
+        report["missing_keywords"].append(rng.choice(WORDS))
+        report["summary"] += " " + _sentence(rng, 15)
+        report["recommendations"].append({
+            "title": _sentence(rng, 4),
+            "description": _sentence(rng, 25),
+            "action_items": [_sentence(rng, 10) for _ in range(3)],
+        })
+        body = json.dumps({"response": report}).encode("utf-8")
+    return body
+
+
+def markdown_report(rng: random.Random, size: int) -> bytes:
+    """A markdown report body (tailoring, job analysis) of about `size` bytes."""
+    lines: List[str] = []
+    while sum(len(line) + 1 for line in lines) < size:
+        lines.append(f"## {_sentence(rng, 3)}")
+        lines.extend(f"- {_sentence(rng, 12)}" for _ in range(5))
+        lines.append(_sentence(rng, 40))
+    return json.dumps({"result": "\n".join(lines)}).encode("utf-8")
+
+
+def timed(function: Callable[[], object], repeat: int) -> float:
+    """Median microseconds per call."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - start)
+    samples.sort()
+    return samples[len(samples) // 2] * 1e6
+
+
+def streamed_parse(body: bytes) -> None:
+    """What stream_ats_report does with a body: emit and validate each section."""
+    from app.schema.ats_report import AtsReport
+    from app.utils.incremental_json import IncrementalJSONParser
+    from app.utils.json_parsing import get_type_adapter
+
+    parser = IncrementalJSONParser(path=("response",))
+    for start in range(0, len(body), 8192):
+        for section, value in parser.feed(body[start:start + 8192]):
+            get_type_adapter(AtsReport.model_fields[section].annotation).validate_python(value)
+    parser.close()
+
+
+def compressors() -> Dict[str, Tuple[Callable[[bytes], bytes], Callable[[bytes], bytes]]]:
+    """(compress, decompress) for every encoding the client can decode here."""
+    from app.utils.api_clients.http_client import accept_encoding
+
+    available = {"gzip": (lambda b: gzip.compress(b, 6), gzip.decompress),
+                 "deflate": (lambda b: zlib.compress(b, 6), zlib.decompress)}
+    offered = accept_encoding("auto")
+    if "br" in offered:
+        import brotli
+        available["br"] = (lambda b: brotli.compress(b, quality=5), brotli.decompress)
+    if "zstd" in offered:
+        import zstandard
+        available["zstd"] = (zstandard.ZstdCompressor(level=3).compress, zstandard.ZstdDecompressor().decompress)
+    return available
+
+
+def check_fallback() -> List[str]:
+    from app.core.config import settings
+    from app.utils.json_parsing import loads
+
+    failures = []
+    documents = [b'{"a": [1, 2.5, "x"], "b": null}', b'{"score": NaN}', b'[Infinity, -Infinity]',
+                 '{"text": "café"}', b'{"nested": {"list": [[], {}, true, false]}}']
+    for decoder in ("auto", "stdlib"):
+        settings.JSON_DECODER = decoder
+        for document in documents:
+            expected, got = json.loads(document), loads(document)
+            if json.dumps(got) != json.dumps(expected):
+                failures.append(f"JSON_DECODER={decoder} decoded {document!r} as {got!r}")
+        try:
+            loads(b'{"broken": ')
+            failures.append(f"JSON_DECODER={decoder} accepted invalid JSON")
+        except ValueError:
+            pass
+    settings.JSON_DECODER = "auto"
+    return failures
+
+
+def check_end_to_end() -> Tuple[Dict[str, int], List[str]]:
+    from app.core.config import settings
+    from app.utils.api_clients import http_client
+    from app.utils.api_clients.ats_client import ATS_ENDPOINT, check_resume_against_job_description
+
+    failures = []
+    results = {}
+    calls: List[http_client.ApiCall] = []
+    original = http_client.ApiCall.post
+
+    def post(self, *args, **kwargs):
+        calls.append(self)
+        return original(self, *args, **kwargs)
+
+    http_client.ApiCall.post = post
+    try:
+        for compress in (False, True):
+            http_client._sessions.clear()
+            with StubBackend(scale=0.01, compress=compress) as stub:
+                stub.profile[ATS_ENDPOINT]["payload_bytes"] = 64 * 1024
+                settings.API_BASE_URL = stub.url
+                resume = io.BytesIO(RESUME_PDF)
+                resume.name = "resume.pdf"
+                report = check_resume_against_job_description(resume, JOB_DESCRIPTION)
+            call = calls[-1]
+            results["gzip" if compress else "identity"] = call.bytes_received
+            if compress:
+                if call.encoding != "gzip":
+                    failures.append(f"the stub answered with Content-Encoding {call.encoding!r}")
+                if call.bytes_received >= results["identity"] / 2:
+                    failures.append(f"{call.bytes_received} bytes received compressed, {results['identity']} without")
+                if report != plain:
+                    failures.append("the compressed report parsed differently")
+            else:
+                plain = report
+    finally:
+        http_client.ApiCall.post = original
+        http_client._sessions.clear()
+    return results, failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    parser.add_argument("--max-kb", type=int, default=256)
+    parser.add_argument("--min-speedup", type=float, default=1.2)
+    parser.add_argument("--min-ratio", type=float, default=2.0)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+
+    from app.core.config import settings
+    from app.schema.api_responses import ReportResponse, TailorResponse
+    from app.utils.api_clients.http_client import accept_encoding
+    from app.utils.json_parsing import get_decoder, loads, parse_json
+
+    rng = random.Random(0)
+    sizes = [kb for kb in (4, 16, 64, 256, 1024) if kb <= args.max_kb]
+    bodies = [(f"ats {kb}KB", ats_report(rng, kb * 1024), ReportResponse) for kb in sizes]
+    bodies += [(f"markdown {kb}KB", markdown_report(rng, kb * 1024), TailorResponse) for kb in sizes]
+    fast, _ = get_decoder("auto")
+    failures = check_fallback()
+
+    print(f"Decoding, median microseconds per body ({args.repeat} runs); fast decoder: {fast}")
+    print(f"{'body':<16} {'stdlib':>9} {fast:>9} {'loads':>9} {'speedup':>8} {'parse_json':>11} "
+          f"{'stream stdlib':>14} {'stream ' + fast:>14}")
+    for name, body, schema in bodies:
+        stdlib = timed(lambda: json.loads(body), args.repeat)
+        fastest = timed(lambda: get_decoder("auto")[1](body), args.repeat)
+        selected = timed(lambda: loads(body), args.repeat)
+        schema_parse = timed(lambda: parse_json(body, schema), args.repeat)
+        streamed = {}
+        if name.startswith("ats"):
+            for decoder in ("stdlib", "auto"):
+                settings.JSON_DECODER = decoder
+                streamed[decoder] = timed(lambda: streamed_parse(body), max(1, args.repeat // 4))
+            settings.JSON_DECODER = "auto"
+        print(f"{name:<16} {stdlib:>9.0f} {fastest:>9.0f} {selected:>9.0f} {stdlib / fastest:>7.1f}x "
+              f"{schema_parse:>11.0f} {streamed.get('stdlib', 0):>14.0f} {streamed.get('auto', 0):>14.0f}")
+        if fast == "orjson" and stdlib / fastest < args.min_speedup:
+            failures.append(f"{name}: orjson only {stdlib / fastest:.1f}x faster than the standard library")
+
+    codecs = compressors()
+    print(f"\nCompression, body bytes and median decompression microseconds "
+          f"(Accept-Encoding: {accept_encoding('auto')})")
+    print(f"{'body':<16} {'bytes':>9} " + " ".join(f"{codec + ' bytes':>12} {codec + ' us':>9}" for codec in codecs))
+    for name, body, _ in bodies:
+        row = f"{name:<16} {len(body):>9} "
+        for codec, (compress, decompress) in codecs.items():
+            packed = compress(body)
+            row += f"{len(packed):>12} {timed(lambda: decompress(packed), args.repeat):>9.0f} "
+            if codec == "gzip" and len(body) / len(packed) < args.min_ratio:
+                failures.append(f"{name}: gzip only shrinks the body {len(body) / len(packed):.1f}x")
+        print(row)
+
+    wire, e2e_failures = check_end_to_end()
+    failures += e2e_failures
+    print(f"\nATS client, 64 KB stub report: {wire.get('identity', 0)} bytes on the wire uncompressed, "
+          f"{wire.get('gzip', 0)} with gzip")
+
+    if failures:
+        print(f"\n{len(failures)} decoding check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,226 @@
+"""
+Adaptive Concurrency Limit Benchmark and Check
+
+Plays a backend that degrades and recovers: the stub backend runs with
+--healthy-capacity workers, then with --degraded-capacity workers that are
+also --slowdown times slower, then healthy again. It turns requests away
+with 503 and `Retry-After` once as many requests are waiting as it has
+workers (times --queue-per-worker). The same closed-loop HR Q&A load
+(--threads callers) runs with a fixed cap (API_ADAPTIVE_LIMIT off,
+API_INTERACTIVE_MAX_IN_FLIGHT=--fixed) and with the adaptive limit, and
+the report shows per phase: answers per second, client latency, 503
+answers from the stub, failed calls and the limit.
+
+Checks: the limit grows under flat latency only while it is used, is cut
+once per round trip when latency climbs or the backend is overloaded, and
+stays within its bounds; Retry-After is parsed and holds back the
+scheduler; end to end, the adaptive limit grows past the fixed cap while
+the backend is healthy, falls while it is degraded (with fewer 503s than
+the fixed cap once it has settled) and grows again after it recovers.
+
+Usage:
+    python -m benchmarks.bench_limiter [--phase-seconds 10] [--threads 20] [--check]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from email.utils import formatdate
+from typing import Dict, List
+
+from benchmarks.bench_suite import client_hr_qa, percentile
+from benchmarks.stub_backend import StubBackend
+
+
+def check_limit() -> List[str]:
+    from app.utils.api_clients.http_client import parse_retry_after
+    from app.utils.api_clients.limiter import AdaptiveLimit
+    from app.utils.api_clients.scheduler import FairScheduler
+
+    failures = []
+    hr = "/api/hr-qa/answer"
+
+    limit = AdaptiveLimit(min_limit=2, max_limit=16, initial=4)
+    for _ in range(50):
+        limit.observe(hr, 0.1, time.perf_counter(), in_flight=1)
+    if limit.current != 4:
+        failures.append(f"an unused limit grew to {limit.current}")
+    for _ in range(50):
+        limit.observe(hr, 0.1, time.perf_counter(), in_flight=limit.current)
+    if limit.current <= 4:
+        failures.append(f"limit did not grow under flat latency (still {limit.current})")
+    # An ATS call is slower than an HR answer, but flat for its endpoint
+    grown = limit.limit
+    for _ in range(5):
+        limit.observe("/api/ats-checker/check", 0.8, time.perf_counter(), in_flight=limit.current)
+    if limit.limit < grown:
+        failures.append("a slower endpoint cut the limit")
+
+    before = limit.limit
+    sent_at = time.perf_counter()
+    for _ in range(10):
+        limit.observe(hr, 0.5, sent_at, in_flight=limit.current)
+    if not before * 0.6 < limit.limit < before:
+        failures.append(f"calls sent in one round trip with rising latency moved the limit {before:.1f} -> {limit.limit:.1f}")
+    before = limit.limit
+    limit.overloaded(time.perf_counter())
+    if not limit.limit < before:
+        failures.append("an overload answer did not cut the limit")
+    for _ in range(20):
+        limit.overloaded(time.perf_counter())
+    if limit.current != 2:
+        failures.append(f"limit fell to {limit.current}, below its minimum of 2")
+
+    if parse_retry_after("3") != 3.0:
+        failures.append("Retry-After in seconds not parsed")
+    date = parse_retry_after(formatdate(time.time() + 60, usegmt=True))
+    if date is None or not 55 < date <= 60:
+        failures.append(f"Retry-After as an HTTP date parsed as {date}")
+    if parse_retry_after("soon") is not None:
+        failures.append("invalid Retry-After not ignored")
+
+    scheduler = FairScheduler(capacity=2)
+    ticket = scheduler.acquire("a", hr)
+    scheduler.release(ticket, retry_after=0.3)
+    start = time.perf_counter()
+    scheduler.release(scheduler.acquire("b", hr))
+    if time.perf_counter() - start < 0.25:
+        failures.append("a call was sent before the Retry-After pause ended")
+    return failures
+
+
+def run_phases(stub: StubBackend, args: argparse.Namespace, adaptive: bool) -> List[Dict[str, float]]:
+    """Run the load through the healthy, degraded and recovered phases; one result per phase."""
+    from app.core.config import settings
+    from app.utils.api_clients import http_client, scheduler as scheduler_module
+
+    settings.API_BASE_URL = stub.url
+    settings.API_ADAPTIVE_LIMIT = adaptive
+    settings.API_INTERACTIVE_MAX_IN_FLIGHT = args.max_limit if adaptive else args.fixed
+    scheduler_module._schedulers.clear()
+    http_client._sessions.clear()
+    scheduler = scheduler_module.get_scheduler(scheduler_module.get_workload("/api/hr-qa/answer"))
+    call = client_hr_qa()
+
+    phases = [
+        ("healthy", args.healthy_capacity, args.scale),
+        ("degraded", args.degraded_capacity, args.scale * args.slowdown),
+        ("recovered", args.healthy_capacity, args.scale),
+    ]
+    lock = threading.Lock()
+    samples: Dict[str, Dict[str, list]] = {name: {"latency": [], "failed": [], "limit": []} for name, _, _ in phases}
+    current = {"phase": phases[0][0]}
+    stop = threading.Event()
+
+    def caller() -> None:
+        while not stop.is_set():
+            phase = current["phase"]
+            start = time.perf_counter()
+            try:
+                call()
+                failed = False
+            except Exception:
+                failed = True
+            with lock:
+                samples[phase]["latency"].append((time.perf_counter() - start) * 1000)
+                samples[phase]["failed"].append(failed)
+
+    def monitor() -> None:
+        while not stop.is_set():
+            samples[current["phase"]]["limit"].append(scheduler.capacity)
+            time.sleep(0.05)
+
+    threads = [threading.Thread(target=caller) for _ in range(args.threads)]
+    threads.append(threading.Thread(target=monitor))
+    results = []
+    for thread in threads:
+        thread.start()
+    for name, capacity, scale in phases:
+        current["phase"] = name
+        stub.max_queue = max(1, int(capacity * args.queue_per_worker))
+        stub.set_capacity(capacity)
+        stub.scale = scale
+        rejected = stub.rejected
+        time.sleep(args.phase_seconds / 2)
+        # Calls already in flight when the backend changes are turned away whatever the limit
+        settled = stub.rejected
+        time.sleep(args.phase_seconds / 2)
+        results.append({"phase": name, "rejected": stub.rejected - rejected, "rejected_settled": stub.rejected - settled})
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    for result in results:
+        phase = samples[result["phase"]]
+        answered = [ms for ms, failed in zip(phase["latency"], phase["failed"]) if not failed]
+        result.update({
+            "answers_per_s": len(answered) / args.phase_seconds,
+            "p50": percentile(answered, 0.5),
+            "p95": percentile(answered, 0.95),
+            "failed": sum(phase["failed"]),
+            "limit_mean": sum(phase["limit"]) / max(len(phase["limit"]), 1),
+            "limit_min": min(phase["limit"], default=0),
+            "limit_end": phase["limit"][-1] if phase["limit"] else 0,
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--phase-seconds", type=float, default=10.0)
+    parser.add_argument("--threads", type=int, default=20, help="concurrent HR callers")
+    parser.add_argument("--healthy-capacity", type=int, default=12)
+    parser.add_argument("--degraded-capacity", type=int, default=3)
+    parser.add_argument("--slowdown", type=float, default=3.0, help="latency factor while degraded")
+    parser.add_argument("--queue-per-worker", type=float, default=1.0,
+                        help="waiting requests per stub worker before it answers 503")
+    parser.add_argument("--scale", type=float, default=0.5, help="stub backend latency scale")
+    parser.add_argument("--fixed", type=int, default=8, help="the fixed cap to compare with")
+    parser.add_argument("--max-limit", type=int, default=32)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+
+    failures = check_limit()
+
+    results = {}
+    for mode, adaptive in ((f"fixed {args.fixed}", False), ("adaptive", True)):
+        with StubBackend(scale=args.scale, capacity=args.healthy_capacity) as stub:
+            results[mode] = run_phases(stub, args, adaptive)
+
+    print(f"{args.threads} HR callers; backend {args.healthy_capacity} workers, then {args.degraded_capacity} "
+          f"workers {args.slowdown:.0f}x slower, then healthy again; {args.phase_seconds:.0f}s per phase")
+    print(f"{'mode':<10} {'phase':<10} {'answers/s':>10} {'p50 ms':>8} {'p95 ms':>8} {'503s':>6} {'2nd half':>9} "
+          f"{'failed':>7} {'limit mean':>11} {'limit min':>10} {'limit end':>10}")
+    for mode, phases in results.items():
+        for result in phases:
+            print(f"{mode:<10} {result['phase']:<10} {result['answers_per_s']:>10.1f} {result['p50']:>8.0f} "
+                  f"{result['p95']:>8.0f} {result['rejected']:>6} {result['rejected_settled']:>9} {result['failed']:>7} "
+                  f"{result['limit_mean']:>11.1f} "
+                  f"{result['limit_min']:>10} {result['limit_end']:>10}")
+
+    fixed = {result["phase"]: result for result in results[f"fixed {args.fixed}"]}
+    adaptive = {result["phase"]: result for result in results["adaptive"]}
+    if adaptive["healthy"]["limit_end"] <= args.fixed:
+        failures.append(f"limit only reached {adaptive['healthy']['limit_end']} on a healthy backend")
+    if adaptive["degraded"]["limit_min"] >= adaptive["healthy"]["limit_end"]:
+        failures.append("limit did not fall while the backend was degraded")
+    if adaptive["degraded"]["rejected_settled"] >= fixed["degraded"]["rejected_settled"]:
+        failures.append(f"{adaptive['degraded']['rejected_settled']} 503s in the second half of the degraded phase "
+                        f"with the adaptive limit, {fixed['degraded']['rejected_settled']} with the fixed cap")
+    if adaptive["recovered"]["limit_end"] <= adaptive["degraded"]["limit_min"]:
+        failures.append("limit did not grow again after the backend recovered")
+
+    if failures:
+        print(f"\n{len(failures)} limiter check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
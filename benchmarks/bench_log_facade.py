@@ -0,0 +1,83 @@
+"""
+Log Facade Benchmark
+
+Measures the CPU spent on logging per request for the log calls an ATS check
+and a resume render make, comparing eager f-strings on a plain logger with
+the deferred, truncating `LogFacade` returned by `get_logger`.
+
+Usage:
+    python -m benchmarks.bench_log_facade [--level INFO] [--requests 2000]
+"""
+
+import argparse
+import logging
+import tempfile
+import time
+
+from app.core.logger import CustomLogger, LogFacade
+from benchmarks.bench_resume_parsing import build_resume
+
+
+class UploadedFile:
+    name = "resume.pdf"
+
+
+def eager_request(logger: logging.Logger, resume_file, resume_input: dict, url: str) -> None:
+    """Log calls of one request as written before the facade."""
+    logger.info("Starting ATS compatibility check")
+    logger.debug(f"Processing resume file: {resume_file.name}")
+    logger.debug(f"Sending request to {url}/api/ats-checker/check")
+    logger.info("ATS check completed successfully")
+    logger.info(f"Resume function started{resume_input}")
+    logger.info("Resume data validated successfully")
+
+
+def lazy_request(logger: LogFacade, resume_file, resume_input: dict, url: str) -> None:
+    """The same log calls through the facade."""
+    logger.info("Starting ATS compatibility check")
+    logger.debug("Processing resume file: %s", resume_file.name)
+    logger.debug("Sending request to %s/api/ats-checker/check", url)
+    logger.info("ATS check completed successfully")
+    logger.info("Resume function started")
+    logger.debug("Resume input: %r", resume_input)
+    logger.info("Resume data validated successfully")
+
+
+def measure(fn, logger, requests: int, *args) -> float:
+    """Return CPU seconds per request."""
+    start = time.process_time()
+    for _ in range(requests):
+        fn(logger, *args)
+    return (time.process_time() - start) / requests
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--level", default="INFO")
+    parser.add_argument("--requests", type=int, default=2000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        custom_logger = CustomLogger(log_dir=log_dir, log_level=args.level, console_level="CRITICAL")
+        plain = custom_logger.get_logger("bench")
+        facade = LogFacade(plain)
+
+        resume_input = build_resume(20, 50)
+        resume_file = UploadedFile()
+        url = "http://localhost:8000"
+
+        # Warm up
+        measure(eager_request, plain, 10, resume_file, resume_input, url)
+        measure(lazy_request, facade, 10, resume_file, resume_input, url)
+
+        eager = measure(eager_request, plain, args.requests, resume_file, resume_input, url)
+        lazy = measure(lazy_request, facade, args.requests, resume_file, resume_input, url)
+
+    print(f"level {args.level}, {args.requests} requests, resume payload {len(repr(resume_input)) / 1024:.0f} KB")
+    print(f"eager f-strings: {eager * 1e6:9.1f} us CPU per request")
+    print(f"log facade:      {lazy * 1e6:9.1f} us CPU per request")
+    print(f"saved:           {(eager - lazy) * 1e6:9.1f} us CPU per request ({(1 - lazy / eager) * 100:.0f}%)")
+
+
+if __name__ == "__main__":
+    main()
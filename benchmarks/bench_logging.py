@@ -0,0 +1,173 @@
+"""
+Logging Overhead Benchmark
+
+Measures the cost of a logging call as seen by the calling thread, with the
+default synchronous handlers and with the queue mode of `CustomLogger`,
+while several threads log concurrently (as Streamlit sessions do).
+
+Each mode runs in a fresh subprocess so the singleton logger is configured
+from scratch, with its log files written to a temporary directory.
+
+Check: in queue mode, a record's arguments and its traceback are formatted
+on the listener thread, not on the thread that logged it.
+
+Usage:
+    python -m benchmarks.bench_logging [--threads 8] [--records 5000] [--check]
+"""
+
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+
+
+def run_mode(use_queue: bool, threads: int, records: int, queue_size: int) -> dict:
+    """Log `records` messages from each of `threads` threads and time every call."""
+    from app.core.logger import CustomLogger
+
+    with tempfile.TemporaryDirectory() as log_dir:
+        custom_logger = CustomLogger(
+            log_dir=log_dir,
+            log_level="DEBUG",
+            console_level="CRITICAL",
+            use_queue=use_queue,
+            queue_size=queue_size
+        )
+        logger = custom_logger.get_logger("bench")
+        latencies = [[] for _ in range(threads)]
+        barrier = threading.Barrier(threads)
+
+        def worker(idx: int) -> None:
+            samples = latencies[idx]
+            barrier.wait()
+            for i in range(records):
+                start = time.perf_counter()
+                logger.info("Request %d handled by worker %d", i, idx)
+                samples.append(time.perf_counter() - start)
+
+        workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        wall = time.perf_counter() - start
+
+        # Time until every queued record has been written
+        custom_logger.shutdown()
+        drained = time.perf_counter() - start
+        dropped = custom_logger.queue_handler.dropped if custom_logger.queue_handler else 0
+
+    samples = sorted(s for per_thread in latencies for s in per_thread)
+    return {
+        "mode": "queue" if use_queue else "sync",
+        "calls": len(samples),
+        "mean_us": statistics.fmean(samples) * 1e6,
+        "p50_us": samples[len(samples) // 2] * 1e6,
+        "p99_us": samples[int(len(samples) * 0.99)] * 1e6,
+        "caller_wall_s": wall,
+        "drained_s": drained,
+        "dropped": dropped,
+    }
+
+
+class ThreadProbe:
+    """Argument, and exception, whose rendering notes the thread it happens on."""
+
+    def __init__(self, seen: set):
+        self.seen = seen
+
+    def __str__(self) -> str:
+        self.seen.add(threading.current_thread().name)
+        return "probe"
+
+
+class ProbeError(Exception):
+    def __init__(self, probe: ThreadProbe):
+        super().__init__()
+        self.probe = probe
+
+    def __str__(self) -> str:
+        return str(self.probe)
+
+
+def check_formatting_thread() -> dict:
+    """Log a message and an exception in queue mode and report where they were formatted."""
+    from app.core.logger import CustomLogger
+
+    message_threads: set = set()
+    traceback_threads: set = set()
+    with tempfile.TemporaryDirectory() as log_dir:
+        custom_logger = CustomLogger(log_dir=log_dir, log_level="DEBUG", console_level="CRITICAL", use_queue=True)
+        logger = custom_logger.get_logger("bench")
+        logger.info("Formatted on %s", ThreadProbe(message_threads))
+        try:
+            raise ProbeError(ThreadProbe(traceback_threads))
+        except ProbeError:
+            logger.exception("Traceback formatted")
+        custom_logger.shutdown()
+    return {
+        "caller": threading.current_thread().name,
+        "message_threads": sorted(message_threads),
+        "traceback_threads": sorted(traceback_threads),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--records", type=int, default=5000)
+    parser.add_argument("--queue-size", type=int, default=10000)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    parser.add_argument("--mode", choices=["sync", "queue", "check"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.mode == "check":
+        print(json.dumps(check_formatting_thread()))
+        return
+    if args.mode:
+        result = run_mode(args.mode == "queue", args.threads, args.records, args.queue_size)
+        print(json.dumps(result))
+        return
+
+    print(f"{args.threads} threads x {args.records} records, queue size {args.queue_size}")
+    print(f"{'mode':>6} {'mean us':>9} {'p50 us':>8} {'p99 us':>8} {'caller s':>9} {'drained s':>10} {'dropped':>8}")
+    for mode in ("sync", "queue"):
+        output = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_logging", "--mode", mode,
+             "--threads", str(args.threads), "--records", str(args.records),
+             "--queue-size", str(args.queue_size)],
+            check=True, capture_output=True, text=True
+        ).stdout
+        r = json.loads(output.strip().splitlines()[-1])
+        print(f"{r['mode']:>6} {r['mean_us']:>9.1f} {r['p50_us']:>8.1f} {r['p99_us']:>8.1f} "
+              f"{r['caller_wall_s']:>9.3f} {r['drained_s']:>10.3f} {r['dropped']:>8}")
+
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_logging", "--mode", "check"],
+        check=True, capture_output=True, text=True
+    ).stdout
+    threads = json.loads(output.strip().splitlines()[-1])
+    print(f"\nqueue mode, caller {threads['caller']}: message formatted on {threads['message_threads']}, "
+          f"traceback on {threads['traceback_threads']}")
+    failures = []
+    for part in ("message", "traceback"):
+        if not threads[f"{part}_threads"]:
+            failures.append(f"the {part} was never formatted")
+        elif threads["caller"] in threads[f"{part}_threads"]:
+            failures.append(f"the {part} was formatted on the calling thread")
+
+    if failures:
+        print(f"\n{len(failures)} logging check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Metrics Overhead Benchmark
+
+Measures the per-operation cost of the metrics registry: counter
+increments, histogram observations, the `timed` context manager and a
+full Prometheus export, single-threaded and from several threads at once.
+
+Usage:
+    python -m benchmarks.bench_metrics [--ops 200000] [--threads 8]
+"""
+
+import argparse
+import random
+import threading
+import time
+
+from app.core.metrics import Registry, Counter, Histogram, timed
+
+
+def per_op(fn, ops: int, threads: int = 1) -> float:
+    """Return wall nanoseconds per operation with `threads` threads sharing `ops`."""
+    share = ops // threads
+    barrier = threading.Barrier(threads + 1)
+
+    def worker():
+        barrier.wait()
+        for _ in range(share):
+            fn()
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    for thread in workers:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in workers:
+        thread.join()
+    return (time.perf_counter() - start) / (share * threads) * 1e9
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ops", type=int, default=200000)
+    parser.add_argument("--threads", type=int, default=8)
+    args = parser.parse_args()
+
+    registry = Registry()
+    calls = registry.get_or_create(Counter, "bench_calls_total", "calls", ["endpoint", "status"])
+    latency = registry.get_or_create(Histogram, "bench_call_seconds", "latency", ["endpoint"])
+    timer = timed(latency, endpoint="/api/hr-qa/answer")
+    values = [random.lognormvariate(-2, 1) for _ in range(1024)]
+    counter_idx = iter(range(10**9))
+
+    def timed_block():
+        with timer:
+            pass
+
+    operations = {
+        "baseline (empty call)": lambda: None,
+        "counter.inc": lambda: calls.inc(endpoint="/api/hr-qa/answer", status="200"),
+        "histogram.observe": lambda: latency.observe(values[next(counter_idx) & 1023], endpoint="/api/hr-qa/answer"),
+        "timed block": timed_block,
+    }
+
+    print(f"{'operation':<24} {'1 thread ns/op':>15} {f'{args.threads} threads ns/op':>17}")
+    for name, fn in operations.items():
+        single = per_op(fn, args.ops)
+        multi = per_op(fn, args.ops, args.threads)
+        print(f"{name:<24} {single:>15.0f} {multi:>17.0f}")
+
+    for i in range(50):
+        latency.observe(values[i], endpoint=f"/api/endpoint-{i % 5}")
+    start = time.perf_counter()
+    exports = 200
+    for _ in range(exports):
+        text = registry.render_prometheus()
+    print(f"prometheus export: {(time.perf_counter() - start) / exports * 1e3:.3f} ms "
+          f"({len(text.splitlines())} lines)")
+    print(f"p50/p99 of {latency.count(endpoint='/api/hr-qa/answer')} observations: "
+          f"{latency.quantile(0.5, endpoint='/api/hr-qa/answer') * 1e3:.1f} / "
+          f"{latency.quantile(0.99, endpoint='/api/hr-qa/answer') * 1e3:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
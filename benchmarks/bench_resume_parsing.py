@@ -0,0 +1,85 @@
+"""
+Resume Parsing Benchmark
+
+Compares the old parsing path (`response.json()` followed by
+`ResumeData(**resume_input)`) with validating the raw response bytes directly
+through `app.utils.json_parsing.parse_json` on increasingly large resumes.
+The resume builder currently answers with markdown, not resume JSON, so no
+live flow parses a ResumeData yet; this measures the path one would use.
+
+Usage:
+    python -m benchmarks.bench_resume_parsing [--repeat 200]
+"""
+
+import argparse
+import json
+import timeit
+
+from app.schema.resume_data import ResumeData
+from app.utils.json_parsing import get_type_adapter, parse_json
+
+
+def build_resume(n_experience: int, n_achievements: int) -> dict:
+    """Build a synthetic resume with the given number of jobs and achievements per job."""
+    return {
+        "name": "Jane Doe",
+        "about_me": "Backend engineer focused on distributed systems. " * 20,
+        "contact_info": {
+            "address": "1 Main Street, Springfield",
+            "phone": "+1 555 123 4567",
+            "email": "jane.doe@example.com",
+            "github": "https://github.com/janedoe",
+            "linkedin": "https://linkedin.com/in/janedoe",
+        },
+        "education": [
+            {
+                "degree": f"Degree {i}",
+                "institution": f"University {i}",
+                "start_date": "2010",
+                "end_date": "2014",
+            }
+            for i in range(3)
+        ],
+        "experience": [
+            {
+                "job_title": f"Engineer {i}",
+                "company": f"Company {i}",
+                "start_date": "Jan 2015",
+                "end_date": "Present",
+                "achievements": [
+                    f"Improved throughput of service {j} by {j % 90 + 10}% through batching and caching"
+                    for j in range(n_achievements)
+                ],
+            }
+            for i in range(n_experience)
+        ],
+        "skills": [f"skill-{i}" for i in range(200)],
+        "soft_skills": [f"soft-skill-{i}" for i in range(50)],
+    }
+
+
+def current_path(raw: bytes) -> ResumeData:
+    """Old path: decode to dict, then validate the dict."""
+    return ResumeData(**json.loads(raw))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    # Warm the adapter cache so its build cost is not measured
+    get_type_adapter(ResumeData)
+
+    print(f"{'resume size':>12} {'dict path (ms)':>15} {'bytes path (ms)':>16} {'speedup':>8}")
+    for n_experience, n_achievements in [(5, 10), (20, 50), (50, 200)]:
+        raw = json.dumps(build_resume(n_experience, n_achievements)).encode()
+        assert current_path(raw) == parse_json(raw, ResumeData)
+
+        old = min(timeit.repeat(lambda: current_path(raw), number=args.repeat, repeat=3)) / args.repeat
+        new = min(timeit.repeat(lambda: parse_json(raw, ResumeData), number=args.repeat, repeat=3)) / args.repeat
+        print(f"{len(raw) / 1024:>9.1f} KB {old * 1000:>15.3f} {new * 1000:>16.3f} {old / new:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
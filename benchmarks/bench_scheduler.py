@@ -0,0 +1,220 @@
+"""
+Fair-Share Scheduler Benchmark and Check
+
+Runs one heavy session, sending tailoring requests from several threads at
+once, next to a few light sessions asking HR questions one after another,
+against the stub backend with a fixed number of backend workers. The same
+load runs with the scheduler off and on, and the report shows, per mode:
+HR answer latency, calls completed per session class, and each session's
+share of the backend (completed calls weighted by endpoint cost).
+
+Checks: slots go out in deficit round-robin order and the reported queue
+positions match it, a call that waits too long fails with QueueTimeout,
+in-flight calls never exceed the cap, and with the scheduler on the HR
+p95 stays within --max-hr-p95-ratio of HR answers on an idle backend.
+
+Usage:
+    python -m benchmarks.bench_scheduler [--duration 15] [--capacity 4] [--heavy-threads 8] [--check]
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+from unittest.mock import patch
+
+from benchmarks.bench_suite import client_hr_qa, client_resume_tailor, percentile
+from benchmarks.stub_backend import StubBackend
+
+_session = threading.local()
+
+
+def check_order() -> List[str]:
+    """Slots and queue positions follow deficit round-robin over sessions."""
+    from app.utils.api_clients.scheduler import FairScheduler, QueueTimeout
+
+    failures = []
+    hr = "/api/hr-qa/answer"
+    scheduler = FairScheduler(capacity=1)
+    held = scheduler.acquire("holder", hr)
+    granted: List[str] = []
+    lock = threading.Lock()
+
+    def call(session: str, label: str) -> None:
+        ticket = scheduler.acquire(session, hr)
+        with lock:
+            granted.append(label)
+        scheduler.release(ticket)
+
+    threads = []
+    for session, label in (("a", "a1"), ("a", "a2"), ("a", "a3"), ("b", "b1")):
+        thread = threading.Thread(target=call, args=(session, label))
+        thread.start()
+        threads.append(thread)
+        # Keep the arrival order fixed
+        while scheduler.waiting() < len(threads):
+            time.sleep(0.001)
+
+    with scheduler._cond:
+        tickets = [ticket for queue in scheduler._queues.values() for ticket in queue]
+        positions = {ticket: scheduler._position(ticket) for ticket in tickets}
+    expected_order = ["a1", "b1", "a2", "a3"]
+    order_by_position = [
+        label for _, label in sorted(zip([positions[t] for t in tickets], ["a1", "a2", "a3", "b1"]))
+    ]
+    if order_by_position != expected_order:
+        failures.append(f"queue positions give order {order_by_position}, expected {expected_order}")
+
+    scheduler.release(held)
+    for thread in threads:
+        thread.join(5)
+    if granted != expected_order:
+        failures.append(f"slots were granted in order {granted}, expected {expected_order}")
+
+    held = scheduler.acquire("holder", hr)
+    start = time.perf_counter()
+    try:
+        scheduler.acquire("late", hr, timeout=0.2)
+        failures.append("a call waiting past its timeout was not failed")
+    except QueueTimeout:
+        if time.perf_counter() - start > 1.0:
+            failures.append("queue timeout fired late")
+    scheduler.release(held)
+    if scheduler.waiting() or scheduler.in_flight:
+        failures.append("scheduler not empty after the timed out call")
+    return failures
+
+
+def run_load(stub_url: str, capacity: int, duration: float, heavy_threads: int, light_sessions: int,
+             hr_only: bool = False) -> Dict[str, object]:
+    """Run the mixed load for `duration` seconds; capacity 0 turns the scheduler off."""
+    from app.core.config import settings
+    from app.utils.api_clients import http_client, scheduler as scheduler_module
+    from app.utils.api_clients.scheduler import ENDPOINT_COSTS, HEAVY
+
+    settings.API_BASE_URL = stub_url
+    settings.API_HEAVY_MAX_IN_FLIGHT = capacity
+    # A fixed cap as large as the backend; bench_limiter covers the adaptive limit
+    settings.API_ADAPTIVE_LIMIT = False
+    scheduler_module._schedulers.clear()
+    http_client._sessions.clear()
+    hr_call, tailor_call = client_hr_qa(), client_resume_tailor()
+
+    deadline = time.monotonic() + duration
+    hr_latencies: List[float] = []
+    completed: Dict[str, float] = {}
+    errors = 0
+    lock = threading.Lock()
+    peak = 0
+    stop = threading.Event()
+
+    def monitor() -> None:
+        nonlocal peak
+        while not stop.is_set():
+            scheduler = scheduler_module._schedulers.get(HEAVY)
+            if scheduler is not None:
+                peak = max(peak, scheduler.in_flight)
+            time.sleep(0.002)
+
+    def loop(session: str, call: Callable[[], None], endpoint: str, think: float) -> None:
+        nonlocal errors
+        _session.name = session
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                call()
+            except Exception:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                completed[session] = completed.get(session, 0.0) + ENDPOINT_COSTS[endpoint]
+                if endpoint == "/api/hr-qa/answer" and session.startswith("light"):
+                    hr_latencies.append((time.perf_counter() - start) * 1000)
+            time.sleep(think)
+
+    threads = [threading.Thread(target=monitor, daemon=True)]
+    if not hr_only:
+        threads += [
+            threading.Thread(target=loop, args=("heavy", tailor_call, "/api/resume-builder/check", 0.0))
+            for _ in range(heavy_threads)
+        ]
+    threads += [
+        threading.Thread(target=loop, args=(f"light-{i}", hr_call, "/api/hr-qa/answer", 0.05))
+        for i in range(light_sessions)
+    ]
+    # HR answers share the heavy class here, so that both kinds of session compete for the same
+    # slots; bench_workloads covers the classes
+    with patch("app.utils.api_clients.http_client.current_session", lambda: getattr(_session, "name", "default")), \
+            patch.dict(scheduler_module.ENDPOINT_WORKLOADS, {"/api/hr-qa/answer": HEAVY}):
+        for thread in threads:
+            thread.start()
+        for thread in threads[1:]:
+            thread.join()
+    stop.set()
+
+    total = sum(completed.values()) or 1.0
+    return {
+        "hr_p50": percentile(hr_latencies, 0.5),
+        "hr_p95": percentile(hr_latencies, 0.95),
+        "hr_calls": len(hr_latencies),
+        "heavy_share": completed.get("heavy", 0.0) / total,
+        "light_share": sum(v for k, v in completed.items() if k.startswith("light")) / total,
+        "errors": errors,
+        "peak_in_flight": peak,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--duration", type=float, default=15.0)
+    parser.add_argument("--capacity", type=int, default=4, help="backend workers, and the scheduler cap")
+    parser.add_argument("--heavy-threads", type=int, default=8)
+    parser.add_argument("--light-sessions", type=int, default=3)
+    parser.add_argument("--scale", type=float, default=0.5, help="stub backend latency scale")
+    parser.add_argument("--max-hr-p95-ratio", type=float, default=8.0)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+
+    failures = check_order()
+
+    results: Dict[str, Dict[str, object]] = {}
+    with StubBackend(scale=args.scale, capacity=args.capacity) as stub:
+        results["idle (HR only)"] = run_load(stub.url, 0, args.duration / 3, 0, args.light_sessions, hr_only=True)
+        results["scheduler off"] = run_load(stub.url, 0, args.duration, args.heavy_threads, args.light_sessions)
+        results["scheduler on"] = run_load(stub.url, args.capacity, args.duration, args.heavy_threads,
+                                           args.light_sessions)
+
+    print(f"backend workers {args.capacity}, heavy session with {args.heavy_threads} threads, "
+          f"{args.light_sessions} light sessions, {args.duration:.0f}s per mode")
+    print(f"{'mode':<16} {'HR p50 ms':>10} {'HR p95 ms':>10} {'HR calls':>9} {'heavy share':>12} "
+          f"{'light share':>12} {'peak in flight':>15} {'errors':>7}")
+    for mode, result in results.items():
+        print(f"{mode:<16} {result['hr_p50']:>10.0f} {result['hr_p95']:>10.0f} {result['hr_calls']:>9} "
+              f"{result['heavy_share']:>12.1%} {result['light_share']:>12.1%} {result['peak_in_flight']:>15} "
+              f"{result['errors']:>7}")
+
+    fair = results["scheduler on"]
+    if fair["peak_in_flight"] > args.capacity:
+        failures.append(f"{fair['peak_in_flight']} calls in flight with a cap of {args.capacity}")
+    ratio = fair["hr_p95"] / max(results["idle (HR only)"]["hr_p95"], 1e-9)
+    if ratio > args.max_hr_p95_ratio:
+        failures.append(f"HR p95 under load is {ratio:.1f}x the idle p95 with the scheduler on")
+    for mode, result in results.items():
+        if result["errors"]:
+            failures.append(f"{mode}: {result['errors']} failed calls")
+
+    if failures:
+        print(f"\n{len(failures)} scheduler check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
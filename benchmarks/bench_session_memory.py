@@ -0,0 +1,133 @@
+"""
+Session Memory Benchmark and Check
+
+Simulates many sessions, each holding what the pages keep in session state
+after a full run (the tailored resume PDF, its markdown analysis and an ATS
+report), and compares the memory they hold without a budget and with the
+session store's budgets. Then reads every value back in turn, as returning
+users would, and reports reload latency.
+
+Checks: values round-trip unchanged, resident bytes stay within both
+budgets, and spill files are deleted once the sessions are gone.
+
+Usage:
+    python -m benchmarks.bench_session_memory [--sessions 200] [--session-budget-kb 512] [--check]
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Dict, List
+
+from app.core.session_store import SessionStore, SessionValue, approximate_size
+from benchmarks.bench_suite import RESUME_PDF, percentile
+from benchmarks.stub_backend import ENDPOINT_BODIES
+
+MB = 1024 * 1024
+
+
+def session_values(index: int) -> Dict[str, Any]:
+    """What one session holds after tailoring a resume and running an ATS check."""
+    ats_builder, _ = ENDPOINT_BODIES["/api/ats-checker/check"]
+    tailor_builder, _ = ENDPOINT_BODIES["/api/resume-builder/check"]
+    return {
+        # Fresh copies, so sessions do not share the same objects
+        "pdf_bytes": RESUME_PDF + str(index).encode(),
+        "markdown_result": tailor_builder()["result"] + f"\n{index}",
+        "analysis_results": ats_builder()["response"],
+    }
+
+
+def fill(store: SessionStore, sessions: int) -> List[Dict[str, SessionValue]]:
+    handles = []
+    for i in range(sessions):
+        handles.append({key: store.wrap(f"session-{i}", key, value) for key, value in session_values(i).items()})
+    return handles
+
+
+def measure(session_budget: int, global_budget: int, sessions: int, spill_dir: Path) -> Dict[str, Any]:
+    gc.collect()
+    tracemalloc.start()
+    store = SessionStore(session_budget, global_budget, spill_dir)
+    handles = fill(store, sessions)
+    gc.collect()
+    held_mb = tracemalloc.get_traced_memory()[0] / MB
+
+    failures = []
+    timings = []
+    for i, session in enumerate(handles):
+        expected = session_values(i)
+        for key, handle in session.items():
+            start = time.perf_counter()
+            value = store.load(handle)
+            timings.append((time.perf_counter() - start) * 1000)
+            if value != expected[key]:
+                failures.append(f"session {i} {key} changed after a reload")
+        if store.total(f"session-{i}") > session_budget:
+            failures.append(f"session {i} holds {store.total(f'session-{i}')} bytes over its budget")
+    if store.total() > global_budget:
+        failures.append(f"sessions hold {store.total()} bytes over the global budget")
+    tracemalloc.stop()
+
+    result = {
+        "held_mb": held_mb,
+        "resident_mb": store.total() / MB,
+        "spilled_mb": store.total(resident=False) / MB,
+        "disk_mb": sum(path.stat().st_size for path in spill_dir.glob("*")) / MB if spill_dir.exists() else 0.0,
+        "reload_ms_p50": percentile(timings, 0.5),
+        "reload_ms_p95": percentile(timings, 0.95),
+    }
+    del handles, session, handle
+    gc.collect()
+    store.total()
+    leftover = list(spill_dir.glob("*")) if spill_dir.exists() else []
+    if leftover:
+        failures.append(f"{len(leftover)} spill files left after the sessions ended")
+    result["failures"] = failures
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--sessions", type=int, default=200)
+    parser.add_argument("--session-budget-kb", type=int, default=512)
+    parser.add_argument("--global-budget-mb", type=int, default=4)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+    # Spill once first, so modules loaded on first use (settings, logging) are not measured
+    with tempfile.TemporaryDirectory() as workdir:
+        measure(1, 1, 2, Path(workdir) / "spill")
+
+    per_session = sum(approximate_size(v) for v in session_values(0).values()) / 1024
+    print(f"{args.sessions} sessions, about {per_session:.0f} KB of values each")
+    print(f"{'budget':<22} {'held MB':>8} {'resident MB':>12} {'spilled MB':>11} {'disk MB':>8} "
+          f"{'reload p50 ms':>14} {'reload p95 ms':>14}")
+    failures: List[str] = []
+    budgets = [
+        ("none", 1 << 62, 1 << 62),
+        (f"{args.session_budget_kb} KB / {args.global_budget_mb} MB", args.session_budget_kb * 1024, args.global_budget_mb * MB),
+    ]
+    for label, session_budget, global_budget in budgets:
+        with tempfile.TemporaryDirectory() as workdir:
+            result = measure(session_budget, global_budget, args.sessions, Path(workdir) / "spill")
+        failures += [f"{label}: {failure}" for failure in result["failures"]]
+        print(f"{label:<22} {result['held_mb']:>8.1f} {result['resident_mb']:>12.1f} {result['spilled_mb']:>11.1f} "
+              f"{result['disk_mb']:>8.1f} {result['reload_ms_p50']:>14.3f} {result['reload_ms_p95']:>14.3f}")
+
+    if failures:
+        print(f"\n{len(failures)} session memory check failure(s):")
+        for failure in failures[:20]:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+"""
+Speculative Analysis Benchmark and Check
+
+Drives the Job Posting Analyser and ATS Dashboard pages through
+Streamlit's `AppTest` against the stub backend: the user enters a job URL
+(or uploads a resume and pastes a job description), takes --think seconds
+(reading, moving the mouse to the button) and clicks the analyze button.
+The report shows the time from the click to the rendered result with
+SPECULATION_ENABLED off and on, over --iterations runs each.
+
+Checks:
+- with speculation on, the median click is at most --max-click-ratio of
+  the median click without it, on both pages
+- a URL replaced within SPECULATION_DELAY_SECONDS is never sent to the
+  backend: only the last URL is analyzed
+- a URL replaced after its analysis was sent has its result discarded, and
+  the click analyzes the new URL
+- an invalid URL starts nothing, and a session sends no more than
+  SPECULATION_JOB_ANALYSIS_MAX_PER_SESSION speculative analyses
+- the same job description pasted with different whitespace is checked
+  once, and a session sends no more than SPECULATION_ATS_MAX_PER_SESSION
+  speculative ATS checks
+
+Usage:
+    python -m benchmarks.bench_speculation [--iterations 5] [--think 1.5] [--check]
+"""
+
+import argparse
+import os
+import sys
+import time
+from typing import Dict, List
+
+from benchmarks.bench_suite import JOB_DESCRIPTION, JOB_URL, RESUME_PDF, _app_test, _check, percentile
+from benchmarks.stub_backend import StubBackend
+
+JOB_ANALYSIS_ENDPOINT = "/api/job-analysis/analyze"
+ATS_ENDPOINT = "/api/ats-checker/check"
+OTHER_JOB_URL = "https://example.com/jobs/data-engineer"
+
+
+def _sent(stub: StubBackend, endpoint: str = JOB_ANALYSIS_ENDPOINT) -> int:
+    return stub._requests[endpoint]
+
+
+def _wait_for(stub: StubBackend, sent: int, seconds: float, endpoint: str = JOB_ANALYSIS_ENDPOINT) -> None:
+    """Wait until `sent` requests to `endpoint` reached the stub, or `seconds` passed."""
+    deadline = time.monotonic() + seconds
+    while _sent(stub, endpoint) < sent and time.monotonic() < deadline:
+        time.sleep(0.01)
+
+
+def _job_posting_page():
+    at = _app_test("pages/Job_Posting_Analyser.py").run()
+    at.text_input[0].input(JOB_URL).run()
+    return at
+
+
+def _ats_page(job_description: str = JOB_DESCRIPTION):
+    at = _app_test("pages/Ats_Dashboard.py").run()
+    at.file_uploader[0].set_value(("resume.pdf", RESUME_PDF, "application/pdf"))
+    at.text_area(key="job_description").input(job_description).run()
+    return at
+
+
+def click_times(args: argparse.Namespace, page, enabled: bool) -> List[float]:
+    """Milliseconds from the click to the rendered result, one per iteration."""
+    from app.core.config import settings
+
+    settings.SPECULATION_ENABLED = enabled
+    times = []
+    for _ in range(args.iterations):
+        at = page()
+        time.sleep(args.think)
+        start = time.perf_counter()
+        at.button[0].click().run()
+        times.append((time.perf_counter() - start) * 1000)
+        _check(at)
+        if not at.success:
+            raise RuntimeError("analysis did not complete")
+    return times
+
+
+def check_superseded(stub: StubBackend, args: argparse.Namespace) -> List[str]:
+    from app.core.config import settings
+    from app.core.speculation import SPECULATIONS
+
+    settings.SPECULATION_ENABLED = True
+    failures = []
+    kind = "job_analysis"
+
+    # Replaced within the delay: only the final URL reaches the backend
+    sent = _sent(stub)
+    cancelled = SPECULATIONS.value(kind=kind, outcome="cancelled")
+    at = _app_test("pages/Job_Posting_Analyser.py").run()
+    at.text_input[0].input(OTHER_JOB_URL).run()
+    at.text_input[0].input(JOB_URL).run()
+    _wait_for(stub, sent + 1, settings.SPECULATION_DELAY_SECONDS + 2)
+    time.sleep(settings.SPECULATION_DELAY_SECONDS)
+    if _sent(stub) - sent != 1:
+        failures.append(f"{_sent(stub) - sent} analyses sent for a URL replaced within the delay, expected 1")
+    if SPECULATIONS.value(kind=kind, outcome="cancelled") - cancelled != 1:
+        failures.append("the replaced URL was not counted as cancelled")
+    at.button[0].click().run()
+    _check(at)
+    if _sent(stub) - sent != 1:
+        failures.append("the click did not use the speculative analysis")
+
+    # Replaced after it was sent: its result is dropped and the click analyzes the new URL
+    sent = _sent(stub)
+    discarded = SPECULATIONS.value(kind=kind, outcome="discarded")
+    at = _app_test("pages/Job_Posting_Analyser.py").run()
+    at.text_input[0].input(OTHER_JOB_URL).run()
+    _wait_for(stub, sent + 1, settings.SPECULATION_DELAY_SECONDS + 2)
+    at.text_input[0].input(JOB_URL).run()
+    at.button[0].click().run()
+    _check(at)
+    if not at.success:
+        failures.append("no result for the new URL after the speculative one was replaced")
+    if SPECULATIONS.value(kind=kind, outcome="discarded") - discarded != 1:
+        failures.append("the analysis of the replaced URL was not counted as discarded")
+    if _sent(stub) - sent != 2:
+        failures.append(f"{_sent(stub) - sent} analyses sent for two URLs, expected 2")
+
+    # An invalid URL starts nothing
+    sent = _sent(stub)
+    at = _app_test("pages/Job_Posting_Analyser.py").run()
+    at.text_input[0].input("example.com/jobs").run()
+    time.sleep(settings.SPECULATION_DELAY_SECONDS + 0.2)
+    if _sent(stub) != sent:
+        failures.append("an invalid URL was sent for analysis")
+
+    # A session stops analyzing URLs speculatively at its cap
+    sent = _sent(stub)
+    cap = settings.SPECULATION_JOB_ANALYSIS_MAX_PER_SESSION
+    at = _app_test("pages/Job_Posting_Analyser.py").run()
+    for i in range(cap + 2):
+        at.text_input[0].input(f"{JOB_URL}?edit={i}").run()
+        _wait_for(stub, sent + min(i + 1, cap), settings.SPECULATION_DELAY_SECONDS + 2)
+    time.sleep(settings.SPECULATION_DELAY_SECONDS + 0.2)
+    if _sent(stub) - sent != cap:
+        failures.append(f"{_sent(stub) - sent} speculative job analyses in one session, cap {cap}")
+    return failures
+
+
+def check_ats(stub: StubBackend) -> List[str]:
+    from app.core.config import settings
+
+    settings.SPECULATION_ENABLED = True
+    failures = []
+    wait = settings.SPECULATION_DELAY_SECONDS + 2
+
+    # Whitespace of the pasted text does not make a new check
+    sent = _sent(stub, ATS_ENDPOINT)
+    at = _ats_page()
+    _wait_for(stub, sent + 1, wait, ATS_ENDPOINT)
+    at.text_area(key="job_description").input("  " + JOB_DESCRIPTION.replace(" ", "  ") + "\n\n\n").run()
+    at.button[0].click().run()
+    _check(at)
+    if not at.success:
+        failures.append("no ATS result after the job description was pasted again")
+    if _sent(stub, ATS_ENDPOINT) - sent != 1:
+        failures.append(f"{_sent(stub, ATS_ENDPOINT) - sent} ATS checks for one job description, expected 1")
+
+    # A session stops checking speculatively at its cap; the click still checks
+    sent = _sent(stub, ATS_ENDPOINT)
+    cap = settings.SPECULATION_ATS_MAX_PER_SESSION
+    at = _ats_page("Job 0: " + JOB_DESCRIPTION)
+    for i in range(1, cap + 2):
+        _wait_for(stub, sent + i, wait, ATS_ENDPOINT)
+        at.text_area(key="job_description").input(f"Job {i}: " + JOB_DESCRIPTION).run()
+    time.sleep(wait)
+    if _sent(stub, ATS_ENDPOINT) - sent != cap:
+        failures.append(f"{_sent(stub, ATS_ENDPOINT) - sent} speculative ATS checks in one session, cap {cap}")
+    at.button[0].click().run()
+    _check(at)
+    if not at.success or _sent(stub, ATS_ENDPOINT) - sent != cap + 1:
+        failures.append("the click past the cap did not check the resume")
+    return failures
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=5)
+    parser.add_argument("--think", type=float, default=1.5, help="seconds between entering the inputs and the click")
+    parser.add_argument("--scale", type=float, default=1.0, help="stub backend latency scale")
+    parser.add_argument("--max-click-ratio", type=float, default=0.5)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+    # Speculative ATS checks are off by default
+    os.environ.setdefault("SPECULATION_ATS_MAX_PER_SESSION", "5")
+
+    pages = {"job posting": _job_posting_page, "ats": _ats_page}
+    results: Dict[str, Dict[str, List[float]]] = {}
+    with StubBackend(scale=args.scale) as stub:
+        from app.core.config import settings
+        settings.API_BASE_URL = stub.url
+        for name, page in pages.items():
+            results[name] = {
+                "off": click_times(args, page, enabled=False),
+                "on": click_times(args, page, enabled=True),
+            }
+        failures = check_superseded(stub, args) + check_ats(stub)
+
+    print(f"{args.think:.1f}s between entering the inputs and the click, {args.iterations} runs each")
+    print(f"{'page':<12} {'speculation':<12} {'click p50 ms':>13} {'click max ms':>13}")
+    for name, modes in results.items():
+        for mode, times in modes.items():
+            print(f"{name:<12} {mode:<12} {percentile(times, 0.5):>13.0f} {max(times):>13.0f}")
+
+    for name, modes in results.items():
+        ratio = percentile(modes["on"], 0.5) / max(percentile(modes["off"], 0.5), 1e-9)
+        if ratio > args.max_click_ratio:
+            failures.append(f"{name}: median click with speculation is {ratio:.2f}x the click without")
+
+    if failures:
+        print(f"\n{len(failures)} speculation check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
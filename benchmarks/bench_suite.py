@@ -0,0 +1,498 @@
+"""
+End-to-End Benchmark Suite
+
+Runs every API client and every page against the local stub backend and
+reports, per flow, throughput, p50/p95/p99 latency, the frontend's share of
+that latency (latency minus the backend's Server-Timing total), CPU time
+per iteration and peak RSS.
+
+Pages are driven through Streamlit's `AppTest`: the page is loaded, inputs
+are filled in, the action button is clicked and the rerun is awaited.
+Interaction flows load a page once and then time a single interaction,
+rerunning only the fragment the widget belongs to, as a browser would.
+Each flow runs in its own subprocess so its peak RSS is its own.
+
+With `--replay ARCHIVE` the flows run against recorded responses (see
+`benchmarks.replay_backend`) instead of the synthetic stub.
+
+Results are written as JSON. Passing an earlier result file with
+`--baseline` compares the two and exits with status 1 when a metric
+regressed by more than its threshold (`DEFAULT_THRESHOLDS`, or a JSON file
+of the same shape given with `--thresholds`).
+
+Usage:
+    python -m benchmarks.bench_suite [--iterations 10] [--scale 1.0] [--seed 0]
+                                     [--flows page_hr_qa,client_hr_qa]
+                                     [--output results.json] [--baseline previous.json]
+"""
+
+import argparse
+import io
+import json
+import math
+import os
+import platform
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+from unittest.mock import patch
+
+from benchmarks.stub_backend import StubBackend, load_profile
+
+ROOT = Path(__file__).resolve().parent.parent
+
+RESUME_PDF = (ROOT / "data" / "resume_templates" / "tailored_resume.pdf").read_bytes()
+JOB_DESCRIPTION = (
+    "We are hiring a backend engineer with Python, SQL, Docker and AWS experience. "
+    "Kubernetes and Terraform are a plus."
+)
+HR_QUESTION = "Tell me about a time you disagreed with a team member."
+JOB_URL = "https://example.com/jobs/backend-engineer"
+
+# Largest allowed relative change per metric; throughput may not drop, the rest may not rise
+DEFAULT_THRESHOLDS: Dict[str, float] = {
+    "throughput_per_s": 0.15,
+    "latency_ms.p50": 0.15,
+    "latency_ms.p95": 0.20,
+    "latency_ms.p99": 0.30,
+    "frontend_ms.p50": 0.25,
+    "frontend_ms.p95": 0.30,
+    "cpu_ms.p50": 0.25,
+    "peak_rss_mb": 0.10,
+}
+HIGHER_IS_BETTER = {"throughput_per_s"}
+
+
+class UploadedFile(io.BytesIO):
+    """Stands in for a Streamlit UploadedFile."""
+    name = "resume.pdf"
+    type = "application/pdf"
+
+
+# Flows. Each builder runs once per process and returns the iteration callable;
+# an iteration raises on failure.
+
+def client_ats() -> Callable[[], None]:
+    from app.utils.api_clients.ats_client import check_resume_against_job_description
+
+    def run():
+        if not check_resume_against_job_description(UploadedFile(RESUME_PDF), JOB_DESCRIPTION):
+            raise RuntimeError("empty ATS report")
+    return run
+
+
+def client_ats_stream() -> Callable[[], None]:
+    from app.utils.api_clients.ats_client import stream_ats_report
+
+    def run():
+        if not list(stream_ats_report(UploadedFile(RESUME_PDF), JOB_DESCRIPTION)):
+            raise RuntimeError("no ATS report sections")
+    return run
+
+
+def client_hr_qa() -> Callable[[], None]:
+    from app.utils.api_clients.hr_qa_client import hr_qa_client
+
+    def run():
+        if not hr_qa_client(HR_QUESTION):
+            raise RuntimeError("empty HR answer")
+    return run
+
+
+def client_job_analysis() -> Callable[[], None]:
+    from app.utils.api_clients.job_posting_analyser_client import analyze_job_posting
+
+    def run():
+        if not analyze_job_posting(JOB_URL):
+            raise RuntimeError("empty job analysis")
+    return run
+
+
+def client_resume_tailor() -> Callable[[], None]:
+    from app.utils.api_clients.resume_tailor_client import tailor_resume_and_guide
+
+    def run():
+        if tailor_resume_and_guide(UploadedFile(RESUME_PDF), JOB_URL, "https://github.com/example", "Statement") is None:
+            raise RuntimeError("empty tailoring result")
+    return run
+
+
+def _app_test(page: str):
+    from streamlit.testing.v1 import AppTest
+    return AppTest.from_file(str(ROOT / page), default_timeout=120)
+
+
+def _check(at) -> None:
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+    if at.error:
+        raise RuntimeError(at.error[0].value)
+
+
+def page_home_dashboard() -> Callable[[], None]:
+    def run():
+        at = _app_test("Home_Dashboard.py").run()
+        _check(at)
+    return run
+
+
+def page_ats_dashboard() -> Callable[[], None]:
+    def run():
+        at = _app_test("pages/Ats_Dashboard.py").run()
+        at.file_uploader[0].set_value(("resume.pdf", RESUME_PDF, "application/pdf"))
+        at.text_area(key="job_description").input(JOB_DESCRIPTION)
+        at.button[0].click().run()
+        _check(at)
+        if not at.success:
+            raise RuntimeError("analysis did not complete")
+    return run
+
+
+def page_hr_qa() -> Callable[[], None]:
+    def run():
+        at = _app_test("pages/HR_Question_Answer.py").run()
+        at.text_area[0].input(HR_QUESTION)
+        at.button[0].click().run()
+        _check(at)
+    return run
+
+
+def page_job_posting_analyser() -> Callable[[], None]:
+    def run():
+        at = _app_test("pages/Job_Posting_Analyser.py").run()
+        at.text_input[0].input(JOB_URL)
+        at.button[0].click().run()
+        _check(at)
+        if not at.success:
+            raise RuntimeError("analysis did not complete")
+    return run
+
+
+def page_resume_tailor() -> Callable[[], None]:
+    def run():
+        at = _app_test("pages/Resume_Tailor.py").run()
+        at.file_uploader[0].set_value(("resume.pdf", RESUME_PDF, "application/pdf"))
+        at.text_input[0].input(JOB_URL)
+        at.text_input[1].input("https://github.com/example")
+        at.text_area[0].input("Personal statement")
+        at.button[0].click().run()
+        _check(at)
+        if not at.success:
+            raise RuntimeError("tailoring did not complete")
+    return run
+
+
+def _fragment_run(at, fragment: str):
+    """
+    Rerun only the named `st.fragment` of the page, as the browser does when
+    a widget inside the fragment changes; AppTest itself always reruns the
+    whole script. A page without that fragment gets a full rerun, so the
+    same flow measures a page before and after it was split into fragments.
+
+    Afterwards the AppTest element tree holds only the fragment's elements.
+    """
+    from streamlit.runtime.scriptrunner_utils.script_requests import RerunData
+    from streamlit.testing.v1.element_tree import parse_tree_from_messages
+    from streamlit.testing.v1.local_script_runner import LocalScriptRunner, require_widgets_deltas
+
+    fragment_id = None
+    for candidate, wrapped in at._fragment_storage._fragments.items():
+        cells = dict(zip(wrapped.__code__.co_freevars, wrapped.__closure__ or ()))
+        func = cells.get("non_optional_func")
+        if func is not None and getattr(func.cell_contents, "__name__", None) == fragment:
+            fragment_id = candidate
+    if fragment_id is None:
+        return at.run()
+
+    def run(runner, widget_state=None, query_params=None, timeout=3, page_hash=""):
+        # Replace the full rerun the runner was created with
+        runner._requests._rerun_data = RerunData(
+            widget_states=widget_state, page_script_hash=page_hash,
+            fragment_id_queue=[fragment_id], is_fragment_scoped_rerun=True
+        )
+        try:
+            runner.start()
+            require_widgets_deltas(runner, timeout)
+        finally:
+            runner.join()
+        return parse_tree_from_messages(runner.forward_msgs())
+
+    with patch.object(LocalScriptRunner, "run", run):
+        return at.run()
+
+
+def _ats_page_with_inputs():
+    at = _app_test("pages/Ats_Dashboard.py").run()
+    at.file_uploader[0].set_value(("resume.pdf", RESUME_PDF, "application/pdf"))
+    at.text_area(key="job_description").input(JOB_DESCRIPTION)
+    at.run()
+    _check(at)
+    return at
+
+
+def interaction_ats_edit_job_description() -> Callable[[], None]:
+    at = _ats_page_with_inputs()
+    edits = [JOB_DESCRIPTION + " Remote friendly.", JOB_DESCRIPTION]
+    count = [0]
+
+    def run():
+        count[0] += 1
+        at.text_area(key="job_description").input(edits[count[0] % 2])
+        _fragment_run(at, "input_panel")
+        _check(at)
+    return run
+
+
+def interaction_ats_analyze() -> Callable[[], None]:
+    at = _ats_page_with_inputs()
+
+    def run():
+        next(button for button in at.button if "Analyze" in button.label).click()
+        _fragment_run(at, "analysis_panel")
+        _check(at)
+        if not at.success:
+            raise RuntimeError("analysis did not complete")
+    return run
+
+
+FLOWS: Dict[str, Callable[[], Callable[[], None]]] = {
+    "client_ats": client_ats,
+    "client_ats_stream": client_ats_stream,
+    "client_hr_qa": client_hr_qa,
+    "client_job_analysis": client_job_analysis,
+    "client_resume_tailor": client_resume_tailor,
+    "page_home_dashboard": page_home_dashboard,
+    "page_ats_dashboard": page_ats_dashboard,
+    "page_hr_qa": page_hr_qa,
+    "page_job_posting_analyser": page_job_posting_analyser,
+    "page_resume_tailor": page_resume_tailor,
+    "interaction_ats_edit_job_description": interaction_ats_edit_job_description,
+    "interaction_ats_analyze": interaction_ats_analyze,
+}
+
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of `values`."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, min(len(ordered) - 1, math.ceil(q * len(ordered)) - 1))]
+
+
+def summarize(values: List[float]) -> Dict[str, float]:
+    return {
+        "mean": round(sum(values) / len(values), 3) if values else 0.0,
+        "p50": round(percentile(values, 0.50), 3),
+        "p95": round(percentile(values, 0.95), 3),
+        "p99": round(percentile(values, 0.99), 3),
+    }
+
+
+def peak_rss_mb() -> float:
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def run_flow(name: str, iterations: int, warmup: int) -> Dict[str, object]:
+    """Run one flow in this process and measure it."""
+    from app.utils.api_clients import http_client
+
+    server_ms: List[float] = []
+    lock = threading.Lock()
+    record_metrics = http_client._record_metrics
+
+    def capture(call):
+        with lock:
+            server_ms.append(call.server_ms or 0.0)
+        record_metrics(call)
+
+    http_client._record_metrics = capture
+
+    iteration = FLOWS[name]()
+    for _ in range(warmup):
+        iteration()
+    baseline_rss = peak_rss_mb()
+
+    latencies: List[float] = []
+    frontend: List[float] = []
+    cpu: List[float] = []
+    errors: List[str] = []
+    start = time.perf_counter()
+    for _ in range(iterations):
+        del server_ms[:]
+        iteration_start = time.perf_counter()
+        cpu_start = time.process_time()
+        try:
+            iteration()
+        except Exception as e:
+            errors.append(f"{type(e).__name__}: {e}")
+            continue
+        elapsed = (time.perf_counter() - iteration_start) * 1000
+        cpu.append((time.process_time() - cpu_start) * 1000)
+        latencies.append(elapsed)
+        frontend.append(max(0.0, elapsed - sum(server_ms)))
+    wall = time.perf_counter() - start
+
+    return {
+        "iterations": iterations,
+        "errors": len(errors),
+        "error_samples": errors[:3],
+        "throughput_per_s": round(len(latencies) / wall, 3) if wall else 0.0,
+        "latency_ms": summarize(latencies),
+        "frontend_ms": summarize(frontend),
+        "cpu_ms": summarize(cpu),
+        "baseline_rss_mb": round(baseline_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_flow_subprocess(name: str, args: argparse.Namespace, api_base_url: str) -> Dict[str, object]:
+    """Run one flow in a fresh interpreter so its peak RSS is not shared."""
+    env = dict(os.environ, API_BASE_URL=api_base_url, LOG_LEVEL=args.log_level, PYTHONPATH=str(ROOT))
+    # The flow's spilled session values go to a directory removed when it ends
+    with tempfile.NamedTemporaryFile(suffix=".json") as output, \
+            tempfile.TemporaryDirectory(prefix=f"jobfit-{name}-") as workdir:
+        env["TMPDIR"] = workdir
+        # Streamlit warns about the missing script context outside a server; only show stderr on failure
+        child = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_suite", "--child", name,
+             "--iterations", str(args.iterations), "--warmup", str(args.warmup),
+             "--output", output.name],
+            cwd=ROOT, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+        )
+        if child.returncode != 0:
+            sys.stderr.write(child.stderr)
+            raise RuntimeError(f"flow {name} exited with status {child.returncode}")
+        return json.loads(Path(output.name).read_text(encoding="utf-8"))
+
+
+def _metric(result: Dict[str, object], metric: str) -> Optional[float]:
+    value = result
+    for key in metric.split("."):
+        if not isinstance(value, dict) or key not in value:
+            return None
+        value = value[key]
+    return float(value)
+
+
+def compare(current: Dict, baseline: Dict, thresholds: Dict[str, float]) -> List[str]:
+    """Return one message per metric that regressed beyond its threshold."""
+    regressions = []
+    for flow, result in current["flows"].items():
+        previous = baseline.get("flows", {}).get(flow)
+        if previous is None:
+            continue
+        if result["errors"] > previous.get("errors", 0):
+            regressions.append(f"{flow}: errors {previous.get('errors', 0)} -> {result['errors']}")
+        for metric, tolerance in thresholds.items():
+            new, old = _metric(result, metric), _metric(previous, metric)
+            if new is None or not old:
+                continue
+            change = (new - old) / old
+            if metric in HIGHER_IS_BETTER:
+                change = -change
+            if change > tolerance:
+                regressions.append(
+                    f"{flow}: {metric} {old:g} -> {new:g} ({change * 100:+.0f}% worse, limit {tolerance * 100:.0f}%)"
+                )
+    return regressions
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iterations", type=int, default=10)
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--flows", help="comma-separated subset of: " + ", ".join(FLOWS))
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply all stub phase durations")
+    parser.add_argument("--profile", type=Path, help="stub backend profile (see benchmarks.stub_backend)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", type=Path, help="serve responses recorded with API_RECORD_DIR instead of the stub")
+    parser.add_argument("--replay-latency", default="distribution", help="replay latency mode (see benchmarks.replay_backend)")
+    parser.add_argument("--log-level", default="WARNING", help="LOG_LEVEL of the flow processes")
+    parser.add_argument("--output", type=Path, default=Path("benchmark_results.json"))
+    parser.add_argument("--baseline", type=Path, help="earlier result file to compare against")
+    parser.add_argument("--thresholds", type=Path, help="JSON file overriding DEFAULT_THRESHOLDS")
+    parser.add_argument("--child", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        result = run_flow(args.child, args.iterations, args.warmup)
+        args.output.write_text(json.dumps(result), encoding="utf-8")
+        return
+
+    flows = args.flows.split(",") if args.flows else list(FLOWS)
+    unknown = [name for name in flows if name not in FLOWS]
+    if unknown:
+        parser.error(f"unknown flows: {', '.join(unknown)}")
+
+    profile = load_profile(args.profile)
+    results = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpus": os.cpu_count(),
+            "iterations": args.iterations,
+            "warmup": args.warmup,
+            "scale": args.scale,
+            "seed": args.seed,
+            "profile": None if args.replay else profile,
+            "replay": str(args.replay) if args.replay else None,
+            "replay_latency": args.replay_latency if args.replay else None,
+        },
+        "flows": {},
+    }
+
+    print(f"{'flow':<38} {'req/s':>7} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'frontend p50':>13} "
+          f"{'CPU p50 ms':>11} {'peak RSS MB':>12} {'errors':>7}")
+    if args.replay:
+        from benchmarks.replay_backend import ReplayBackend
+        backend = ReplayBackend(args.replay, latency=args.replay_latency, scale=args.scale, seed=args.seed)
+    else:
+        backend = StubBackend(scale=args.scale, profile=profile, seed=args.seed)
+    with backend:
+        for name in flows:
+            result = run_flow_subprocess(name, args, backend.url)
+            results["flows"][name] = result
+            latency = result["latency_ms"]
+            print(f"{name:<38} {result['throughput_per_s']:>7.2f} {latency['p50']:>8.1f} {latency['p95']:>8.1f} "
+                  f"{latency['p99']:>8.1f} {result['frontend_ms']['p50']:>13.1f} {result['cpu_ms']['p50']:>11.1f} "
+                  f"{result['peak_rss_mb']:>12.1f} {result['errors']:>7}")
+            for sample in result["error_samples"]:
+                print(f"    error: {sample}")
+
+    args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"Results written to {args.output}")
+
+    if args.baseline:
+        thresholds = dict(DEFAULT_THRESHOLDS)
+        if args.thresholds:
+            thresholds.update(json.loads(args.thresholds.read_text(encoding="utf-8")))
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare(results, baseline, thresholds)
+        print(f"Compared with {args.baseline} (commit {baseline.get('meta', {}).get('commit')}): "
+              f"{len(regressions)} regression(s)")
+        for message in regressions:
+            print(f"  REGRESSION {message}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Workload Class Benchmark and Check
+
+A few sessions ask HR questions one after another while a growing number
+of other sessions flood the backend with tailoring requests (--floods
+concurrent tailoring sessions). The load runs twice against the stub
+backend:
+- shared: HR answers and tailoring requests are one workload class, with
+  --interactive + --heavy slots and one connection pool between them
+- separate: HR answers get their own --interactive slots and pool, and
+  tailoring requests --heavy slots and their own pool
+
+The stub has --backend-workers workers, enough for both classes, so the
+difference is in the frontend only. The adaptive limit is off, so each
+class has a fixed cap. The report shows, per flood size, HR latency,
+tailoring requests per second and connections the HTTP pools had to
+throw away ("Connection pool is full").
+
+Checks: with separate classes the HR p95 under the largest flood stays
+within --max-hr-p95-ratio of the HR p95 without a flood, and no
+connection is thrown away.
+
+Usage:
+    python -m benchmarks.bench_workloads [--seconds 6] [--floods 0,8,16,32] [--check]
+"""
+
+import argparse
+import logging
+import os
+import sys
+import threading
+import time
+from contextlib import ExitStack
+from typing import Dict, List
+from unittest.mock import patch
+
+from benchmarks.bench_suite import client_hr_qa, client_resume_tailor, percentile
+from benchmarks.stub_backend import StubBackend
+
+_session = threading.local()
+
+
+class _PoolDiscards(logging.Handler):
+    """Counts urllib3 warnings about connections thrown away by a full pool."""
+
+    def __init__(self):
+        super().__init__(logging.WARNING)
+        self.count = 0
+
+    def emit(self, record: logging.LogRecord) -> None:
+        if "Connection pool is full" in record.getMessage():
+            self.count += 1
+
+
+def run_load(stub_url: str, args: argparse.Namespace, separate: bool, floods: int,
+             discards: _PoolDiscards) -> Dict[str, float]:
+    """HR sessions next to `floods` tailoring sessions for --seconds; returns HR latency and throughput."""
+    from app.core.config import settings
+    from app.utils.api_clients import http_client, scheduler as scheduler_module
+    from app.utils.api_clients.scheduler import HEAVY
+
+    settings.API_BASE_URL = stub_url
+    settings.API_ADAPTIVE_LIMIT = False
+    settings.API_INTERACTIVE_MAX_IN_FLIGHT = args.interactive
+    settings.API_HEAVY_MAX_IN_FLIGHT = args.heavy if separate else args.interactive + args.heavy
+    scheduler_module._schedulers.clear()
+    http_client._sessions.clear()
+    hr_call, tailor_call = client_hr_qa(), client_resume_tailor()
+
+    deadline = time.monotonic() + args.seconds
+    hr_latencies: List[float] = []
+    tailored = 0
+    errors = 0
+    lock = threading.Lock()
+
+    def loop(session: str, call, think: float) -> None:
+        nonlocal tailored, errors
+        _session.name = session
+        while time.monotonic() < deadline:
+            start = time.perf_counter()
+            try:
+                call()
+            except Exception:
+                with lock:
+                    errors += 1
+                continue
+            with lock:
+                if session.startswith("hr"):
+                    hr_latencies.append((time.perf_counter() - start) * 1000)
+                else:
+                    tailored += 1
+            time.sleep(think)
+
+    threads = [threading.Thread(target=loop, args=(f"hr-{i}", hr_call, 0.05)) for i in range(args.hr_sessions)]
+    threads += [threading.Thread(target=loop, args=(f"tailor-{i}", tailor_call, 0.0)) for i in range(floods)]
+    discarded = discards.count
+    with ExitStack() as stack:
+        stack.enter_context(
+            patch("app.utils.api_clients.http_client.current_session", lambda: getattr(_session, "name", "default"))
+        )
+        if not separate:
+            stack.enter_context(patch.dict(scheduler_module.ENDPOINT_WORKLOADS, {"/api/hr-qa/answer": HEAVY}))
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+    return {
+        "hr_p50": percentile(hr_latencies, 0.5),
+        "hr_p95": percentile(hr_latencies, 0.95),
+        "tailored_per_s": tailored / args.seconds,
+        "discarded": discards.count - discarded,
+        "errors": errors,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--seconds", type=float, default=6.0, help="duration of each run")
+    parser.add_argument("--floods", default="0,8,16,32", help="tailoring sessions per run")
+    parser.add_argument("--hr-sessions", type=int, default=3)
+    parser.add_argument("--interactive", type=int, default=4, help="slots of the interactive class")
+    parser.add_argument("--heavy", type=int, default=12, help="slots of the heavy class")
+    parser.add_argument("--backend-workers", type=int, default=16)
+    parser.add_argument("--scale", type=float, default=0.5, help="stub backend latency scale")
+    parser.add_argument("--max-hr-p95-ratio", type=float, default=1.5)
+    parser.add_argument("--check", action="store_true", help="exit with status 1 when a check fails")
+    args = parser.parse_args()
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    os.environ.setdefault("TRACING_ENABLED", "false")
+
+    discards = _PoolDiscards()
+    logging.getLogger("urllib3.connectionpool").addHandler(discards)
+    floods = [int(n) for n in args.floods.split(",")]
+
+    results: Dict[str, Dict[int, Dict[str, float]]] = {"shared": {}, "separate": {}}
+    with StubBackend(scale=args.scale, capacity=args.backend_workers) as stub:
+        for mode in results:
+            for flood in floods:
+                results[mode][flood] = run_load(stub.url, args, mode == "separate", flood, discards)
+
+    print(f"{args.hr_sessions} HR sessions, {args.backend_workers} backend workers, "
+          f"slots: interactive {args.interactive}, heavy {args.heavy}; {args.seconds:.0f}s per run")
+    print(f"{'mode':<9} {'tailoring sessions':>18} {'HR p50 ms':>10} {'HR p95 ms':>10} {'tailored/s':>11} "
+          f"{'pool discards':>14} {'errors':>7}")
+    for mode, runs in results.items():
+        for flood, result in runs.items():
+            print(f"{mode:<9} {flood:>18} {result['hr_p50']:>10.0f} {result['hr_p95']:>10.0f} "
+                  f"{result['tailored_per_s']:>11.1f} {result['discarded']:>14} {result['errors']:>7}")
+
+    failures = []
+    separate = results["separate"]
+    ratio = separate[max(floods)]["hr_p95"] / max(separate[min(floods)]["hr_p95"], 1e-9)
+    if ratio > args.max_hr_p95_ratio:
+        failures.append(f"HR p95 with {max(floods)} tailoring sessions is {ratio:.2f}x the p95 without")
+    discarded = sum(result["discarded"] for result in separate.values())
+    if discarded:
+        failures.append(f"{discarded} connections thrown away by full pools with separate classes")
+    for mode, runs in results.items():
+        errors = sum(result["errors"] for result in runs.values())
+        if errors:
+            failures.append(f"{mode}: {errors} failed calls")
+
+    if failures:
+        print(f"\n{len(failures)} workload check failure(s):")
+        for failure in failures:
+            print(f"  {failure}")
+        if args.check:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
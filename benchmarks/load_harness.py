@@ -0,0 +1,351 @@
+"""
+Concurrent-Session Load Harness
+
+Estimates how many concurrent users one frontend process can serve. The
+harness simulates Streamlit sessions in-process: each session is an
+`AppTest` instance with its own session state and script runner, driven by
+its own thread through a realistic flow with think time between actions:
+
+- ats:    upload a resume and job description on Ats_Dashboard, analyze
+- hr:     ask HR questions one after another
+- tailor: fill in and submit the Resume Tailor form
+
+Sessions are added step by step (the ramp) and kept alive, like users who
+stay on a page. After each step the harness measures rerun latency,
+throughput, error rate, the process's CPU use and memory per session. The
+stub backend (or, with `--replay`, the replay backend) runs in a separate
+process, so CPU and memory belong to the frontend alone.
+
+The saturation report names the knee point: the step with the highest
+power (throughput / p95 latency), after which extra sessions mostly add
+queueing delay.
+
+Usage:
+    python -m benchmarks.load_harness [--ramp 1,2,4,8,16,32] [--duration 10]
+                                      [--think 1.0] [--scale 1.0] [--output load.json]
+"""
+
+import argparse
+import gc
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from benchmarks.bench_suite import (
+    HR_QUESTION, JOB_DESCRIPTION, JOB_URL, RESUME_PDF, ROOT, summarize
+)
+
+FLOW_MIX = {"ats": 0.4, "hr": 0.4, "tailor": 0.2}
+PAGES = {
+    "ats": "pages/Ats_Dashboard.py",
+    "hr": "pages/HR_Question_Answer.py",
+    "tailor": "pages/Resume_Tailor.py",
+}
+
+# Ramp stops once a step is this bad
+MAX_ERROR_RATE = 0.5
+
+
+def current_rss_mb() -> float:
+    """Resident set size now (Linux), else the peak so far."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError):
+        rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def cpu_seconds() -> float:
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    return usage.ru_utime + usage.ru_stime
+
+
+class StepStats:
+    """Reruns and errors recorded during one ramp step."""
+
+    def __init__(self):
+        self.latencies: List[float] = []
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: Optional[float], error: bool) -> None:
+        with self._lock:
+            if error:
+                self.errors += 1
+            else:
+                self.latencies.append(latency_ms)
+
+
+class Harness:
+    """Holds the running sessions and the stats of the current step."""
+
+    def __init__(self, think: float, seed: int):
+        self.think = think
+        self.rng = random.Random(seed)
+        self.stats = StepStats()
+        self.stop = threading.Event()
+        self.sessions: List[threading.Thread] = []
+
+    def add_sessions(self, count: int) -> None:
+        flows, weights = zip(*FLOW_MIX.items())
+        for _ in range(count):
+            flow = self.rng.choices(flows, weights)[0]
+            session = Session(len(self.sessions), flow, self, random.Random(self.rng.random()))
+            thread = threading.Thread(target=session.run, name=f"session-{session.index}", daemon=True)
+            self.sessions.append(thread)
+            thread.start()
+
+    def shutdown(self) -> None:
+        self.stop.set()
+        for thread in self.sessions:
+            thread.join(timeout=120)
+
+
+class Session:
+    """One simulated user looping through a flow."""
+
+    def __init__(self, index: int, flow: str, harness: Harness, rng: random.Random):
+        self.index = index
+        self.flow = flow
+        self.harness = harness
+        self.rng = rng
+        self.at = None
+
+    def rerun(self, at) -> None:
+        """Run the script once and record its latency against the current step."""
+        stats = self.harness.stats
+        start = time.perf_counter()
+        try:
+            at.run()
+            failed = bool(at.exception or at.error)
+        except Exception:
+            failed = True
+        stats.record((time.perf_counter() - start) * 1000, failed)
+
+    def pause(self) -> None:
+        # Exponential think time keeps sessions from moving in lockstep
+        self.harness.stop.wait(self.rng.expovariate(1 / self.harness.think) if self.harness.think else 0)
+
+    def run(self) -> None:
+        from streamlit.testing.v1 import AppTest
+
+        page = PAGES[self.flow]
+        self.at = AppTest.from_file(str(ROOT / page), default_timeout=300)
+        self.rerun(self.at)
+        round_no = 0
+        while not self.harness.stop.is_set():
+            round_no += 1
+            try:
+                getattr(self, f"step_{self.flow}")(round_no)
+            except Exception:
+                # Widget lookups fail when the previous run errored; start over
+                self.harness.stats.record(None, True)
+                self.at = AppTest.from_file(str(ROOT / page), default_timeout=300)
+                self.rerun(self.at)
+            self.pause()
+
+    def step_ats(self, round_no: int) -> None:
+        at = self.at
+        at.file_uploader[0].set_value((f"resume-{self.index}-{round_no}.pdf", RESUME_PDF, "application/pdf"))
+        at.text_area(key="job_description").input(f"{JOB_DESCRIPTION} (revision {round_no})")
+        self.rerun(at)
+        self.pause()
+        at.button[0].click()
+        self.rerun(at)
+
+    def step_hr(self, round_no: int) -> None:
+        self.at.text_area[0].input(f"{HR_QUESTION} ({round_no})")
+        self.at.button[0].click()
+        self.rerun(self.at)
+
+    def step_tailor(self, round_no: int) -> None:
+        at = self.at
+        at.file_uploader[0].set_value(("resume.pdf", RESUME_PDF, "application/pdf"))
+        at.text_input[0].input(f"{JOB_URL}?round={round_no}")
+        at.text_input[1].input("https://github.com/example")
+        at.text_area[0].input("Personal statement")
+        at.button[0].click()
+        self.rerun(at)
+
+
+def share_runtime_state() -> None:
+    """
+    Let concurrent AppTest runs share what one Streamlit server shares.
+
+    AppTest installs a mock `Runtime` singleton for the length of each run
+    and clears it afterwards, which breaks other sessions still running, so
+    fall back to a shared mock whenever the singleton is unset. It also
+    compiles the page on every run; a server compiles each page once into
+    its script cache, so all runs share one cache, filled up front because
+    concurrent `ast.parse` calls can fail on Python 3.11.
+    """
+    from unittest.mock import MagicMock
+
+    from streamlit.runtime import Runtime
+    from streamlit.runtime.scriptrunner.script_cache import ScriptCache
+    from streamlit.testing.v1 import app_test, local_script_runner
+    from streamlit.runtime.caching.storage.dummy_cache_storage import MemoryCacheStorageManager
+    from streamlit.runtime.media_file_manager import MediaFileManager
+    from streamlit.runtime.memory_media_file_storage import MemoryMediaFileStorage
+
+    shared = MagicMock(spec=Runtime)
+    shared.media_file_mgr = MediaFileManager(MemoryMediaFileStorage("/mock/media"))
+    shared.cache_storage_manager = MemoryCacheStorageManager()
+    Runtime.instance = classmethod(lambda cls: cls._instance or shared)
+
+    script_cache = ScriptCache()
+    for page in PAGES.values():
+        script_cache.get_bytecode(str(ROOT / page))
+    app_test.ScriptCache = local_script_runner.ScriptCache = lambda: script_cache
+
+
+def start_stub(args: argparse.Namespace) -> subprocess.Popen:
+    if args.replay:
+        command = [sys.executable, "-m", "benchmarks.replay_backend", str(args.replay),
+                   "--latency", args.replay_latency]
+    else:
+        command = [sys.executable, "-m", "benchmarks.stub_backend"]
+        if args.profile:
+            command += ["--profile", str(args.profile)]
+    command += ["--port", "0", "--scale", str(args.scale), "--seed", str(args.seed)]
+    return subprocess.Popen(command, cwd=ROOT, stdout=subprocess.PIPE, text=True,
+                            env=dict(os.environ, PYTHONPATH=str(ROOT)))
+
+
+def knee_point(steps: List[Dict]) -> Dict[str, Optional[int]]:
+    """
+    Knee = step with the highest power (reruns/s divided by p95 latency).
+    Saturation = first step whose throughput grew by less than 10% over the
+    previous one.
+    """
+    usable = [s for s in steps if s["rerun_ms"]["p95"] > 0]
+    knee = max(usable, key=lambda s: s["reruns_per_s"] / s["rerun_ms"]["p95"], default=None)
+    saturated = None
+    for previous, step in zip(steps, steps[1:]):
+        if step["reruns_per_s"] < previous["reruns_per_s"] * 1.10:
+            saturated = step["sessions"]
+            break
+    return {"knee_sessions": knee["sessions"] if knee else None, "saturated_sessions": saturated}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--ramp", default="1,2,4,8,16,32", help="total sessions at each step")
+    parser.add_argument("--duration", type=float, default=10.0, help="measured seconds per step")
+    parser.add_argument("--settle", type=float, default=2.0, help="unmeasured seconds after adding sessions")
+    parser.add_argument("--think", type=float, default=1.0, help="mean think time between actions (s)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply all stub phase durations")
+    parser.add_argument("--profile", type=Path, help="stub backend profile (see benchmarks.stub_backend)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--replay", type=Path, help="serve responses recorded with API_RECORD_DIR instead of the stub")
+    parser.add_argument("--replay-latency", default="distribution", help="replay latency mode (see benchmarks.replay_backend)")
+    parser.add_argument("--max-p95", type=float, default=30000.0, help="stop ramping above this p95 rerun latency (ms)")
+    parser.add_argument("--output", type=Path, help="write the report as JSON")
+    args = parser.parse_args()
+
+    ramp = sorted({int(n) for n in args.ramp.split(",")})
+    stub = start_stub(args)
+    # The backend may log to stdout before it announces its address
+    line = ""
+    while "listening on" not in line:
+        line = stub.stdout.readline()
+        if not line:
+            raise RuntimeError("backend process exited before it started listening")
+    url = line.rsplit(" ", 1)[-1].strip()
+    # Keep draining its output so a full pipe never blocks it
+    threading.Thread(target=stub.stdout.read, daemon=True).start()
+
+    os.environ["API_BASE_URL"] = url
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    from app.core.config import settings
+    settings.API_BASE_URL = url
+
+    share_runtime_state()
+    # Spilled session values of the simulated sessions go to a directory removed at exit
+    workdir = tempfile.TemporaryDirectory(prefix="jobfit-load-")
+    tempfile.tempdir = workdir.name
+    harness = Harness(args.think, args.seed)
+    steps: List[Dict] = []
+    gc.collect()
+    base_rss = current_rss_mb()
+
+    print(f"{'replay' if args.replay else 'stub'} backend {url}, flow mix {FLOW_MIX}, think {args.think}s, {args.duration}s per step")
+    print(f"{'sessions':>8} {'reruns/s':>9} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} "
+          f"{'errors':>7} {'CPU cores':>10} {'RSS MB':>8} {'MB/session':>11}")
+    try:
+        for sessions in ramp:
+            harness.add_sessions(sessions - len(harness.sessions))
+            time.sleep(args.settle)
+
+            harness.stats = stats = StepStats()
+            cpu_start, wall_start = cpu_seconds(), time.perf_counter()
+            time.sleep(args.duration)
+            harness.stats = StepStats()
+            wall = time.perf_counter() - wall_start
+            cpu = cpu_seconds() - cpu_start
+            rss = current_rss_mb()
+
+            total = len(stats.latencies) + stats.errors
+            step = {
+                "sessions": sessions,
+                "reruns_per_s": round(len(stats.latencies) / wall, 3),
+                "rerun_ms": summarize(stats.latencies),
+                "errors": stats.errors,
+                "error_rate": round(stats.errors / total, 4) if total else 0.0,
+                "cpu_cores": round(cpu / wall, 3),
+                "rss_mb": round(rss, 1),
+                "mb_per_session": round((rss - base_rss) / sessions, 2),
+            }
+            steps.append(step)
+            latency = step["rerun_ms"]
+            print(f"{sessions:>8} {step['reruns_per_s']:>9.2f} {latency['p50']:>8.0f} {latency['p95']:>8.0f} "
+                  f"{latency['p99']:>8.0f} {step['error_rate']:>7.1%} {step['cpu_cores']:>10.2f} "
+                  f"{step['rss_mb']:>8.0f} {step['mb_per_session']:>11.2f}")
+
+            if step["error_rate"] > MAX_ERROR_RATE or latency["p95"] > args.max_p95:
+                print(f"stopping ramp: error rate {step['error_rate']:.0%}, p95 {latency['p95']:.0f} ms")
+                break
+    finally:
+        harness.shutdown()
+        stub.terminate()
+        stub.wait()
+        tempfile.tempdir = None
+        workdir.cleanup()
+
+    report = knee_point(steps)
+    print()
+    print("Saturation report")
+    if report["knee_sessions"] is not None:
+        knee = next(s for s in steps if s["sessions"] == report["knee_sessions"])
+        print(f"  knee point:    {knee['sessions']} sessions "
+              f"({knee['reruns_per_s']:.2f} reruns/s, p95 {knee['rerun_ms']['p95']:.0f} ms, "
+              f"{knee['cpu_cores']:.2f} CPU cores)")
+    if report["saturated_sessions"] is not None:
+        print(f"  saturated at:  {report['saturated_sessions']} sessions (throughput grew < 10% over the previous step)")
+    else:
+        print("  throughput still scaling at the last step; extend --ramp")
+    if steps:
+        print(f"  memory:        ~{steps[-1]['mb_per_session']:.1f} MB per session at {steps[-1]['sessions']} sessions")
+
+    if args.output:
+        args.output.write_text(json.dumps({
+            "config": {**vars(args), "profile": str(args.profile) if args.profile else None,
+                       "replay": str(args.replay) if args.replay else None,
+                       "output": str(args.output), "flow_mix": FLOW_MIX, "cpus": os.cpu_count()},
+            "steps": steps,
+            "report": report,
+        }, indent=2), encoding="utf-8")
+        print(f"Report written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
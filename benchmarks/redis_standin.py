@@ -0,0 +1,202 @@
+"""
+Redis Stand-in
+
+A small in-memory server speaking the subset of the Redis protocol the
+result cache uses (PING, AUTH, SELECT, GET, SET with EX/PX/NX/XX, DEL,
+EXISTS, DBSIZE, FLUSHDB), so CACHE_BACKEND=redis can be run and
+benchmarked without a Redis installation. Total value size is bounded by
+`--max-bytes`, evicting the least recently used keys like Redis'
+`allkeys-lru` policy.
+
+Usage:
+    python -m benchmarks.redis_standin [--port 6379] [--max-bytes 268435456]
+    CACHE_BACKEND=redis CACHE_REDIS_URL=redis://127.0.0.1:6379/0 streamlit run Home_Dashboard.py
+"""
+
+import argparse
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+
+
+class Store:
+    """Keys with optional expiry, bounded by total value size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.entries: "OrderedDict[bytes, Tuple[bytes, Optional[float]]]" = OrderedDict()
+        self.lock = threading.Lock()
+
+    def _live(self, key: bytes) -> Optional[bytes]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] is not None and entry[1] <= time.monotonic():
+            self._remove(key)
+            return None
+        self.entries.move_to_end(key)
+        return entry[0]
+
+    def _remove(self, key: bytes) -> bool:
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return False
+        self.size -= len(entry[0])
+        return True
+
+    def get(self, key: bytes) -> Optional[bytes]:
+        with self.lock:
+            return self._live(key)
+
+    def set(self, key: bytes, value: bytes, ttl: Optional[float], nx: bool, xx: bool) -> bool:
+        with self.lock:
+            exists = self._live(key) is not None
+            if (nx and exists) or (xx and not exists):
+                return False
+            self._remove(key)
+            self.entries[key] = (value, None if ttl is None else time.monotonic() + ttl)
+            self.size += len(value)
+            while self.size > self.max_bytes and len(self.entries) > 1:
+                self._remove(next(iter(self.entries)))
+            return True
+
+    def delete(self, keys: List[bytes]) -> int:
+        with self.lock:
+            return sum(self._remove(key) for key in keys)
+
+    def exists(self, keys: List[bytes]) -> int:
+        with self.lock:
+            return sum(self._live(key) is not None for key in keys)
+
+
+class RedisHandler(socketserver.StreamRequestHandler):
+    """Serves one client connection."""
+
+    disable_nagle_algorithm = True
+
+    def handle(self) -> None:
+        while True:
+            try:
+                args = self._read_command()
+            except (ConnectionError, ValueError):
+                return
+            if args is None:
+                return
+            self.wfile.write(self._execute(args))
+            self.wfile.flush()
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        line = self.rfile.readline()
+        if not line:
+            return None
+        if not line.startswith(b"*"):
+            # Inline command, as typed in telnet
+            return line.split()
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def _execute(self, args: List[bytes]) -> bytes:
+        store: Store = self.server.store
+        command = args[0].upper() if args else b""
+        if command == b"PING":
+            return b"+PONG\r\n"
+        if command in (b"AUTH", b"SELECT"):
+            return b"+OK\r\n"
+        if command == b"GET" and len(args) == 2:
+            return _bulk(store.get(args[1]))
+        if command == b"SET" and len(args) >= 3:
+            ttl, nx, xx = None, False, False
+            options = [arg.upper() for arg in args[3:]]
+            i = 0
+            while i < len(options):
+                if options[i] in (b"EX", b"PX") and i + 1 < len(options):
+                    ttl = int(options[i + 1]) / (1 if options[i] == b"EX" else 1000)
+                    i += 2
+                    continue
+                if options[i] == b"NX":
+                    nx = True
+                elif options[i] == b"XX":
+                    xx = True
+                else:
+                    return b"-ERR syntax error\r\n"
+                i += 1
+            return b"+OK\r\n" if store.set(args[1], args[2], ttl, nx, xx) else _bulk(None)
+        if command == b"DEL" and len(args) >= 2:
+            return b":%d\r\n" % store.delete(args[1:])
+        if command == b"EXISTS" and len(args) >= 2:
+            return b":%d\r\n" % store.exists(args[1:])
+        if command == b"DBSIZE":
+            with store.lock:
+                return b":%d\r\n" % len(store.entries)
+        if command == b"FLUSHDB":
+            with store.lock:
+                store.entries.clear()
+                store.size = 0
+            return b"+OK\r\n"
+        return b"-ERR unknown command or wrong number of arguments\r\n"
+
+
+def _bulk(value: Optional[bytes]) -> bytes:
+    if value is None:
+        return b"$-1\r\n"
+    return b"$%d\r\n%s\r\n" % (len(value), value)
+
+
+class RedisStandin:
+    """
+    Run the stand-in in a background thread.
+
+    Example usage:
+        with RedisStandin() as redis:
+            os.environ["CACHE_REDIS_URL"] = redis.url
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, max_bytes: int = 256 * 1024 * 1024):
+        self.server = socketserver.ThreadingTCPServer((host, port), RedisHandler)
+        self.server.daemon_threads = True
+        self.server.store = Store(max_bytes)
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"redis://{host}:{port}/0"
+
+    def start(self) -> "RedisStandin":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "RedisStandin":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--max-bytes", type=int, default=256 * 1024 * 1024)
+    args = parser.parse_args()
+
+    standin = RedisStandin(args.host, args.port, args.max_bytes)
+    print(f"Redis stand-in listening on {standin.url}", flush=True)
+    try:
+        standin.server.serve_forever()
+    except KeyboardInterrupt:
+        standin.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+"""
+Replay Backend
+
+Serves backend responses recorded with API_RECORD_DIR, so benchmarks and
+load tests can run offline with real response bodies, headers and
+latencies.
+
+A request is matched to recordings by its fingerprint (the same one the
+client computes: endpoint, form fields, uploaded file names and content
+hashes). Unmatched requests get the recordings of the same endpoint in
+turn. Latency is replayed in one of three modes:
+
+- distribution: time to first byte and body time are drawn from all
+  recordings of the endpoint, seeded per endpoint and request number
+- recorded:     the matched recording's own timings
+- none:         answer immediately
+
+Usage:
+    API_RECORD_DIR=recordings/run1 streamlit run Home_Dashboard.py   # record
+    python -m benchmarks.replay_backend recordings/run1 [--port 8000] [--latency distribution]
+    python -m benchmarks.replay_backend recordings/run1 --summary
+"""
+
+import argparse
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from email import policy
+from email.parser import BytesParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Dict, List, Tuple
+from urllib.parse import parse_qsl
+
+from app.utils.api_clients.recording import fingerprint, iter_archive
+from benchmarks.bench_suite import percentile
+
+LATENCY_MODES = ("distribution", "recorded", "none")
+BODY_CHUNK = 8192
+
+
+def parse_form(content_type: str, body: bytes) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str, bytes]]]:
+    """Split a form body into (fields, files) for fingerprinting."""
+    if content_type.startswith("application/x-www-form-urlencoded"):
+        return parse_qsl(body.decode("utf-8"), keep_blank_values=True), []
+    if not content_type.startswith("multipart/form-data"):
+        return [], []
+
+    message = BytesParser(policy=policy.HTTP).parsebytes(
+        b"Content-Type: " + content_type.encode("latin-1") + b"\r\n\r\n" + body
+    )
+    fields, files = [], []
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition") or ""
+        filename = part.get_filename()
+        payload = part.get_payload(decode=True) or b""
+        if filename is None:
+            fields.append((name, payload.decode("utf-8")))
+        else:
+            files.append((name, filename, payload))
+    return fields, files
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    """Answers with recorded responses of `server.backend`."""
+
+    protocol_version = "HTTP/1.1"
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        length = int(self.headers.get("Content-Length") or 0)
+        body = self.rfile.read(length)
+        fields, files = parse_form(self.headers.get("Content-Type", ""), body)
+        key = fingerprint("POST", self.path, fields, files)
+
+        backend: ReplayBackend = self.server.backend
+        entry, payload, (wait_ms, body_ms) = backend.pick(self.path, key)
+        if entry is None:
+            self._send_status(404, b'{"detail": "No recording for this endpoint"}')
+            return
+
+        time.sleep(wait_ms / 1000)
+        self.send_response(entry["status"])
+        for name, value in entry["headers"].items():
+            if name.lower() != "x-request-id":
+                self.send_header(name, value)
+        self.send_header("Content-Length", str(len(payload)))
+        self.send_header("X-Request-ID", self.headers.get("X-Request-ID") or uuid.uuid4().hex)
+        self.end_headers()
+
+        # Pace the body over the recorded read time
+        chunks = [payload[i:i + BODY_CHUNK] for i in range(0, len(payload), BODY_CHUNK)] or [b""]
+        pause = body_ms / 1000 / len(chunks)
+        for chunk in chunks:
+            self.wfile.write(chunk)
+            if pause > 0.0005:
+                time.sleep(pause)
+
+    def _send_status(self, status: int, payload: bytes) -> None:
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+class ReplayBackend:
+    """
+    Run the replay server in a background thread.
+
+    Example usage:
+        with ReplayBackend("recordings/run1") as backend:
+            settings.API_BASE_URL = backend.url
+            ...
+    """
+
+    def __init__(
+        self,
+        archive: Path,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        latency: str = "distribution",
+        scale: float = 1.0,
+        seed: int = 0
+    ):
+        if latency not in LATENCY_MODES:
+            raise ValueError(f"latency must be one of {LATENCY_MODES}, got {latency!r}")
+        self.latency = latency
+        self.scale = scale
+        self.seed = seed
+        self.by_fingerprint: Dict[str, List[Tuple[Dict[str, Any], bytes]]] = defaultdict(list)
+        self.by_endpoint: Dict[str, List[Tuple[Dict[str, Any], bytes]]] = defaultdict(list)
+        for entry, payload in iter_archive(Path(archive)):
+            self.by_fingerprint[entry["fingerprint"]].append((entry, payload))
+            self.by_endpoint[entry["endpoint"]].append((entry, payload))
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), ReplayHandler)
+        self.server.daemon_threads = True
+        self.server.backend = self
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def pick(self, endpoint: str, key: str) -> Tuple[Any, bytes, Tuple[float, float]]:
+        """Choose the recording and the latency (ms to first byte, ms for the body) for a request."""
+        with self._lock:
+            number = self._requests[endpoint]
+            self._requests[endpoint] += 1
+        candidates = self.by_fingerprint.get(key) or self.by_endpoint.get(endpoint)
+        if not candidates:
+            return None, b"", (0.0, 0.0)
+        entry, payload = candidates[number % len(candidates)]
+
+        if self.latency == "none":
+            return entry, payload, (0.0, 0.0)
+        timings = entry["timings"]
+        if self.latency == "distribution":
+            rng = random.Random(f"{self.seed}:{endpoint}:{number}")
+            timings = rng.choice(self.by_endpoint[endpoint])[0]["timings"]
+        return entry, payload, (timings["server_wait_ms"] * self.scale, timings["body_ms"] * self.scale)
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "ReplayBackend":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "ReplayBackend":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def summary(backend: ReplayBackend) -> None:
+    """Print the recorded latency and size profile per endpoint."""
+    print(f"{'endpoint':<28} {'calls':>6} {'unique':>7} {'ttfb p50':>9} {'ttfb p95':>9} {'body p50':>9} {'KB p50':>7}")
+    for endpoint, recordings in sorted(backend.by_endpoint.items()):
+        entries = [entry for entry, _ in recordings]
+        waits = [e["timings"]["server_wait_ms"] for e in entries]
+        bodies = [e["timings"]["body_ms"] for e in entries]
+        sizes = [e["body_bytes"] / 1024 for e in entries]
+        unique = len({e["fingerprint"] for e in entries})
+        print(f"{endpoint:<28} {len(entries):>6} {unique:>7} {percentile(waits, 0.5):>9.0f} "
+              f"{percentile(waits, 0.95):>9.0f} {percentile(bodies, 0.5):>9.0f} {percentile(sizes, 0.5):>7.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("archive", type=Path, help="directory written with API_RECORD_DIR")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--latency", choices=LATENCY_MODES, default="distribution")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply all replayed latencies")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--summary", action="store_true", help="print the recorded profile and exit")
+    args = parser.parse_args()
+
+    backend = ReplayBackend(args.archive, args.host, args.port, args.latency, args.scale, args.seed)
+    if args.summary:
+        summary(backend)
+        backend.server.server_close()
+        return
+
+    print(f"Replay backend listening on {backend.url}", flush=True)
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        backend.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
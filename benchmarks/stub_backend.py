@@ -0,0 +1,367 @@
+"""
+Stub Backend
+
+A local stand-in for the JobFit backend API. It serves the four endpoints
+the frontend clients call, sleeps through simulated server phases, and
+answers with the same response shapes as the real backend. Every response
+echoes the request's `X-Request-ID` and reports its phases in a
+`Server-Timing` header, so client-side timing and request-ID correlation
+can be checked without the real backend.
+
+Phase latencies and response sizes come from a profile. The default is
+`DEFAULT_PROFILE`; a JSON file of the same shape can replace any part of
+it. A latency is written as "fixed:S", "uniform:LOW,HIGH" or
+"lognormal:MEDIAN,SIGMA" (seconds). Draws are seeded per endpoint and
+request number, so a run with the same seed sees the same latencies.
+
+With `--capacity N` at most N requests are worked on at once, like a
+backend with N workers; the others wait their turn, and the wait is
+reported as a `queue` Server-Timing phase. With `--max-queue M` as well, a
+request finding M others already waiting is turned away with 503 and
+`Retry-After`. `scale` and `set_capacity()` can be changed while the stub
+runs, to play a backend that degrades and recovers. With `--compress`,
+bodies are gzip-compressed for requests that accept gzip.
+
+Usage:
+    python -m benchmarks.stub_backend [--port 8000] [--scale 1.0] [--profile p.json] [--seed 0] [--capacity 0] [--max-queue 0] [--compress]
+    python -m benchmarks.stub_backend --demo    # call each client once against the stub
+"""
+
+import argparse
+import gzip
+import json
+import math
+import random
+import threading
+import time
+import uuid
+from collections import defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+# Simulated server phases (latency specs) and response size per endpoint
+DEFAULT_PROFILE: Dict[str, Dict[str, Any]] = {
+    "/api/ats-checker/check": {
+        "phases": {"parse": "lognormal:0.05,0.3", "llm": "lognormal:0.4,0.4"},
+        "payload_bytes": 4000,
+    },
+    "/api/hr-qa/answer": {
+        "phases": {"retrieve": "fixed:0.02", "llm": "lognormal:0.15,0.4"},
+        "payload_bytes": 1500,
+    },
+    "/api/job-analysis/analyze": {
+        "phases": {"scrape": "uniform:0.2,0.4", "llm": "lognormal:0.3,0.4"},
+        "payload_bytes": 3000,
+    },
+    "/api/resume-builder/check": {
+        "phases": {"parse": "lognormal:0.05,0.3", "scrape": "uniform:0.2,0.4", "llm": "lognormal:0.8,0.5"},
+        "payload_bytes": 6000,
+    },
+}
+
+
+def parse_latency(spec: str) -> Callable[[random.Random], float]:
+    """Turn a latency spec such as "lognormal:0.4,0.5" into a sampler."""
+    kind, _, args = spec.partition(":")
+    values = [float(v) for v in args.split(",") if v.strip()]
+    if kind == "fixed" and len(values) == 1:
+        return lambda rng: values[0]
+    if kind == "uniform" and len(values) == 2:
+        return lambda rng: rng.uniform(values[0], values[1])
+    if kind == "lognormal" and len(values) == 2:
+        mu = math.log(values[0])
+        return lambda rng: rng.lognormvariate(mu, values[1])
+    raise ValueError(f"Invalid latency spec: {spec!r}")
+
+
+def load_profile(path: Optional[Path] = None) -> Dict[str, Dict[str, Any]]:
+    """Return the default profile, updated per endpoint from a JSON file."""
+    profile = {endpoint: dict(spec) for endpoint, spec in DEFAULT_PROFILE.items()}
+    if path is not None:
+        for endpoint, spec in json.loads(Path(path).read_text(encoding="utf-8")).items():
+            profile.setdefault(endpoint, {}).update(spec)
+    for spec in profile.values():
+        for latency in spec.get("phases", {}).values():
+            parse_latency(latency)
+    return profile
+
+
+def pad_payload(payload: dict, field: Tuple[str, ...], size: int) -> dict:
+    """Grow the text at `field` until the JSON body is about `size` bytes."""
+    missing = size - len(json.dumps(payload))
+    if missing > 0:
+        target = payload
+        for key in field[:-1]:
+            target = target[key]
+        filler = " Lorem ipsum dolor sit amet, consectetur adipiscing elit."
+        target[field[-1]] += (filler * (missing // len(filler) + 1))[:missing]
+    return payload
+
+
+def ats_body() -> dict:
+    return {"response": {
+        "match_score": 72,
+        "matched_keywords": ["python", "sql", "docker", "aws"],
+        "missing_keywords": ["kubernetes", "terraform"],
+        "summary": "Strong backend profile; infrastructure-as-code experience is missing.",
+        "recommendations": [{
+            "title": "Add infrastructure keywords",
+            "description": "The posting asks for Kubernetes and Terraform.",
+            "action_items": ["Mention any cluster deployments", "List Terraform modules you have written"],
+        }],
+    }}
+
+
+def hr_body() -> dict:
+    return {"response": "Use the STAR method: describe the Situation, Task, Action and Result."}
+
+
+def job_analysis_body() -> dict:
+    return {"response": "## Key skills\n- Python\n- SQL\n\n## Responsibilities\n- Build data pipelines\n"}
+
+
+def resume_builder_body() -> dict:
+    return {"result": "## Tailored resume\n- Highlight data pipeline work\n- Move AWS experience up\n"}
+
+
+# Body builder and the text field padded to reach the configured size
+ENDPOINT_BODIES: Dict[str, Tuple[Callable[[], dict], Tuple[str, ...]]] = {
+    "/api/ats-checker/check": (ats_body, ("response", "summary")),
+    "/api/hr-qa/answer": (hr_body, ("response",)),
+    "/api/job-analysis/analyze": (job_analysis_body, ("response",)),
+    "/api/resume-builder/check": (resume_builder_body, ("result",)),
+}
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """Serves the stub endpoints of `server.backend`."""
+
+    protocol_version = "HTTP/1.1"
+    # Headers and body are separate writes; with Nagle on, the body waits for a delayed ACK
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+    def do_POST(self) -> None:
+        start = time.perf_counter()
+        length = int(self.headers.get("Content-Length") or 0)
+        self.rfile.read(length)
+
+        backend: StubBackend = self.server.backend
+        if self.path not in backend.profile or self.path not in ENDPOINT_BODIES:
+            self._send(404, {"detail": "Not Found"}, [])
+            return
+
+        timings = []
+        with backend.worker_slot(timings) as admitted:
+            if not admitted:
+                self._send(503, {"detail": "Service overloaded"}, [],
+                           {"Retry-After": str(backend.retry_after)})
+                return
+            for name, seconds in backend.draw_phases(self.path):
+                phase_start = time.perf_counter()
+                time.sleep(seconds)
+                timings.append((name, (time.perf_counter() - phase_start) * 1000))
+        timings.append(("total", (time.perf_counter() - start) * 1000))
+
+        build, field = ENDPOINT_BODIES[self.path]
+        size = backend.profile[self.path].get("payload_bytes", 0)
+        self._send(200, pad_payload(build(), field, size), timings)
+
+    def _send(self, status: int, payload: dict, timings: List[Tuple[str, float]],
+              headers: Optional[Dict[str, str]] = None) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        accepted = {encoding.split(";")[0].strip() for encoding in (self.headers.get("Accept-Encoding") or "").split(",")}
+        compress = self.server.backend.compress and "gzip" in accepted
+        if compress:
+            body = gzip.compress(body, compresslevel=6)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        if compress:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("X-Request-ID", self.headers.get("X-Request-ID") or uuid.uuid4().hex)
+        if timings:
+            self.send_header("Server-Timing", ", ".join(f"{name};dur={ms:.1f}" for name, ms in timings))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubBackend:
+    """
+    Run the stub backend in a background thread.
+
+    Example usage:
+        with StubBackend(scale=0.1) as backend:
+            settings.API_BASE_URL = backend.url
+            ...
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        scale: float = 1.0,
+        profile: Optional[Dict[str, Dict[str, Any]]] = None,
+        seed: int = 0,
+        capacity: int = 0,
+        max_queue: int = 0,
+        retry_after: int = 1,
+        compress: bool = False
+    ):
+        self.profile = profile or load_profile()
+        self.compress = compress
+        self.scale = scale
+        self.seed = seed
+        self.capacity = capacity
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._workers = threading.Condition()
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.waiting = 0
+        self.rejected = 0
+        self._samplers = {
+            endpoint: [(name, parse_latency(latency)) for name, latency in spec.get("phases", {}).items()]
+            for endpoint, spec in self.profile.items()
+        }
+        self._requests: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self.server = ThreadingHTTPServer((host, port), StubHandler)
+        self.server.daemon_threads = True
+        self.server.backend = self
+        self._thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def draw_phases(self, endpoint: str) -> List[Tuple[str, float]]:
+        """Phase durations in seconds for the next request to `endpoint`."""
+        with self._lock:
+            number = self._requests[endpoint]
+            self._requests[endpoint] += 1
+        rng = random.Random(f"{self.seed}:{endpoint}:{number}")
+        return [(name, sample(rng) * self.scale) for name, sample in self._samplers[endpoint]]
+
+    def set_capacity(self, capacity: int) -> None:
+        """Change the number of workers (0: no limit) while the stub runs."""
+        with self._workers:
+            self.capacity = capacity
+            self._workers.notify_all()
+
+    @contextmanager
+    def worker_slot(self, timings: List[Tuple[str, float]]) -> Iterator[bool]:
+        """Hold one of the `capacity` workers while a request is worked on; yields False if it was turned away."""
+        wait_start = time.perf_counter()
+        with self._workers:
+            admitted = not (self.capacity and self.in_flight >= self.capacity
+                            and self.max_queue and self.waiting >= self.max_queue)
+            if admitted:
+                self.waiting += 1
+                while self.capacity and self.in_flight >= self.capacity:
+                    self._workers.wait()
+                self.waiting -= 1
+                self.in_flight += 1
+                self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            else:
+                self.rejected += 1
+        if not admitted:
+            yield False
+            return
+        if self.capacity:
+            timings.append(("queue", (time.perf_counter() - wait_start) * 1000))
+        try:
+            yield True
+        finally:
+            with self._workers:
+                self.in_flight -= 1
+                self._workers.notify()
+
+    @property
+    def url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubBackend":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+    def __enter__(self) -> "StubBackend":
+        return self.start()
+
+    def __exit__(self, *exc) -> None:
+        self.stop()
+
+
+def demo(backend: StubBackend) -> None:
+    """Call each client once against the stub and print its timing split."""
+    import io
+
+    from app.core.config import settings
+    from app.utils.api_clients import http_client
+    from app.utils.api_clients.ats_client import check_resume_against_job_description
+    from app.utils.api_clients.hr_qa_client import hr_qa_client
+    from app.utils.api_clients.job_posting_analyser_client import analyze_job_posting
+    from app.utils.api_clients.resume_tailor_client import tailor_resume_and_guide
+
+    class UploadedFile(io.BytesIO):
+        name = "resume.pdf"
+        type = "application/pdf"
+
+    calls = []
+    original = http_client._record_metrics
+
+    def capture(call):
+        calls.append(call)
+        original(call)
+
+    http_client._record_metrics = capture
+    with backend:
+        settings.API_BASE_URL = backend.url
+        check_resume_against_job_description(UploadedFile(b"%PDF-1.4"), "Python developer")
+        hr_qa_client("How do I answer 'tell me about yourself'?")
+        analyze_job_posting("https://example.com/jobs/1")
+        tailor_resume_and_guide(UploadedFile(b"%PDF-1.4"), "https://example.com/jobs/1", "", "")
+
+    for call in calls:
+        phases = ", ".join(f"{name} {ms:.0f}" for name, ms in call.server_timing.items())
+        print(f"{call.endpoint:<28} {call.request_id}  total {call.duration_ms:6.1f} ms  "
+              f"network {call.network_ms:5.1f} ms  server: {phases}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply all phase durations")
+    parser.add_argument("--profile", type=Path, help="JSON file overriding DEFAULT_PROFILE per endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--capacity", type=int, default=0, help="requests worked on at once (0: no limit)")
+    parser.add_argument("--max-queue", type=int, default=0, help="waiting requests before 503s (0: no limit)")
+    parser.add_argument("--compress", action="store_true", help="gzip bodies for requests accepting gzip")
+    parser.add_argument("--demo", action="store_true", help="call each client once against the stub")
+    args = parser.parse_args()
+
+    profile = load_profile(args.profile)
+    if args.demo:
+        demo(StubBackend(args.host, 0, args.scale, profile, args.seed, args.capacity, args.max_queue,
+                         compress=args.compress))
+        return
+
+    backend = StubBackend(args.host, args.port, args.scale, profile, args.seed, args.capacity, args.max_queue,
+                          compress=args.compress)
+    print(f"Stub backend listening on {backend.url}", flush=True)
+    try:
+        backend.server.serve_forever()
+    except KeyboardInterrupt:
+        backend.server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -9,18 +9,34 @@ This module provides a professional Streamlit interface for users to:
 2. Input a job description
 3. Get analysis of how well their resume matches the job description
 
-The main functionality is delegated to the resume_analyser component.
+The main functionality is delegated to the resume_analyser component. The
+input and analysis sections are fragments, so interacting with them does not
+rerun the styling, header, sidebar and footer. Once both inputs are there,
+the input section prepares them. When SPECULATION_ATS_MAX_PER_SESSION is
+raised above its default of 0, it also starts the ATS check speculatively, so
+"Analyze Resume" mostly just displays the result.
 """
 
 import streamlit as st
-import time
-from typing import Optional
-import os
-from datetime import datetime
-
-from app.components.resume_analyser import resume_analyzer
+from typing import TYPE_CHECKING
+
+from app.components.queue_status import queue_status
+from app.components.resume_analyser import (
+    ATS_SPECULATION,
+    AnalysisInputs,
+    analysis_sections,
+    prepare_analysis_inputs,
+    speculate_resume_analysis,
+)
+from app.core import assets, session_store, speculation
 from app.core.logger import get_logger
 from app.core.exceptions import CustomException
+from app.core.metrics import instrument_fragment, instrument_page
+from app.core.tracing import span
+
+if TYPE_CHECKING:
+    # Loaded with the first report, so the page renders before pydantic is imported
+    from app.schema.ats_report import AtsReport
 
 # Initialize logger
 logger = get_logger(__name__)
@@ -33,6 +49,7 @@ BG_COLOR = "#F5F5F5"
 TEXT_COLOR = "#212121"
 
 
+@span("page_setup")
 def page_setup():
     """Configure the page with custom theme and layout."""
     try:
@@ -43,56 +60,15 @@ def page_setup():
             initial_sidebar_state="expanded"
         )
         
-        # Custom CSS styling
-        st.markdown("""
-        <style>
-        .main {
-            background-color: #F5F5F5;
-            padding: 20px;
-        }
-        .stButton > button {
-            background-color: #4CAF50;
-            color: white;
-            font-weight: bold;
-            border: none;
-            padding: 10px 24px;
-            border-radius: 4px;
-            transition-duration: 0.4s;
-        }
-        .stButton > button:hover {
-            background-color: #45a049;
-        }
-        .stTextArea > div > div > textarea {
-            border-radius: 4px;
-            border: 1px solid #ddd;
-        }
-        .stUploadButton > div {
-            border-radius: 4px;
-            border: 1px solid #ddd;
-        }
-        .stProgress > div > div > div {
-            background-color: #4CAF50;
-        }
-        h1 {
-            color: #212121;
-            font-weight: bold;
-        }
-        h2 {
-            color: #424242;
-        }
-        .stAlert > div {
-            border-radius: 4px;
-            padding: 15px;
-        }
-        </style>
-        """, unsafe_allow_html=True)
+        assets.apply_stylesheet("ats_dashboard")
         
-        logger.debug("Page setup complete with custom styling")
+        logger.debug("Page setup complete with custom styling", rate_limit=60)
     except Exception as e:
-        logger.error(f"Error in page setup: {str(e)}")
+        logger.error("Error in page setup: %s", e)
         raise CustomException(e)
 
 
+@span("display_header")
 def display_header():
     """Display the header section with logo and title."""
     try:
@@ -117,12 +93,13 @@ def display_header():
         # Divider
         st.markdown("<hr style='margin: 20px 0; border: 0; border-top: 1px solid #ddd;'>", unsafe_allow_html=True)
         
-        logger.debug("Header section displayed")
+        logger.debug("Header section displayed", rate_limit=60)
     except Exception as e:
-        logger.error(f"Error displaying header: {str(e)}")
+        logger.error("Error displaying header: %s", e)
         raise CustomException(e)
 
 
+@span("display_sidebar")
 def display_sidebar():
     """Configure and display the sidebar with helpful information."""
     try:
@@ -147,48 +124,38 @@ def display_sidebar():
             - Get suggestions for improvement
             """)
             
-        logger.debug("Sidebar information displayed")
+        logger.debug("Sidebar information displayed", rate_limit=60)
     except Exception as e:
-        logger.error(f"Error displaying sidebar: {str(e)}")
+        logger.error("Error displaying sidebar: %s", e)
         raise CustomException(e)
 
 
-def save_uploaded_file(uploaded_file) -> Optional[str]:
-    """
-    Save the uploaded file to a temporary location and return the path.
-    
-    Args:
-        uploaded_file: The uploaded file from Streamlit
-        
-    Returns:
-        Optional[str]: The path to the saved file, or None if saving failed
-    """
-    try:
-        if uploaded_file is None:
-            return None
-            
-        # Create temp directory if it doesn't exist
-        temp_dir = "temp_uploads"
-        os.makedirs(temp_dir, exist_ok=True)
-        
-        # Create a unique filename with timestamp
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        file_path = os.path.join(temp_dir, f"{timestamp}_{uploaded_file.name}")
-        
-        # Save the file
-        with open(file_path, "wb") as f:
-            f.write(uploaded_file.getbuffer())
-            
-        logger.info(f"Saved uploaded file to {file_path}")
-        return file_path
-        
-    except Exception as e:
-        logger.error(f"Error saving uploaded file: {str(e)}")
-        return None
+def _analysis_inputs(resume_file, job_description: str) -> tuple:
+    """Identify the inputs a report was computed for."""
+    return (resume_file.file_id if resume_file else None, job_description)
+
+
+def _prepared_inputs(resume_file, job_description: str) -> AnalysisInputs:
+    """The inputs prepared for the ATS checker, computed once per upload and job description."""
+    inputs = _analysis_inputs(resume_file, job_description)
+    prepared = st.session_state.get("prepared_inputs")
+    if prepared is None or prepared[0] != inputs:
+        previous = prepared[1] if prepared is not None else None
+        prepared = st.session_state.prepared_inputs = (
+            inputs, prepare_analysis_inputs(resume_file, job_description, previous)
+        )
+    return prepared[1]
+
 
+@st.fragment
+@instrument_fragment("ats_dashboard", "input_panel")
+def input_panel():
+    """
+    Display the input section for resume upload and job description.
 
-def display_input_section():
-    """Display the input section for resume upload and job description."""
+    A fragment: uploading a file or editing the job description reruns only
+    this panel. The analysis panel reads the values through their widget keys.
+    """
     try:
         # Use columns for layout
         col1, col2 = st.columns(2)
@@ -201,21 +168,13 @@ def display_input_section():
             resume_file = st.file_uploader(
                 "Upload your resume (PDF only)",
                 type=["pdf"],
-                help="Only PDF files are accepted. Make sure text is selectable in your PDF."
+                help="Only PDF files are accepted. Make sure text is selectable in your PDF.",
+                key="resume_upload"
             )
             
             if resume_file:
                 st.success(f"✅ Resume uploaded: {resume_file.name}")
                 
-                # Save file info in session state
-                if "resume_file" not in st.session_state or st.session_state.resume_file != resume_file:
-                    st.session_state.resume_file = resume_file
-                    st.session_state.resume_file_path = save_uploaded_file(resume_file)
-                    
-                    # Clear previous results if any
-                    if "analysis_results" in st.session_state:
-                        del st.session_state.analysis_results
-                
         with col2:
             st.markdown("""
             <h3 style="color: #424242;">📝 Job Description</h3>
@@ -227,147 +186,304 @@ def display_input_section():
                 help="Copy and paste the complete job description for accurate analysis",
                 key="job_description"
             )
-            
-            # Save job description in session state
-            if "job_description" not in st.session_state or st.session_state.job_description != job_description:
-                st.session_state.job_description = job_description
-                
-                # Clear previous results if any
-                if "analysis_results" in st.session_state:
-                    del st.session_state.analysis_results
-        
-        # Center the analyze button
-        col1, col2, col3 = st.columns([1, 2, 1])
         
-        with col2:
-            analyze_btn = st.button(
-                "🔍 Analyze Resume",
-                help="Click to analyze how well your resume matches the job description",
-                use_container_width=True,
-                type="primary"
-            )
-            
-            # Initialize the session state for results if not exists
-            if "analysis_results" not in st.session_state:
-                st.session_state.analysis_results = None
+        # Prepare complete inputs right away and check them in the background; other inputs drop that check
+        if resume_file and job_description.strip():
+            prepared = _prepared_inputs(resume_file, job_description)
+            if prepared.is_pdf:
+                if prepared.resume_text == "":
+                    st.warning("No text could be read from this PDF; if it is a scan, an ATS will not read it either. "
+                               "Export your resume from a word processor for an accurate analysis.")
+                speculate_resume_analysis(resume_file, prepared)
+            else:
+                speculation.discard(ATS_SPECULATION)
+                st.warning("This file does not look like a PDF. Please upload your resume as a PDF.")
+        else:
+            speculation.discard(ATS_SPECULATION)
         
-        # Return values needed by the calling function
-        return resume_file, job_description, analyze_btn
+        # Results of other inputs are stale; the results panel only redraws on a full rerun
+        inputs = _analysis_inputs(resume_file, job_description)
+        if st.session_state.get("analysis_results") is not None and st.session_state.get("analysis_inputs") != inputs:
+            session_store.put("analysis_results", None)
+            st.rerun(scope="app")
         
     except Exception as e:
-        logger.error(f"Error in input section: {str(e)}")
+        if type(e).__module__.startswith("streamlit"):
+            raise
+        logger.error("Error in input section: %s", e)
         raise CustomException(e)
 
 
-def display_results(results):
+@st.fragment
+@instrument_fragment("ats_dashboard", "analysis_panel")
+def analysis_panel():
     """
-    Display the analysis results in an organized, user-friendly format.
-    
-    Args:
-        results: The analysis results from the resume_analyzer function
+    Display the analyze button and the results.
+
+    A fragment: clicking the button streams the report into this panel
+    without rerunning the rest of the page.
     """
-    try:
-        if not results:
+    # Center the analyze button
+    col1, col2, col3 = st.columns([1, 2, 1])
+    
+    with col2:
+        analyze_btn = st.button(
+            "🔍 Analyze Resume",
+            help="Click to analyze how well your resume matches the job description",
+            use_container_width=True,
+            type="primary"
+        )
+    
+    resume_file = st.session_state.get("resume_upload")
+    job_description = st.session_state.get("job_description") or ""
+    
+    # Process analysis if the button is clicked
+    streamed = False
+    if analyze_btn:
+        if resume_file is None:
+            st.error("Please upload your resume first.")
+            logger.warning("Analysis attempted without resume upload")
             return
             
-        # st.markdown("<hr style='margin: 30px 0; border: 0; border-top: 1px solid #ddd;'>", unsafe_allow_html=True)
+        if not job_description.strip():
+            st.error("Please paste the job description.")
+            logger.warning("Analysis attempted without job description")
+            return
+            
+        try:
+            # Sections are rendered as soon as they arrive
+            with st.spinner("Analyzing your resume against the job description..."):
+                results = stream_results(resume_file, _prepared_inputs(resume_file, job_description))
+                streamed = True
+                
+                # Store results in session state, under the session memory budget
+                session_store.put("analysis_results", results)
+                st.session_state.analysis_inputs = _analysis_inputs(resume_file, job_description)
+            
+            if results:
+                st.success("Analysis complete!")
+                logger.info("Resume analysis completed successfully")
+            else:
+                st.error("Failed to analyze resume. Please try again.")
+                logger.error("Resume analysis returned no results")
+                
+        except CustomException as ce:
+            st.error(f"Error: {str(ce)}")
+            logger.error("Custom error during resume analysis: %s", ce)
+        except Exception as e:
+            st.error("An unexpected error occurred. Please try again later.")
+            logger.error("Unexpected error in resume analysis: %s", e)
+    
+    # Display results from session state unless they were just streamed
+    analysis_results = None if streamed else session_store.get("analysis_results")
+    if analysis_results:
+        display_results(analysis_results)
+
+
+class ReportView:
+    """
+    Placeholders for each section of the ATS report.
+
+    The layout is created up front so that sections can be filled in as soon
+    as they arrive: match score first, then keywords, then recommendations.
+    """
+
+    def __init__(self):
+        st.markdown("<hr style='margin: 30px 0; border: 0; border-top: 1px solid #ddd;'>", unsafe_allow_html=True)
         
-        # st.markdown("""
-        # <h2 style="text-align: center; color: #424242;">🎯 Analysis Results</h2>
-        # """, unsafe_allow_html=True)
+        st.markdown("""
+        <h2 style="text-align: center; color: #424242;">🎯 Analysis Results</h2>
+        """, unsafe_allow_html=True)
         
-        # # Display the match score prominently
-        # match_score = results.get("match_score", 0)
+        self.score = st.empty()
+        self.score.info("Waiting for match score...")
         
-        # st.markdown(f"""
-        # <div style="text-align: center; margin: 20px 0;">
-        #     <h1 style="font-size: 3rem; margin-bottom: 0px;">{match_score}%</h1>
-        #     <p style="color: #757575; margin-top: 0px;">Resume match score</p>
-        # </div>
-        # """, unsafe_allow_html=True)
+        # Create tabs for different sections of results
+        tab1, tab2, tab3 = st.tabs(["📊 Summary", "🔑 Keywords", "💡 Recommendations"])
+        with tab1:
+            self.summary = st.empty()
+        with tab2:
+            self.keywords = st.empty()
+        with tab3:
+            self.recommendations = st.empty()
         
-        # # Create tabs for different sections of results
-        # tab1, tab2, tab3 = st.tabs(["📊 Summary", "🔑 Keywords", "💡 Recommendations"])
+        self.sections = {}
+
+    def update(self, section: str, value) -> None:
+        """
+        Render one report section into its placeholder.
         
-        # with tab1:
-        #     st.markdown("""
-        #     <h3 style="color: #424242;">Analysis Summary</h3>
-        #     """, unsafe_allow_html=True)
-            
-        #     # Create columns for the summary stats
-        #     col1, col2, col3 = st.columns(3)
-            
-        #     with col1:
-        #         st.metric("Matched Keywords", results.get("matched_keywords_count", 0))
-                
-        #     with col2:
-        #         st.metric("Missing Keywords", results.get("missing_keywords_count", 0))
-                
-        #     with col3:
-        #         st.metric("Total Keywords", results.get("total_keywords_count", 0))
-                
-        #     # Display summary text
-        #     st.markdown(results.get("summary", ""))
+        Args:
+            section: Name of the AtsReport field that arrived
+            value: Validated value of the section
+        """
+        self.sections[section] = value
+        
+        with span("render_section", section=section):
+            self._render(section, value)
+
+    def _render(self, section: str, value) -> None:
+        if section == "match_score":
+            render_match_score(self.score, value)
+        elif section in ("matched_keywords", "missing_keywords"):
+            render_keywords(
+                self.keywords,
+                self.sections.get("matched_keywords"),
+                self.sections.get("missing_keywords")
+            )
+            render_summary(self.summary, self.sections)
+        elif section == "summary":
+            render_summary(self.summary, self.sections)
+        elif section == "recommendations":
+            render_recommendations(self.recommendations, value)
+
+    def report(self) -> "AtsReport":
+        """Build the complete report from the sections received so far."""
+        from app.schema.ats_report import AtsReport
+        return AtsReport(**self.sections)
+
+
+def render_match_score(slot, match_score: float) -> None:
+    """Display the match score prominently."""
+    slot.markdown(f"""
+    <div style="text-align: center; margin: 20px 0;">
+        <h1 style="font-size: 3rem; margin-bottom: 0px;">{match_score:g}%</h1>
+        <p style="color: #757575; margin-top: 0px;">Resume match score</p>
+    </div>
+    """, unsafe_allow_html=True)
+
+
+def render_summary(slot, sections: dict) -> None:
+    """Display the summary stats and summary text."""
+    matched = sections.get("matched_keywords") or []
+    missing = sections.get("missing_keywords") or []
+    
+    with slot.container():
+        st.markdown("""
+        <h3 style="color: #424242;">Analysis Summary</h3>
+        """, unsafe_allow_html=True)
+        
+        # Create columns for the summary stats
+        col1, col2, col3 = st.columns(3)
         
-        # with tab2:
-        #     # Create columns for matched vs missing keywords
-        #     col1, col2 = st.columns(2)
+        with col1:
+            st.metric("Matched Keywords", len(matched))
             
-        #     with col1:
-        #         st.markdown("""
-        #         <h3 style="color: #4CAF50;">✅ Matched Keywords</h3>
-        #         """, unsafe_allow_html=True)
-                
-        #         matched_keywords = results.get("matched_keywords", [])
-                
-        #         if matched_keywords:
-        #             for keyword in matched_keywords:
-        #                 st.markdown(f"- **{keyword}**")
-        #         else:
-        #             st.info("No matched keywords found.")
+        with col2:
+            st.metric("Missing Keywords", len(missing))
             
-        #     with col2:
-        #         st.markdown("""
-        #         <h3 style="color: #F44336;">❌ Missing Keywords</h3>
-        #         """, unsafe_allow_html=True)
-                
-        #         missing_keywords = results.get("missing_keywords", [])
-                
-        #         if missing_keywords:
-        #             for keyword in missing_keywords:
-        #                 st.markdown(f"- **{keyword}**")
-        #         else:
-        #             st.success("No missing keywords - great job!")
+        with col3:
+            st.metric("Total Keywords", len(matched) + len(missing))
+            
+        # Display summary text
+        st.markdown(sections.get("summary", ""))
+
+
+def render_keywords(slot, matched_keywords, missing_keywords) -> None:
+    """Display matched vs missing keywords; a side still downloading shows a spinner text."""
+    with slot.container():
+        col1, col2 = st.columns(2)
         
-        # with tab3:
-        #     st.markdown("""
-        #     <h3 style="color: #424242;">Recommendations</h3>
-        #     """, unsafe_allow_html=True)
+        with col1:
+            st.markdown("""
+            <h3 style="color: #4CAF50;">✅ Matched Keywords</h3>
+            """, unsafe_allow_html=True)
             
-        #     recommendations = results.get("recommendations", [])
+            if matched_keywords is None:
+                st.caption("Loading...")
+            elif matched_keywords:
+                st.markdown("\n".join(f"- **{keyword}**" for keyword in matched_keywords))
+            else:
+                st.info("No matched keywords found.")
+        
+        with col2:
+            st.markdown("""
+            <h3 style="color: #F44336;">❌ Missing Keywords</h3>
+            """, unsafe_allow_html=True)
             
-        #     if recommendations:
-        #         for i, rec in enumerate(recommendations, 1):
-        #             st.markdown(f"### {i}. {rec.get('title', 'Recommendation')}")
-        #             st.markdown(rec.get("description", ""))
-                    
-        #             if "action_items" in rec:
-        #                 st.markdown("**Action Items:**")
-        #                 for item in rec["action_items"]:
-        #                     st.markdown(f"- {item}")
-        #     else:
-        #         st.info("No specific recommendations available.")
+            if missing_keywords is None:
+                st.caption("Loading...")
+            elif missing_keywords:
+                st.markdown("\n".join(f"- **{keyword}**" for keyword in missing_keywords))
+            else:
+                st.success("No missing keywords - great job!")
+
+
+def render_recommendations(slot, recommendations) -> None:
+    """Display the recommendations with their action items."""
+    with slot.container():
+        st.markdown("""
+        <h3 style="color: #424242;">Recommendations</h3>
+        """, unsafe_allow_html=True)
         
-        # Add download button for detailed report if available
-        st.markdown(results)
+        if recommendations:
+            for i, rec in enumerate(recommendations, 1):
+                st.markdown(f"### {i}. {rec.title}")
+                st.markdown(rec.description)
+                
+                if rec.action_items:
+                    st.markdown("**Action Items:**")
+                    st.markdown("\n".join(f"- {item}" for item in rec.action_items))
+        else:
+            st.info("No specific recommendations available.")
+
+
+@span("render_results")
+def display_results(results):
+    """
+    Display the analysis results in an organized, user-friendly format.
+    
+    Args:
+        results: The analysis results, either a structured AtsReport or a
+                 markdown report from the legacy backend response
+    """
+    try:
+        if not results:
+            return
+            
+        from app.schema.ats_report import AtsReport
+        if isinstance(results, AtsReport):
+            view = ReportView()
+            for section, value in results:
+                view.update(section, value)
+        else:
+            st.markdown(results)
             
         logger.debug("Results displayed successfully")
         
     except Exception as e:
-        logger.error(f"Error displaying results: {str(e)}")
+        logger.error("Error displaying results: %s", e)
         st.error("Error displaying results. Please try again.")
 
 
+@span("stream_results")
+def stream_results(resume_file, inputs: AnalysisInputs):
+    """
+    Render the analysis progressively while the report is downloading, or at once
+    if it was checked speculatively.
+    
+    Args:
+        resume_file: The uploaded resume file object
+        inputs: The prepared resume and job description
+        
+    Returns:
+        The complete AtsReport, the legacy markdown report, or None
+    """
+    view = None
+    
+    with queue_status():
+        for section, value in analysis_sections(resume_file, inputs):
+            if section == "markdown":
+                st.markdown(value)
+                return value
+            if view is None:
+                view = ReportView()
+            view.update(section, value)
+        
+    return view.report() if view else None
+
+
+@span("display_footer")
 def display_footer():
     """Display the footer section with additional information."""
     try:
@@ -380,13 +496,19 @@ def display_footer():
         </div>
         """, unsafe_allow_html=True)
         
-        logger.debug("Footer displayed")
+        logger.debug("Footer displayed", rate_limit=60)
     except Exception as e:
-        logger.error(f"Error displaying footer: {str(e)}")
+        logger.error("Error displaying footer: %s", e)
 
 
+@instrument_page("ats_dashboard")
 def ats_checker():
-    """Main function for the ATS Checker page."""
+    """
+    Main function for the ATS Checker page.
+
+    Only the first load and explicit full reruns run this whole function;
+    the input and analysis panels are fragments that rerun on their own.
+    """
     try:
         logger.info("Initializing ATS Checker page")
 
@@ -399,68 +521,18 @@ def ats_checker():
         # Display header
         display_header()
         
-        # Display input section and get user inputs
-        resume_file, job_description, analyze_btn = display_input_section()
-    
-        # Process analysis if the button is clicked
-        if analyze_btn:
-            if resume_file is None:
-                st.error("Please upload your resume first.")
-                logger.warning("Analysis attempted without resume upload")
-                return
-                
-            if not job_description.strip():
-                st.error("Please paste the job description.")
-                logger.warning("Analysis attempted without job description")
-                return
-                
-            try:
-                # Show processing animation
-                with st.spinner("Analyzing your resume against the job description..."):
-                    # Artificial delay to show progress bar
-
-                    
-                    # Get resume file path from session state
-
-                    
-                    # Perform the analysis
-                    progress_bar = st.progress(5)
-                    results = resume_analyzer(resume_file, job_description)
-                    for i in range(100):
-
-                        time.sleep(0.05)
-                        progress_bar.progress(i + 1)
-
-                    
-                    # Store results in session state
-                    st.session_state.analysis_results = results
-                    
-                # Remove progress bar after completion
-                progress_bar.empty()
-                
-                if results:
-                    st.success("Analysis complete! View your results below.")
-                    logger.info("Resume analysis completed successfully")
-                else:
-                    st.error("Failed to analyze resume. Please try again.")
-                    logger.error("Resume analysis returned no results")
-                    
-            except CustomException as ce:
-                st.error(f"Error: {str(ce)}")
-                logger.error(f"Custom error during resume analysis: {str(ce)}")
-            except Exception as e:
-                st.error("An unexpected error occurred. Please try again later.")
-                logger.error(f"Unexpected error in resume analysis: {str(e)}")
-        
-        # Display results if available in session state
-        if "analysis_results" in st.session_state and st.session_state.analysis_results:
-            display_results(st.session_state.analysis_results)
+        # Inputs, then the analyze action and its results
+        input_panel()
+        analysis_panel()
         
         # Display footer
         display_footer()
         
     except Exception as e:
-        logger.critical(f"Unexpected error in ATS Checker page: {str(e)}")
+        if type(e).__module__.startswith("streamlit"):
+            # st.rerun() from a panel
+            raise
+        logger.critical("Unexpected error in ATS Checker page: %s", e)
         st.error("A system error occurred. Please refresh the page and try again.")
         raise CustomException(e)
 
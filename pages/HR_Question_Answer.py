@@ -1,6 +1,8 @@
 
 from app.components.hr_qa import hr_behavioral_qa
+from app.core.metrics import instrument_page
 
+@instrument_page("hr_question_answer")
 def hr_qu_interface():
     hr_behavioral_qa()
 
@@ -3,6 +3,10 @@ Job Posting Analyzer UI Module
 
 This module provides a Streamlit-based user interface for the job posting analyzer
 feature, allowing users to enter job URLs and view analysis results.
+
+As soon as the input holds a valid URL, the analysis is started speculatively in
+the background, so "Analyze Job" shows a finished result or waits for one already
+on its way.
 """
 
 import streamlit as st
@@ -11,9 +15,11 @@ import streamlit as st
 from urllib.parse import urlparse
 
 # Import custom modules
-from app.utils.api_clients.job_posting_analyser_client import analyze_job_posting
+from app.components.queue_status import queue_status
+from app.core import session_store, speculation
 from app.core.exceptions import CustomException
 from app.core.logger import get_logger
+from app.core.metrics import instrument_page
 
 # Initialize logger for this module
 logger = get_logger(__name__)
@@ -36,10 +42,42 @@ def is_valid_url(url: str) -> bool:
         result = urlparse(url)
         return all([result.scheme, result.netloc])
     except Exception as e:
-        logger.warning(f"URL validation error: {str(e)}")
+        logger.warning("URL validation error: %s", e)
         return False
 
 
+def _analyze(url: str):
+    """Analyze `url` with the analysis started speculatively for it, or with a new request."""
+    from app.utils.api_clients.job_posting_analyser_client import analyze_job_posting
+
+    running = speculation.take("job_analysis", url)
+    if running is not None:
+        try:
+            analysis_results = running.result()
+            if analysis_results:
+                return analysis_results
+        except Exception as e:
+            logger.warning("Speculative analysis of %s failed, analyzing again: %s", url, e)
+    with queue_status():
+        return analyze_job_posting(url)
+
+
+def _speculate(url: str) -> None:
+    """Start analyzing a valid URL in the background; drop speculative work for anything else."""
+    if not is_valid_url(url):
+        speculation.discard("job_analysis")
+        return
+
+    from app.core.config import settings
+
+    def analyze():
+        from app.utils.api_clients.job_posting_analyser_client import analyze_job_posting
+        return analyze_job_posting(url)
+
+    speculation.speculate("job_analysis", url, analyze, limit=settings.SPECULATION_JOB_ANALYSIS_MAX_PER_SESSION)
+
+
+@instrument_page("job_posting_analyser")
 def display_job_posting_analyzer():
     """
     Display the job posting analyzer interface in Streamlit.
@@ -76,6 +114,8 @@ def display_job_posting_analyzer():
             placeholder="https://example.com/job-posting",
             help="Enter the full URL of the job posting you want to analyze"
         )
+        url = url.strip()
+        _speculate(url)
     
     with col2:
         st.write("")  # Add some spacing
@@ -93,30 +133,31 @@ def display_job_posting_analyzer():
             logger.warning("User attempted analysis without entering a URL")
         elif not is_valid_url(url):
             st.error("Please enter a valid URL (e.g., https://example.com/job)")
-            logger.warning(f"User entered invalid URL: {url}")
+            logger.warning("User entered invalid URL: %s", url)
         else:
             try:
                 # Show a spinner while analyzing
                 with st.spinner("Analyzing job posting..."):
-                    logger.info(f"Analyzing job posting URL: {url}")
-                    analysis_results = analyze_job_posting(url)
-                    st.session_state.analysis_results = analysis_results
+                    logger.info("Analyzing job posting URL: %s", url)
+                    analysis_results = _analyze(url)
+                    session_store.put("analysis_results", analysis_results)
                     
                 if analysis_results:
                     logger.info("Successfully retrieved analysis results")
                 else:
                     st.error("Failed to analyze the job posting. Please try again later.")
-                    logger.error(f"API returned no results for URL: {url}")
+                    logger.error("API returned no results for URL: %s", url)
             
             except CustomException as ce:
                 st.error(f"Error: {str(ce)}")
-                logger.error(f"Custom error during job analysis: {str(ce)}")
+                logger.error("Custom error during job analysis: %s", ce)
             except Exception as e:
                 st.error("An unexpected error occurred. Please try again later.")
-                logger.error(f"Unexpected error in job analysis UI: {str(e)}")
+                logger.error("Unexpected error in job analysis UI: %s", e)
     
     # Display analysis results if available
-    if st.session_state.analysis_results:
+    analysis_results = session_store.get("analysis_results")
+    if analysis_results:
         st.success("Analysis completed successfully!")
         
         # Create tabs for different sections of the analysis
@@ -147,7 +188,7 @@ def display_job_posting_analyzer():
         #             st.markdown(f"- {rec}")
         #     else:
         #         st.info("No specific recommendations available")
-        st.markdown(st.session_state.analysis_results)
+        st.markdown(analysis_results)
         
     
     # Add footer
@@ -164,5 +205,5 @@ if __name__ == "__main__":
         logger.info("Starting Job Posting Analyzer application")
         display_job_posting_analyzer()
     except Exception as e:
-        logger.critical(f"Application crashed: {str(e)}")
+        logger.critical("Application crashed: %s", e)
         st.error("The application encountered a critical error. Please refresh the page or try again later.")
\ No newline at end of file
@@ -1,6 +1,8 @@
 import streamlit as st
 from app.components.resume_builder import resume_builder
+from app.core.metrics import instrument_page
 
+@instrument_page("resume_tailor")
 def resume_tailor():
     st.title("AI Resume Tailor")
     st.write("Upload your resume and job details to create a tailored resume")
@@ -0,0 +1,19 @@
+"""
+Import budget test: every page imports within its budget on top of Streamlit,
+and importing it does not set up logging. Runs `benchmarks.bench_import_time
+--check` in a subprocess, which measures each page in fresh interpreters.
+"""
+
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+
+def test_pages_import_within_budget():
+    result = subprocess.run(
+        [sys.executable, "-m", "benchmarks.bench_import_time", "--check", "--runs", "3"],
+        cwd=ROOT, capture_output=True, text=True, timeout=600
+    )
+    assert result.returncode == 0, result.stdout + result.stderr
@@ -0,0 +1,54 @@
+"""
+Logger test: when the first records come from many threads at once, logging
+is still set up once, with one set of handlers. Runs in a subprocess, as the
+setup is process-wide.
+"""
+
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+SCRIPT = textwrap.dedent("""
+    import logging
+    import threading
+    import time
+
+    import app.core.logger as log
+
+    # Widen the window between checking for a setup and finishing it
+    settings = log._settings
+    log._settings = lambda: time.sleep(0.2) or settings()
+    created = []
+    init = log.CustomLogger.__init__
+    log.CustomLogger.__init__ = lambda self, **kwargs: created.append(1) or init(self, **kwargs)
+
+    logger = log.get_logger("race")
+    barrier = threading.Barrier(16)
+
+    def first_record():
+        barrier.wait()
+        logger.info("first record")
+
+    threads = [threading.Thread(target=first_record) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    print("result", len(created), len(logging.getLogger().handlers))
+""")
+
+
+def test_concurrent_first_records_set_up_logging_once(tmp_path):
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT], cwd=ROOT, capture_output=True, text=True, timeout=60,
+        env={"PYTHONPATH": str(ROOT), "LOG_DIR": str(tmp_path), "LOG_QUEUE_ENABLED": "true", "PATH": ""}
+    )
+    assert result.returncode == 0, result.stderr
+    line = next(line for line in result.stdout.splitlines() if line.startswith("result "))
+    created, handlers = map(int, line.split()[1:])
+    assert created == 1
+    # Queue mode: the root logger holds only the queue handler
+    assert handlers == 1
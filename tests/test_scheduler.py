@@ -0,0 +1,38 @@
+"""
+Scheduler test: a huge Retry-After from the backend holds the workload class
+back for at most API_RETRY_AFTER_MAX_SECONDS, and calls whose budget ends
+before the pause does fail right away instead of waiting it out.
+"""
+
+import time
+
+import pytest
+
+from app.core.config import settings
+from app.utils.api_clients.scheduler import FairScheduler, QueueTimeout
+
+ENDPOINT = "/api/hr-qa/answer"
+
+
+def test_huge_retry_after_is_capped(monkeypatch):
+    monkeypatch.setattr(settings, "API_RETRY_AFTER_MAX_SECONDS", 0.3)
+    scheduler = FairScheduler(capacity=2, name="test")
+    scheduler.release(scheduler.acquire("a", ENDPOINT), retry_after=3600)
+
+    assert scheduler._paused_until - time.perf_counter() <= 0.3
+    start = time.perf_counter()
+    ticket = scheduler.acquire("b", ENDPOINT, timeout=5)
+    assert time.perf_counter() - start < 1.0
+    scheduler.release(ticket)
+
+
+def test_pause_past_the_budget_fails_fast(monkeypatch):
+    monkeypatch.setattr(settings, "API_RETRY_AFTER_MAX_SECONDS", 30)
+    scheduler = FairScheduler(capacity=2, name="test")
+    scheduler.release(scheduler.acquire("a", ENDPOINT), retry_after=3600)
+
+    start = time.perf_counter()
+    with pytest.raises(QueueTimeout):
+        scheduler.acquire("b", ENDPOINT, timeout=10)
+    assert time.perf_counter() - start < 1.0
+    assert scheduler.waiting() == 0
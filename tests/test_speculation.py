@@ -0,0 +1,42 @@
+"""
+Speculation test: superseded streamed work stops at its next item and closes
+its iterator, and speculations let go of their work and results once they
+are cancelled or handed over.
+"""
+
+import threading
+
+from app.core.speculation import Speculation
+
+
+def _stream(closed: threading.Event, release: threading.Event):
+    try:
+        for item in range(1000):
+            yield item
+            if item == 2:
+                release.wait(5)
+    finally:
+        closed.set()
+
+
+def test_cancelled_stream_stops_and_closes():
+    closed, release = threading.Event(), threading.Event()
+    speculation = Speculation("test", "key", lambda: _stream(closed, release), delay=0, stream=True)
+    speculation.start()
+    items = speculation.items()
+    assert [next(items) for _ in range(3)] == [0, 1, 2]
+
+    speculation.cancel()
+    release.set()
+    assert closed.wait(5)
+    assert speculation._done.wait(5)
+    assert speculation._items == [] and speculation._work is None
+    assert list(items) == []
+
+
+def test_taken_result_is_dropped():
+    speculation = Speculation("test", "key", lambda: "report", delay=0)
+    speculation.start()
+    assert speculation.result(timeout=5) == "report"
+    assert speculation.consumed
+    assert speculation._work is None and speculation._result is None